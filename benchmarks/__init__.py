@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for Musos-Assist.
+
+Each module is runnable from the repository root, e.g.
+`python -m benchmarks.journal --singles 10000`.
+"""
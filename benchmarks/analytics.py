@@ -0,0 +1,102 @@
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Iterator
+from musos_assist.adapters.analytics import CatalogueMirror
+from musos_assist.domain.models import MusicSingleRelease
+from benchmarks.catalogue import synthetic_singles
+
+
+def varied_singles(
+    count: int, artists: int, rng: random.Random
+) -> Iterator[MusicSingleRelease]:
+    """Synthetic singles spread over months, genres, labels and artists."""
+    genres = [f"Genre {n}" for n in range(40)]
+    labels = [f"Label {n}" for n in range(2_000)]
+    for single in synthetic_singles(count):
+        yield single.model_copy(
+            update={
+                "release_date": date(2000, 1, 1) + timedelta(days=rng.randrange(9_000)),
+                "genres": rng.sample(genres, rng.randint(1, 3)),
+                "label": rng.choice(labels),
+                "duration": timedelta(seconds=rng.randint(90, 480)),
+                "artist_names": [
+                    f"Artist {rng.randrange(artists)}"
+                    for _ in range(rng.choice((1, 1, 1, 2, 3)))
+                ],
+            }
+        )
+
+
+def aggregate_models(singles: list[MusicSingleRelease]) -> dict[str, Any]:
+    """The same aggregates computed by iterating the models, for comparison."""
+    per_month: dict[str, int] = {}
+    per_genre: dict[str, int] = {}
+    per_label: dict[str, int] = {}
+    durations: list[float] = []
+    pairs: dict[tuple[str, str], int] = {}
+    for single in singles:
+        month = single.release_date.strftime("%Y-%m")
+        per_month[month] = per_month.get(month, 0) + 1
+        for genre in set(single.genres):
+            per_genre[genre] = per_genre.get(genre, 0) + 1
+        if single.label is not None:
+            per_label[single.label] = per_label.get(single.label, 0) + 1
+        if single.duration is not None:
+            durations.append(single.duration.total_seconds())
+        names = sorted(set(single.artist_names))
+        for i, first in enumerate(names):
+            for second in names[i + 1 :]:
+                pairs[first, second] = pairs.get((first, second), 0) + 1
+    return {
+        "per_month": per_month,
+        "per_genre": per_genre,
+        "per_label": per_label,
+        "median": statistics.median(durations),
+        "pairs": sorted(pairs.items(), key=lambda item: -item[1])[:20],
+    }
+
+
+def timed(function: Callable[[], Any], repeat: int) -> float:
+    """Median milliseconds of `repeat` calls."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(singles: int, artists: int, repeat: int) -> dict[str, Any]:
+    rng = random.Random(0)
+    catalogue = list(varied_singles(singles, artists, rng))
+    mirror = CatalogueMirror()
+    started = time.perf_counter()
+    for single in catalogue:
+        mirror.put(single)
+    load = time.perf_counter() - started
+    return {
+        "singles": singles,
+        "artists": artists,
+        "mirror_put_us": load / singles * 1_000_000,
+        "stats_ms": timed(mirror.stats, repeat),
+        "iterate_models_ms": timed(lambda: aggregate_models(catalogue), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare catalogue statistics from the mirror with iterating models."
+    )
+    parser.add_argument("--singles", type=int, default=1_000_000)
+    parser.add_argument("--artists", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.singles, args.artists, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
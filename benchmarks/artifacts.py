@@ -0,0 +1,102 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any
+from musos_assist.adapters.artifacts import FileSystemArtifactStore
+from musos_assist.constants import ARTIFACT_BLOCK_SIZE
+from musos_assist.domain.models import ArtifactUploadRequest
+
+VERSIONS = ("Radio Edit", "Extended Mix", "Acoustic")
+
+
+def release_files(stem_mib: int, unique_mib: int) -> dict[str, dict[str, bytes]]:
+    """
+    Artifacts of a multi-version release: the same artwork and stems in each
+    version, plus a master of `unique_mib` MiB that is particular to it.
+    """
+    rng = random.Random(0)
+    shared = {
+        "artwork.png": rng.randbytes(ARTIFACT_BLOCK_SIZE // 2),
+        "stems.zip": rng.randbytes(stem_mib * ARTIFACT_BLOCK_SIZE),
+    }
+    return {
+        version: {
+            **shared,
+            "master.flac": rng.randbytes(unique_mib * ARTIFACT_BLOCK_SIZE),
+        }
+        for version in VERSIONS
+    }
+
+
+def upload(
+    store: FileSystemArtifactStore, isrc: str, name: str, content: bytes, reuse: bool
+) -> int:
+    """Upload an artifact, offering its block digests first when `reuse`; return bytes sent."""
+    request = ArtifactUploadRequest(name=name, size=len(content))
+    upload_id = store.start_upload(isrc, request).upload_id
+    offset = 0
+    if reuse:
+        digests = [
+            hashlib.sha256(content[start : start + ARTIFACT_BLOCK_SIZE]).hexdigest()
+            for start in range(0, len(content), ARTIFACT_BLOCK_SIZE)
+        ]
+        offset = store.reuse_blocks(upload_id, 0, digests).offset
+    writer = store.open_chunk(upload_id, offset)
+    try:
+        writer.write(content[offset:])
+        writer.commit()
+    finally:
+        writer.close()
+    store.complete_upload(upload_id)
+    return len(content) - offset
+
+
+def stored_bytes(root: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(os.path.join(root, "blocks"))
+        for name in names
+    )
+
+
+def run(stem_mib: int, unique_mib: int) -> dict[str, Any]:
+    release = release_files(stem_mib, unique_mib)
+    logical = sum(
+        len(content) for files in release.values() for content in files.values()
+    )
+    results: dict[str, Any] = {"versions": len(VERSIONS), "logical_bytes": logical}
+    for reuse in (False, True):
+        with tempfile.TemporaryDirectory() as root:
+            store = FileSystemArtifactStore(root)
+            sent = 0
+            started = time.perf_counter()
+            for index, files in enumerate(release.values()):
+                for name, content in files.items():
+                    sent += upload(store, f"USX9P24{index:05d}", name, content, reuse)
+            label = "reuse" if reuse else "upload_all"
+            results[f"{label}_sec"] = time.perf_counter() - started
+            results[f"{label}_sent_bytes"] = sent
+            results["stored_bytes"] = stored_bytes(root)
+    results["storage_reduction"] = logical / results["stored_bytes"]
+    results["upload_reduction"] = (
+        results["upload_all_sent_bytes"] / results["reuse_sent_bytes"]
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure artifact storage and upload for a multi-version release."
+    )
+    parser.add_argument("--stem-mib", type=int, default=64)
+    parser.add_argument("--unique-mib", type=int, default=16)
+    args = parser.parse_args()
+    print(json.dumps(run(args.stem_mib, args.unique_mib), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+from typing import Any, Callable
+from musos_assist.adapters.bundles import (
+    BundleViewsMusicSingleReleaseRepository,
+    InMemoryBundleRepository,
+)
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.domain.models import ReleaseBundle
+from benchmarks.catalogue import synthetic_singles
+
+
+def timed(function: Callable[[], Any], repeat: int) -> float:
+    """Median microseconds of `repeat` calls."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(timings)
+
+
+def run(tracks: int, albums: int, repeat: int) -> dict[str, Any]:
+    rng = random.Random(0)
+    catalogue = ConcurrentInMemoryMusicSingleReleaseRepository()
+    bundles = InMemoryBundleRepository(catalogue)
+    singles = BundleViewsMusicSingleReleaseRepository(catalogue, bundles)
+    created = singles.create_singles(list(synthetic_singles(tracks)))
+    isrcs = [single.isrc for single in created]
+    per_album = tracks // albums
+    for n in range(albums):
+        bundles.create_bundle(
+            ReleaseBundle(
+                id=f"album-{n}",
+                title=f"Album {n}",
+                kind="album",
+                tracks=isrcs[n * per_album : (n + 1) * per_album],
+            )
+        )
+    compilation = ReleaseBundle(
+        id="compilation",
+        title="Compilation",
+        kind="compilation",
+        bundles=[f"album-{n}" for n in range(albums)],
+    )
+    bundles.create_bundle(compilation)
+
+    def walk() -> None:
+        """Read every track of the compilation and aggregate them."""
+        duration = timedelta()
+        genres: set[str] = set()
+        for album in compilation.bundles:
+            for isrc in bundles.read_bundle(album).bundle.tracks:
+                single = singles.read_single(isrc)
+                duration += single.duration or timedelta()
+                genres.update(single.genres)
+
+    def write() -> None:
+        single = singles.read_single(rng.choice(isrcs))
+        singles.update_single(
+            single.isrc,
+            single.model_copy(
+                update={"duration": timedelta(seconds=rng.randrange(90, 480))}
+            ),
+        )
+
+    def write_and_read() -> None:
+        write()
+        bundles.read_bundle("compilation")
+
+    return {
+        "tracks": tracks,
+        "albums": albums,
+        "read_view_us": timed(lambda: bundles.read_bundle("compilation"), repeat),
+        "read_after_write_us": timed(write_and_read, repeat),
+        "write_only_us": timed(write, repeat),
+        "walk_tracks_us": timed(walk, repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare reading a bundle's kept aggregates with walking its tracks."
+    )
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--albums", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.tracks, args.albums, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from itertools import accumulate
+from typing import Any, List
+from musos_assist.adapters.caching import CachingMusicSingleReleaseRepository
+from musos_assist.adapters.sqlite import SQLiteMusicSingleReleaseRepository
+from musos_assist.domain.ports import MusicSingleReleaseRepository
+from benchmarks.catalogue import synthetic_singles
+
+
+def skewed_isrcs(
+    isrcs: List[str], reads: int, skew: float, rng: random.Random
+) -> List[str]:
+    """ISRCs to read, the nth most popular with weight 1 / n ** skew (Zipf)."""
+    weights = list(accumulate(1 / (n + 1) ** skew for n in range(len(isrcs))))
+    return rng.choices(isrcs, cum_weights=weights, k=reads)
+
+
+def read_all(repository: MusicSingleReleaseRepository, isrcs: List[str]) -> float:
+    """Mean microseconds per read."""
+    started = time.perf_counter()
+    for isrc in isrcs:
+        try:
+            repository.read_single(isrc)
+        except ValueError:
+            pass
+    return (time.perf_counter() - started) * 1_000_000 / len(isrcs)
+
+
+def run(singles: int, reads: int, size: int, skew: float) -> dict[str, Any]:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as scratch:
+        backend = SQLiteMusicSingleReleaseRepository(
+            os.path.join(scratch, "singles.db")
+        )
+        created = backend.create_singles(list(synthetic_singles(singles)))
+        # One read in twenty is of a single the catalogue has not got
+        isrcs = [single.isrc for single in created]
+        isrcs += [f"ZZ{n:010d}" for n in range(singles // 20)]
+        rng.shuffle(isrcs)
+        workload = skewed_isrcs(isrcs, reads, skew, rng)
+        cached = CachingMusicSingleReleaseRepository(backend, size=size)
+        uncached_us = read_all(backend, workload)
+        cached_us = read_all(cached, workload)
+        hits, misses = cached.hit_counts()
+    return {
+        "singles": singles,
+        "reads": reads,
+        "cache_size": size,
+        "skew": skew,
+        "uncached_read_us": uncached_us,
+        "cached_read_us": cached_us,
+        "hit_ratio": hits / (hits + misses),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare skewed reads of a SQLite catalogue with and without "
+        "a read-through cache."
+    )
+    parser.add_argument("--singles", type=int, default=20_000)
+    parser.add_argument("--reads", type=int, default=100_000)
+    parser.add_argument("--cache-size", type=int, default=1_000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    args = parser.parse_args()
+    print(
+        json.dumps(run(args.singles, args.reads, args.cache_size, args.skew), indent=2)
+    )
+
+
+if __name__ == "__main__":
+    main()
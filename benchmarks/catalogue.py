@@ -0,0 +1,16 @@
+from typing import Iterator
+from musos_assist.constants import EXAMPLE_SINGLE_DATA
+from musos_assist.domain.models import MusicSingleRelease
+
+
+def synthetic_isrc(n: int) -> str:
+    return f"USX9P{n:07d}"
+
+
+def synthetic_singles(count: int, start: int = 0) -> Iterator[MusicSingleRelease]:
+    """Yield `count` distinct singles derived from EXAMPLE_SINGLE_DATA."""
+    template = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+    for n in range(start, start + count):
+        yield template.model_copy(
+            update={"isrc": synthetic_isrc(n), "title": f"{template.title} {n}"}
+        )
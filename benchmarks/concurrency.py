@@ -0,0 +1,79 @@
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.constants import LOCK_STRIPES
+from musos_assist.domain.ports import MusicSingleReleaseRepository
+from benchmarks.catalogue import synthetic_isrc, synthetic_singles
+
+
+def mixed_throughput(
+    repository: MusicSingleReleaseRepository,
+    catalogue: int,
+    operations: int,
+    threads: int,
+    write_ratio: float,
+) -> float:
+    """
+    Run `operations` reads and updates, split across `threads` threads, against
+    singles of an existing catalogue; return operations/sec.
+    """
+    per_thread = operations // threads
+    singles = list(synthetic_singles(catalogue))
+
+    def work(thread: int) -> None:
+        rng = random.Random(thread)
+        for _ in range(per_thread):
+            n = rng.randrange(catalogue)
+            if rng.random() < write_ratio:
+                repository.update_single(synthetic_isrc(n), singles[n])
+            else:
+                repository.read_single(synthetic_isrc(n))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(work, range(threads)))
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def run(
+    catalogue: int, operations: int, threads: list[int], write_ratio: float
+) -> dict[str, Any]:
+    results: dict[str, Any] = {
+        "catalogue": catalogue,
+        "operations": operations,
+        "write_ratio": write_ratio,
+        "ops_per_sec": {},
+    }
+    # One stripe queues every writer on one lock, which striping avoids
+    for label, stripes in (("striped", LOCK_STRIPES), ("one_stripe", 1)):
+        throughput = results["ops_per_sec"][label] = {}
+        for count in threads:
+            repository = ConcurrentInMemoryMusicSingleReleaseRepository(stripes)
+            repository.create_singles(list(synthetic_singles(catalogue)))
+            throughput[count] = mixed_throughput(
+                repository, catalogue, operations, count, write_ratio
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure concurrent in-memory throughput per thread count."
+    )
+    parser.add_argument("--catalogue", type=int, default=10_000)
+    parser.add_argument("--operations", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+    results = run(args.catalogue, args.operations, args.threads, args.write_ratio)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
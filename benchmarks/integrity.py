@@ -0,0 +1,55 @@
+import argparse
+import json
+import time
+from itertools import islice
+from typing import Any
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.adapters.integrity import (
+    BackgroundIntegrityScanner,
+    IntegrityChecker,
+)
+from musos_assist.constants import INTEGRITY_BATCH_SIZE
+from benchmarks.catalogue import synthetic_singles
+
+
+def run(singles: int, batch_size: int) -> dict[str, Any]:
+    catalogue = list(synthetic_singles(singles))
+    checker = IntegrityChecker(2025)
+    started = time.perf_counter()
+    findings = 0
+    batches = iter(catalogue)
+    while batch := list(islice(batches, batch_size)):
+        findings += len(checker.check(batch))
+    check_seconds = time.perf_counter() - started
+
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    repository.create_singles(catalogue)
+    scanner = BackgroundIntegrityScanner(repository, batch_size=batch_size)
+    started = time.perf_counter()
+    scan = scanner.start_scan()
+    while (scan := scanner.read_scan(scan.id)).state == "running":
+        time.sleep(0.01)
+    return {
+        "singles": singles,
+        "batch_size": batch_size,
+        "issues": findings,
+        "check_seconds": check_seconds,
+        "scan_seconds": time.perf_counter() - started,
+        "scan_state": scan.state,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time an integrity scan of a large in-memory catalogue."
+    )
+    parser.add_argument("--singles", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=INTEGRITY_BATCH_SIZE)
+    args = parser.parse_args()
+    print(json.dumps(run(args.singles, args.batch_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
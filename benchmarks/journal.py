@@ -0,0 +1,65 @@
+import argparse
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.adapters.journal import JournalMusicSingleReleaseRepository
+from musos_assist.domain.ports import MusicSingleReleaseRepository
+from benchmarks.catalogue import synthetic_singles
+
+
+def write_throughput(
+    repository: MusicSingleReleaseRepository, singles: int, writers: int
+) -> float:
+    """Create `singles` singles across `writers` threads; return singles/sec."""
+    per_writer = singles // writers
+
+    def write(writer: int) -> None:
+        for single in synthetic_singles(per_writer, start=writer * per_writer):
+            repository.create_single(single)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(write, range(writers)))
+    return per_writer * writers / (time.perf_counter() - started)
+
+
+def run(singles: int, writers: int, snapshot_every: int) -> dict[str, Any]:
+    results: dict[str, Any] = {"singles": singles, "writers": writers}
+    results["in_memory_writes_per_sec"] = write_throughput(
+        InMemoryMusicSingleReleaseRepository(), singles, 1
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        journal = JournalMusicSingleReleaseRepository(
+            directory, snapshot_every=snapshot_every
+        )
+        results["journal_writes_per_sec"] = write_throughput(journal, singles, writers)
+        journal.close()
+
+        started = time.perf_counter()
+        recovered = JournalMusicSingleReleaseRepository(directory)
+        results["journal_recovery_sec"] = time.perf_counter() - started
+        recovered.snapshot()
+        recovered.close()
+
+        started = time.perf_counter()
+        JournalMusicSingleReleaseRepository(directory).close()
+        results["snapshot_recovery_sec"] = time.perf_counter() - started
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare journal and in-memory write throughput and recovery."
+    )
+    parser.add_argument("--singles", type=int, default=10_000)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--snapshot-every", type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.singles, args.writers, args.snapshot_every), indent=2))
+
+
+if __name__ == "__main__":
+    main()
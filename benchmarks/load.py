@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+from starlette.types import Message
+from musos_assist import app
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.adapters.artifacts import FileSystemArtifactStore
+from musos_assist.adapters.columnar import ColumnarMusicSingleReleaseRepository
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.adapters.journal import JournalMusicSingleReleaseRepository
+from musos_assist.adapters.sqlite import SQLiteMusicSingleReleaseRepository
+from musos_assist.constants import NDJSON_MEDIA_TYPE
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.domain.ports import MusicSingleReleaseRepository
+from musos_assist.routers import get_artifact_store, get_repository
+from benchmarks.catalogue import synthetic_isrc, synthetic_singles
+
+# Name -> factory given a scratch directory
+REPOSITORIES: dict[str, Callable[[str], MusicSingleReleaseRepository]] = {
+    "in_memory": lambda scratch: InMemoryMusicSingleReleaseRepository(),
+    "concurrent": lambda scratch: ConcurrentInMemoryMusicSingleReleaseRepository(),
+    "columnar": lambda scratch: ColumnarMusicSingleReleaseRepository(),
+    "sqlite": lambda scratch: SQLiteMusicSingleReleaseRepository(
+        os.path.join(scratch, "singles.db")
+    ),
+    "journal": lambda scratch: JournalMusicSingleReleaseRepository(
+        os.path.join(scratch, "journal")
+    ),
+}
+
+# Singles per request of the bulk routes
+BULK_ROWS = 100
+
+Headers = list[tuple[bytes, bytes]]
+Request = tuple[str, str, bytes, Headers]
+
+
+async def call(method: str, url: str, body: bytes, headers: Headers) -> int:
+    """Send one request straight into the ASGI app; return the status code."""
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"benchmark"), *headers],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    status = 0
+    sent = False
+    done = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Nothing more to read: the client only goes away once answered
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return status
+
+
+def single_json(single: MusicSingleRelease) -> bytes:
+    return single.model_dump_json().encode()
+
+
+JSON = [(b"content-type", b"application/json")]
+NDJSON = [(b"content-type", NDJSON_MEDIA_TYPE.encode())]
+
+
+def routes(catalogue: int, requests: int) -> dict[str, Callable[[int], Request]]:
+    """
+    Route name -> function of the request number giving the request to send.
+    Routes that write keep the catalogue at its size: creates are deleted
+    again, and updates rewrite a single with the same content.
+    """
+    template = next(synthetic_singles(1))
+    created = list(synthetic_singles(requests, start=catalogue))
+    batches = [
+        list(synthetic_singles(BULK_ROWS, start=catalogue + requests + n * BULK_ROWS))
+        for n in range(max(1, requests // BULK_ROWS))
+    ]
+
+    def existing(n: int) -> MusicSingleRelease:
+        return template.model_copy(
+            update={
+                "isrc": synthetic_isrc(n % catalogue),
+                "title": f"{template.title} {n % catalogue}",
+            }
+        )
+
+    def rows(batch: list[MusicSingleRelease], delete: bool = False) -> bytes:
+        return b"\n".join(
+            (
+                json.dumps({"isrc": single.isrc}).encode()
+                if delete
+                else single_json(single)
+            )
+            for single in batch
+        )
+
+    return {
+        "create": lambda n: ("POST", "/singles/", single_json(created[n]), JSON),
+        "read": lambda n: ("GET", f"/singles/{synthetic_isrc(n % catalogue)}", b"", []),
+        "list_page": lambda n: (
+            "GET",
+            f"/singles/?limit=100&after={synthetic_isrc(n * 97 % catalogue)}",
+            b"",
+            [],
+        ),
+        "list_all": lambda n: ("GET", "/singles/", b"", []),
+        "list_stream": lambda n: (
+            "GET",
+            "/singles/",
+            b"",
+            [(b"accept", NDJSON_MEDIA_TYPE.encode())],
+        ),
+        "query": lambda n: ("GET", "/singles/?genre=Rock&limit=100", b"", []),
+        "search": lambda n: ("GET", f"/singles/search?q={n % catalogue}", b"", []),
+        "update": lambda n: (
+            "PUT",
+            f"/singles/{synthetic_isrc(n % catalogue)}",
+            single_json(existing(n)),
+            JSON,
+        ),
+        "delete": lambda n: ("DELETE", f"/singles/{created[n].isrc}", b"", []),
+        "bulk_create": lambda n: (
+            "POST",
+            "/singles/bulk",
+            rows(batches[n % len(batches)]),
+            NDJSON,
+        ),
+        "bulk_delete": lambda n: (
+            "POST",
+            "/singles/bulk/delete",
+            rows(batches[n % len(batches)], delete=True),
+            NDJSON,
+        ),
+        "export": lambda n: ("GET", "/singles/export", b"", []),
+    }
+
+
+# Route -> share of the requests it is sent, for routes that answer with the
+# whole catalogue or write many singles, so each route takes a similar time
+ROUTE_SHARE: dict[str, float] = {
+    "list_all": 0.01,
+    "list_stream": 0.01,
+    "export": 0.01,
+    "bulk_create": 1 / BULK_ROWS,
+    "bulk_delete": 1 / BULK_ROWS,
+}
+
+
+async def drive(
+    request: Callable[[int], Request], count: int, concurrency: int
+) -> dict[str, Any]:
+    """Send `count` requests from `concurrency` concurrent clients."""
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(count))
+
+    async def client() -> None:
+        nonlocal errors
+        for n in remaining:
+            method, url, body, headers = request(n)
+            started = time.perf_counter()
+            status = await call(method, url, body, headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    percentiles = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else latencies * 99
+    )
+    return {
+        "requests": count,
+        "errors": errors,
+        "requests_per_sec": count / elapsed,
+        "p50_ms": percentiles[49],
+        "p95_ms": percentiles[94],
+        "p99_ms": percentiles[98],
+    }
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process so far, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_repository(
+    name: str, catalogue: int, requests: int, concurrency: int
+) -> dict[str, Any]:
+    """Load one repository with the catalogue and drive every route at it."""
+    with tempfile.TemporaryDirectory() as scratch:
+        repository = REPOSITORIES[name](scratch)
+        artifacts = FileSystemArtifactStore(os.path.join(scratch, "artifacts"))
+        app.dependency_overrides[get_repository] = lambda: repository
+        app.dependency_overrides[get_artifact_store] = lambda: artifacts
+        started = time.perf_counter()
+        repository.create_singles(list(synthetic_singles(catalogue)))
+        results: dict[str, Any] = {"load_sec": time.perf_counter() - started}
+        requests_for = routes(catalogue, requests)
+
+        async def every_route() -> None:
+            for route, request in requests_for.items():
+                count = max(1, int(requests * ROUTE_SHARE.get(route, 1.0)))
+                results[route] = await drive(request, count, concurrency)
+
+        asyncio.run(every_route())
+        results["peak_rss_bytes"] = peak_rss()
+        app.dependency_overrides.clear()
+        return results
+
+
+def run(
+    repositories: list[str], catalogue: int, requests: int, concurrency: int
+) -> dict[str, Any]:
+    results: dict[str, Any] = {
+        "python": platform.python_version(),
+        "catalogue": catalogue,
+        "requests": requests,
+        "concurrency": concurrency,
+        "repositories": {},
+    }
+    for name in repositories:
+        # A fresh process per repository, so that each peak RSS is its own
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            results["repositories"][name] = pool.submit(
+                run_repository, name, catalogue, requests, concurrency
+            ).result()
+    return results
+
+
+def regressions(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """
+    Describe every route now slower at p95, or lower in throughput, than in
+    a baseline run, by more than `tolerance` as a fraction.
+    """
+    found: list[str] = []
+    for name, routes_now in results["repositories"].items():
+        routes_then = baseline["repositories"].get(name, {})
+        for route, now in routes_now.items():
+            then = routes_then.get(route)
+            if not isinstance(now, dict) or not isinstance(then, dict):
+                continue
+            if now["p95_ms"] > then["p95_ms"] * (1 + tolerance):
+                found.append(
+                    f"{name} {route}: p95 {then['p95_ms']:.2f} -> {now['p95_ms']:.2f} ms"
+                )
+            if now["requests_per_sec"] < then["requests_per_sec"] * (1 - tolerance):
+                found.append(
+                    f"{name} {route}: {then['requests_per_sec']:.0f} -> "
+                    f"{now['requests_per_sec']:.0f} requests/sec"
+                )
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load-test every /singles route in-process, per repository."
+    )
+    parser.add_argument(
+        "--repositories", nargs="+", choices=REPOSITORIES, default=list(REPOSITORIES)
+    )
+    parser.add_argument("--catalogue", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    parser.add_argument(
+        "--baseline", help="Results of an earlier run; exit 1 on any regression."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Fraction a route may slow down by against the baseline.",
+    )
+    args = parser.parse_args()
+    results = run(args.repositories, args.catalogue, args.requests, args.concurrency)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            found = regressions(results, json.load(file), args.tolerance)
+        for regression in found:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from itertools import accumulate, islice
+from typing import Any, Callable, Iterator, List
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.adapters.columnar import ColumnarMusicSingleReleaseRepository
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.domain.ports import MusicSingleReleaseRepository
+from benchmarks.catalogue import synthetic_singles
+from benchmarks.search import vocabulary
+
+# Name -> factory given a scratch directory
+REPOSITORIES: dict[str, Callable[[str], MusicSingleReleaseRepository]] = {
+    "in_memory": lambda scratch: InMemoryMusicSingleReleaseRepository(),
+    "columnar": lambda scratch: ColumnarMusicSingleReleaseRepository(),
+    # Lyrics spilled to a file rather than kept compressed in memory
+    "columnar_spilled": lambda scratch: ColumnarMusicSingleReleaseRepository(
+        os.path.join(scratch, "lyrics")
+    ),
+}
+
+
+def catalogue_singles(count: int) -> Iterator[MusicSingleRelease]:
+    """
+    Synthetic singles with varied titles and lyrics, and artists, genres and
+    labels drawn from pools the size a real catalogue would share them across.
+    """
+    rng = random.Random(0)
+    words = vocabulary(20_000, rng)
+    # Cumulative Zipf-like weights, computed once rather than per choice
+    cumulative = list(accumulate(1 / (rank + 1) for rank in range(len(words))))
+    artists = [f"Artist {n}" for n in range(max(1, count // 10))]
+    genres = [f"Genre {n}" for n in range(200)]
+    labels = [f"Label {n}" for n in range(max(1, count // 100))]
+    for single in synthetic_singles(count):
+        yield single.model_copy(
+            update={
+                "title": " ".join(rng.choices(words, cum_weights=cumulative, k=3)),
+                "lyrics": " ".join(rng.choices(words, cum_weights=cumulative, k=120)),
+                "artist_names": rng.sample(artists, k=rng.randint(1, 2)),
+                "genres": rng.sample(genres, k=2),
+                "label": rng.choice(labels),
+            }
+        )
+
+
+def resident_bytes(
+    load: Callable[[List[MusicSingleRelease]], object], singles: int, batch: int
+) -> tuple[int, float]:
+    """
+    Load a catalogue in batches and return the bytes kept allocated once
+    loaded, with the seconds the load took.
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    source = catalogue_singles(singles)
+    while chunk := list(islice(source, batch)):
+        load(chunk)
+    del chunk, source
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, elapsed
+
+
+def run(singles: int, batch: int, repositories: list[str]) -> dict[str, Any]:
+    results: dict[str, Any] = {"singles": singles, "repositories": {}}
+    # Baseline: the models alone, in a dict keyed by ISRC, without the
+    # inverted and full-text indexes the in-memory repository keeps
+    models: dict[str, MusicSingleRelease] = {}
+    size, _ = resident_bytes(
+        lambda chunk: models.update((single.isrc, single) for single in chunk),
+        singles,
+        batch,
+    )
+    models.clear()
+    results["models"] = {"bytes": size, "bytes_per_single": size / singles}
+    for name in repositories:
+        with tempfile.TemporaryDirectory() as scratch:
+            repository = REPOSITORIES[name](scratch)
+            size, elapsed = resident_bytes(repository.create_singles, singles, batch)
+            del repository
+        results["repositories"][name] = {
+            "bytes": size,
+            "bytes_per_single": size / singles,
+            "load_seconds": elapsed,
+        }
+    sizes = results["repositories"]
+    baseline = results["models"]["bytes"]
+    # How many times smaller each repository is than the models alone
+    results["reduction"] = {
+        name: baseline / size["bytes"]
+        for name, size in sizes.items()
+        if name != "in_memory"
+    }
+    if "in_memory" in sizes:
+        # Share of the in-memory repository taken by its indexes
+        results["in_memory_index_share"] = 1 - baseline / sizes["in_memory"]["bytes"]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure the memory a loaded catalogue keeps per repository."
+    )
+    parser.add_argument("--singles", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument(
+        "--repositories",
+        nargs="+",
+        choices=sorted(REPOSITORIES),
+        default=list(REPOSITORIES),
+    )
+    args = parser.parse_args()
+    print(json.dumps(run(args.singles, args.batch, args.repositories), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from musos_assist.adapters.scheduler import HeapReleaseScheduler
+
+
+def run(pending: int, fsync: bool, directory: Optional[str]) -> dict[str, Any]:
+    rng = random.Random(0)
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    with tempfile.TemporaryDirectory(dir=directory) as temp:
+        path = os.path.join(temp, "schedule.log")
+        scheduler = HeapReleaseScheduler(path, fsync=fsync)
+        started = time.perf_counter()
+        releases = [
+            scheduler.schedule(
+                f"US{n:010d}",
+                rng.choice(("publish", "promote")),
+                start + timedelta(minutes=rng.randrange(525_600)),
+            )
+            for n in range(pending)
+        ]
+        schedule = time.perf_counter() - started
+
+        cancelled = releases[: pending // 10]
+        started = time.perf_counter()
+        for release in cancelled:
+            scheduler.cancel(release.isrc, release.id)
+        cancel = time.perf_counter() - started
+
+        # Release day: take and complete one day's actions in scheduler batches
+        day = start + timedelta(days=1)
+        started = time.perf_counter()
+        fired = 0
+        while batch := scheduler.take_due(day, 100):
+            scheduler.complete([release.id for release in batch])
+            fired += len(batch)
+        fire = time.perf_counter() - started
+        scheduler.close()
+
+        started = time.perf_counter()
+        restarted = HeapReleaseScheduler(path, fsync=fsync)
+        restarted.next_due()
+        replay = time.perf_counter() - started
+        restarted.close()
+    return {
+        "pending": pending,
+        "fsync": fsync,
+        "schedule_us": schedule / pending * 1_000_000,
+        "cancel_us": cancel / len(cancelled) * 1_000_000,
+        "fired_on_day": fired,
+        "fire_us": fire / max(fired, 1) * 1_000_000,
+        "replay_ms": replay * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time scheduling, cancelling and firing release actions."
+    )
+    parser.add_argument("--pending", type=int, default=100_000)
+    parser.add_argument("--fsync", action="store_true")
+    parser.add_argument("--dir", default=None, help="Directory for the schedule log.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.pending, args.fsync, args.dir), indent=2))
+
+
+if __name__ == "__main__":
+    main()
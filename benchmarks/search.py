@@ -0,0 +1,85 @@
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Iterator
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.domain.models import MusicSingleRelease
+from benchmarks.catalogue import synthetic_singles
+
+SYLLABLES = (
+    "la mi ro sa ven tor el dan ka sun mor bi de fu go ha ju ne pi qua re ti".split()
+)
+
+
+def vocabulary(size: int, rng: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def worded_singles(
+    count: int, words: list[str], rng: random.Random
+) -> Iterator[MusicSingleRelease]:
+    """Synthetic singles with titles and lyrics drawn from a Zipf-like mix."""
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    for single in synthetic_singles(count):
+        yield single.model_copy(
+            update={
+                "title": " ".join(rng.choices(words, weights, k=3)),
+                "lyrics": " ".join(rng.choices(words, weights, k=120)),
+            }
+        )
+
+
+def run(singles: int, words: int, queries: int) -> dict[str, Any]:
+    rng = random.Random(0)
+    vocabulary_words = vocabulary(words, rng)
+    catalogue = list(worded_singles(singles, vocabulary_words, rng))
+    repository = InMemoryMusicSingleReleaseRepository()
+    started = time.perf_counter()
+    repository.create_singles(catalogue)
+    results: dict[str, Any] = {
+        "singles": singles,
+        "vocabulary": words,
+        "index_sec": time.perf_counter() - started,
+    }
+    # Rare and common words, alone, in pairs and as prefixes
+    for label, pool in (
+        ("rare", vocabulary_words[len(vocabulary_words) // 2 :]),
+        ("common", vocabulary_words[:20]),
+    ):
+        for shape in ("word", "two_words", "prefix"):
+            cold: list[float] = []
+            warm: list[float] = []
+            for _ in range(queries):
+                first, second = rng.sample(pool, 2)
+                text = {
+                    "word": first,
+                    "two_words": f"{first} {second}",
+                    "prefix": first[:3],
+                }[shape]
+                # Cold ranks the words' postings; warm reuses that work
+                for timings in (cold, warm):
+                    started = time.perf_counter()
+                    repository.search_singles(text)
+                    timings.append((time.perf_counter() - started) * 1000)
+            for name, timings in (("cold", cold), ("warm", warm)):
+                results[f"{label}_{shape}_{name}_p50_ms"] = statistics.median(timings)
+                results[f"{label}_{shape}_{name}_max_ms"] = max(timings)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure full-text search latency.")
+    parser.add_argument("--singles", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.singles, args.words, args.queries), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, List
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from musos_assist import app
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.routers import get_repository, serialization
+from benchmarks.catalogue import synthetic_singles
+
+
+async def records_per_sec(
+    render: Callable[[], Awaitable[object]], records: int, rounds: int
+) -> float:
+    """Records/sec of an awaitable render, every path timed in the same loop."""
+    await render()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await render()
+    return records * rounds / (time.perf_counter() - started)
+
+
+async def measure(singles: List[MusicSingleRelease], rounds: int) -> dict[str, float]:
+    field = create_model_field(
+        name="response", type_=List[MusicSingleRelease], mode="serialization"
+    )
+    count = len(singles)
+
+    async def list_default() -> object:
+        content = await serialize_response(field=field, response_content=singles)
+        return JSONResponse(content).body
+
+    async def list_fast() -> object:
+        return serialization.render_singles(singles)
+
+    async def singles_default() -> object:
+        return [serialization.render_single_validated(single) for single in singles]
+
+    async def singles_fast() -> object:
+        return [serialization.render_single(single) for single in singles]
+
+    results = {
+        "render_list_default": await records_per_sec(list_default, count, rounds),
+        "render_list_fast": await records_per_sec(list_fast, count, rounds),
+        "render_single_default": await records_per_sec(singles_default, count, rounds),
+        "render_single_fast": await records_per_sec(singles_fast, count, rounds),
+    }
+
+    # End to end, where the saving is diluted by routing and the thread hop to
+    # the repository; repeat reads of a single are served from rendered bodies
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as (
+        client
+    ):
+        for fast in (False, True):
+            serialization.FAST_SERIALIZATION = fast
+            label = "fast" if fast else "default"
+
+            async def get(path: str) -> object:
+                response = await client.get(path)
+                assert response.status_code == 200
+                return response
+
+            results[f"list_{label}"] = await records_per_sec(
+                lambda: get(f"/singles/?limit={count}"), count, rounds
+            )
+            results[f"read_{label}"] = await records_per_sec(
+                lambda: get(f"/singles/{singles[0].isrc}"), 1, rounds * 25
+            )
+    return results
+
+
+def run(singles: int, rounds: int) -> dict[str, Any]:
+    repository = InMemoryMusicSingleReleaseRepository()
+    created = repository.create_singles(list(synthetic_singles(singles)))
+    app.dependency_overrides[get_repository] = lambda: repository
+    fast = serialization.FAST_SERIALIZATION
+    try:
+        results = asyncio.run(measure(created, rounds))
+    finally:
+        serialization.FAST_SERIALIZATION = fast
+        app.dependency_overrides.pop(get_repository)
+    return {
+        "singles": singles,
+        "rounds": rounds,
+        "records_per_sec": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare rendering singles as JSON with and without the fast "
+        "serialization path."
+    )
+    parser.add_argument("--singles", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.singles, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Callable
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.adapters.snapshots import (
+    SnapshotFollower,
+    SnapshotMusicSingleReleaseRepository,
+    SnapshotPublisher,
+)
+from benchmarks.catalogue import synthetic_singles
+
+
+def timed(function: Callable[[], Any], repeat: int) -> float:
+    """Median microseconds of `repeat` calls."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(timings)
+
+
+def run(singles: int, repeat: int) -> dict[str, Any]:
+    rng = random.Random(0)
+    catalogue = ConcurrentInMemoryMusicSingleReleaseRepository()
+    created = catalogue.create_singles(list(synthetic_singles(singles)))
+    isrcs = [single.isrc for single in created]
+    with tempfile.TemporaryDirectory() as directory:
+        publisher = SnapshotPublisher(directory)
+        repository = SnapshotMusicSingleReleaseRepository(catalogue, publisher)
+        follower = SnapshotFollower(directory)
+        publisher.wait_published(publisher.wanted_version())
+
+        def read_snapshot() -> bytes:
+            snapshot = follower.current()
+            assert snapshot is not None
+            found = snapshot.find(rng.choice(isrcs))
+            assert found is not None
+            return bytes(found[0])
+
+        def read_repository() -> bytes:
+            return catalogue.read_single(rng.choice(isrcs)).model_dump_json().encode()
+
+        def write_until_published() -> None:
+            single = repository.read_single(rng.choice(isrcs))
+            repository.update_single(
+                single.isrc, single.model_copy(update={"title": str(rng.random())})
+            )
+            publisher.wait_published(publisher.wanted_version())
+
+        return {
+            "singles": singles,
+            "read_snapshot_us": timed(read_snapshot, repeat),
+            "read_repository_us": timed(read_repository, repeat),
+            "write_until_published_us": timed(write_until_published, repeat // 10),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare reading singles from a snapshot with serializing them."
+    )
+    parser.add_argument("--singles", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.singles, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
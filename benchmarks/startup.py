@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any
+
+# Run in a fresh interpreter per sample, as a cold start would be; the test
+# client is imported first, so that only the app's own imports are timed
+COLD_START = """
+import json
+import time
+from fastapi.testclient import TestClient
+
+started = time.perf_counter()
+from musos_assist import app
+
+imported = time.perf_counter()
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    client.get("/singles/").raise_for_status()
+    first = time.perf_counter()
+    client.get("/singles/").raise_for_status()
+    second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (first - ready) * 1000,
+    "second_request_ms": (second - first) * 1000,
+}))
+"""
+
+
+def cold_start(scratch: str) -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START],
+        env={**os.environ, "MUSOS_ARTIFACT_ROOT": scratch},
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    timings: dict[str, float] = json.loads(output)
+    return timings
+
+
+def run(repeat: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as scratch:
+        samples = [cold_start(scratch) for _ in range(repeat)]
+    return {
+        "repeat": repeat,
+        **{
+            name: statistics.median(sample[name] for sample in samples)
+            for name in samples[0]
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time importing the app, starting it and its first requests."
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
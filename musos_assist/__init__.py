@@ -1,29 +1,16 @@
-from typing import Any
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from musos_assist.routers import singles_router
-import os
+from typing import TYPE_CHECKING, Any
 
-app = FastAPI(
-    title="Music Single Release API",
-    description="API for managing music single releases",
-)
+if TYPE_CHECKING:
+    from musos_assist.main import app
 
-# Mount the static directory to serve static files
-app.mount(
-    "/static",
-    StaticFiles(directory=(os.path.join(os.path.dirname(__file__), "static"))),
-    name="static",
-)
+__all__ = ["app"]
 
-# Your API routes go here...
-app.include_router(singles_router)
 
+def __getattr__(name: str) -> Any:
+    # The app, with every router and adapter, is only imported when asked for,
+    # so that importing a model or adapter alone stays cheap
+    if name == "app":
+        from musos_assist.main import app
 
-# Serve the index.html at the root
-@app.get("/", response_class=FileResponse)
-async def read_simple_root() -> Any:
-    return FileResponse(
-        path=os.path.join(os.path.dirname(__file__), "static", "index.html")
-    )
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
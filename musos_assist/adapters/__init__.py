@@ -1,27 +1,127 @@
-from typing import List
-from musos_assist.domain.models import MusicSingleRelease
-from musos_assist.domain.ports import MusicSingleReleaseRepository
-from musos_assist.constants import SINGLE_NOT_FOUND
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from heapq import nsmallest
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional
+from musos_assist.adapters.search import FullTextIndex
+from musos_assist.domain.models import (
+    MusicSingleQuery,
+    MusicSingleRelease,
+    MusicSingleSearchHit,
+)
+from musos_assist.domain.ports import BulkWriteError, MusicSingleReleaseRepository
+from musos_assist.constants import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    SINGLE_EXISTS,
+    SINGLE_NOT_FOUND,
+)
+
+# Query criterion -> MusicSingleRelease field kept in an inverted index
+INDEXED_FIELDS: dict[str, str] = {
+    "artist": "artist_names",
+    "genre": "genres",
+    "subgenre": "subgenres",
+    "label": "label",
+    "language": "language",
+}
+
+
+def indexed_terms(single: MusicSingleRelease, field: str) -> Iterator[str]:
+    """Yield the normalised index keys of a single for one indexed field."""
+    value = getattr(single, field)
+    if value is None:
+        return
+    for term in [value] if isinstance(value, str) else value:
+        yield term.casefold()
+
+
+def repeated_isrcs(isrcs: Iterable[str]) -> dict[int, str]:
+    """Map the index of every ISRC already seen earlier in a batch to an error."""
+    seen: set[str] = set()
+    errors: dict[int, str] = {}
+    for row, isrc in enumerate(isrcs):
+        if isrc in seen:
+            errors[row] = "ISRC repeated within the batch"
+        seen.add(isrc)
+    return errors
 
 
 class InMemoryMusicSingleReleaseRepository(MusicSingleReleaseRepository):
     def __init__(self) -> None:
         self.singles_db: dict[str, MusicSingleRelease] = {}
+        # ISRCs kept sorted so keyset pagination is a bisect, not a full sort
+        self._sorted_isrcs: list[str] = []
+        # Inverted indexes: field -> normalised value -> ISRCs
+        self._indexes: dict[str, dict[str, set[str]]] = {
+            field: {} for field in INDEXED_FIELDS.values()
+        }
+        # (release_date, isrc) pairs kept sorted for date range queries
+        self._release_dates: list[tuple[date, str]] = []
+        # Full-text index over titles, credits, lyrics and notes
+        self._search = FullTextIndex()
+        # Revision of each single, and of the catalogue as a whole. Seeded from
+        # the clock so revisions keep increasing across restarts, and an ETag
+        # handed out by an earlier process never names different content.
+        self._revisions: dict[str, int] = {}
+        self._revision = time.time_ns()
 
     def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
         if single.isrc in self.singles_db:
-            raise ValueError("ISRC already exists")
+            raise ValueError(SINGLE_EXISTS)
         self.singles_db[single.isrc] = single
+        self._add_sorted_isrc(single.isrc)
+        self._index_single(single)
+        self._stamp([single.isrc])
         return self.singles_db[single.isrc]
 
     def list_singles(self) -> List[MusicSingleRelease]:
         return list(self.singles_db.values())
 
+    def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        start = 0 if after is None else bisect_right(self._sorted_isrcs, after)
+        return [
+            self.singles_db[isrc] for isrc in self._sorted_isrcs[start : start + limit]
+        ]
+
+    def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        candidates = self._match_isrcs(query)
+        if candidates is None:
+            return self.list_singles_page(after=after, limit=limit)
+        if after is not None:
+            candidates = {isrc for isrc in candidates if isrc > after}
+        return [self.singles_db[isrc] for isrc in nsmallest(limit, candidates)]
+
+    def search_singles(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[MusicSingleSearchHit]:
+        return [
+            MusicSingleSearchHit(score=score, single=self.singles_db[isrc])
+            for isrc, score in self._search.search(text, limit)
+        ]
+
     def read_single(self, isrc: str) -> MusicSingleRelease:
         if isrc not in self.singles_db:
             raise ValueError(SINGLE_NOT_FOUND)
         return self.singles_db[isrc]
 
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        return self.read_single(isrc), self._revisions[isrc]
+
+    def catalogue_revision(self) -> int:
+        return self._revision
+
+    def count_singles(self) -> int:
+        return len(self.singles_db)
+
     def update_single(
         self, isrc: str, single_update: MusicSingleRelease
     ) -> MusicSingleRelease:
@@ -29,12 +129,187 @@ class InMemoryMusicSingleReleaseRepository(MusicSingleReleaseRepository):
         #     raise ValueError("ISRC in path and request body do not match")
         if isrc not in self.singles_db:
             raise ValueError(SINGLE_NOT_FOUND)
-        # AI! remove item from dict and re-add it to update the value and new isrc
-        del self.singles_db[isrc]
+        if single_update.isrc != isrc and single_update.isrc in self.singles_db:
+            raise ValueError(SINGLE_EXISTS)
+        # Replaced in place unless renamed, so the ISRC never goes missing
+        renamed = isrc != single_update.isrc
+        self._unindex_single(
+            self.singles_db.pop(isrc) if renamed else self.singles_db[isrc]
+        )
         self.singles_db[single_update.isrc] = single_update
+        self._index_single(single_update)
+        if renamed:
+            self._remove_sorted_isrc(isrc)
+            self._add_sorted_isrc(single_update.isrc)
+            self._forget([isrc])
+        self._stamp([single_update.isrc])
         return self.singles_db[single_update.isrc]
 
     def delete_single(self, isrc: str) -> None:
         if isrc not in self.singles_db:
             raise ValueError(SINGLE_NOT_FOUND)
-        del self.singles_db[isrc]
+        self._unindex_single(self.singles_db.pop(isrc))
+        self._remove_sorted_isrc(isrc)
+        self._forget([isrc])
+
+    def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        errors = repeated_isrcs(single.isrc for single in singles)
+        for row, single in enumerate(singles):
+            if single.isrc in self.singles_db:
+                errors.setdefault(row, SINGLE_EXISTS)
+        if errors:
+            raise BulkWriteError(errors)
+        self._bulk_load(singles)
+        return singles
+
+    def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        errors = repeated_isrcs(single.isrc for single in singles)
+        if errors:
+            raise BulkWriteError(errors)
+        self._bulk_remove(
+            {single.isrc for single in singles if single.isrc in self.singles_db}
+        )
+        self._bulk_load(singles)
+        return singles
+
+    def delete_singles(self, isrcs: List[str]) -> None:
+        errors = repeated_isrcs(isrcs)
+        for row, isrc in enumerate(isrcs):
+            if isrc not in self.singles_db:
+                errors.setdefault(row, SINGLE_NOT_FOUND)
+        if errors:
+            raise BulkWriteError(errors)
+        self._bulk_remove(set(isrcs))
+
+    def _bulk_load(self, singles: Iterable[MusicSingleRelease]) -> None:
+        """
+        Add many singles at once, sorting the ordered indexes a single time at
+        the end instead of bisect-inserting into them per single.
+        """
+        self._revision += 1
+        for single in singles:
+            if single.isrc in self.singles_db:
+                raise ValueError(SINGLE_EXISTS)
+            self.singles_db[single.isrc] = single
+            self._sorted_isrcs.append(single.isrc)
+            self._add_terms(single)
+            self._release_dates.append((single.release_date, single.isrc))
+            self._revisions[single.isrc] = self._revision
+        self._sorted_isrcs.sort()
+        self._release_dates.sort()
+
+    def _bulk_remove(self, isrcs: set[str]) -> None:
+        """
+        Remove many singles at once, filtering the ordered indexes in one pass
+        instead of deleting from them per single.
+        """
+        if not isrcs:
+            return
+        for isrc in isrcs:
+            self._remove_terms(self.singles_db.pop(isrc))
+        self._sorted_isrcs = [isrc for isrc in self._sorted_isrcs if isrc not in isrcs]
+        self._release_dates = [
+            entry for entry in self._release_dates if entry[1] not in isrcs
+        ]
+        self._forget(isrcs)
+
+    def _stamp(self, isrcs: Iterable[str]) -> None:
+        """Give written singles a new catalogue revision."""
+        self._revision += 1
+        for isrc in isrcs:
+            self._revisions[isrc] = self._revision
+
+    def _forget(self, isrcs: Iterable[str]) -> None:
+        self._revision += 1
+        for isrc in isrcs:
+            self._revisions.pop(isrc, None)
+
+    def _match_isrcs(self, query: MusicSingleQuery) -> Optional[set[str]]:
+        """
+        Resolve a query to the set of matching ISRCs using only the indexes, so
+        the cost follows the number of matches rather than the catalogue size.
+        Returns None when the query places no constraint at all.
+        """
+        postings: list[set[str]] = []
+        for criterion, field in INDEXED_FIELDS.items():
+            value = getattr(query, criterion)
+            if value is not None:
+                postings.append(self._indexes[field].get(value.casefold(), set()))
+        candidates: Optional[set[str]] = None
+        if postings:
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+
+        released_from, released_to = query.released_from, query.released_to
+        if released_from is None and released_to is None:
+            return candidates
+        low = (
+            0
+            if released_from is None
+            else bisect_left(self._release_dates, released_from, key=itemgetter(0))
+        )
+        high = (
+            len(self._release_dates)
+            if released_to is None
+            else bisect_right(self._release_dates, released_to, key=itemgetter(0))
+        )
+        if candidates is not None and len(candidates) < high - low:
+            # Cheaper to check the few candidates than to walk the date range
+            return {
+                isrc
+                for isrc in candidates
+                if (
+                    released_from is None
+                    or self.singles_db[isrc].release_date >= released_from
+                )
+                and (
+                    released_to is None
+                    or self.singles_db[isrc].release_date <= released_to
+                )
+            }
+        in_range = {isrc for _, isrc in self._release_dates[low:high]}
+        return in_range if candidates is None else in_range & candidates
+
+    def _index_single(self, single: MusicSingleRelease) -> None:
+        self._add_terms(single)
+        insort(self._release_dates, (single.release_date, single.isrc))
+
+    def _unindex_single(self, single: MusicSingleRelease) -> None:
+        self._remove_terms(single)
+        entry = (single.release_date, single.isrc)
+        position = bisect_left(self._release_dates, entry)
+        if (
+            position < len(self._release_dates)
+            and self._release_dates[position] == entry
+        ):
+            del self._release_dates[position]
+
+    def _add_terms(self, single: MusicSingleRelease) -> None:
+        for field, index in self._indexes.items():
+            for term in indexed_terms(single, field):
+                index.setdefault(term, set()).add(single.isrc)
+        self._search.add(single)
+
+    def _remove_terms(self, single: MusicSingleRelease) -> None:
+        for field, index in self._indexes.items():
+            for term in indexed_terms(single, field):
+                isrcs = index.get(term)
+                if isrcs is not None:
+                    isrcs.discard(single.isrc)
+                    if not isrcs:
+                        del index[term]
+        self._search.remove(single)
+
+    def _add_sorted_isrc(self, isrc: str) -> None:
+        index = bisect_left(self._sorted_isrcs, isrc)
+        if index == len(self._sorted_isrcs) or self._sorted_isrcs[index] != isrc:
+            self._sorted_isrcs.insert(index, isrc)
+
+    def _remove_sorted_isrc(self, isrc: str) -> None:
+        index = bisect_left(self._sorted_isrcs, isrc)
+        if index < len(self._sorted_isrcs) and self._sorted_isrcs[index] == isrc:
+            del self._sorted_isrcs[index]
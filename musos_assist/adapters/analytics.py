@@ -0,0 +1,255 @@
+import math
+import threading
+from array import array
+from collections import Counter
+from itertools import combinations, islice
+from typing import Generic, Hashable, List, TypeVar
+from musos_assist.adapters.columnar import MISSING, SymbolTable
+from musos_assist.adapters.forwarding import ObservedMusicSingleReleaseRepository
+from musos_assist.constants import (
+    BULK_BATCH_SIZE,
+    DEFAULT_CO_CREDITS,
+    DURATION_BUCKET_SECONDS,
+    LOCK_STRIPES,
+)
+from musos_assist.domain.models import (
+    CatalogueStats,
+    CoCredit,
+    DurationBucket,
+    DurationStats,
+    MusicSingleRelease,
+)
+from musos_assist.domain.ports import MusicSingleReleaseRepository, SingleWrite
+
+K = TypeVar("K", bound=Hashable)
+
+
+def tally(counts: "Counter[K]", key: K, change: int) -> None:
+    """Add `change` to a count, dropping groups left empty."""
+    count = counts[key] + change
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]
+
+
+class RankedCounts(Generic[K]):
+    """
+    Counts also grouped by value, so the largest are found without sorting
+    every key: a change moves its key between two groups, and listing the top
+    `n` costs `n` plus the number of distinct counts. Ties go to the key
+    reaching the count first.
+    """
+
+    def __init__(self) -> None:
+        self.counts: dict[K, int] = {}
+        # Count -> keys with it, as an insertion-ordered set
+        self._by_count: dict[int, dict[K, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key: K, change: int) -> None:
+        count = self.counts.get(key, 0)
+        if count:
+            group = self._by_count[count]
+            del group[key]
+            if not group:
+                del self._by_count[count]
+        count += change
+        if count:
+            self.counts[key] = count
+            self._by_count.setdefault(count, {})[key] = None
+        else:
+            del self.counts[key]
+
+    def largest(self, n: int) -> list[tuple[K, int]]:
+        found: list[tuple[K, int]] = []
+        for count in sorted(self._by_count, reverse=True):
+            if len(found) >= n:
+                break
+            keys = islice(self._by_count[count], n - len(found))
+            found.extend((key, count) for key in keys)
+        return found
+
+
+class CatalogueMirror:
+    """
+    The fields the catalogue statistics group by, kept per single in compact
+    columns like those of the columnar repository, and the running count of
+    every group. Counts change as singles are put and removed, so computing
+    the statistics costs the number of groups rather than of singles.
+    """
+
+    def __init__(self) -> None:
+        # ISRC -> slot in the columns, and slots freed by removals
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._strings: SymbolTable[str] = SymbolTable()
+        self._lists: SymbolTable[tuple[int, ...]] = SymbolTable()
+        # Release month as year * 12 + month - 1, label string id, list ids of
+        # the genres and artists, and duration in whole seconds
+        self._columns = {
+            column: array("i")
+            for column in ("month", "label", "genres", "artists", "duration")
+        }
+        self._per_month: Counter[int] = Counter()
+        self._per_label: Counter[int] = Counter()
+        self._per_genre: Counter[int] = Counter()
+        self._per_duration: Counter[int] = Counter()
+        self._co_credits: RankedCounts[tuple[int, ...]] = RankedCounts()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def put(self, single: MusicSingleRelease) -> None:
+        """Add a single, or replace the one with its ISRC."""
+        if single.isrc in self._slots:
+            self.remove(single.isrc)
+        released = single.release_date
+        row = {
+            "month": released.year * 12 + released.month - 1,
+            "label": (
+                MISSING if single.label is None else self._strings.intern(single.label)
+            ),
+            "genres": self._intern_set(single.genres),
+            "artists": self._intern_set(single.artist_names),
+            "duration": (
+                MISSING
+                if single.duration is None
+                else round(single.duration.total_seconds())
+            ),
+        }
+        if self._free:
+            slot = self._free.pop()
+            for column, value in row.items():
+                self._columns[column][slot] = value
+        else:
+            slot = len(self._columns["month"])
+            for column, value in row.items():
+                self._columns[column].append(value)
+        self._slots[single.isrc] = slot
+        self._count(slot, 1)
+
+    def remove(self, isrc: str) -> None:
+        slot = self._slots.pop(isrc)
+        self._count(slot, -1)
+        self._free.append(slot)
+
+    def stats(self, co_credits: int = DEFAULT_CO_CREDITS) -> CatalogueStats:
+        """The statistics, with the `co_credits` most co-credited artist pairs."""
+        names = self._strings.values
+        return CatalogueStats(
+            singles=len(self._slots),
+            per_month={
+                f"{month // 12:04d}-{month % 12 + 1:02d}": count
+                for month, count in sorted(self._per_month.items())
+            },
+            per_genre=ranked(self._per_genre, names),
+            per_label=ranked(self._per_label, names),
+            durations=duration_stats(self._per_duration),
+            co_credits=[
+                CoCredit(
+                    artists=sorted(names[artist] for artist in pair), singles=count
+                )
+                for pair, count in self._co_credits.largest(co_credits)
+            ],
+        )
+
+    def _intern_set(self, values: List[str]) -> int:
+        """Intern distinct values as one list, whatever their order."""
+        return self._lists.intern(
+            tuple(sorted({self._strings.intern(value) for value in values}))
+        )
+
+    def _count(self, slot: int, change: int) -> None:
+        """Count the single in `slot` into its groups, or out of them."""
+        columns = self._columns
+        tally(self._per_month, columns["month"][slot], change)
+        if columns["label"][slot] != MISSING:
+            tally(self._per_label, columns["label"][slot], change)
+        if columns["duration"][slot] != MISSING:
+            tally(self._per_duration, columns["duration"][slot], change)
+        for genre in self._lists.values[columns["genres"][slot]]:
+            tally(self._per_genre, genre, change)
+        for pair in combinations(self._lists.values[columns["artists"][slot]], 2):
+            self._co_credits.add(pair, change)
+
+
+def ranked(counts: "Counter[int]", names: List[str]) -> dict[str, int]:
+    """Counts by interned name, most first, then by name."""
+    return {
+        names[key]: count
+        for key, count in sorted(
+            counts.items(), key=lambda item: (-item[1], names[item[0]])
+        )
+    }
+
+
+def duration_stats(per_second: "Counter[int]") -> DurationStats:
+    """Summarise durations from the number of singles lasting each second."""
+    durations = sorted(per_second.items())
+    total = sum(per_second.values())
+    if not total:
+        return DurationStats(singles=0)
+    histogram: Counter[int] = Counter()
+    for seconds, count in durations:
+        histogram[seconds // DURATION_BUCKET_SECONDS * DURATION_BUCKET_SECONDS] += count
+
+    def quantile(fraction: float) -> int:
+        """Nearest-rank quantile."""
+        rank = max(1, math.ceil(fraction * total))
+        seen = 0
+        for seconds, count in durations:
+            seen += count
+            if seen >= rank:
+                return seconds
+        return durations[-1][0]
+
+    return DurationStats(
+        singles=total,
+        min_seconds=durations[0][0],
+        max_seconds=durations[-1][0],
+        mean_seconds=sum(seconds * count for seconds, count in durations) / total,
+        median_seconds=quantile(0.5),
+        p90_seconds=quantile(0.9),
+        histogram=[
+            DurationBucket(start_seconds=start, singles=count)
+            for start, count in sorted(histogram.items())
+        ],
+    )
+
+
+class AnalyticsMusicSingleReleaseRepository(ObservedMusicSingleReleaseRepository):
+    """
+    Repository adding catalogue statistics to another one, from a
+    CatalogueMirror updated with every write the repository accepts.
+    Statistics are kept until the next write.
+    """
+
+    def __init__(
+        self, repository: MusicSingleReleaseRepository, stripes: int = LOCK_STRIPES
+    ) -> None:
+        super().__init__(repository, stripes)
+        self._lock = threading.Lock()
+        self._mirror = CatalogueMirror()
+        # Number of co-credits asked for -> statistics as of the last write
+        self._stats: dict[int, CatalogueStats] = {}
+        for single in repository.iter_singles(batch_size=BULK_BATCH_SIZE):
+            self._mirror.put(single)
+
+    def catalogue_stats(self, co_credits: int = DEFAULT_CO_CREDITS) -> CatalogueStats:
+        with self._lock:
+            stats = self._stats.get(co_credits)
+            if stats is None:
+                stats = self._stats[co_credits] = self._mirror.stats(co_credits)
+            return stats
+
+    def observe(self, writes: List[SingleWrite]) -> None:
+        with self._lock:
+            self._stats.clear()
+            for _, isrc, single in writes:
+                if single is None or single.isrc != isrc:
+                    self._mirror.remove(isrc)
+                if single is not None:
+                    self._mirror.put(single)
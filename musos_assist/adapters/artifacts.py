@@ -0,0 +1,471 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Iterable, List, Optional
+from musos_assist.constants import (
+    ARTIFACT_BLOCK_SIZE,
+    ARTIFACT_NAME_PATTERN,
+    ARTIFACT_NOT_FOUND,
+    BLOCK_COLLECTION_DELAY,
+    CHUNK_DIGEST_MISMATCH,
+    CHUNK_TOO_LARGE,
+    UPLOAD_BUSY,
+    UPLOAD_INCOMPLETE,
+    UPLOAD_NOT_ALIGNED,
+    UPLOAD_NOT_FOUND,
+    UPLOAD_OFFSET_MISMATCH,
+)
+from musos_assist.domain.models import Artifact, ArtifactUpload, ArtifactUploadRequest
+from musos_assist.domain.ports import ArtifactStore, ChunkWriter
+
+# ISRCs and artifact names both match this, so neither can escape the root
+SAFE_NAME = re.compile(ARTIFACT_NAME_PATTERN)
+UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+BLOCK_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+# Bytes per entry of a block list: a hex SHA-256 and a newline
+BLOCK_ENTRY = 65
+
+
+def read_blocks(path: str) -> list[str]:
+    """Read a block list: the digests of a file's blocks, one per line."""
+    try:
+        with open(path) as file:
+            return file.read().split()
+    except FileNotFoundError:
+        return []
+
+
+def replace_text(path: str, text: str) -> None:
+    """Write a small file so that readers see either its old or new content."""
+    # Dot-prefixed, so never taken for an artifact name when listing
+    directory, name = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+    temporary = os.path.join(directory, f".{name}.tmp")
+    with open(temporary, "w") as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+
+class FileSystemArtifactChunkWriter(ChunkWriter):
+    """
+    Streams a chunk into the upload's partial block, moving each block into
+    the store as it fills. A discarded chunk undoes everything it added.
+    """
+
+    def __init__(
+        self,
+        store: "FileSystemArtifactStore",
+        upload: ArtifactUpload,
+        running: "hashlib._Hash",
+        sha256: Optional[str],
+    ) -> None:
+        self._store = store
+        self._upload = upload
+        self._start = upload.offset
+        self._offset = upload.offset
+        self._expected = None if sha256 is None else sha256.lower()
+        self._committed = False
+        # Whole-file digest before this chunk, restored if it is discarded
+        self._before = running.copy()
+        self._running = running
+        self._chunk = hashlib.sha256()
+        self._part_path = store._upload_path(upload.upload_id, ".part")
+        # The partial block the chunk starts on, always under a block in size
+        with open(self._part_path, "rb") as file:
+            self._partial = file.read()
+        self._block = hashlib.sha256(self._partial)
+        self._block_length = len(self._partial)
+        self._sealed = 0
+        self._part = open(self._part_path, "ab")
+
+    def write(self, data: bytes) -> None:
+        if self._offset + len(data) > self._upload.size:
+            raise ValueError(CHUNK_TOO_LARGE)
+        self._chunk.update(data)
+        self._running.update(data)
+        self._offset += len(data)
+        view = memoryview(data)
+        while view:
+            piece = view[: ARTIFACT_BLOCK_SIZE - self._block_length]
+            view = view[len(piece) :]
+            self._part.write(piece)
+            self._block.update(piece)
+            self._block_length += len(piece)
+            if self._block_length == ARTIFACT_BLOCK_SIZE:
+                self._part.close()
+                self._store._seal_block(self._upload.upload_id, self._block.hexdigest())
+                self._sealed += 1
+                self._part = open(self._part_path, "wb")
+                self._block = hashlib.sha256()
+                self._block_length = 0
+
+    def commit(self) -> ArtifactUpload:
+        self._part.flush()
+        if self._expected is not None and self._chunk.hexdigest() != self._expected:
+            raise ValueError(CHUNK_DIGEST_MISMATCH)
+        self._committed = True
+        return self._upload.model_copy(update={"offset": self._offset})
+
+    def close(self) -> None:
+        if self._part.closed:
+            return
+        self._part.close()
+        if self._expected is not None and not self._committed:
+            # A chunk that carried a digest is kept only once verified
+            self._store._unseal_blocks(self._upload.upload_id, self._sealed)
+            with open(self._part_path, "wb") as file:
+                file.write(self._partial)
+            self._running, self._offset = self._before, self._start
+        self._store._release(self._upload.upload_id, self._running, self._offset)
+
+
+class FileSystemArtifactStore(ArtifactStore):
+    """
+    Artifacts kept as files under `root`, deduplicated by content. Files are
+    cut into blocks of ARTIFACT_BLOCK_SIZE, each stored once under blocks/ by
+    its SHA-256, so the versions of a single that share artwork, stems or
+    whole masters share their storage. An artifact is a block list under
+    lists/<isrc>/<name>, with its metadata in meta/<isrc>/<name>.
+
+    An upload in progress keeps its block list and metadata under uploads/,
+    and fills its next block in a .part file; its offset follows from their
+    sizes, so uploads resume across restarts. Chunks are streamed to disk and
+    hashed on the way, and blocks the store already holds can be reused by
+    digest rather than uploaded again.
+
+    Blocks are reference counted over all block lists, counted from disk on
+    first use. A block no list refers to any more is deleted by a background
+    collector after `collection_delay` seconds, unless reused in the meantime.
+    """
+
+    def __init__(
+        self, root: str, collection_delay: float = BLOCK_COLLECTION_DELAY
+    ) -> None:
+        self.root = root
+        self.collection_delay = collection_delay
+        self._lock = threading.Lock()
+        # Upload ID -> running SHA-256 of the upload and the offset it covers
+        self._digests: dict[str, tuple["hashlib._Hash", int]] = {}
+        self._writing: set[str] = set()
+        self._references: Optional[Counter[str]] = None
+        self._garbage: set[str] = set()
+        self._collector: Optional[threading.Thread] = None
+
+    def start_upload(self, isrc: str, request: ArtifactUploadRequest) -> ArtifactUpload:
+        self._check_name(isrc)
+        upload = ArtifactUpload(
+            upload_id=uuid.uuid4().hex, isrc=isrc, offset=0, **request.model_dump()
+        )
+        os.makedirs(os.path.join(self.root, "uploads"), exist_ok=True)
+        for suffix in (".part", ".blocks"):
+            open(self._upload_path(upload.upload_id, suffix), "xb").close()
+        replace_text(
+            self._upload_path(upload.upload_id, ".json"), upload.model_dump_json()
+        )
+        return upload
+
+    def read_upload(self, upload_id: str) -> ArtifactUpload:
+        if not UPLOAD_ID.match(upload_id):
+            raise ValueError(UPLOAD_NOT_FOUND)
+        try:
+            with open(self._upload_path(upload_id, ".json")) as file:
+                upload = ArtifactUpload.model_validate_json(file.read())
+            blocks = os.path.getsize(self._upload_path(upload_id, ".blocks"))
+            partial = os.path.getsize(self._upload_path(upload_id, ".part"))
+        except FileNotFoundError:
+            raise ValueError(UPLOAD_NOT_FOUND)
+        # Only the last block of a file is ever short
+        sealed = min(blocks // BLOCK_ENTRY * ARTIFACT_BLOCK_SIZE, upload.size)
+        return upload.model_copy(update={"offset": sealed + partial})
+
+    def open_chunk(
+        self, upload_id: str, offset: int, sha256: Optional[str] = None
+    ) -> ChunkWriter:
+        upload = self.read_upload(upload_id)
+        if offset != upload.offset:
+            raise ValueError(UPLOAD_OFFSET_MISMATCH)
+        running = self._acquire(upload)
+        try:
+            return FileSystemArtifactChunkWriter(self, upload, running, sha256)
+        except BaseException:
+            self._release(upload_id, running, upload.offset)
+            raise
+
+    def reuse_blocks(
+        self, upload_id: str, offset: int, digests: List[str]
+    ) -> ArtifactUpload:
+        upload = self.read_upload(upload_id)
+        if offset != upload.offset:
+            raise ValueError(UPLOAD_OFFSET_MISMATCH)
+        if offset % ARTIFACT_BLOCK_SIZE:
+            raise ValueError(UPLOAD_NOT_ALIGNED)
+        running = self._acquire(upload)
+        try:
+            for digest in digests:
+                length = self._reference_block(digest, upload.size - offset)
+                if length is None:
+                    break
+                with open(self._block_path(digest), "rb") as file:
+                    running.update(file.read())
+                with open(self._upload_path(upload_id, ".blocks"), "a") as file:
+                    file.write(f"{digest}\n")
+                offset += length
+        finally:
+            self._release(upload_id, running, offset)
+        return upload.model_copy(update={"offset": offset})
+
+    def complete_upload(self, upload_id: str) -> Artifact:
+        upload = self.read_upload(upload_id)
+        if upload.offset != upload.size:
+            raise ValueError(UPLOAD_INCOMPLETE)
+        running = self._acquire(upload)
+        try:
+            part = self._upload_path(upload_id, ".part")
+            with open(part, "rb") as file:
+                last = file.read()
+            if last:
+                # The short last block of the file
+                self._seal_block(upload_id, hashlib.sha256(last).hexdigest())
+            else:
+                os.remove(part)
+            artifact = Artifact(
+                isrc=upload.isrc,
+                name=upload.name,
+                media_type=upload.media_type,
+                size=upload.size,
+                sha256=running.hexdigest(),
+            )
+            list_path = self._list_path(upload.isrc, upload.name)
+            replaced = read_blocks(list_path)
+            os.makedirs(os.path.dirname(list_path), exist_ok=True)
+            os.replace(self._upload_path(upload_id, ".blocks"), list_path)
+            replace_text(
+                self._meta_path(upload.isrc, upload.name), artifact.model_dump_json()
+            )
+            os.remove(self._upload_path(upload_id, ".json"))
+            self._dereference_blocks(replaced)
+        finally:
+            with self._lock:
+                self._writing.discard(upload_id)
+                self._digests.pop(upload_id, None)
+        return artifact
+
+    def abort_upload(self, upload_id: str) -> None:
+        self.read_upload(upload_id)
+        with self._lock:
+            if upload_id in self._writing:
+                raise ValueError(UPLOAD_BUSY)
+            self._digests.pop(upload_id, None)
+        blocks = read_blocks(self._upload_path(upload_id, ".blocks"))
+        for suffix in (".json", ".part", ".blocks"):
+            os.remove(self._upload_path(upload_id, suffix))
+        self._dereference_blocks(blocks)
+
+    def list_artifacts(self, isrc: str) -> List[Artifact]:
+        self._check_name(isrc)
+        return [
+            self.read_artifact(isrc, name)
+            for name in sorted(self._listdir("meta", isrc))
+            if SAFE_NAME.match(name)
+        ]
+
+    def read_artifact(self, isrc: str, name: str) -> Artifact:
+        self._check_name(isrc, name)
+        try:
+            with open(self._meta_path(isrc, name)) as file:
+                return Artifact.model_validate_json(file.read())
+        except FileNotFoundError:
+            raise ValueError(ARTIFACT_NOT_FOUND)
+
+    def artifact_blocks(self, isrc: str, name: str) -> List[str]:
+        self.read_artifact(isrc, name)
+        return [
+            self._block_path(digest)
+            for digest in read_blocks(self._list_path(isrc, name))
+        ]
+
+    def delete_artifact(self, isrc: str, name: str) -> None:
+        self.read_artifact(isrc, name)
+        blocks = read_blocks(self._list_path(isrc, name))
+        os.remove(self._meta_path(isrc, name))
+        os.remove(self._list_path(isrc, name))
+        self._dereference_blocks(blocks)
+
+    def delete_artifacts(self, isrc: str) -> None:
+        for artifact in self.list_artifacts(isrc):
+            self.delete_artifact(isrc, artifact.name)
+
+    def move_artifacts(self, isrc: str, new_isrc: str) -> None:
+        self._check_name(new_isrc)
+        for artifact in self.list_artifacts(isrc):
+            list_path = self._list_path(new_isrc, artifact.name)
+            replaced = read_blocks(list_path)
+            os.makedirs(os.path.dirname(list_path), exist_ok=True)
+            os.replace(self._list_path(isrc, artifact.name), list_path)
+            replace_text(
+                self._meta_path(new_isrc, artifact.name),
+                artifact.model_copy(update={"isrc": new_isrc}).model_dump_json(),
+            )
+            os.remove(self._meta_path(isrc, artifact.name))
+            self._dereference_blocks(replaced)
+
+    def collect_garbage(self) -> int:
+        """Delete the blocks no block list refers to; return how many."""
+        deleted = 0
+        with self._lock:
+            references = self._counted()
+            garbage, self._garbage = self._garbage, set()
+            for digest in garbage:
+                if references[digest] > 0:
+                    continue
+                del references[digest]
+                try:
+                    os.remove(self._block_path(digest))
+                    deleted += 1
+                except FileNotFoundError:
+                    pass
+        return deleted
+
+    def _counted(self) -> Counter[str]:
+        """
+        The reference count of every block, counted from all block lists the
+        first time it is needed, when blocks no list refers to (left by an
+        earlier process) become garbage. Call with the lock held.
+        """
+        if self._references is None:
+            references: Counter[str] = Counter()
+            for directory, _, names in os.walk(os.path.join(self.root, "lists")):
+                for name in names:
+                    references.update(read_blocks(os.path.join(directory, name)))
+            for name in self._listdir("uploads"):
+                if name.endswith(".blocks"):
+                    references.update(read_blocks(self._upload_path(name)))
+            for prefix in self._listdir("blocks"):
+                for digest in self._listdir("blocks", prefix):
+                    if BLOCK_DIGEST.match(digest) and references[digest] == 0:
+                        self._garbage.add(digest)
+            self._references = references
+            if self._garbage:
+                self._schedule_collection()
+        return self._references
+
+    def _seal_block(self, upload_id: str, digest: str) -> None:
+        """Move an upload's filled .part file into the store as a block."""
+        with self._lock:
+            self._counted()[digest] += 1
+        # Referenced now, so the collector cannot delete a stored copy
+        part = self._upload_path(upload_id, ".part")
+        block = self._block_path(digest)
+        if os.path.exists(block):
+            os.remove(part)
+        else:
+            os.makedirs(os.path.dirname(block), exist_ok=True)
+            os.replace(part, block)
+        with open(self._upload_path(upload_id, ".blocks"), "a") as file:
+            file.write(f"{digest}\n")
+
+    def _unseal_blocks(self, upload_id: str, count: int) -> None:
+        """Drop the last `count` blocks sealed into an upload."""
+        if not count:
+            return
+        path = self._upload_path(upload_id, ".blocks")
+        blocks = read_blocks(path)
+        os.truncate(path, (len(blocks) - count) * BLOCK_ENTRY)
+        self._dereference_blocks(blocks[-count:])
+
+    def _reference_block(self, digest: str, remaining: int) -> Optional[int]:
+        """
+        Take a reference on a stored block, if it fits in the `remaining`
+        bytes of an upload without leaving a short block mid-file, and return
+        its length.
+        """
+        if not BLOCK_DIGEST.match(digest):
+            return None
+        with self._lock:
+            try:
+                length = os.path.getsize(self._block_path(digest))
+            except FileNotFoundError:
+                return None
+            if length > remaining or (
+                length < ARTIFACT_BLOCK_SIZE and length != remaining
+            ):
+                return None
+            self._counted()[digest] += 1
+        return length
+
+    def _dereference_blocks(self, digests: Iterable[str]) -> None:
+        with self._lock:
+            references = self._counted()
+            for digest in digests:
+                references[digest] -= 1
+                if references[digest] <= 0:
+                    self._garbage.add(digest)
+            if self._garbage:
+                self._schedule_collection()
+
+    def _schedule_collection(self) -> None:
+        """Start the collector unless it is running. Call with the lock held."""
+        if self._collector is None:
+            self._collector = threading.Thread(
+                target=self._collect_later, name="artifact-collector", daemon=True
+            )
+            self._collector.start()
+
+    def _collect_later(self) -> None:
+        while True:
+            time.sleep(self.collection_delay)
+            self.collect_garbage()
+            with self._lock:
+                if not self._garbage:
+                    self._collector = None
+                    return
+
+    def _acquire(self, upload: ArtifactUpload) -> "hashlib._Hash":
+        """
+        Claim an upload for one writer, returning its running digest; rebuilt
+        from disk if this process has not hashed every byte received so far.
+        """
+        with self._lock:
+            if upload.upload_id in self._writing:
+                raise ValueError(UPLOAD_BUSY)
+            self._writing.add(upload.upload_id)
+            running, offset = self._digests.pop(upload.upload_id, (None, -1))
+        if running is None or offset != upload.offset:
+            running = hashlib.sha256()
+            blocks = read_blocks(self._upload_path(upload.upload_id, ".blocks"))
+            paths = [self._block_path(digest) for digest in blocks]
+            for path in paths + [self._upload_path(upload.upload_id, ".part")]:
+                with open(path, "rb") as file:
+                    running.update(file.read())
+        return running
+
+    def _release(self, upload_id: str, running: "hashlib._Hash", offset: int) -> None:
+        with self._lock:
+            self._digests[upload_id] = (running, offset)
+            self._writing.discard(upload_id)
+
+    def _check_name(self, *names: str) -> None:
+        if not all(SAFE_NAME.match(name) for name in names):
+            raise ValueError(ARTIFACT_NOT_FOUND)
+
+    def _listdir(self, *parts: str) -> list[str]:
+        try:
+            return os.listdir(os.path.join(self.root, *parts))
+        except FileNotFoundError:
+            return []
+
+    def _upload_path(self, upload_id: str, suffix: str = "") -> str:
+        return os.path.join(self.root, "uploads", upload_id + suffix)
+
+    def _block_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blocks", digest[:2], digest)
+
+    def _list_path(self, isrc: str, name: str) -> str:
+        return os.path.join(self.root, "lists", isrc, name)
+
+    def _meta_path(self, isrc: str, name: str) -> str:
+        return os.path.join(self.root, "meta", isrc, name)
@@ -0,0 +1,293 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, List, Optional
+from musos_assist.adapters.analytics import tally
+from musos_assist.adapters.forwarding import ObservedMusicSingleReleaseRepository
+from musos_assist.constants import (
+    BUNDLE_CYCLE,
+    BUNDLE_EXISTS,
+    BUNDLE_ID_MISMATCH,
+    BUNDLE_IN_USE,
+    BUNDLE_NOT_FOUND,
+    LOCK_STRIPES,
+    NESTED_BUNDLE_NOT_FOUND,
+)
+from musos_assist.domain.models import (
+    BundleCredit,
+    BundleView,
+    CreditRole,
+    MusicSingleRelease,
+    ReleaseBundle,
+)
+from musos_assist.domain.ports import (
+    BundleRepository,
+    MusicSingleReleaseRepository,
+    SingleWrite,
+)
+
+# What each appearance of a single adds to the aggregates of a bundle: its
+# duration in microseconds, if it has one, its genres and its credits
+SingleFacts = tuple[Optional[int], tuple[str, ...], tuple[tuple[CreditRole, str], ...]]
+
+
+def single_facts(single: MusicSingleRelease) -> SingleFacts:
+    credits: set[tuple[CreditRole, str]] = {
+        ("artist", name) for name in single.artist_names
+    }
+    credits.update(("composer", name) for name in single.composers or ())
+    credits.update(("producer", name) for name in single.producers or ())
+    return (
+        (
+            None
+            if single.duration is None
+            else single.duration // timedelta(microseconds=1)
+        ),
+        tuple(sorted(set(single.genres))),
+        tuple(sorted(credits)),
+    )
+
+
+class BundleAggregates:
+    """
+    The running aggregates of the tracks of one bundle, nested ones included,
+    changed by the tracks that come, go or change.
+    """
+
+    def __init__(self) -> None:
+        # ISRC -> appearances on the bundle
+        self.tracks: Counter[str] = Counter()
+        self.track_count = 0
+        self.missing: Counter[str] = Counter()
+        self.duration = 0
+        self.untimed = 0
+        self.genres: Counter[str] = Counter()
+        self.credits: Counter[tuple[CreditRole, str]] = Counter()
+
+    def add_track(self, isrc: str, facts: Optional[SingleFacts], change: int) -> None:
+        """Count `change` more appearances of a track, or fewer if negative."""
+        tally(self.tracks, isrc, change)
+        self.track_count += change
+        self.count_facts(isrc, facts, change)
+
+    def count_facts(self, isrc: str, facts: Optional[SingleFacts], change: int) -> None:
+        """Count the facts of a track into the aggregates, or out of them."""
+        if facts is None:
+            tally(self.missing, isrc, change)
+            return
+        duration, genres, credits = facts
+        if duration is None:
+            self.untimed += change
+        else:
+            self.duration += duration * change
+        for genre in genres:
+            tally(self.genres, genre, change)
+        for credit in credits:
+            tally(self.credits, credit, change)
+
+    def view(self, bundle: ReleaseBundle) -> BundleView:
+        return BundleView(
+            bundle=bundle,
+            tracks=self.track_count,
+            missing_tracks=sorted(self.missing),
+            duration=timedelta(microseconds=self.duration),
+            untimed_tracks=self.untimed,
+            genres=dict(
+                sorted(self.genres.items(), key=lambda item: (-item[1], item[0]))
+            ),
+            credits=[
+                BundleCredit(name=name, role=role, tracks=count)
+                for (role, name), count in sorted(
+                    self.credits.items(),
+                    key=lambda item: (-item[1], item[0][1], item[0][0]),
+                )
+            ],
+        )
+
+
+class InMemoryBundleRepository(BundleRepository):
+    """
+    Bundle repository keeping the aggregates of every bundle as a
+    materialized view. A write to a single changes the aggregates of the
+    bundles with it as a track, nested or not, by the difference it makes; a
+    bundle written changes those of itself and the bundles nesting it by the
+    tracks it gained or lost. Reading a bundle costs its number of genres and
+    credits, not of tracks, and validates no single, and its view is kept
+    until its aggregates next change.
+
+    Facts are kept only for the singles on some bundle, read from `singles`
+    when a bundle first lists them.
+    """
+
+    def __init__(self, singles: MusicSingleReleaseRepository) -> None:
+        self.singles = singles
+        self._lock = threading.Lock()
+        self._bundles: Dict[str, ReleaseBundle] = {}
+        self._aggregates: Dict[str, BundleAggregates] = {}
+        # Bundle -> bundles nesting it, by times nested; ISRC -> bundles with
+        # it as a track, by appearances
+        self._parents: Dict[str, Counter[str]] = {}
+        self._containing: Dict[str, Counter[str]] = {}
+        self._facts: Dict[str, Optional[SingleFacts]] = {}
+        self._views: Dict[str, BundleView] = {}
+
+    def create_bundle(self, bundle: ReleaseBundle) -> ReleaseBundle:
+        with self._lock:
+            if bundle.id in self._bundles:
+                raise ValueError(BUNDLE_EXISTS)
+            self._check_nested(bundle)
+            self._bundles[bundle.id] = bundle
+            self._aggregates[bundle.id] = BundleAggregates()
+            self._parents[bundle.id] = Counter()
+            self._link(bundle, 1)
+            self._change_tracks(bundle.id, self._expand(bundle))
+        return bundle
+
+    def list_bundles(self) -> List[ReleaseBundle]:
+        with self._lock:
+            return [self._bundles[id] for id in sorted(self._bundles)]
+
+    def read_bundle(self, bundle_id: str) -> BundleView:
+        with self._lock:
+            view = self._views.get(bundle_id)
+            if view is None:
+                if bundle_id not in self._bundles:
+                    raise ValueError(BUNDLE_NOT_FOUND)
+                view = self._views[bundle_id] = self._aggregates[bundle_id].view(
+                    self._bundles[bundle_id]
+                )
+            return view
+
+    def update_bundle(self, bundle_id: str, bundle: ReleaseBundle) -> ReleaseBundle:
+        with self._lock:
+            if bundle_id not in self._bundles:
+                raise ValueError(BUNDLE_NOT_FOUND)
+            if bundle.id != bundle_id:
+                raise ValueError(BUNDLE_ID_MISMATCH)
+            self._check_nested(bundle)
+            self._link(self._bundles[bundle_id], -1)
+            self._link(bundle, 1)
+            self._bundles[bundle_id] = bundle
+            self._views.pop(bundle_id, None)
+            self._change_tracks(bundle_id, self._expand(bundle))
+        return bundle
+
+    def delete_bundle(self, bundle_id: str) -> None:
+        with self._lock:
+            if bundle_id not in self._bundles:
+                raise ValueError(BUNDLE_NOT_FOUND)
+            if self._parents[bundle_id]:
+                raise ValueError(BUNDLE_IN_USE)
+            self._change_tracks(bundle_id, Counter())
+            self._link(self._bundles[bundle_id], -1)
+            del self._bundles[bundle_id]
+            del self._aggregates[bundle_id]
+            del self._parents[bundle_id]
+            self._views.pop(bundle_id, None)
+
+    def observe_singles(self, writes: List[SingleWrite]) -> None:
+        with self._lock:
+            for _, isrc, single in writes:
+                if single is None or single.isrc != isrc:
+                    self._refresh(isrc, None)
+                if single is not None:
+                    self._refresh(single.isrc, single_facts(single))
+
+    def _check_nested(self, bundle: ReleaseBundle) -> None:
+        ancestors = self._ancestors(bundle.id) if bundle.id in self._bundles else {}
+        for child in bundle.bundles:
+            if child == bundle.id or child in ancestors:
+                raise ValueError(BUNDLE_CYCLE)
+            if child not in self._bundles:
+                raise ValueError(NESTED_BUNDLE_NOT_FOUND)
+
+    def _link(self, bundle: ReleaseBundle, change: int) -> None:
+        """Record the bundle as nesting its children, or no longer."""
+        for child in bundle.bundles:
+            tally(self._parents[child], bundle.id, change)
+
+    def _ancestors(self, bundle_id: str) -> Counter[str]:
+        """The bundles nesting one, by the times they do, however deep."""
+        found: Counter[str] = Counter()
+        stack = [(bundle_id, 1)]
+        while stack:
+            nested, times = stack.pop()
+            for parent, count in self._parents[nested].items():
+                found[parent] += times * count
+                stack.append((parent, times * count))
+        return found
+
+    def _expand(self, bundle: ReleaseBundle) -> Counter[str]:
+        """The tracks of a bundle, by appearances, from those of its children."""
+        tracks = Counter(bundle.tracks)
+        for child in bundle.bundles:
+            tracks.update(self._aggregates[child].tracks)
+        return tracks
+
+    def _change_tracks(self, bundle_id: str, tracks: Counter[str]) -> None:
+        """Set the tracks of a bundle, updating it and those nesting it."""
+        old = self._aggregates[bundle_id].tracks
+        changes = {
+            isrc: tracks[isrc] - old[isrc]
+            for isrc in tracks.keys() | old.keys()
+            if tracks[isrc] != old[isrc]
+        }
+        if not changes:
+            return
+        affected = self._ancestors(bundle_id)
+        affected[bundle_id] = 1
+        for target, times in affected.items():
+            aggregates = self._aggregates[target]
+            for isrc, change in changes.items():
+                self._add_track(target, aggregates, isrc, change * times)
+            self._views.pop(target, None)
+
+    def _add_track(
+        self, bundle_id: str, aggregates: BundleAggregates, isrc: str, change: int
+    ) -> None:
+        if isrc not in self._facts:
+            self._facts[isrc] = self._read_facts(isrc)
+        aggregates.add_track(isrc, self._facts[isrc], change)
+        containing = self._containing.setdefault(isrc, Counter())
+        tally(containing, bundle_id, change)
+        if not containing:
+            del self._containing[isrc]
+            del self._facts[isrc]
+
+    def _read_facts(self, isrc: str) -> Optional[SingleFacts]:
+        try:
+            return single_facts(self.singles.read_single(isrc))
+        except ValueError:
+            return None
+
+    def _refresh(self, isrc: str, facts: Optional[SingleFacts]) -> None:
+        """Replace the facts of a track on the bundles with it."""
+        containing = self._containing.get(isrc)
+        if not containing:
+            return
+        old = self._facts[isrc]
+        for bundle_id, appearances in containing.items():
+            aggregates = self._aggregates[bundle_id]
+            aggregates.count_facts(isrc, old, -appearances)
+            aggregates.count_facts(isrc, facts, appearances)
+            self._views.pop(bundle_id, None)
+        self._facts[isrc] = facts
+
+
+class BundleViewsMusicSingleReleaseRepository(ObservedMusicSingleReleaseRepository):
+    """
+    Repository passing every write another one accepts to a bundle
+    repository, keeping the aggregates of the bundles up to date.
+    """
+
+    def __init__(
+        self,
+        repository: MusicSingleReleaseRepository,
+        bundles: BundleRepository,
+        stripes: int = LOCK_STRIPES,
+    ) -> None:
+        super().__init__(repository, stripes)
+        self.bundles = bundles
+
+    def observe(self, writes: List[SingleWrite]) -> None:
+        self.bundles.observe_singles(writes)
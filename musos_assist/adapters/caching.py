@@ -0,0 +1,176 @@
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Optional
+from musos_assist.adapters.forwarding import ObservedMusicSingleReleaseRepository
+from musos_assist.constants import LOCK_STRIPES, READ_CACHE_SIZE, SINGLE_NOT_FOUND
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.domain.ports import MusicSingleReleaseRepository, SingleWrite
+
+# A single with its revision, or None for an ISRC the repository has not got
+CachedSingle = Optional[tuple[MusicSingleRelease, int]]
+
+# Odd multipliers spreading a hash over the rows of a frequency sketch. The
+# hash is CRC-32 rather than the salted hash(), so admission does not vary
+# from one process to the next
+SKETCH_SEEDS = (
+    0x9E3779B97F4A7C15,
+    0xC2B2AE3D27D4EB4F,
+    0x165667B19E3779F9,
+    0xD6E8FEB86659FD93,
+)
+SKETCH_MAX_COUNT = 15
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of how often each key was asked for lately, in a few
+    bytes per cached entry. Rows are four counters per entry wide, at least
+    64, so that a scan of cold keys does not saturate every counter of a
+    small cache. Counts saturate at 15 and are halved once the sketch has
+    counted ten times its width, so that popularity fades.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._bits = max(6, (4 * capacity - 1).bit_length())
+        self._rows = [bytearray(1 << self._bits) for _ in SKETCH_SEEDS]
+        self._counted = 0
+        self._sample_size = 10 << self._bits
+
+    def _slots(self, key: str) -> List[int]:
+        h = zlib.crc32(key.encode())
+        return [
+            ((h * seed) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+            for seed in SKETCH_SEEDS
+        ]
+
+    def increment(self, key: str) -> None:
+        for row, slot in zip(self._rows, self._slots(key)):
+            if row[slot] < SKETCH_MAX_COUNT:
+                row[slot] += 1
+        self._counted += 1
+        if self._counted >= self._sample_size:
+            self._counted //= 2
+            for row in self._rows:
+                row[:] = bytes(count >> 1 for count in row)
+
+    def frequency(self, key: str) -> int:
+        return min(row[slot] for row, slot in zip(self._rows, self._slots(key)))
+
+
+class CachingMusicSingleReleaseRepository(ObservedMusicSingleReleaseRepository):
+    """
+    Repository keeping the singles read most often from another one, for a
+    slower repository serving traffic skewed towards a few releases.
+
+    Up to `size` singles are kept, along with ISRCs found missing, so that
+    lookups of unknown singles do not reach the repository either. When full,
+    a single read is only kept in place of the least recently read if it was
+    asked for more often lately (TinyLFU admission), so a scan of cold singles
+    does not flush the hot ones. Concurrent misses on one ISRC share a single
+    read of the repository. Writes through this repository evict the singles
+    they touch; writes bypassing it are not seen, so it must be outermost.
+    """
+
+    def __init__(
+        self,
+        repository: MusicSingleReleaseRepository,
+        size: int = READ_CACHE_SIZE,
+        stripes: int = LOCK_STRIPES,
+    ) -> None:
+        super().__init__(repository, stripes)
+        self.size = size
+        self._lock = threading.Lock()
+        # Least recently read first
+        self._entries: OrderedDict[str, CachedSingle] = OrderedDict()
+        self._sketch = FrequencySketch(size)
+        # Reads of the repository in progress, each shared by everyone asking
+        # meanwhile; dropped when a write makes what they read stale
+        self._pending: dict[str, Future[CachedSingle]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def read_single(self, isrc: str) -> MusicSingleRelease:
+        return self.read_single_with_revision(isrc)[0]
+
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        cached = self._read_through(isrc)
+        if cached is None:
+            raise ValueError(SINGLE_NOT_FOUND)
+        return cached
+
+    def hit_counts(self) -> tuple[int, int]:
+        """
+        Return how many reads were served without a read of the repository,
+        from the cache or by joining one in progress, and how many needed one.
+        """
+        with self._lock:
+            return self._hits, self._misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def observe(self, writes: List[SingleWrite]) -> None:
+        with self._lock:
+            for _, isrc, single in writes:
+                self._evict(isrc)
+                if single is not None:
+                    # Also known missing until renamed to
+                    self._evict(single.isrc)
+
+    def _read_through(self, isrc: str) -> CachedSingle:
+        with self._lock:
+            self._sketch.increment(isrc)
+            if isrc in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(isrc)
+                return self._entries[isrc]
+            pending = self._pending.get(isrc)
+            if pending is None:
+                self._misses += 1
+                future = self._pending[isrc] = Future()
+            else:
+                self._hits += 1
+        if pending is not None:
+            return pending.result()
+        try:
+            cached = self._read_repository(isrc)
+        except Exception as e:
+            with self._lock:
+                if self._pending.get(isrc) is future:
+                    del self._pending[isrc]
+            future.set_exception(e)
+            raise
+        self._finish(isrc, future, cached)
+        future.set_result(cached)
+        return cached
+
+    def _read_repository(self, isrc: str) -> CachedSingle:
+        try:
+            return self.repository.read_single_with_revision(isrc)
+        except ValueError as e:
+            if str(e) != SINGLE_NOT_FOUND:
+                raise
+            return None
+
+    def _finish(
+        self, isrc: str, future: "Future[CachedSingle]", cached: CachedSingle
+    ) -> None:
+        """Keep what a read found, unless a write made it stale meanwhile."""
+        with self._lock:
+            if self._pending.get(isrc) is not future:
+                return
+            del self._pending[isrc]
+            if len(self._entries) >= self.size:
+                victim = next(iter(self._entries), None)
+                if victim is None:
+                    return
+                if self._sketch.frequency(isrc) <= self._sketch.frequency(victim):
+                    return
+                del self._entries[victim]
+            self._entries[isrc] = cached
+
+    def _evict(self, isrc: str) -> None:
+        self._entries.pop(isrc, None)
+        self._pending.pop(isrc, None)
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import List
+from musos_assist.adapters.forwarding import ObservedMusicSingleReleaseRepository
+from musos_assist.constants import CHANGE_FEED_SIZE, CHANGES_EXPIRED, LOCK_STRIPES
+from musos_assist.domain.models import SingleChange
+from musos_assist.domain.ports import (
+    ChangeFeed,
+    MusicSingleReleaseRepository,
+    SingleWrite,
+)
+
+
+def wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class InMemoryChangeFeed(ChangeFeed):
+    """
+    Change feed keeping the latest `size` changes in a ring buffer. Changes
+    are recorded from any thread, and wake the tasks waiting on any event loop.
+
+    Sequences start from the microsecond the feed was created, so they keep
+    growing across restarts: a client following the feed from before one
+    finds its sequence expired, rather than quietly matched to other changes.
+    """
+
+    def __init__(self, size: int = CHANGE_FEED_SIZE) -> None:
+        self._lock = threading.Lock()
+        self._changes: deque[SingleChange] = deque(maxlen=size)
+        self._sequence = time.time_ns() // 1000
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+
+    def record(self, writes: List[SingleWrite]) -> None:
+        with self._lock:
+            for kind, isrc, single in writes:
+                self._sequence += 1
+                self._changes.append(
+                    SingleChange(
+                        sequence=self._sequence, kind=kind, isrc=isrc, single=single
+                    )
+                )
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(wake, future)
+
+    def latest_sequence(self) -> int:
+        return self._sequence
+
+    def changes_after(self, sequence: int, limit: int) -> List[SingleChange]:
+        with self._lock:
+            oldest = self._changes[0].sequence if self._changes else self._sequence + 1
+            # Later than the latest is from another feed, as before a restart
+            if not oldest - 1 <= sequence <= self._sequence:
+                raise ValueError(CHANGES_EXPIRED)
+            start = sequence - oldest + 1
+            return list(islice(self._changes, start, start + limit))
+
+    async def wait_after(self, sequence: int, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        with self._lock:
+            if self._sequence > sequence:
+                return
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
+
+class ChangeFeedMusicSingleReleaseRepository(ObservedMusicSingleReleaseRepository):
+    """Repository recording every write another one accepts in a change feed."""
+
+    def __init__(
+        self,
+        repository: MusicSingleReleaseRepository,
+        feed: ChangeFeed,
+        stripes: int = LOCK_STRIPES,
+    ) -> None:
+        super().__init__(repository, stripes)
+        self.feed = feed
+
+    def observe(self, writes: List[SingleWrite]) -> None:
+        self.feed.record(writes)
@@ -0,0 +1,386 @@
+import os
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Any, BinaryIO, Generic, Hashable, List, Optional, TypeVar
+from musos_assist.adapters import repeated_isrcs
+from musos_assist.constants import DEFAULT_PAGE_SIZE, SINGLE_EXISTS, SINGLE_NOT_FOUND
+from musos_assist.domain.models import MusicSingleQuery, MusicSingleRelease
+from musos_assist.domain.ports import BulkWriteError, MusicSingleReleaseRepository
+
+# Strings mostly unique to one single, kept as they are
+TEXT_FIELDS = ("title", "catalog_number", "artwork_url", "audio_preview_url", "notes")
+# Strings shared by many singles, interned and stored as symbol ids
+SYMBOL_FIELDS = ("label", "version", "language")
+# Lists of shared strings, interned as a whole and stored as list ids
+LIST_FIELDS = (
+    "artist_names",
+    "genres",
+    "formats",
+    "subgenres",
+    "composers",
+    "producers",
+)
+
+# MusicSingleQuery criterion -> the column it is matched against
+QUERY_COLUMNS: dict[str, str] = {
+    "artist": "artist_names",
+    "genre": "genres",
+    "subgenre": "subgenres",
+    "label": "label",
+    "language": "language",
+}
+
+# Column value standing for None
+MISSING = -1
+
+T = TypeVar("T", bound=Hashable)
+
+
+class SymbolTable(Generic[T]):
+    """Interns values as dense integer ids, so each distinct value is kept once."""
+
+    def __init__(self) -> None:
+        self.values: list[T] = []
+        self._ids: dict[T, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: T) -> int:
+        symbol = self._ids.get(value)
+        if symbol is None:
+            symbol = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return symbol
+
+
+class LyricsStore:
+    """
+    Lyrics kept apart from the other columns and zlib-compressed: in memory by
+    default, or appended to a scratch file so they take no resident memory at
+    all. The file is truncated when opened, as the offsets into it are only
+    kept in memory, and space of replaced lyrics in it is not reclaimed.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._blobs: list[Optional[bytes]] = []
+        self._file: Optional[BinaryIO] = None
+        self._offsets = array("q")
+        self._lengths = array("i")
+        self._end = 0
+        if path is not None:
+            self._file = open(path, "w+b", buffering=0)
+
+    def put(self, slot: int, lyrics: Optional[str]) -> None:
+        blob = None if lyrics is None else zlib.compress(lyrics.encode())
+        if self._file is None:
+            while len(self._blobs) <= slot:
+                self._blobs.append(None)
+            self._blobs[slot] = blob
+            return
+        while len(self._offsets) <= slot:
+            self._offsets.append(MISSING)
+            self._lengths.append(0)
+        if blob is None:
+            self._offsets[slot] = MISSING
+            return
+        os.pwrite(self._file.fileno(), blob, self._end)
+        self._offsets[slot] = self._end
+        self._lengths[slot] = len(blob)
+        self._end += len(blob)
+
+    def get(self, slot: int) -> Optional[str]:
+        if self._file is None:
+            blob = self._blobs[slot]
+        elif self._offsets[slot] == MISSING:
+            blob = None
+        else:
+            blob = os.pread(
+                self._file.fileno(), self._lengths[slot], self._offsets[slot]
+            )
+        return None if blob is None else zlib.decompress(blob).decode()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class ColumnarMusicSingleReleaseRepository(MusicSingleReleaseRepository):
+    """
+    Compact in-memory repository for large catalogues. Singles are not kept as
+    models but spread over column arrays, one slot per single: shared strings
+    (artists, genres, labels, ...) are interned, release dates stored as
+    ordinals and durations as whole seconds, and lyrics held compressed in a
+    separate LyricsStore. Models are only built when read.
+
+    Queries scan the columns in ISRC order rather than using indexes, and
+    full-text search is not supported; both trade speed for memory. One lock
+    serialises access, so the repository can be shared between threads.
+    """
+
+    def __init__(self, lyrics_path: Optional[str] = None) -> None:
+        self._lock = threading.RLock()
+        # ISRC -> slot, in the order singles were written
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._sorted_isrcs: list[str] = []
+        self._strings: SymbolTable[str] = SymbolTable()
+        self._lists: SymbolTable[tuple[int, ...]] = SymbolTable()
+        # Casefolded string -> ids of the interned strings folding to it
+        self._folded: dict[str, set[int]] = {}
+        self._isrcs: list[Optional[str]] = []
+        self._texts: dict[str, list[Optional[str]]] = {
+            field: [] for field in TEXT_FIELDS
+        }
+        self._symbols: dict[str, array[int]] = {
+            field: array("i") for field in SYMBOL_FIELDS + LIST_FIELDS
+        }
+        self._release_dates = array("i")
+        self._durations = array("i")
+        self._revisions = array("q")
+        self._lyrics = LyricsStore(lyrics_path)
+        # Seeded from the clock, as in InMemoryMusicSingleReleaseRepository
+        self._revision = time.time_ns()
+
+    def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
+        with self._lock:
+            if single.isrc in self._slots:
+                raise ValueError(SINGLE_EXISTS)
+            self._revision += 1
+            self._add(single)
+            self._sorted_isrcs.insert(
+                bisect_left(self._sorted_isrcs, single.isrc), single.isrc
+            )
+            return single
+
+    def list_singles(self) -> List[MusicSingleRelease]:
+        with self._lock:
+            return [self._load(slot) for slot in self._slots.values()]
+
+    def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        with self._lock:
+            start = 0 if after is None else bisect_right(self._sorted_isrcs, after)
+            return [
+                self._load(self._slots[isrc])
+                for isrc in self._sorted_isrcs[start : start + limit]
+            ]
+
+    def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        with self._lock:
+            # Each criterion as a column and the ids acceptable in it
+            criteria: list[tuple[array[int], set[int]]] = []
+            for criterion, field in QUERY_COLUMNS.items():
+                value = getattr(query, criterion)
+                if value is None:
+                    continue
+                symbols = self._folded.get(value.casefold(), set())
+                if field in LIST_FIELDS:
+                    symbols = {
+                        list_id
+                        for list_id, members in enumerate(self._lists.values)
+                        if not symbols.isdisjoint(members)
+                    }
+                if not symbols:
+                    return []
+                criteria.append((self._symbols[field], symbols))
+            released_from, released_to = query.released_from, query.released_to
+            first = 0 if released_from is None else released_from.toordinal()
+            last = None if released_to is None else released_to.toordinal()
+
+            matches: List[MusicSingleRelease] = []
+            start = 0 if after is None else bisect_right(self._sorted_isrcs, after)
+            for isrc in self._sorted_isrcs[start:]:
+                slot = self._slots[isrc]
+                ordinal = self._release_dates[slot]
+                if ordinal < first or (last is not None and ordinal > last):
+                    continue
+                if all(column[slot] in symbols for column, symbols in criteria):
+                    matches.append(self._load(slot))
+                    if len(matches) == limit:
+                        break
+            return matches
+
+    def read_single(self, isrc: str) -> MusicSingleRelease:
+        with self._lock:
+            return self._load(self._slot(isrc))
+
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        with self._lock:
+            slot = self._slot(isrc)
+            return self._load(slot), self._revisions[slot]
+
+    def catalogue_revision(self) -> int:
+        return self._revision
+
+    def count_singles(self) -> int:
+        return len(self._slots)
+
+    def update_single(
+        self, isrc: str, single_update: MusicSingleRelease
+    ) -> MusicSingleRelease:
+        with self._lock:
+            self._slot(isrc)
+            if single_update.isrc != isrc and single_update.isrc in self._slots:
+                raise ValueError(SINGLE_EXISTS)
+            self._revision += 1
+            self._remove(isrc)
+            self._add(single_update)
+            if single_update.isrc != isrc:
+                del self._sorted_isrcs[bisect_left(self._sorted_isrcs, isrc)]
+                self._sorted_isrcs.insert(
+                    bisect_left(self._sorted_isrcs, single_update.isrc),
+                    single_update.isrc,
+                )
+            return single_update
+
+    def delete_single(self, isrc: str) -> None:
+        with self._lock:
+            self._slot(isrc)
+            self._revision += 1
+            self._remove(isrc)
+            del self._sorted_isrcs[bisect_left(self._sorted_isrcs, isrc)]
+
+    def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        with self._lock:
+            errors = repeated_isrcs(single.isrc for single in singles)
+            for row, single in enumerate(singles):
+                if single.isrc in self._slots:
+                    errors.setdefault(row, SINGLE_EXISTS)
+            if errors:
+                raise BulkWriteError(errors)
+            self._revision += 1
+            for single in singles:
+                self._add(single)
+            self._sorted_isrcs.extend(single.isrc for single in singles)
+            self._sorted_isrcs.sort()
+            return singles
+
+    def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        with self._lock:
+            errors = repeated_isrcs(single.isrc for single in singles)
+            if errors:
+                raise BulkWriteError(errors)
+            self._revision += 1
+            for single in singles:
+                if single.isrc in self._slots:
+                    self._remove(single.isrc)
+                else:
+                    self._sorted_isrcs.append(single.isrc)
+                self._add(single)
+            self._sorted_isrcs.sort()
+            return singles
+
+    def delete_singles(self, isrcs: List[str]) -> None:
+        with self._lock:
+            errors = repeated_isrcs(isrcs)
+            for row, isrc in enumerate(isrcs):
+                if isrc not in self._slots:
+                    errors.setdefault(row, SINGLE_NOT_FOUND)
+            if errors:
+                raise BulkWriteError(errors)
+            self._revision += 1
+            for isrc in isrcs:
+                self._remove(isrc)
+            removed = set(isrcs)
+            self._sorted_isrcs = [
+                isrc for isrc in self._sorted_isrcs if isrc not in removed
+            ]
+
+    def close(self) -> None:
+        self._lyrics.close()
+
+    def _slot(self, isrc: str) -> int:
+        slot = self._slots.get(isrc)
+        if slot is None:
+            raise ValueError(SINGLE_NOT_FOUND)
+        return slot
+
+    def _add(self, single: MusicSingleRelease) -> None:
+        """Write a single into a free slot, or a new one at the end."""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._isrcs)
+            self._isrcs.append(None)
+            for texts in self._texts.values():
+                texts.append(None)
+            for column in self._symbols.values():
+                column.append(MISSING)
+            self._release_dates.append(0)
+            self._durations.append(MISSING)
+            self._revisions.append(0)
+        self._isrcs[slot] = single.isrc
+        for field in TEXT_FIELDS:
+            value = getattr(single, field)
+            self._texts[field][slot] = None if value is None else str(value)
+        for field in SYMBOL_FIELDS:
+            value = getattr(single, field)
+            self._symbols[field][slot] = (
+                MISSING if value is None else self._intern(value)
+            )
+        for field in LIST_FIELDS:
+            values = getattr(single, field)
+            self._symbols[field][slot] = (
+                MISSING
+                if values is None
+                else self._lists.intern(tuple(map(self._intern, values)))
+            )
+        self._release_dates[slot] = single.release_date.toordinal()
+        self._durations[slot] = (
+            MISSING
+            if single.duration is None
+            else round(single.duration.total_seconds())
+        )
+        self._revisions[slot] = self._revision
+        self._lyrics.put(slot, single.lyrics)
+        self._slots[single.isrc] = slot
+
+    def _remove(self, isrc: str) -> None:
+        slot = self._slots.pop(isrc)
+        self._isrcs[slot] = None
+        for texts in self._texts.values():
+            texts[slot] = None
+        self._lyrics.put(slot, None)
+        self._free.append(slot)
+
+    def _intern(self, value: str) -> int:
+        symbol = self._strings.intern(value)
+        self._folded.setdefault(value.casefold(), set()).add(symbol)
+        return symbol
+
+    def _load(self, slot: int) -> MusicSingleRelease:
+        """Build the model of the single in a slot."""
+        strings = self._strings.values
+        record: dict[str, Any] = {"isrc": self._isrcs[slot]}
+        for field in TEXT_FIELDS:
+            record[field] = self._texts[field][slot]
+        for field in SYMBOL_FIELDS:
+            symbol = self._symbols[field][slot]
+            record[field] = None if symbol == MISSING else strings[symbol]
+        for field in LIST_FIELDS:
+            list_id = self._symbols[field][slot]
+            record[field] = (
+                None
+                if list_id == MISSING
+                else [strings[symbol] for symbol in self._lists.values[list_id]]
+            )
+        record["release_date"] = date.fromordinal(self._release_dates[slot])
+        seconds = self._durations[slot]
+        record["duration"] = None if seconds == MISSING else timedelta(seconds=seconds)
+        record["lyrics"] = self._lyrics.get(slot)
+        return MusicSingleRelease.model_validate(record)
@@ -0,0 +1,128 @@
+import threading
+from typing import List, Optional
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.adapters.forwarding import locked_stripes
+from musos_assist.constants import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    LOCK_STRIPES,
+    SINGLE_EXISTS,
+    SINGLE_NOT_FOUND,
+)
+from musos_assist.domain.models import (
+    MusicSingleQuery,
+    MusicSingleRelease,
+    MusicSingleSearchHit,
+)
+
+
+class ConcurrentInMemoryMusicSingleReleaseRepository(
+    InMemoryMusicSingleReleaseRepository
+):
+    """
+    In-memory repository safe to share between threads.
+
+    Writers first take the stripe locks of the ISRCs they touch, so the
+    check-then-act of a create, update or delete cannot interleave with another
+    writer on the same ISRC, while writers on other ISRCs (and every rejected
+    write) proceed without contending. The shared dict, sorted ISRCs and
+    indexes are then changed under one short structure lock, which readers
+    also take, so they never see a half-applied write. A rename locks both
+    ISRCs and so is atomic: it refuses to overwrite another single.
+    """
+
+    def __init__(self, stripes: int = LOCK_STRIPES) -> None:
+        super().__init__()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        # Reentrant, as inherited methods call others this class overrides
+        self._structure = threading.RLock()
+        # Immutable copy of the catalogue, rebuilt on the first read after a write
+        self._snapshot: Optional[tuple[MusicSingleRelease, ...]] = None
+
+    def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
+        with locked_stripes(self._stripes, [single.isrc]):
+            if single.isrc in self.singles_db:
+                raise ValueError(SINGLE_EXISTS)
+            with self._structure:
+                self._snapshot = None
+                return super().create_single(single)
+
+    def list_singles(self) -> List[MusicSingleRelease]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._structure:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = self._snapshot = tuple(self.singles_db.values())
+        return list(snapshot)
+
+    def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        with self._structure:
+            return super().list_singles_page(after=after, limit=limit)
+
+    def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        with self._structure:
+            return super().query_singles(query, after=after, limit=limit)
+
+    def search_singles(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[MusicSingleSearchHit]:
+        with self._structure:
+            return super().search_singles(text, limit)
+
+    def read_single(self, isrc: str) -> MusicSingleRelease:
+        with self._structure:
+            return super().read_single(isrc)
+
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        with self._structure:
+            return super().read_single_with_revision(isrc)
+
+    def update_single(
+        self, isrc: str, single_update: MusicSingleRelease
+    ) -> MusicSingleRelease:
+        with locked_stripes(self._stripes, [isrc, single_update.isrc]):
+            if isrc not in self.singles_db:
+                raise ValueError(SINGLE_NOT_FOUND)
+            if single_update.isrc != isrc and single_update.isrc in self.singles_db:
+                raise ValueError(SINGLE_EXISTS)
+            with self._structure:
+                self._snapshot = None
+                return super().update_single(isrc, single_update)
+
+    def delete_single(self, isrc: str) -> None:
+        with locked_stripes(self._stripes, [isrc]):
+            if isrc not in self.singles_db:
+                raise ValueError(SINGLE_NOT_FOUND)
+            with self._structure:
+                self._snapshot = None
+                super().delete_single(isrc)
+
+    def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        with locked_stripes(self._stripes, (single.isrc for single in singles)):
+            with self._structure:
+                self._snapshot = None
+                return super().create_singles(singles)
+
+    def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        with locked_stripes(self._stripes, (single.isrc for single in singles)):
+            with self._structure:
+                self._snapshot = None
+                return super().upsert_singles(singles)
+
+    def delete_singles(self, isrcs: List[str]) -> None:
+        with locked_stripes(self._stripes, isrcs):
+            with self._structure:
+                self._snapshot = None
+                super().delete_singles(isrcs)
@@ -0,0 +1,167 @@
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Iterable, Iterator, List, Optional
+from musos_assist.constants import (
+    DEFAULT_CO_CREDITS,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    LOCK_STRIPES,
+)
+from musos_assist.domain.models import (
+    CatalogueStats,
+    MusicSingleQuery,
+    MusicSingleRelease,
+    MusicSingleSearchHit,
+)
+from musos_assist.domain.ports import MusicSingleReleaseRepository, SingleWrite
+
+
+@contextmanager
+def locked_stripes(locks: List[threading.Lock], isrcs: Iterable[str]) -> Iterator[None]:
+    """
+    Hold the stripe locks of `isrcs`, taken in stripe order so that two
+    writers locking overlapping sets of ISRCs cannot deadlock.
+    """
+    stripes = sorted({hash(isrc) % len(locks) for isrc in isrcs})
+    with ExitStack() as stack:
+        for stripe in stripes:
+            stack.enter_context(locks[stripe])
+        yield
+
+
+class ForwardingMusicSingleReleaseRepository(MusicSingleReleaseRepository):
+    """
+    Repository passing every call on to another one, for decorators to
+    override the calls they add behaviour to.
+    """
+
+    def __init__(self, repository: MusicSingleReleaseRepository) -> None:
+        self.repository = repository
+
+    def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
+        return self.repository.create_single(single)
+
+    def list_singles(self) -> List[MusicSingleRelease]:
+        return self.repository.list_singles()
+
+    def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        return self.repository.list_singles_page(after, limit)
+
+    def iter_singles(
+        self,
+        after: Optional[str] = None,
+        batch_size: int = DEFAULT_PAGE_SIZE,
+        query: Optional[MusicSingleQuery] = None,
+    ) -> Iterator[MusicSingleRelease]:
+        return self.repository.iter_singles(after, batch_size, query)
+
+    def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        return self.repository.query_singles(query, after, limit)
+
+    def search_singles(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[MusicSingleSearchHit]:
+        return self.repository.search_singles(text, limit)
+
+    def read_single(self, isrc: str) -> MusicSingleRelease:
+        return self.repository.read_single(isrc)
+
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        return self.repository.read_single_with_revision(isrc)
+
+    def catalogue_revision(self) -> int:
+        return self.repository.catalogue_revision()
+
+    def count_singles(self) -> int:
+        return self.repository.count_singles()
+
+    def catalogue_stats(self, co_credits: int = DEFAULT_CO_CREDITS) -> CatalogueStats:
+        return self.repository.catalogue_stats(co_credits)
+
+    def update_single(
+        self, isrc: str, single_update: MusicSingleRelease
+    ) -> MusicSingleRelease:
+        return self.repository.update_single(isrc, single_update)
+
+    def delete_single(self, isrc: str) -> None:
+        self.repository.delete_single(isrc)
+
+    def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        return self.repository.create_singles(singles)
+
+    def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        return self.repository.upsert_singles(singles)
+
+    def delete_singles(self, isrcs: List[str]) -> None:
+        self.repository.delete_singles(isrcs)
+
+
+class ObservedMusicSingleReleaseRepository(ForwardingMusicSingleReleaseRepository):
+    """
+    Repository passing every call on to another one, and every write that
+    one accepts to `observe`. Writers hold the stripe locks of the ISRCs they
+    touch across both, so writes to a single are observed in the order they
+    were applied. Upserts are observed as updates, whether or not the single
+    existed before.
+    """
+
+    def __init__(
+        self, repository: MusicSingleReleaseRepository, stripes: int = LOCK_STRIPES
+    ) -> None:
+        super().__init__(repository)
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+
+    def observe(self, writes: List[SingleWrite]) -> None:
+        """Called with the writes of each call, once the repository applied them."""
+        raise NotImplementedError
+
+    def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
+        with locked_stripes(self._stripes, [single.isrc]):
+            created = self.repository.create_single(single)
+            self.observe([("created", created.isrc, created)])
+        return created
+
+    def update_single(
+        self, isrc: str, single_update: MusicSingleRelease
+    ) -> MusicSingleRelease:
+        with locked_stripes(self._stripes, [isrc, single_update.isrc]):
+            updated = self.repository.update_single(isrc, single_update)
+            self.observe([("updated", isrc, updated)])
+        return updated
+
+    def delete_single(self, isrc: str) -> None:
+        with locked_stripes(self._stripes, [isrc]):
+            self.repository.delete_single(isrc)
+            self.observe([("deleted", isrc, None)])
+
+    def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        with locked_stripes(self._stripes, (single.isrc for single in singles)):
+            created = self.repository.create_singles(singles)
+            self.observe([("created", single.isrc, single) for single in created])
+        return created
+
+    def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        with locked_stripes(self._stripes, (single.isrc for single in singles)):
+            written = self.repository.upsert_singles(singles)
+            self.observe([("updated", single.isrc, single) for single in written])
+        return written
+
+    def delete_singles(self, isrcs: List[str]) -> None:
+        with locked_stripes(self._stripes, isrcs):
+            self.repository.delete_singles(isrcs)
+            self.observe([("deleted", isrc, None) for isrc in isrcs])
@@ -0,0 +1,292 @@
+import logging
+import re
+import threading
+import unicodedata
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import accumulate, islice
+from typing import Dict, List, Optional, Sequence
+from musos_assist.constants import (
+    INTEGRITY_BATCH_SIZE,
+    INTEGRITY_SCAN_NOT_FOUND,
+    INTEGRITY_SCAN_RUNNING,
+    INTEGRITY_SCANS_KEPT,
+    REQUIRED_ARTIFACT_TYPES,
+)
+from musos_assist.domain.models import (
+    IntegrityIssue,
+    IntegrityIssueKind,
+    IntegrityScan,
+    MusicSingleRelease,
+)
+from musos_assist.domain.ports import (
+    ArtifactStore,
+    IntegrityScanner,
+    MusicSingleReleaseRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+# Country and registrant code, year of reference and designation code, each
+# ISRC on a line of its own
+ISRC_PARTS = re.compile(r"^([A-Z]{2}[A-Z0-9]{3})(\d{2})(\d{5})$", re.MULTILINE)
+# Taken out of titles before comparing them: accents, featured artists, then
+# everything but letters and digits
+TITLE_ACCENTS = re.compile(r"[\u0300-\u036f]+")
+TITLE_FEATURING = re.compile(r"[ \t(\[]+(?:feat\.?|ft\.?|featuring) [^\n]*")
+TITLE_PUNCTUATION = re.compile(r"[^\w\n]+|_")
+# The same for ASCII text, for str.translate, much faster than a substitution
+ASCII_PUNCTUATION = str.maketrans(
+    "", "", "".join(c for c in map(chr, range(128)) if not c.isalnum() and c != "\n")
+)
+
+# An issue found, before it is numbered: kind, ISRC, detail, related ISRCs
+Finding = tuple[IntegrityIssueKind, str, str, List[str]]
+
+
+def fold(texts: Sequence[str]) -> List[str]:
+    """Texts folded for comparison, case and accents aside, in one pass."""
+    text = "\n".join(text.replace("\n", " ") for text in texts).casefold()
+    if not text.isascii():
+        text = TITLE_ACCENTS.sub("", unicodedata.normalize("NFKD", text))
+    return text.split("\n")
+
+
+def title_keys(titles: Sequence[str]) -> List[str]:
+    """
+    Titles folded for comparison, so that those differing only in case,
+    accents, punctuation or featured artists are equal. The batch is folded as
+    one string, each regular expression passing over it once.
+    """
+    text = TITLE_FEATURING.sub("", "\n".join(fold(titles)))
+    if text.isascii():
+        return text.translate(ASCII_PUNCTUATION).split("\n")
+    return TITLE_PUNCTUATION.sub("", text).split("\n")
+
+
+def reference_year(two_digits: str, this_year: int) -> int:
+    """The year an ISRC was assigned, taking none to be from the future."""
+    year = this_year - this_year % 100 + int(two_digits)
+    return year - 100 if year > this_year else year
+
+
+class IntegrityChecker:
+    """
+    Checks the singles of a catalogue a batch at a time, remembering what it
+    needs of earlier batches to find issues between singles: the first single
+    of each artist with a title, and the first label each registrant code was
+    seen with. Each field is parsed or folded for the whole batch at once.
+    """
+
+    def __init__(self, this_year: int) -> None:
+        self._years = {
+            f"{yy:02d}": reference_year(f"{yy:02d}", this_year) for yy in range(100)
+        }
+        # Artist, folded title and version -> ISRC of the first single
+        self._titles: Dict[str, str] = {}
+        # Country and registrant code -> folded label, label, ISRC
+        self._registrants: Dict[str, tuple[str, str, str]] = {}
+
+    def check(self, singles: Sequence[MusicSingleRelease]) -> List[Finding]:
+        isrcs = [single.isrc for single in singles]
+        parts = {
+            match.start(): match.groups()
+            for match in ISRC_PARTS.finditer("\n".join(isrcs))
+        }
+        starts = accumulate((len(isrc) + 1 for isrc in isrcs), initial=0)
+        titles = title_keys([single.title for single in singles])
+        versions = title_keys([single.version or "" for single in singles])
+        labels = fold([(single.label or "").strip() for single in singles])
+        findings: List[Finding] = []
+        for single, start, title, version, label in zip(
+            singles, starts, titles, versions, labels
+        ):
+            isrc = single.isrc
+            found = parts.get(start)
+            if found is None or found[2] == "00000":
+                findings.append(("invalid_isrc", isrc, "Not a well-formed ISRC", []))
+            else:
+                code, year, _ = found
+                assigned = self._years[year]
+                if assigned > single.release_date.year:
+                    findings.append(
+                        (
+                            "isrc_year_after_release",
+                            isrc,
+                            f"ISRC assigned in {assigned}, after the single's"
+                            f" release in {single.release_date.year}",
+                            [],
+                        )
+                    )
+                if label:
+                    first = self._registrants.setdefault(
+                        code, (label, str(single.label), isrc)
+                    )
+                    if first[0] != label:
+                        findings.append(
+                            (
+                                "registrant_label_mismatch",
+                                isrc,
+                                f"Registrant {code} also assigned {first[2]}, of"
+                                f" label {first[1]!r}, not {single.label!r}",
+                                [first[2]],
+                            )
+                        )
+            if not title:
+                continue
+            for artist in single.artist_names:
+                first_isrc = self._titles.setdefault(
+                    f"{artist.casefold()}\x1f{title}\x1f{version}", isrc
+                )
+                if first_isrc != isrc:
+                    findings.append(
+                        (
+                            "near_duplicate_title",
+                            isrc,
+                            f"Title {single.title!r} by {artist} matches that of"
+                            f" {first_isrc}",
+                            [first_isrc],
+                        )
+                    )
+                    break
+        return findings
+
+
+class BackgroundIntegrityScanner(IntegrityScanner):
+    """
+    Integrity scans of a repository, each run on a thread of its own over
+    the catalogue a batch at a time, along with the artifacts of each single
+    when given a store. Issues are kept as tuples, made into models as they
+    are read, so that scans of millions of singles stay small. Singles
+    written during a scan may be checked as before or after the write.
+    """
+
+    def __init__(
+        self,
+        singles: MusicSingleReleaseRepository,
+        artifacts: Optional[ArtifactStore] = None,
+        batch_size: int = INTEGRITY_BATCH_SIZE,
+        required_artifact_types: Sequence[str] = REQUIRED_ARTIFACT_TYPES,
+        kept: int = INTEGRITY_SCANS_KEPT,
+    ) -> None:
+        self.singles = singles
+        self.artifacts = artifacts
+        self.batch_size = batch_size
+        self.required_artifact_types = required_artifact_types
+        self.kept = kept
+        self._lock = threading.Lock()
+        # Oldest first, with the issues each found
+        self._scans: OrderedDict[str, IntegrityScan] = OrderedDict()
+        self._findings: Dict[str, List[Finding]] = {}
+
+    def start_scan(self) -> IntegrityScan:
+        with self._lock:
+            if any(scan.state == "running" for scan in self._scans.values()):
+                raise ValueError(INTEGRITY_SCAN_RUNNING)
+            scan = IntegrityScan(
+                id=uuid.uuid4().hex, state="running", started=datetime.now(timezone.utc)
+            )
+            self._scans[scan.id] = scan
+            self._findings[scan.id] = []
+            while len(self._scans) > max(self.kept, 1):
+                old, _ = self._scans.popitem(last=False)
+                del self._findings[old]
+            started = scan.model_copy(deep=True)
+        threading.Thread(
+            target=self._run, args=(scan,), name="integrity-scan", daemon=True
+        ).start()
+        return started
+
+    def list_scans(self) -> List[IntegrityScan]:
+        with self._lock:
+            return [
+                scan.model_copy(deep=True) for scan in reversed(self._scans.values())
+            ]
+
+    def read_scan(self, scan_id: str) -> IntegrityScan:
+        with self._lock:
+            scan = self._scans.get(scan_id)
+            if scan is None:
+                raise ValueError(INTEGRITY_SCAN_NOT_FOUND)
+            return scan.model_copy(deep=True)
+
+    def issues_after(
+        self, scan_id: str, sequence: int, limit: int
+    ) -> List[IntegrityIssue]:
+        with self._lock:
+            findings = self._findings.get(scan_id)
+            if findings is None:
+                raise ValueError(INTEGRITY_SCAN_NOT_FOUND)
+            start = max(sequence, 0)
+            page = findings[start : start + limit]
+        return [
+            IntegrityIssue(
+                sequence=start + n + 1,
+                kind=kind,
+                isrc=isrc,
+                detail=detail,
+                related=related,
+            )
+            for n, (kind, isrc, detail, related) in enumerate(page)
+        ]
+
+    def _run(self, scan: IntegrityScan) -> None:
+        checker = IntegrityChecker(scan.started.year)
+        try:
+            try:
+                total = self.singles.count_singles()
+            except NotImplementedError:
+                pass
+            else:
+                with self._lock:
+                    scan.total = total
+            singles = self.singles.iter_singles(batch_size=self.batch_size)
+            while batch := list(islice(singles, self.batch_size)):
+                findings = checker.check(batch)
+                if self.artifacts is not None:
+                    findings.extend(self._check_artifacts(self.artifacts, batch))
+                with self._lock:
+                    self._findings.get(scan.id, []).extend(findings)
+                    scan.scanned += len(batch)
+                    for kind, *_ in findings:
+                        scan.issues[kind] = scan.issues.get(kind, 0) + 1
+        except Exception as e:
+            logger.exception("Integrity scan %s failed", scan.id)
+            with self._lock:
+                scan.state, scan.error = "failed", str(e)
+                scan.finished = datetime.now(timezone.utc)
+            return
+        with self._lock:
+            scan.state = "completed"
+            scan.finished = datetime.now(timezone.utc)
+
+    def _check_artifacts(
+        self, artifacts: ArtifactStore, singles: Sequence[MusicSingleRelease]
+    ) -> List[Finding]:
+        findings: List[Finding] = []
+        for single in singles:
+            try:
+                media_types = [
+                    artifact.media_type
+                    for artifact in artifacts.list_artifacts(single.isrc)
+                ]
+            except ValueError:
+                # Not an ISRC the store can hold artifacts for
+                continue
+            missing = [
+                prefix
+                for prefix in self.required_artifact_types
+                if not any(media_type.startswith(prefix) for media_type in media_types)
+            ]
+            if missing:
+                findings.append(
+                    (
+                        "missing_artifact",
+                        single.isrc,
+                        "No artifact of type "
+                        + " or ".join(f"{prefix}*" for prefix in missing),
+                        [],
+                    )
+                )
+        return findings
@@ -0,0 +1,366 @@
+import logging
+import os
+import threading
+from itertools import islice
+from typing import IO, List, Optional
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.constants import DEFAULT_PAGE_SIZE, DEFAULT_SEARCH_LIMIT
+from musos_assist.domain.models import (
+    MusicSingleQuery,
+    MusicSingleRelease,
+    MusicSingleSearchHit,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.ndjson"
+JOURNAL_PREFIX = "journal."
+JOURNAL_SUFFIX = ".log"
+
+# Journal entries are "<op>\t<isrc>\t<json>\n"; neither ISRCs nor the JSON
+# rendering of a single contain raw tabs or newlines.
+OP_CREATE = "C"
+OP_UPDATE = "U"
+OP_DELETE = "D"
+OP_UPSERT = "P"
+# A batch is a "B\t<count>\t" header followed by <count> entries of one op,
+# replayed all-or-nothing.
+OP_BATCH = "B"
+SNAPSHOT_HEADER = "SNAPSHOT"
+
+
+def journal_name(generation: int) -> str:
+    return f"{JOURNAL_PREFIX}{generation:010d}{JOURNAL_SUFFIX}"
+
+
+class JournalMusicSingleReleaseRepository(InMemoryMusicSingleReleaseRepository):
+    """
+    In-memory repository made durable by a write-ahead, append-only journal.
+
+    Every write is applied to memory and appended to the journal under one lock,
+    so the journal order is the order writes were applied. Reads take the lock
+    too, so they never walk the indexes while a write is changing them. Writers then wait for
+    an fsync covering their entry; whichever writer gets there first syncs on
+    behalf of everyone queued behind it (group commit), so concurrent writers
+    share one fsync instead of paying one each.
+
+    Once `snapshot_every` entries have accumulated the catalogue is compacted
+    into a snapshot and a fresh journal generation is started. At startup the
+    snapshot is loaded and only the journals written since it are replayed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_every: int = 10_000,
+        fsync: bool = True,
+    ) -> None:
+        super().__init__()
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._lock = threading.Condition()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+        self._entries_since_snapshot = 0
+        os.makedirs(directory, exist_ok=True)
+        self._generation = self._recover()
+        self._journal: IO[str] = self._open_journal(self._generation)
+
+    def list_singles(self) -> List[MusicSingleRelease]:
+        with self._lock:
+            return super().list_singles()
+
+    def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        with self._lock:
+            return super().list_singles_page(after=after, limit=limit)
+
+    def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        with self._lock:
+            return super().query_singles(query, after=after, limit=limit)
+
+    def search_singles(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[MusicSingleSearchHit]:
+        with self._lock:
+            return super().search_singles(text, limit)
+
+    def read_single(self, isrc: str) -> MusicSingleRelease:
+        with self._lock:
+            return super().read_single(isrc)
+
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        with self._lock:
+            return super().read_single_with_revision(isrc)
+
+    def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
+        with self._lock:
+            created = super().create_single(single)
+            entry = self._append(OP_CREATE, created.isrc, created.model_dump_json())
+        self._commit(entry)
+        return created
+
+    def update_single(
+        self, isrc: str, single_update: MusicSingleRelease
+    ) -> MusicSingleRelease:
+        with self._lock:
+            updated = super().update_single(isrc, single_update)
+            entry = self._append(OP_UPDATE, isrc, updated.model_dump_json())
+        self._commit(entry)
+        return updated
+
+    def delete_single(self, isrc: str) -> None:
+        with self._lock:
+            super().delete_single(isrc)
+            entry = self._append(OP_DELETE, isrc, "")
+        self._commit(entry)
+
+    def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        with self._lock:
+            created = super().create_singles(singles)
+            entry = self._append_batch(
+                OP_CREATE,
+                [(single.isrc, single.model_dump_json()) for single in created],
+            )
+        self._commit(entry)
+        return created
+
+    def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        with self._lock:
+            upserted = super().upsert_singles(singles)
+            entry = self._append_batch(
+                OP_UPSERT,
+                [(single.isrc, single.model_dump_json()) for single in upserted],
+            )
+        self._commit(entry)
+        return upserted
+
+    def delete_singles(self, isrcs: List[str]) -> None:
+        with self._lock:
+            super().delete_singles(isrcs)
+            entry = self._append_batch(OP_DELETE, [(isrc, "") for isrc in isrcs])
+        self._commit(entry)
+
+    def snapshot(self) -> None:
+        """
+        Compact the journal: write the whole catalogue to a new snapshot and
+        start a fresh journal generation. Safe to call at any time, e.g. from
+        an hourly backup job.
+        """
+        with self._lock:
+            while self._syncing:
+                self._lock.wait()
+            self._journal.flush()
+            self._sync_file(self._journal)
+            self._journal.close()
+            self._generation += 1
+            self._journal = self._open_journal(self._generation)
+            self._write_snapshot(self._generation)
+            self._entries_since_snapshot = 0
+            self._synced = self._written
+            self._lock.notify_all()
+        self._remove_stale_journals(self._generation)
+
+    def close(self) -> None:
+        with self._lock:
+            self._journal.flush()
+            self._sync_file(self._journal)
+            self._journal.close()
+
+    def _append(self, op: str, isrc: str, payload: str) -> int:
+        """Append one entry under the lock and return its sequence number."""
+        self._journal.write(f"{op}\t{isrc}\t{payload}\n")
+        self._written += 1
+        self._entries_since_snapshot += 1
+        return self._written
+
+    def _append_batch(self, op: str, entries: List[tuple[str, str]]) -> int:
+        """Append a whole batch with one write and return its sequence number."""
+        if not entries:
+            return self._written
+        lines = [f"{OP_BATCH}\t{len(entries)}\t\n"]
+        lines.extend(f"{op}\t{isrc}\t{payload}\n" for isrc, payload in entries)
+        self._journal.write("".join(lines))
+        self._written += 1
+        self._entries_since_snapshot += len(entries)
+        return self._written
+
+    def _commit(self, entry: int) -> None:
+        """Block until `entry` is durable, syncing for the whole group if needed."""
+        with self._lock:
+            while self._synced < entry:
+                if self._syncing:
+                    self._lock.wait()
+                    continue
+                self._syncing = True
+                target = self._written
+                self._journal.flush()
+                journal = self._journal
+                self._lock.release()
+                try:
+                    self._sync_file(journal)
+                finally:
+                    self._lock.acquire()
+                    self._syncing = False
+                self._synced = max(self._synced, target)
+                self._lock.notify_all()
+            compact = self._entries_since_snapshot >= self.snapshot_every
+        if compact:
+            self.snapshot()
+
+    def _sync_file(self, handle: IO[str]) -> None:
+        if self.fsync and not handle.closed:
+            os.fsync(handle.fileno())
+
+    def _open_journal(self, generation: int) -> IO[str]:
+        return open(
+            os.path.join(self.directory, journal_name(generation)),
+            "a",
+            encoding="utf-8",
+        )
+
+    def _write_snapshot(self, generation: int) -> None:
+        """Write the snapshot atomically: temp file, fsync, then rename."""
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            handle.write(f"{SNAPSHOT_HEADER}\t{generation}\n")
+            for isrc in self._sorted_isrcs:
+                handle.write(self.singles_db[isrc].model_dump_json())
+                handle.write("\n")
+            handle.flush()
+            self._sync_file(handle)
+        os.replace(temp_path, path)
+        self._sync_directory()
+
+    def _sync_directory(self) -> None:
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            descriptor = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+
+    def _remove_stale_journals(self, generation: int) -> None:
+        for generation_on_disk, name in self._journal_files():
+            if generation_on_disk < generation:
+                os.remove(os.path.join(self.directory, name))
+
+    def _journal_files(self) -> list[tuple[int, str]]:
+        journals: list[tuple[int, str]] = []
+        for name in os.listdir(self.directory):
+            if name.startswith(JOURNAL_PREFIX) and name.endswith(JOURNAL_SUFFIX):
+                generation = name[len(JOURNAL_PREFIX) : -len(JOURNAL_SUFFIX)]
+                if generation.isdigit():
+                    journals.append((int(generation), name))
+        return sorted(journals)
+
+    def _recover(self) -> int:
+        """Load the snapshot, replay newer journals and return the generation."""
+        snapshot_generation = self._load_snapshot()
+        self._remove_stale_journals(snapshot_generation)
+        generation = snapshot_generation
+        for generation_on_disk, name in self._journal_files():
+            self._replay(os.path.join(self.directory, name))
+            generation = generation_on_disk
+        return generation
+
+    def _load_snapshot(self) -> int:
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as handle:
+            header, generation = handle.readline().rstrip("\n").split("\t")
+            if header != SNAPSHOT_HEADER:
+                raise ValueError(f"Unrecognised snapshot file: {path}")
+            self._bulk_load(
+                MusicSingleRelease.model_validate_json(line) for line in handle
+            )
+        return int(generation)
+
+    def _replay(self, path: str) -> None:
+        size = os.path.getsize(path)
+        with open(path, "rb+") as handle:
+            offset = 0
+            lines = iter(handle)
+            for line in lines:
+                entry = [line]
+                if line.startswith(OP_BATCH.encode()):
+                    entry.extend(islice(lines, self._batch_size(line)))
+                end = offset + sum(len(part) for part in entry)
+                if not self._apply(entry):
+                    if end < size:
+                        raise ValueError(f"Corrupt journal entry at {path}:{offset}")
+                    # A torn tail from a crash mid-append; drop it so that new
+                    # entries are not appended after garbage.
+                    logger.warning("Truncating torn journal entry in %s", path)
+                    handle.truncate(offset)
+                    break
+                offset = end
+                self._entries_since_snapshot += len(entry)
+
+    def _batch_size(self, header: bytes) -> int:
+        try:
+            return int(header.split(b"\t")[1])
+        except (IndexError, ValueError):
+            return 0
+
+    def _apply(self, entry: List[bytes]) -> bool:
+        """Apply one journal entry (a line, or a batch of lines) to memory."""
+        if not all(line.endswith(b"\n") for line in entry):
+            return False
+        try:
+            parsed = [
+                line.rstrip(b"\n").decode("utf-8").split("\t", 2) for line in entry
+            ]
+            if parsed[0][0] == OP_BATCH:
+                return self._apply_batch(parsed[1:], int(parsed[0][1]))
+            op, isrc, payload = parsed[0]
+            if op == OP_DELETE:
+                InMemoryMusicSingleReleaseRepository.delete_single(self, isrc)
+            elif op == OP_CREATE:
+                InMemoryMusicSingleReleaseRepository.create_single(
+                    self, MusicSingleRelease.model_validate_json(payload)
+                )
+            elif op == OP_UPDATE:
+                InMemoryMusicSingleReleaseRepository.update_single(
+                    self, isrc, MusicSingleRelease.model_validate_json(payload)
+                )
+            else:
+                return False
+        except ValueError:
+            return False
+        return True
+
+    def _apply_batch(self, parsed: List[List[str]], count: int) -> bool:
+        ops = {op for op, _, _ in parsed}
+        if len(parsed) != count or len(ops) != 1:
+            return False
+        op = ops.pop()
+        if op == OP_DELETE:
+            InMemoryMusicSingleReleaseRepository.delete_singles(
+                self, [isrc for _, isrc, _ in parsed]
+            )
+            return True
+        singles = [
+            MusicSingleRelease.model_validate_json(payload) for _, _, payload in parsed
+        ]
+        if op == OP_CREATE:
+            InMemoryMusicSingleReleaseRepository.create_singles(self, singles)
+        elif op == OP_UPSERT:
+            InMemoryMusicSingleReleaseRepository.upsert_singles(self, singles)
+        else:
+            return False
+        return True
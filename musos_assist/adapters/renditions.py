@@ -0,0 +1,335 @@
+import io
+import os
+import sys
+import threading
+import wave
+from array import array
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, Executor, Future
+from contextlib import suppress
+from functools import partial
+from operator import add
+from typing import TYPE_CHECKING, BinaryIO, Callable, List, Optional
+from uuid import uuid4
+from musos_assist.constants import (
+    ARTIFACT_BLOCK_SIZE,
+    PREVIEW_SAMPLE_RATE,
+    PREVIEW_SECONDS,
+    RENDITION_CACHE_BYTES,
+    RENDITION_NOT_FOUND,
+    RENDITION_UNAVAILABLE,
+    RENDITION_UNSUPPORTED,
+    THUMBNAIL_SIZES,
+)
+from musos_assist.domain.models import Artifact, Rendition
+from musos_assist.domain.ports import RenditionCache
+
+if TYPE_CHECKING:
+    from _typeshed import WriteableBuffer
+
+
+class BlockReader(io.RawIOBase):
+    """Reads an artifact stored in blocks as one seekable file."""
+
+    def __init__(self, blocks: List[str]) -> None:
+        super().__init__()
+        self._blocks = blocks
+        self._size = (
+            (len(blocks) - 1) * ARTIFACT_BLOCK_SIZE + os.path.getsize(blocks[-1])
+            if blocks
+            else 0
+        )
+        self._position = 0
+        self._index = -1
+        self._file: Optional[io.BufferedReader] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}
+        self._position = max(base[whence] + offset, 0)
+        return self._position
+
+    def readinto(self, buffer: "WriteableBuffer") -> int:
+        if self._position >= self._size:
+            return 0
+        index, start = divmod(self._position, ARTIFACT_BLOCK_SIZE)
+        if index != self._index:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self._blocks[index], "rb")
+            self._index = index
+        assert self._file is not None
+        self._file.seek(start)
+        view = memoryview(buffer).cast("B")
+        count = self._file.readinto(view[: ARTIFACT_BLOCK_SIZE - start])
+        self._position += count
+        return count
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super().close()
+
+
+def thumbnail(source: BinaryIO, target: str, size: int) -> None:
+    """Scale artwork down to fit a `size` pixel square, as a JPEG."""
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise NotImplementedError(RENDITION_UNAVAILABLE) from e
+    try:
+        image = Image.open(source)
+        # Lets JPEG decoding scale down as it goes, rather than decode in full
+        image.draft("RGB", (size, size))
+        image = image.convert("RGB")
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(RENDITION_UNSUPPORTED) from e
+    image.thumbnail((size, size))
+    image.save(target, "JPEG", quality=85)
+
+
+def pcm16(frames: bytes, width: int) -> bytes:
+    """Keep the two most significant bytes of each little-endian PCM sample."""
+    if width == 2:
+        return frames
+    converted = bytearray(len(frames) // width * 2)
+    converted[0::2] = frames[width - 2 :: width]
+    converted[1::2] = frames[width - 1 :: width]
+    return bytes(converted)
+
+
+def audio_preview(source: BinaryIO, target: str) -> None:
+    """
+    Trim a WAV file to its first PREVIEW_SECONDS, mixed down to 16-bit mono and
+    downsampled by a whole factor to at most PREVIEW_SAMPLE_RATE.
+    """
+    try:
+        reader = wave.open(source, "rb")
+    except (wave.Error, EOFError) as e:
+        raise ValueError(RENDITION_UNSUPPORTED) from e
+    with reader:
+        channels = reader.getnchannels()
+        width = reader.getsampwidth()
+        rate = reader.getframerate()
+        if width not in (2, 3, 4):
+            raise ValueError(RENDITION_UNSUPPORTED)
+        frames = reader.readframes(rate * PREVIEW_SECONDS)
+    samples = array("h", pcm16(frames, width))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    # Average every run of `step` frames over all channels: a box filter that
+    # keeps decimation from folding high frequencies into the audible band
+    step = -(-rate // PREVIEW_SAMPLE_RATE)
+    stride = step * channels
+    count = len(samples) // stride
+    totals = [0] * count
+    for offset in range(stride):
+        totals = list(map(add, totals, samples[offset : count * stride : stride]))
+    mono = array("h", [total // stride for total in totals])
+    if sys.byteorder == "big":
+        mono.byteswap()
+    with wave.open(target, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate // step)
+        writer.writeframes(mono.tobytes())
+
+
+# Rendition name -> (media type, transform, arguments after source and target)
+RENDITIONS: dict[str, tuple[str, Callable[..., None], tuple[int, ...]]] = {
+    **{
+        f"thumbnail-{size}": ("image/jpeg", thumbnail, (size,))
+        for size in THUMBNAIL_SIZES
+    },
+    "preview": ("audio/wav", audio_preview, ()),
+}
+
+
+def cached_rendition(name: str, size: int, path: str) -> Rendition:
+    return Rendition(name=name, media_type=RENDITIONS[name][0], size=size, path=path)
+
+
+def render_rendition(blocks: List[str], target: str, name: str) -> None:
+    """Write a rendition of the artifact stored in `blocks` to `target`."""
+    _, transform, arguments = RENDITIONS[name]
+    with io.BufferedReader(BlockReader(blocks)) as source:
+        transform(source, target, *arguments)
+
+
+class FileSystemRenditionCache(RenditionCache):
+    """
+    Renditions cached as files named by the SHA-256 of their artifact, so
+    artwork shared across versions is rendered once, and an artifact replaced
+    with new content is never served a stale rendition.
+
+    Renditions are made in a pool of worker processes, where decoding images
+    and audio holds up neither the event loop nor each other. The cache evicts
+    the least recently served once it outgrows `max_bytes`, an order it keeps
+    across restarts in the modification times of the files.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = RENDITION_CACHE_BYTES,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._executor = executor
+        self._lock = threading.Lock()
+        # Cached renditions and their sizes, least recently served first
+        self._cached: Optional[OrderedDict[str, int]] = None
+        self._cached_bytes = 0
+        # Renditions being made, each shared by everyone asking meanwhile
+        self._pending: dict[str, Future[Rendition]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def render(
+        self, artifact: Artifact, blocks: List[str], name: str
+    ) -> "Future[Rendition]":
+        if name not in RENDITIONS:
+            raise ValueError(RENDITION_NOT_FOUND)
+        key = f"{artifact.sha256}-{name}"
+        path = os.path.join(self.root, key)
+        with self._lock:
+            cached = self._entries()
+            size = cached.get(key)
+            if size is not None:
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    self._cached_bytes -= cached.pop(key)
+                else:
+                    self._hits += 1
+                    cached.move_to_end(key)
+                    future: Future[Rendition] = Future()
+                    future.set_result(cached_rendition(name, size, path))
+                    return future
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._hits += 1
+                return pending
+            self._misses += 1
+            future = self._pending[key] = Future()
+        temporary = os.path.join(self.root, f".{key}.{uuid4().hex}")
+        try:
+            work = self._submit(blocks, temporary, name)
+        except RuntimeError as e:
+            # The pool was shut down or broke again; fail this rendition, not
+            # the cache
+            work = Future()
+            work.set_exception(e)
+        work.add_done_callback(partial(self._finish, key, name, temporary, future))
+        return future
+
+    def hit_counts(self) -> tuple[int, int]:
+        with self._lock:
+            return self._hits, self._misses
+
+    def close(self) -> None:
+        """Stop the worker processes, letting renditions in progress finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _finish(
+        self,
+        key: str,
+        name: str,
+        temporary: str,
+        future: "Future[Rendition]",
+        work: "Future[None]",
+    ) -> None:
+        """Cache a finished rendition, or hand its error to everyone waiting."""
+        path = os.path.join(self.root, key)
+        try:
+            work.result()
+            os.replace(temporary, path)
+            size = os.path.getsize(path)
+        except Exception as e:
+            with suppress(FileNotFoundError):
+                os.remove(temporary)
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            return
+        with self._lock:
+            del self._pending[key]
+            self._entries()[key] = size
+            self._cached_bytes += size
+            self._evict()
+        future.set_result(cached_rendition(name, size, path))
+
+    def _entries(self) -> "OrderedDict[str, int]":
+        """The cached renditions, found on disk on first use."""
+        if self._cached is None:
+            os.makedirs(self.root, exist_ok=True)
+            found: list[tuple[int, str, int]] = []
+            for entry in os.scandir(self.root):
+                if entry.name.startswith("."):
+                    # Left behind by a rendering cut short
+                    with suppress(FileNotFoundError):
+                        os.remove(entry.path)
+                    continue
+                stat = entry.stat()
+                found.append((stat.st_mtime_ns, entry.name, stat.st_size))
+            found.sort()
+            self._cached = OrderedDict((key, size) for _, key, size in found)
+            self._cached_bytes = sum(self._cached.values())
+            self._evict()
+        return self._cached
+
+    def _evict(self) -> None:
+        """Delete the least recently served renditions until the cache fits."""
+        assert self._cached is not None
+        # The newest rendition stays even if it alone is too large
+        while self._cached_bytes > self.max_bytes and len(self._cached) > 1:
+            key, size = self._cached.popitem(last=False)
+            self._cached_bytes -= size
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(self.root, key))
+
+    def _submit(self, blocks: List[str], temporary: str, name: str) -> "Future[None]":
+        """
+        Hand a rendering to the pool. A worker that died, killed for running
+        out of memory say, breaks the whole pool, so a broken pool is
+        replaced with a new one and the rendering submitted again, once.
+        """
+        executor = self._pool()
+        try:
+            return executor.submit(render_rendition, blocks, temporary, name)
+        except BrokenExecutor:
+            self._discard(executor)
+            return self._pool().submit(render_rendition, blocks, temporary, name)
+
+    def _discard(self, executor: Executor) -> None:
+        """Drop a broken pool, unless another thread has replaced it already."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False)
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Spawned rather than forked, as forking a threaded server is unsafe
+                self._executor = ProcessPoolExecutor(
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
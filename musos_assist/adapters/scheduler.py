@@ -0,0 +1,242 @@
+import heapq
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import IO, Dict, List, Optional, Set
+from musos_assist.constants import SCHEDULED_RELEASE_NOT_FOUND
+from musos_assist.domain.models import ReleaseAction, ScheduledRelease
+from musos_assist.domain.ports import ReleaseScheduler
+
+logger = logging.getLogger(__name__)
+
+# Log entries are "<op>\t<payload>\n": the JSON of an action scheduled, or the
+# id of one cancelled or completed. Neither contains raw tabs or newlines.
+OP_SCHEDULE = "S"
+OP_FINISH = "F"
+
+
+def utc(moment: datetime) -> datetime:
+    """The moment in UTC, taking a naive one to be in UTC already."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+class HeapReleaseScheduler(ReleaseScheduler):
+    """
+    Release scheduler keeping the actions waiting in a binary heap by due
+    time, so scheduling, cancelling and taking the next action due each cost
+    O(log n) however many are waiting; nothing scans them all. Cancelled
+    actions stay in the heap and are skipped when they reach the top, until
+    they outnumber the rest and the heap is rebuilt without them.
+
+    Given a `path`, every action scheduled and finished is appended to a log
+    there, replayed the first time the scheduler is used. The log is rewritten
+    with only the actions unfinished once `compact_after` finished ones have
+    accumulated and outnumber them.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        fsync: bool = True,
+        compact_after: int = 1_000,
+    ) -> None:
+        self.path = path
+        self.fsync = fsync
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        self._heap: list[tuple[float, str]] = []
+        self._waiting: Dict[str, ScheduledRelease] = {}
+        self._by_isrc: Dict[str, Set[str]] = {}
+        # Taken but not completed: unfinished in the log, so due again on restart
+        self._taken: Dict[str, ScheduledRelease] = {}
+        self._cancelled = 0
+        self._finished = 0
+        self._log: Optional[IO[str]] = None
+        self._loaded = path is None
+
+    def schedule(
+        self, isrc: str, action: ReleaseAction, due: datetime
+    ) -> ScheduledRelease:
+        release = ScheduledRelease(
+            id=uuid.uuid4().hex, isrc=isrc, action=action, due=utc(due)
+        )
+        with self._lock:
+            self._load()
+            self._append([f"{OP_SCHEDULE}\t{release.model_dump_json()}\n"])
+            self._add(release)
+        return release
+
+    def list_scheduled(self, isrc: str) -> List[ScheduledRelease]:
+        with self._lock:
+            self._load()
+            releases = [self._waiting[id] for id in self._by_isrc.get(isrc, ())]
+        return sorted(releases, key=lambda release: release.due)
+
+    def cancel(self, isrc: str, release_id: str) -> None:
+        with self._lock:
+            self._load()
+            release = self._waiting.get(release_id)
+            if release is None or release.isrc != isrc:
+                raise ValueError(SCHEDULED_RELEASE_NOT_FOUND)
+            self._append([f"{OP_FINISH}\t{release_id}\n"])
+            self._discard(release)
+            self._cancelled += 1
+            self._finished += 1
+            if self._cancelled > len(self._waiting):
+                self._rebuild_heap()
+            self._compact_if_due()
+
+    def next_due(self) -> Optional[datetime]:
+        with self._lock:
+            self._load()
+            self._skip_cancelled()
+            if not self._heap:
+                return None
+            return datetime.fromtimestamp(self._heap[0][0], timezone.utc)
+
+    def take_due(self, now: datetime, limit: int) -> List[ScheduledRelease]:
+        cutoff = utc(now).timestamp()
+        taken: List[ScheduledRelease] = []
+        with self._lock:
+            self._load()
+            while len(taken) < limit:
+                self._skip_cancelled()
+                if not self._heap or self._heap[0][0] > cutoff:
+                    break
+                _, release_id = heapq.heappop(self._heap)
+                release = self._waiting[release_id]
+                self._discard(release)
+                self._taken[release_id] = release
+                taken.append(release)
+        return taken
+
+    def complete(self, release_ids: List[str]) -> None:
+        with self._lock:
+            completed = [id for id in release_ids if self._taken.pop(id, None)]
+            if completed:
+                self._append([f"{OP_FINISH}\t{id}\n" for id in completed])
+                self._finished += len(completed)
+                self._compact_if_due()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _add(self, release: ScheduledRelease) -> None:
+        self._waiting[release.id] = release
+        self._by_isrc.setdefault(release.isrc, set()).add(release.id)
+        heapq.heappush(self._heap, (release.due.timestamp(), release.id))
+
+    def _discard(self, release: ScheduledRelease) -> None:
+        """Forget a waiting action, leaving its heap entry behind."""
+        del self._waiting[release.id]
+        ids = self._by_isrc[release.isrc]
+        ids.discard(release.id)
+        if not ids:
+            del self._by_isrc[release.isrc]
+
+    def _skip_cancelled(self) -> None:
+        while self._heap and self._heap[0][1] not in self._waiting:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [
+            (release.due.timestamp(), id) for id, release in self._waiting.items()
+        ]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
+
+    def _append(self, lines: List[str]) -> None:
+        if self._log is None:
+            return
+        self._log.write("".join(lines))
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    def _compact_if_due(self) -> None:
+        unfinished = len(self._waiting) + len(self._taken)
+        if self._finished >= self.compact_after and self._finished > unfinished:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log atomically with only the unfinished actions."""
+        if self.path is None:
+            return
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            for release in (*self._taken.values(), *self._waiting.values()):
+                handle.write(f"{OP_SCHEDULE}\t{release.model_dump_json()}\n")
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+        if self._log is not None:
+            self._log.close()
+        os.replace(temp_path, self.path)
+        self._sync_directory()
+        self._log = open(self.path, "a", encoding="utf-8")
+        self._finished = 0
+
+    def _sync_directory(self) -> None:
+        directory = os.path.dirname(self.path or "") or "."
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+
+    def _load(self) -> None:
+        """Replay the log, once, and open it for appending."""
+        if self._loaded or self.path is None:
+            return
+        self._loaded = True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path):
+            self._replay(self.path)
+            self._rebuild_heap()
+        self._log = open(self.path, "a", encoding="utf-8")
+        self._compact_if_due()
+
+    def _replay(self, path: str) -> None:
+        size = os.path.getsize(path)
+        with open(path, "rb+") as handle:
+            offset = 0
+            for line in handle:
+                end = offset + len(line)
+                if not self._apply(line):
+                    if end < size:
+                        raise ValueError(f"Corrupt schedule entry at {path}:{offset}")
+                    # A torn tail from a crash mid-append; drop it so that new
+                    # entries are not appended after garbage.
+                    logger.warning("Truncating torn schedule entry in %s", path)
+                    handle.truncate(offset)
+                    break
+                offset = end
+
+    def _apply(self, line: bytes) -> bool:
+        """Apply one log entry to memory."""
+        if not line.endswith(b"\n"):
+            return False
+        try:
+            op, payload = line.rstrip(b"\n").decode("utf-8").split("\t", 1)
+            if op == OP_SCHEDULE:
+                self._add(ScheduledRelease.model_validate_json(payload))
+            elif op == OP_FINISH:
+                release = self._waiting.get(payload)
+                if release is not None:
+                    self._discard(release)
+                    self._cancelled += 1
+                self._finished += 1
+            else:
+                return False
+        except ValueError:
+            return False
+        return True
@@ -0,0 +1,291 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from heapq import heappush, heapreplace, nlargest
+from itertools import count
+from math import log
+from operator import itemgetter
+from typing import Callable, Optional
+from musos_assist.domain.models import MusicSingleRelease
+
+# MusicSingleRelease field -> weight of each occurrence of a term in it
+SEARCH_FIELDS: dict[str, float] = {
+    "title": 3.0,
+    "artist_names": 2.0,
+    "composers": 1.0,
+    "producers": 1.0,
+    "lyrics": 1.0,
+    "notes": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Most vocabulary terms that the prefix of a search may expand to
+MAX_PREFIX_TERMS = 64
+
+# Searches whose rarest word matches at most this many singles score every
+# candidate; broader ones walk impact-ordered postings and stop early
+EXHAUSTIVE_CANDIDATES = 2_000
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into casefolded word tokens with accents removed."""
+    folded = text.casefold()
+    if not folded.isascii():
+        folded = "".join(
+            char
+            for char in unicodedata.normalize("NFKD", folded)
+            if not unicodedata.combining(char)
+        )
+    return TOKEN.findall(folded)
+
+
+def weighted_terms(single: MusicSingleRelease) -> dict[str, float]:
+    """Count the terms of a single's searchable fields, weighted per field."""
+    counts: dict[str, float] = {}
+    for field, weight in SEARCH_FIELDS.items():
+        value = getattr(single, field)
+        if value is None:
+            continue
+        for text in [value] if isinstance(value, str) else value:
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0.0) + weight
+    return counts
+
+
+class FullTextIndex:
+    """
+    In-process inverted index over the searchable text of singles.
+
+    Results are ranked with BM25 over weighted term counts (each occurrence
+    counts its field's weight, in the manner of BM25F). Every term of a search
+    must match, and the last one also matches as a prefix, so results follow
+    the user as they type.
+
+    Searches on rare words score their few candidates directly. Frequent
+    words use postings sorted by impact, built on first use and dropped when
+    the term next changes, so a write stays cheap and only the next search
+    for its frequent words pays to re-rank them.
+
+    The vocabulary is kept sorted for prefix lookups, but lazily: new terms
+    are merged in on the next prefix lookup, and vanished terms are skipped
+    until enough pile up to rebuild, so writes never pay for a sorted insert.
+    """
+
+    def __init__(self) -> None:
+        # term -> ISRC -> weighted count of the term in that single
+        self._postings: dict[str, dict[str, float]] = {}
+        self._lengths: dict[str, float] = {}
+        self._total_length = 0.0
+        self._terms: list[str] = []
+        self._new_terms: set[str] = set()
+        self._dead_terms = 0
+        # term -> postings ordered by impact, for terms searched since changed
+        self._ranked_postings: dict[str, tuple[float, list[tuple[float, str]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, single: MusicSingleRelease) -> None:
+        terms = weighted_terms(single)
+        length = sum(terms.values())
+        self._lengths[single.isrc] = length
+        self._total_length += length
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocabulary_added(term)
+            postings[single.isrc] = tf
+            self._ranked_postings.pop(term, None)
+
+    def remove(self, single: MusicSingleRelease) -> None:
+        length = self._lengths.pop(single.isrc, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in weighted_terms(single):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(single.isrc, None)
+            self._ranked_postings.pop(term, None)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary_removed(term)
+
+    def search(self, text: str, limit: int) -> list[tuple[str, float]]:
+        """Return up to `limit` (ISRC, score) pairs, best match first."""
+        tokens = list(dict.fromkeys(tokenize(text)))
+        if not tokens or not self._lengths:
+            return []
+        # The terms each search word matches: the last word as a prefix
+        groups: list[list[str]] = []
+        for position, token in enumerate(tokens):
+            if position == len(tokens) - 1:
+                terms = self._expand(token)
+            else:
+                terms = [token] if token in self._postings else []
+            if not terms:
+                return []
+            groups.append(terms)
+        groups.sort(key=self._frequency)
+        if self._frequency(groups[0]) <= EXHAUSTIVE_CANDIDATES:
+            return self._score_candidates(groups, limit)
+        return self._threshold_search(groups, limit)
+
+    def _score_candidates(
+        self, groups: list[list[str]], limit: int
+    ) -> list[tuple[str, float]]:
+        """Score every single matching the rarest word, keeping full matches."""
+        norm = self._norm()
+        idfs = {term: self._idf(term) for group in groups for term in group}
+        candidates = set().union(*(self._postings[term] for term in groups[0]))
+        scores: list[tuple[str, float]] = []
+        for isrc in candidates:
+            score = self._score(groups, idfs, isrc, lambda _: norm)
+            if score is not None:
+                scores.append((isrc, score))
+        return nlargest(limit, scores, key=itemgetter(1))
+
+    def _threshold_search(
+        self, groups: list[list[str]], limit: int
+    ) -> list[tuple[str, float]]:
+        """
+        Fagin's threshold algorithm: walk each term's postings in descending
+        impact, scoring every newly seen single in full, and stop once no
+        unseen single could beat the current top `limit`. Frequent words then
+        rank in a few steps instead of a scan of their postings.
+        """
+        ranked = {term: self._ranked(term) for group in groups for term in group}
+        idfs = {term: self._idf(term) for term in ranked}
+        best: list[tuple[float, str]] = []
+        seen: set[str] = set()
+        for depth in count():
+            bound = 0.0
+            for group in groups:
+                # An unseen single scores at most the best frontier in a group
+                frontier = 0.0
+                for term in group:
+                    entries = ranked[term][1]
+                    if depth >= len(entries):
+                        continue
+                    impact, isrc = entries[depth]
+                    frontier = max(frontier, idfs[term] * impact)
+                    if isrc in seen:
+                        continue
+                    seen.add(isrc)
+                    score = self._score(
+                        groups, idfs, isrc, lambda term: ranked[term][0]
+                    )
+                    if score is None:
+                        continue
+                    if len(best) < limit:
+                        heappush(best, (score, isrc))
+                    elif score > best[0][0]:
+                        heapreplace(best, (score, isrc))
+                bound += frontier
+            if bound == 0.0 or (len(best) == limit and best[0][0] >= bound):
+                break
+        return [(isrc, score) for score, isrc in sorted(best, reverse=True)]
+
+    def _score(
+        self,
+        groups: list[list[str]],
+        idfs: dict[str, float],
+        isrc: str,
+        norm: Callable[[str], float],
+    ) -> Optional[float]:
+        """
+        BM25 score of a single, or None unless every group matches. A prefix
+        counts as its best-scoring completion, not the sum of them all.
+        """
+        score = 0.0
+        for group in groups:
+            best = 0.0
+            for term in group:
+                tf = self._postings[term].get(isrc)
+                if tf is not None:
+                    best = max(best, idfs[term] * self._impact(tf, isrc, norm(term)))
+            if best == 0.0:
+                return None
+            score += best
+        return score
+
+    def _ranked(self, term: str) -> tuple[float, list[tuple[float, str]]]:
+        """
+        A term's postings in descending impact, with the length normalisation
+        they were computed with. Cached until the term's postings change.
+        """
+        ranked = self._ranked_postings.get(term)
+        if ranked is None:
+            norm = self._norm()
+            entries = sorted(
+                (
+                    (self._impact(tf, isrc, norm), isrc)
+                    for isrc, tf in self._postings[term].items()
+                ),
+                reverse=True,
+            )
+            ranked = self._ranked_postings[term] = (norm, entries)
+        return ranked
+
+    def _frequency(self, group: list[str]) -> int:
+        return sum(len(self._postings[term]) for term in group)
+
+    def _norm(self) -> float:
+        """Length normalisation factor: b * k1 / average single length."""
+        return BM25_B * BM25_K1 * len(self._lengths) / self._total_length
+
+    def _impact(self, tf: float, isrc: str, norm: float) -> float:
+        """BM25 weight of a term occurring `tf` times in a single, before idf."""
+        return (
+            tf
+            * (BM25_K1 + 1)
+            / (tf + BM25_K1 * (1 - BM25_B) + norm * self._lengths[isrc])
+        )
+
+    def _idf(self, term: str) -> float:
+        frequency = len(self._postings[term])
+        return log(1 + (len(self._lengths) - frequency + 0.5) / (frequency + 0.5))
+
+    def _expand(self, prefix: str) -> list[str]:
+        """The live vocabulary terms starting with `prefix`, in order."""
+        self._sync_vocabulary()
+        terms: list[str] = []
+        position = bisect_left(self._terms, prefix)
+        while position < len(self._terms) and len(terms) < MAX_PREFIX_TERMS:
+            term = self._terms[position]
+            if not term.startswith(prefix):
+                break
+            if term in self._postings:
+                terms.append(term)
+            position += 1
+        return terms
+
+    def _vocabulary_added(self, term: str) -> None:
+        position = bisect_left(self._terms, term)
+        if position < len(self._terms) and self._terms[position] == term:
+            self._dead_terms -= 1
+        else:
+            self._new_terms.add(term)
+
+    def _vocabulary_removed(self, term: str) -> None:
+        if term in self._new_terms:
+            self._new_terms.discard(term)
+        else:
+            self._dead_terms += 1
+
+    def _sync_vocabulary(self) -> None:
+        if self._dead_terms > len(self._terms) // 2:
+            self._terms = sorted(self._postings)
+            self._new_terms.clear()
+            self._dead_terms = 0
+        elif self._new_terms:
+            # Sorting a sorted list with a short unsorted tail is near linear
+            self._terms.extend(self._new_terms)
+            self._terms.sort()
+            self._new_terms.clear()
@@ -0,0 +1,329 @@
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from musos_assist.adapters.forwarding import ObservedMusicSingleReleaseRepository
+from musos_assist.constants import (
+    BULK_BATCH_SIZE,
+    SNAPSHOT_OPEN_ATTEMPTS,
+    SNAPSHOTS_KEPT,
+)
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.domain.ports import MusicSingleReleaseRepository, SingleWrite
+
+logger = logging.getLogger(__name__)
+
+# A snapshot file is a header, the JSON of every single, then an index of
+# fixed-width entries sorted by ISRC: the ISRC, the offset and length of its
+# JSON, and its revision. The header holds the catalogue revision the
+# snapshot shows; revisions are 0 for a repository that keeps none. The
+# pointer file holds the version of the latest snapshot.
+SNAPSHOT_MAGIC = b"MUSOSNP2"
+HEADER = struct.Struct("<8sQQQQ")
+INDEX_ENTRY = struct.Struct("<12sQIQ")
+POINTER = struct.Struct("<Q")
+POINTER_FILE = "current"
+
+
+def snapshot_name(version: int) -> str:
+    return f"catalogue.{version:020d}.snap"
+
+
+def write_snapshot(
+    path: str,
+    version: int,
+    rows: Iterable[tuple[str, bytes, int]],
+    catalogue_revision: int = 0,
+) -> None:
+    """
+    Write a snapshot of rows sorted by ISRC, each with its revision,
+    atomically: temp file then rename.
+    """
+    temp_path = path + ".tmp"
+    index: List[bytes] = []
+    with open(temp_path, "wb") as handle:
+        handle.write(HEADER.pack(SNAPSHOT_MAGIC, version, 0, 0, 0))
+        offset = HEADER.size
+        for isrc, row, revision in rows:
+            index.append(INDEX_ENTRY.pack(isrc.encode(), offset, len(row), revision))
+            handle.write(row)
+            offset += len(row)
+        handle.write(b"".join(index))
+        handle.seek(0)
+        handle.write(
+            HEADER.pack(SNAPSHOT_MAGIC, version, catalogue_revision, len(index), offset)
+        )
+    os.replace(temp_path, path)
+
+
+class SnapshotIndex:
+    """The ISRCs of a snapshot as a sequence, for bisect to search in place."""
+
+    def __init__(self, region: mmap.mmap, offset: int, count: int) -> None:
+        self._region = region
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position: int) -> bytes:
+        start = self._offset + position * INDEX_ENTRY.size
+        return self._region[start : start + 12]
+
+    def isrc(self, position: int) -> str:
+        return self[position].decode()
+
+    def row(self, position: int) -> memoryview:
+        return self.row_with_revision(position)[0]
+
+    def row_with_revision(self, position: int) -> tuple[memoryview, int]:
+        _, offset, length, revision = INDEX_ENTRY.unpack_from(
+            self._region, self._offset + position * INDEX_ENTRY.size
+        )
+        return memoryview(self._region)[offset : offset + length], revision
+
+
+class CatalogueSnapshot:
+    """
+    An immutable snapshot of the catalogue, mapped into memory. Rows are the
+    JSON of each single, sliced from the mapping without parsing or copying;
+    every process mapping the same file shares its pages.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as handle:
+            self._region = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, self.catalogue_revision, count, index_offset = (
+            HEADER.unpack_from(self._region)
+        )
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Unrecognised snapshot file: {path}")
+        self._index = SnapshotIndex(self._region, index_offset, count)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def find(self, isrc: str) -> Optional[tuple[memoryview, int]]:
+        """The row of a single with its revision, or None if it has none."""
+        key = isrc.encode()
+        position = bisect.bisect_left(self._index, key)
+        if position < len(self._index) and self._index[position] == key:
+            return self._index.row_with_revision(position)
+        return None
+
+    def page(
+        self, after: Optional[str], limit: Optional[int]
+    ) -> tuple[List[memoryview], Optional[str]]:
+        """
+        The rows after an ISRC, in ISRC order, up to `limit` of them, and the
+        ISRC of the last.
+        """
+        start = 0 if after is None else bisect.bisect_right(self._index, after.encode())
+        end = (
+            len(self._index) if limit is None else min(start + limit, len(self._index))
+        )
+        rows = [self._index.row(position) for position in range(start, end)]
+        return rows, self._index.isrc(end - 1) if rows else None
+
+
+class SnapshotFollower:
+    """
+    Follows the latest snapshot published in a directory. Checking for a new
+    one reads the version from the mapped pointer file, without a system call.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._pointer: Optional[mmap.mmap] = None
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._lock = threading.Lock()
+
+    def latest_version(self) -> int:
+        if self._pointer is None:
+            path = os.path.join(self.directory, POINTER_FILE)
+            if not os.path.exists(path):
+                return 0
+            with open(path, "rb") as handle:
+                self._pointer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        version: int = POINTER.unpack_from(self._pointer)[0]
+        return version
+
+    def current(self) -> Optional[CatalogueSnapshot]:
+        """The latest snapshot, or None before the first is published."""
+        snapshot = self._snapshot
+        version = self.latest_version()
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            for _ in range(SNAPSHOT_OPEN_ATTEMPTS):
+                if not version:
+                    break
+                try:
+                    self._snapshot = CatalogueSnapshot(
+                        os.path.join(self.directory, snapshot_name(version))
+                    )
+                    break
+                except FileNotFoundError:
+                    # Replaced since the pointer was read
+                    version = self.latest_version()
+            return self._snapshot
+
+
+class SnapshotPublisher:
+    """
+    Publishes snapshots of the catalogue to a directory, such as one in
+    /dev/shm, from the JSON of every single. A thread writes each snapshot in
+    full, then points readers at it; writes observed meanwhile are published
+    together in the next. Versions start from the microsecond the publisher
+    was created, so they keep growing across restarts, and the latest
+    `keep` snapshots are kept for readers still opening them. Each snapshot
+    carries the revisions last given for its singles and the catalogue.
+    """
+
+    def __init__(self, directory: str, keep: int = SNAPSHOTS_KEPT) -> None:
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+        self._rows: Dict[str, tuple[bytes, int]] = {}
+        self._sorted_isrcs: List[str] = []
+        self._catalogue_revision = 0
+        self._changed = threading.Condition()
+        # Version of the latest snapshot started, of the one covering every
+        # write observed, and of the latest published. The first snapshot is
+        # published even if nothing is ever written.
+        self._started = time.time_ns() // 1000
+        self._wanted = self._started + 1
+        self._published = 0
+        self._pointer = self._open_pointer()
+        self._thread = threading.Thread(
+            target=self._publish_forever, name="snapshot-publisher", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, isrc: str, row: bytes, revision: int = 0) -> None:
+        with self._changed:
+            if isrc not in self._rows:
+                bisect.insort(self._sorted_isrcs, isrc)
+            self._rows[isrc] = (row, revision)
+            self._want_next()
+
+    def remove(self, isrc: str) -> None:
+        with self._changed:
+            if self._rows.pop(isrc, None) is not None:
+                del self._sorted_isrcs[bisect.bisect_left(self._sorted_isrcs, isrc)]
+            self._want_next()
+
+    def revise(self, catalogue_revision: int) -> None:
+        """Set the catalogue revision, once the rows it names have been put."""
+        with self._changed:
+            self._catalogue_revision = catalogue_revision
+            self._want_next()
+
+    def wanted_version(self) -> int:
+        """The version of the first snapshot with every write observed so far."""
+        return self._wanted
+
+    def wait_published(self, version: int, timeout: Optional[float] = None) -> bool:
+        with self._changed:
+            return self._changed.wait_for(lambda: self._published >= version, timeout)
+
+    def _want_next(self) -> None:
+        self._wanted = self._started + 1
+        self._changed.notify_all()
+
+    def _open_pointer(self) -> mmap.mmap:
+        path = os.path.join(self.directory, POINTER_FILE)
+        with open(path, "ab+") as handle:
+            if os.path.getsize(path) < POINTER.size:
+                handle.write(bytes(POINTER.size))
+                handle.flush()
+            return mmap.mmap(handle.fileno(), POINTER.size)
+
+    def _publish_forever(self) -> None:
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._wanted > self._started)
+                self._started = version = self._wanted
+                rows = [(isrc, *self._rows[isrc]) for isrc in self._sorted_isrcs]
+                catalogue_revision = self._catalogue_revision
+            try:
+                self._publish(version, rows, catalogue_revision)
+            except OSError:
+                logger.exception("Failed to publish catalogue snapshot %d", version)
+                continue
+            with self._changed:
+                self._published = version
+                self._changed.notify_all()
+
+    def _publish(
+        self, version: int, rows: List[tuple[str, bytes, int]], catalogue_revision: int
+    ) -> None:
+        write_snapshot(
+            os.path.join(self.directory, snapshot_name(version)),
+            version,
+            rows,
+            catalogue_revision,
+        )
+        # A reader catching this store half done finds no such snapshot, and
+        # reads the pointer again
+        POINTER.pack_into(self._pointer, 0, version)
+        names = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith("catalogue.") and name.endswith(".snap")
+        )
+        for name in names[: -self.keep]:
+            os.remove(os.path.join(self.directory, name))
+
+
+class SnapshotMusicSingleReleaseRepository(ObservedMusicSingleReleaseRepository):
+    """
+    Repository publishing snapshots of another one for reader processes,
+    updated with every write the repository accepts. The revisions of the
+    singles and the catalogue are published with them, for readers to answer
+    conditional requests as the owner does. Writes are observed one at a
+    time, so the catalogue revision read after each names exactly the singles
+    published so far; the repositories underneath apply one write at a time
+    anyway.
+    """
+
+    def __init__(
+        self, repository: MusicSingleReleaseRepository, publisher: SnapshotPublisher
+    ) -> None:
+        super().__init__(repository, stripes=1)
+        self.publisher = publisher
+        for single in repository.iter_singles(batch_size=BULK_BATCH_SIZE):
+            publisher.put(
+                single.isrc, single.model_dump_json().encode(), self._revision(single)
+            )
+        publisher.revise(self._catalogue_revision())
+
+    def observe(self, writes: List[SingleWrite]) -> None:
+        for _, isrc, single in writes:
+            if single is None or single.isrc != isrc:
+                self.publisher.remove(isrc)
+            if single is not None:
+                self.publisher.put(
+                    single.isrc,
+                    single.model_dump_json().encode(),
+                    self._revision(single),
+                )
+        self.publisher.revise(self._catalogue_revision())
+
+    def _revision(self, single: MusicSingleRelease) -> int:
+        """The revision of a single as written, or 0 without revisions."""
+        try:
+            return self.repository.read_single_with_revision(single.isrc)[1]
+        except NotImplementedError:
+            return 0
+
+    def _catalogue_revision(self) -> int:
+        try:
+            return self.repository.catalogue_revision()
+        except NotImplementedError:
+            return 0
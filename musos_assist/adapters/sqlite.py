@@ -0,0 +1,638 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any, Iterator, List, Optional, Sequence
+from musos_assist.constants import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    SINGLE_EXISTS,
+    SINGLE_NOT_FOUND,
+)
+from musos_assist.domain.models import (
+    MusicSingleQuery,
+    MusicSingleRelease,
+    MusicSingleSearchHit,
+    MusicSingleSummary,
+)
+from musos_assist.adapters import repeated_isrcs
+from musos_assist.adapters.search import tokenize
+from musos_assist.domain.ports import BulkWriteError, MusicSingleReleaseRepository
+
+logger = logging.getLogger(__name__)
+
+# MusicSingleRelease list field -> side table holding one row per entry
+LIST_TABLES: dict[str, str] = {
+    "artist_names": "single_artists",
+    "genres": "single_genres",
+    "subgenres": "single_subgenres",
+    "formats": "single_formats",
+    "composers": "single_composers",
+    "producers": "single_producers",
+}
+
+# MusicSingleQuery criterion -> side table searched for it
+QUERY_TABLES: dict[str, str] = {
+    "artist": "single_artists",
+    "genre": "single_genres",
+    "subgenre": "single_subgenres",
+}
+
+SCALAR_COLUMNS = (
+    "isrc",
+    "title",
+    "release_date",
+    "label",
+    "version",
+    "duration_seconds",
+    "artwork_url",
+    "audio_preview_url",
+    "catalog_number",
+    "language",
+    "lyrics",
+    "notes",
+)
+
+# Kept in PRAGMA user_version; bumped with every change to the schema below,
+# along with a step in SQLiteMusicSingleReleaseRepository._upgrade
+SCHEMA_VERSION = 1
+
+SINGLES_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    isrc TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    release_date TEXT NOT NULL,
+    label TEXT,
+    label_key TEXT,
+    version TEXT,
+    duration_seconds REAL,
+    artwork_url TEXT,
+    audio_preview_url TEXT,
+    catalog_number TEXT,
+    language TEXT,
+    language_key TEXT,
+    lyrics TEXT,
+    notes TEXT,
+    revision INTEGER NOT NULL
+)
+"""
+
+# One row holding the catalogue revision, bumped by every write transaction
+CATALOGUE_TABLE = """
+CREATE TABLE IF NOT EXISTS catalogue (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    revision INTEGER NOT NULL
+)
+"""
+
+SINGLES_INDEXES = (
+    # Covering index: summary pages are answered from the index alone
+    "CREATE INDEX IF NOT EXISTS singles_summary ON singles (isrc, title, release_date)",
+    "CREATE INDEX IF NOT EXISTS singles_release_date ON singles (release_date, isrc)",
+    "CREATE INDEX IF NOT EXISTS singles_label ON singles (label_key, isrc)",
+    "CREATE INDEX IF NOT EXISTS singles_language ON singles (language_key, isrc)",
+)
+
+# Full-text index, sharing rowids with singles (stable, as `id` is declared)
+SEARCH_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS singles_search USING fts5 (
+    title, artists, credits, lyrics, notes,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+SEARCH_DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS singles_search_delete AFTER DELETE ON singles BEGIN
+    DELETE FROM singles_search WHERE rowid = old.id;
+END
+"""
+
+# Column weights for bm25(), in the order of the SEARCH_TABLE columns
+SEARCH_WEIGHTS = "3.0, 2.0, 1.0, 1.0, 1.0"
+
+LIST_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    isrc TEXT NOT NULL REFERENCES singles (isrc) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    PRIMARY KEY (isrc, position)
+) WITHOUT ROWID
+"""
+
+LIST_TABLE_INDEX = "CREATE INDEX IF NOT EXISTS {table}_name ON {table} (name_key, isrc)"
+
+
+def schema() -> Iterator[str]:
+    yield SINGLES_TABLE.format(table="singles")
+    yield CATALOGUE_TABLE
+    yield SEARCH_TABLE
+    yield SEARCH_DELETE_TRIGGER
+    yield from SINGLES_INDEXES
+    for table in LIST_TABLES.values():
+        yield LIST_TABLE.format(table=table)
+        yield LIST_TABLE_INDEX.format(table=table)
+
+
+INSERT_SINGLE = (
+    "INSERT INTO singles ("
+    + ", ".join(SCALAR_COLUMNS)
+    + ", label_key, language_key, revision) VALUES ("
+    + ", ".join("?" for _ in SCALAR_COLUMNS)
+    + ", ?, ?, (SELECT revision FROM catalogue))"
+)
+SELECT_SINGLE = "SELECT " + ", ".join(SCALAR_COLUMNS) + " FROM singles"
+SELECT_SINGLE_REVISION = (
+    "SELECT " + ", ".join(SCALAR_COLUMNS) + ", revision FROM singles WHERE isrc = ?"
+)
+
+INSERT_SEARCH = (
+    "INSERT INTO singles_search (rowid, title, artists, credits, lyrics, notes)"
+    " VALUES ((SELECT id FROM singles WHERE isrc = ?), ?, ?, ?, ?, ?)"
+)
+SEARCH_SINGLES = (
+    f"SELECT singles.isrc, -bm25(singles_search, {SEARCH_WEIGHTS}) AS score"
+    " FROM singles_search JOIN singles ON singles.id = singles_search.rowid"
+    " WHERE singles_search MATCH ? ORDER BY score DESC LIMIT ?"
+)
+
+# Largest number of ISRCs bound into one IN (...) clause
+HYDRATE_BATCH = 500
+
+
+def casefold(value: Optional[str]) -> Optional[str]:
+    return None if value is None else value.casefold()
+
+
+def single_row(single: MusicSingleRelease) -> tuple[Any, ...]:
+    """Render a single as the parameters of INSERT_SINGLE."""
+    return (
+        single.isrc,
+        single.title,
+        single.release_date.isoformat(),
+        single.label,
+        single.version,
+        None if single.duration is None else single.duration.total_seconds(),
+        None if single.artwork_url is None else str(single.artwork_url),
+        None if single.audio_preview_url is None else str(single.audio_preview_url),
+        single.catalog_number,
+        single.language,
+        single.lyrics,
+        single.notes,
+        casefold(single.label),
+        casefold(single.language),
+    )
+
+
+def search_row(single: MusicSingleRelease) -> tuple[Any, ...]:
+    """Render a single as the parameters of INSERT_SEARCH."""
+    return (
+        single.isrc,
+        single.title,
+        " ".join(single.artist_names),
+        " ".join((single.composers or []) + (single.producers or [])),
+        single.lyrics,
+        single.notes,
+    )
+
+
+def search_expression(text: str) -> Optional[str]:
+    """
+    Build an FTS5 query requiring every word of `text`, the last one as a
+    prefix. Words are quoted, so no search text is read as FTS5 syntax.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens) + "*"
+
+
+class SQLiteConnectionPool:
+    """
+    A bounded pool of SQLite connections shareable across FastAPI's threadpool.
+
+    Connections are opened lazily up to `size`; callers block for a free one
+    beyond that. Each connection keeps its own prepared statement cache, so
+    the fixed SQL used by the repository is compiled once per connection.
+    """
+
+    def __init__(self, path: str, size: int = 8, timeout: float = 30.0) -> None:
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        with self._lock:
+            while not self._idle.empty():
+                self._idle.get_nowait().close()
+                self._opened -= 1
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return self._open()
+        return self._idle.get(timeout=self.timeout)
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+
+class SQLiteMusicSingleReleaseRepository(MusicSingleReleaseRepository):
+    """
+    Repository persisting singles in SQLite, in WAL mode so that readers never
+    block the writer. List fields live in indexed side tables, keeping
+    artist, genre and subgenre queries on index lookups.
+    """
+
+    def __init__(self, path: str, pool_size: int = 8) -> None:
+        self.pool = SQLiteConnectionPool(path, size=pool_size)
+        try:
+            with self.pool.connection() as connection:
+                # Off while the singles table may be rebuilt, so that dropping
+                # the old one does not cascade to the side tables
+                connection.execute("PRAGMA foreign_keys=OFF")
+                try:
+                    connection.execute("BEGIN IMMEDIATE")
+                    try:
+                        self._upgrade(connection)
+                    except BaseException:
+                        connection.rollback()
+                        raise
+                    connection.commit()
+                finally:
+                    connection.execute("PRAGMA foreign_keys=ON")
+        except BaseException:
+            self.pool.close()
+            raise
+
+    def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
+        with self._transaction() as connection:
+            self._insert(connection, single)
+        return single
+
+    def list_singles(self) -> List[MusicSingleRelease]:
+        with self._read_transaction() as connection:
+            rows = connection.execute(SELECT_SINGLE + " ORDER BY rowid").fetchall()
+            return self._hydrate(connection, rows)
+
+    def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        with self._read_transaction() as connection:
+            rows = connection.execute(
+                SELECT_SINGLE + " WHERE isrc > ? ORDER BY isrc LIMIT ?",
+                (after or "", limit),
+            ).fetchall()
+            return self._hydrate(connection, rows)
+
+    def list_summaries(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleSummary]:
+        """A page of summaries, read from the covering index only."""
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT isrc, title, release_date FROM singles INDEXED BY singles_summary"
+                " WHERE isrc > ? ORDER BY isrc LIMIT ?",
+                (after or "", limit),
+            ).fetchall()
+        return [
+            MusicSingleSummary(
+                isrc=isrc, title=title, release_date=date.fromisoformat(release_date)
+            )
+            for isrc, title, release_date in rows
+        ]
+
+    def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        clauses = ["isrc > ?"]
+        parameters: list[Any] = [after or ""]
+        for criterion, table in QUERY_TABLES.items():
+            value = getattr(query, criterion)
+            if value is not None:
+                clauses.append(f"isrc IN (SELECT isrc FROM {table} WHERE name_key = ?)")
+                parameters.append(value.casefold())
+        for criterion in ("label", "language"):
+            value = getattr(query, criterion)
+            if value is not None:
+                clauses.append(f"{criterion}_key = ?")
+                parameters.append(value.casefold())
+        if query.released_from is not None:
+            clauses.append("release_date >= ?")
+            parameters.append(query.released_from.isoformat())
+        if query.released_to is not None:
+            clauses.append("release_date <= ?")
+            parameters.append(query.released_to.isoformat())
+        parameters.append(limit)
+        with self._read_transaction() as connection:
+            rows = connection.execute(
+                SELECT_SINGLE
+                + " WHERE "
+                + " AND ".join(clauses)
+                + " ORDER BY isrc LIMIT ?",
+                parameters,
+            ).fetchall()
+            return self._hydrate(connection, rows)
+
+    def search_singles(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[MusicSingleSearchHit]:
+        expression = search_expression(text)
+        if expression is None:
+            return []
+        with self._read_transaction() as connection:
+            scores = dict(
+                connection.execute(SEARCH_SINGLES, (expression, limit)).fetchall()
+            )
+            singles = {
+                single.isrc: single
+                for start in range(0, len(scores), HYDRATE_BATCH)
+                for single in self._read_many(
+                    connection, list(scores)[start : start + HYDRATE_BATCH]
+                )
+            }
+        return [
+            MusicSingleSearchHit(score=score, single=singles[isrc])
+            for isrc, score in scores.items()
+        ]
+
+    def read_single(self, isrc: str) -> MusicSingleRelease:
+        with self._read_transaction() as connection:
+            rows = connection.execute(
+                SELECT_SINGLE + " WHERE isrc = ?", (isrc,)
+            ).fetchall()
+            if not rows:
+                raise ValueError(SINGLE_NOT_FOUND)
+            return self._hydrate(connection, rows)[0]
+
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        with self._read_transaction() as connection:
+            rows = connection.execute(SELECT_SINGLE_REVISION, (isrc,)).fetchall()
+            if not rows:
+                raise ValueError(SINGLE_NOT_FOUND)
+            single = self._hydrate(connection, [row[:-1] for row in rows])[0]
+            return single, rows[0][-1]
+
+    def catalogue_revision(self) -> int:
+        with self.pool.connection() as connection:
+            (revision,) = connection.execute(
+                "SELECT revision FROM catalogue"
+            ).fetchone()
+            return int(revision)
+
+    def count_singles(self) -> int:
+        with self.pool.connection() as connection:
+            (count,) = connection.execute("SELECT COUNT(*) FROM singles").fetchone()
+            return int(count)
+
+    def update_single(
+        self, isrc: str, single_update: MusicSingleRelease
+    ) -> MusicSingleRelease:
+        with self._transaction() as connection:
+            if not connection.execute(
+                "DELETE FROM singles WHERE isrc = ?", (isrc,)
+            ).rowcount:
+                raise ValueError(SINGLE_NOT_FOUND)
+            self._insert(connection, single_update)
+        return single_update
+
+    def delete_single(self, isrc: str) -> None:
+        with self._transaction() as connection:
+            if not connection.execute(
+                "DELETE FROM singles WHERE isrc = ?", (isrc,)
+            ).rowcount:
+                raise ValueError(SINGLE_NOT_FOUND)
+
+    def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        errors = repeated_isrcs(single.isrc for single in singles)
+        with self._transaction() as connection:
+            existing = self._existing_isrcs(
+                connection, [single.isrc for single in singles]
+            )
+            for row, single in enumerate(singles):
+                if single.isrc in existing:
+                    errors.setdefault(row, SINGLE_EXISTS)
+            if errors:
+                raise BulkWriteError(errors)
+            self._insert_many(connection, singles)
+        return singles
+
+    def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        errors = repeated_isrcs(single.isrc for single in singles)
+        if errors:
+            raise BulkWriteError(errors)
+        with self._transaction() as connection:
+            connection.executemany(
+                "DELETE FROM singles WHERE isrc = ?",
+                ((single.isrc,) for single in singles),
+            )
+            self._insert_many(connection, singles)
+        return singles
+
+    def delete_singles(self, isrcs: List[str]) -> None:
+        errors = repeated_isrcs(isrcs)
+        with self._transaction() as connection:
+            existing = self._existing_isrcs(connection, isrcs)
+            for row, isrc in enumerate(isrcs):
+                if isrc not in existing:
+                    errors.setdefault(row, SINGLE_NOT_FOUND)
+            if errors:
+                raise BulkWriteError(errors)
+            connection.executemany(
+                "DELETE FROM singles WHERE isrc = ?", ((isrc,) for isrc in isrcs)
+            )
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def _upgrade(self, connection: sqlite3.Connection) -> None:
+        """
+        Create the schema, or bring a database created by an earlier release
+        up to SCHEMA_VERSION. Before the schema was versioned, singles were
+        keyed by ISRC, without the rowid the full-text index shares, and
+        at first without revisions: such a singles table is rebuilt.
+        """
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(
+                f"Schema version {version} of {self.pool.path} is newer than"
+                f" the {SCHEMA_VERSION} this release supports"
+            )
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(singles)")}
+        rebuilt = version == 0 and bool(columns) and "id" not in columns
+        if rebuilt:
+            self._rebuild_singles(connection, "revision" in columns)
+        for statement in schema():
+            connection.execute(statement)
+        # Seeded from the clock, as in the in-memory repository, so that a
+        # recreated database does not reuse revisions
+        connection.execute(
+            "INSERT OR IGNORE INTO catalogue (id, revision) VALUES (0, ?)",
+            (time.time_ns(),),
+        )
+        if rebuilt:
+            rows = connection.execute(SELECT_SINGLE + " ORDER BY rowid")
+            while batch := rows.fetchmany(HYDRATE_BATCH):
+                connection.executemany(
+                    INSERT_SEARCH, map(search_row, self._hydrate(connection, batch))
+                )
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _rebuild_singles(
+        self, connection: sqlite3.Connection, has_revisions: bool
+    ) -> None:
+        """Copy singles keyed by ISRC into the current singles table."""
+        columns = ", ".join(SCALAR_COLUMNS) + ", label_key, language_key"
+        connection.execute(SINGLES_TABLE.format(table="singles_rebuilt"))
+        connection.execute(
+            f"INSERT INTO singles_rebuilt ({columns}, revision)"
+            f" SELECT {columns}, {'revision' if has_revisions else '?'}"
+            " FROM singles ORDER BY rowid",
+            () if has_revisions else (time.time_ns(),),
+        )
+        connection.execute("DROP TABLE singles")
+        connection.execute("ALTER TABLE singles_rebuilt RENAME TO singles")
+        logger.info("Rebuilt the singles table of %s", self.pool.path)
+
+    @contextmanager
+    def _read_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        A read transaction, so that a single's row, its side-table rows and
+        its revision all come from one version of the database. The pool
+        rolls it back when the connection is returned.
+        """
+        with self.pool.connection() as connection:
+            connection.execute("BEGIN")
+            yield connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """A write transaction that takes the write lock up front."""
+        with self.pool.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("UPDATE catalogue SET revision = revision + 1")
+                yield connection
+            except BaseException:
+                connection.rollback()
+                raise
+            connection.commit()
+
+    def _insert(
+        self, connection: sqlite3.Connection, single: MusicSingleRelease
+    ) -> None:
+        self._insert_many(connection, [single])
+
+    def _insert_many(
+        self, connection: sqlite3.Connection, singles: List[MusicSingleRelease]
+    ) -> None:
+        """Insert singles with one executemany per table."""
+        try:
+            connection.executemany(INSERT_SINGLE, map(single_row, singles))
+        except sqlite3.IntegrityError:
+            raise ValueError(SINGLE_EXISTS)
+        connection.executemany(INSERT_SEARCH, map(search_row, singles))
+        for field, table in LIST_TABLES.items():
+            connection.executemany(
+                f"INSERT INTO {table} (isrc, position, name, name_key)"
+                " VALUES (?, ?, ?, ?)",
+                (
+                    (single.isrc, position, name, name.casefold())
+                    for single in singles
+                    for position, name in enumerate(getattr(single, field) or ())
+                ),
+            )
+
+    def _existing_isrcs(
+        self, connection: sqlite3.Connection, isrcs: List[str]
+    ) -> set[str]:
+        existing: set[str] = set()
+        for start in range(0, len(isrcs), HYDRATE_BATCH):
+            batch = isrcs[start : start + HYDRATE_BATCH]
+            placeholders = ", ".join("?" for _ in batch)
+            existing.update(
+                isrc
+                for (isrc,) in connection.execute(
+                    f"SELECT isrc FROM singles WHERE isrc IN ({placeholders})", batch
+                )
+            )
+        return existing
+
+    def _read_many(
+        self, connection: sqlite3.Connection, isrcs: List[str]
+    ) -> List[MusicSingleRelease]:
+        placeholders = ", ".join("?" for _ in isrcs)
+        rows = connection.execute(
+            SELECT_SINGLE + f" WHERE isrc IN ({placeholders})", isrcs
+        ).fetchall()
+        return self._hydrate(connection, rows)
+
+    def _hydrate(
+        self, connection: sqlite3.Connection, rows: Sequence[tuple[Any, ...]]
+    ) -> List[MusicSingleRelease]:
+        """Rebuild singles from main-table rows, batch-loading the side tables."""
+        records: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            record = dict(zip(SCALAR_COLUMNS, row))
+            seconds = record.pop("duration_seconds")
+            record["duration"] = None if seconds is None else timedelta(seconds=seconds)
+            for field in LIST_TABLES:
+                record[field] = None
+            records[record["isrc"]] = record
+        isrcs = list(records)
+        for start in range(0, len(isrcs), HYDRATE_BATCH):
+            batch = isrcs[start : start + HYDRATE_BATCH]
+            placeholders = ", ".join("?" for _ in batch)
+            for field, table in LIST_TABLES.items():
+                for isrc, name in connection.execute(
+                    f"SELECT isrc, name FROM {table} WHERE isrc IN ({placeholders})"
+                    " ORDER BY isrc, position",
+                    batch,
+                ):
+                    names = records[isrc][field]
+                    if names is None:
+                        records[isrc][field] = [name]
+                    else:
+                        names.append(name)
+        return [
+            MusicSingleRelease.model_validate(record) for record in records.values()
+        ]
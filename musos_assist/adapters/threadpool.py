@@ -0,0 +1,150 @@
+import asyncio
+import contextvars
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+from typing import Callable, ContextManager, List, Optional, ParamSpec, TypeVar
+from musos_assist.constants import (
+    DEFAULT_CO_CREDITS,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    REPOSITORY_THREADS,
+)
+from musos_assist.domain.models import (
+    CatalogueStats,
+    MusicSingleQuery,
+    MusicSingleRelease,
+    MusicSingleSearchHit,
+)
+from musos_assist.domain.ports import (
+    AsyncMusicSingleReleaseRepository,
+    MusicSingleReleaseRepository,
+)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+def repository_executor(max_workers: int = REPOSITORY_THREADS) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="musos-repository"
+    )
+
+
+class ThreadPoolMusicSingleReleaseRepository(AsyncMusicSingleReleaseRepository):
+    """
+    Async repository that runs each call of a synchronous repository on a
+    bounded pool of worker threads, so a slow adapter blocks a worker instead
+    of the event loop. The pool bounds how many storage calls are in flight;
+    share one executor between wrappers to share that bound. When given
+    `observe`, it is called with the name and duration in seconds of every
+    call, as timed on the worker thread, so time queued for one is excluded.
+    When given `worker_scope`, every call runs within the context manager it
+    returns, entered on the worker thread in the caller's context.
+    """
+
+    def __init__(
+        self,
+        repository: MusicSingleReleaseRepository,
+        executor: Optional[Executor] = None,
+        observe: Optional[Callable[[str, float], None]] = None,
+        worker_scope: Optional[Callable[[], ContextManager[object]]] = None,
+    ) -> None:
+        self.repository = repository
+        self.executor = executor or repository_executor()
+        self.observe = observe
+        self.worker_scope = worker_scope
+
+    async def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
+        return await self._run(self.repository.create_single, single)
+
+    async def list_singles(self) -> List[MusicSingleRelease]:
+        return await self._run(self.repository.list_singles)
+
+    async def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        return await self._run(self.repository.list_singles_page, after, limit)
+
+    async def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        return await self._run(self.repository.query_singles, query, after, limit)
+
+    async def search_singles(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[MusicSingleSearchHit]:
+        return await self._run(self.repository.search_singles, text, limit)
+
+    async def read_single(self, isrc: str) -> MusicSingleRelease:
+        return await self._run(self.repository.read_single, isrc)
+
+    async def read_single_with_revision(
+        self, isrc: str
+    ) -> tuple[MusicSingleRelease, int]:
+        return await self._run(self.repository.read_single_with_revision, isrc)
+
+    async def catalogue_revision(self) -> int:
+        return await self._run(self.repository.catalogue_revision)
+
+    async def count_singles(self) -> int:
+        return await self._run(self.repository.count_singles)
+
+    async def catalogue_stats(
+        self, co_credits: int = DEFAULT_CO_CREDITS
+    ) -> CatalogueStats:
+        return await self._run(self.repository.catalogue_stats, co_credits)
+
+    async def update_single(
+        self, isrc: str, single_update: MusicSingleRelease
+    ) -> MusicSingleRelease:
+        return await self._run(self.repository.update_single, isrc, single_update)
+
+    async def delete_single(self, isrc: str) -> None:
+        await self._run(self.repository.delete_single, isrc)
+
+    async def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        return await self._run(self.repository.create_singles, singles)
+
+    async def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        return await self._run(self.repository.upsert_singles, singles)
+
+    async def delete_singles(self, isrcs: List[str]) -> None:
+        await self._run(self.repository.delete_singles, isrcs)
+
+    async def _run(
+        self, function: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        # Carry context variables (e.g. per-request state) into the worker
+        context = contextvars.copy_context()
+        call = partial(function, *args, **kwargs)
+        if self.worker_scope is not None:
+            call = partial(scoped_call, self.worker_scope, call)
+        call = partial(context.run, call)
+        if self.observe is not None:
+            call = partial(timed_call, self.observe, function.__name__, call)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+
+def timed_call(
+    observe: Callable[[str, float], None], name: str, call: Callable[[], T]
+) -> T:
+    started = perf_counter()
+    try:
+        return call()
+    finally:
+        observe(name, perf_counter() - started)
+
+
+def scoped_call(
+    scope: Callable[[], ContextManager[object]], call: Callable[[], T]
+) -> T:
+    with scope():
+        return call()
@@ -22,3 +22,125 @@ EXAMPLE_SINGLE_DATA: dict[str, Any] = {
 }
 
 SINGLE_NOT_FOUND = "Single not found"
+SINGLE_EXISTS = "ISRC already exists"
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+BULK_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+CSV_MEDIA_TYPE = "text/csv"
+CSV_LIST_SEPARATOR = ";"
+CSV_NOT_UTF8 = "CSV body is not valid UTF-8"
+
+DEFAULT_SEARCH_LIMIT = 20
+# Artist pairs /singles/stats ranks by default, and the width of the bars of
+# its histogram of durations
+DEFAULT_CO_CREDITS = 20
+DURATION_BUCKET_SECONDS = 30
+
+# Latest changes the change feed keeps for clients to catch up from
+CHANGE_FEED_SIZE = 10_000
+CHANGES_EXPIRED = "Changes after this sequence are no longer kept"
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+# Seconds a long poll for changes waits by default and at most, and between
+# keep-alive comments on an idle event stream
+DEFAULT_CHANGES_WAIT = 25.0
+MAX_CHANGES_WAIT = 60.0
+EVENT_STREAM_KEEPALIVE = 15.0
+
+BUNDLE_NOT_FOUND = "Bundle not found"
+BUNDLE_EXISTS = "Bundle already exists"
+BUNDLE_ID_MISMATCH = "Bundle id in path and request body do not match"
+NESTED_BUNDLE_NOT_FOUND = "Nested bundle not found"
+BUNDLE_CYCLE = "Bundle cannot contain itself"
+BUNDLE_IN_USE = "Bundle is nested in another bundle"
+BUNDLE_ID_PATTERN = r"^[a-z0-9][a-z0-9-]{0,63}$"
+
+SCHEDULED_RELEASE_NOT_FOUND = "Scheduled release action not found"
+# Most seconds the scheduler sleeps before looking for newly scheduled actions,
+# and most actions it fires per wake-up
+SCHEDULER_POLL_SECONDS = 1.0
+SCHEDULER_BATCH_SIZE = 100
+
+INTEGRITY_SCAN_NOT_FOUND = "Integrity scan not found"
+INTEGRITY_SCAN_RUNNING = "An integrity scan is already running"
+# Singles an integrity scan checks at a time, and finished scans kept to read
+INTEGRITY_BATCH_SIZE = 10_000
+INTEGRITY_SCANS_KEPT = 10
+# Media types of the artifacts every single needs, by prefix: artwork and audio
+REQUIRED_ARTIFACT_TYPES = ("image/", "audio/")
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Upper bounds, in seconds, of the buckets of every latency histogram
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Seconds between stack samples of a profiled request, and the newest profiles
+# kept on disk, older ones being deleted as new ones are written
+PROFILE_INTERVAL = 0.005
+PROFILES_KEPT = 200
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Catalogue snapshots kept for reader workers still opening older ones, and
+# times a reader tries the pointer before serving the snapshot it has
+SNAPSHOTS_KEPT = 3
+SNAPSHOT_OPEN_ATTEMPTS = 10
+SNAPSHOT_VERSION_HEADER = "X-Catalogue-Snapshot"
+OWNER_UNAVAILABLE = "Catalogue owner unavailable"
+# Most seconds a reader worker holds a forwarded write's response until its
+# snapshot is published, and between looks at the pointer meanwhile
+SNAPSHOT_WAIT_SECONDS = 5.0
+SNAPSHOT_POLL_SECONDS = 0.001
+
+REPOSITORY_THREADS = 16
+LOCK_STRIPES = 64
+
+SERIALIZED_CACHE_SIZE = 10_000
+READ_CACHE_SIZE = 10_000
+
+ARTIFACT_NOT_FOUND = "Artifact not found"
+UPLOAD_NOT_FOUND = "Upload not found"
+UPLOAD_OFFSET_MISMATCH = "Chunk does not start at the upload offset"
+UPLOAD_BUSY = "Upload already has a chunk in progress"
+UPLOAD_INCOMPLETE = "Upload has not received every byte"
+CHUNK_TOO_LARGE = "Chunk runs past the declared artifact size"
+CHUNK_DIGEST_MISMATCH = "Chunk does not match its SHA-256 digest"
+UPLOAD_NOT_ALIGNED = "Blocks can only be reused from a block boundary"
+ARTIFACT_NAME_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$"
+MAX_ARTIFACT_SIZE = 10 * 1024**3
+# Bytes moved per disk write or read when streaming artifacts, and the size
+# of the content-addressed blocks artifacts are stored and deduplicated in
+ARTIFACT_BLOCK_SIZE = 1024 * 1024
+# Seconds an unreferenced block is kept, in case an upload reuses it, before
+# the background collector deletes it
+BLOCK_COLLECTION_DELAY = 30.0
+UPLOAD_OFFSET_HEADER = "Upload-Offset"
+CHUNK_DIGEST_HEADER = "X-Chunk-SHA256"
+
+RENDITION_NOT_FOUND = "Rendition not found"
+RENDITION_UNSUPPORTED = "Artifact cannot be made into this rendition"
+RENDITION_UNAVAILABLE = "Image renditions need Pillow installed"
+# Edge lengths of the artwork thumbnails, and the length and highest sample
+# rate of audio preview clips
+THUMBNAIL_SIZES = (128, 300, 600)
+PREVIEW_SECONDS = 30
+PREVIEW_SAMPLE_RATE = 22_050
+# Disk the cache of renditions may fill before evicting the least recently used
+RENDITION_CACHE_BYTES = 1024**3
@@ -1,14 +1,11 @@
-from typing import List, Optional
-from datetime import date, timedelta
-import logging
-import os
+from typing import Dict, List, Literal, Optional
+from datetime import date, datetime, timedelta
 from pydantic import BaseModel, Field, HttpUrl
-
-# Configure logging
-LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL, logging.WARNING),
-    format="%(asctime)s - %(levelname)s - %(message)s",
+from musos_assist.constants import (
+    ARTIFACT_BLOCK_SIZE,
+    ARTIFACT_NAME_PATTERN,
+    BUNDLE_ID_PATTERN,
+    MAX_ARTIFACT_SIZE,
 )
 
 
@@ -84,3 +81,399 @@ class MusicSingleRelease(BaseModel):
         None,
         description="Optional: Any additional notes or information about the single.",
     )
+
+
+class MusicSingleSummary(BaseModel):
+    """
+    Pydantic model of the identifying fields of a music single release, for
+    listings that do not need the full record.
+    """
+
+    isrc: str = Field(..., description="ISRC of the music single.")
+    title: str = Field(..., description="The title of the music single.")
+    release_date: date = Field(
+        ..., description="The date the single was officially released."
+    )
+
+
+class MusicSingleSearchHit(BaseModel):
+    """
+    Pydantic model of one full-text search result.
+    """
+
+    score: float = Field(
+        ..., description="Relevance of the single to the search; higher is better."
+    )
+    single: MusicSingleRelease = Field(..., description="The matching single.")
+
+
+class MusicSingleQuery(BaseModel):
+    """
+    Pydantic model describing a filter over music single releases.
+
+    Every supplied criterion must match; text criteria are case-insensitive.
+    """
+
+    artist: Optional[str] = Field(
+        default=None, description="Optional: Singles credited to this artist."
+    )
+    genre: Optional[str] = Field(
+        default=None, description="Optional: Singles in this genre."
+    )
+    subgenre: Optional[str] = Field(
+        default=None, description="Optional: Singles in this subgenre."
+    )
+    label: Optional[str] = Field(
+        default=None, description="Optional: Singles released on this label."
+    )
+    language: Optional[str] = Field(
+        default=None, description="Optional: Singles with lyrics in this language."
+    )
+    released_from: Optional[date] = Field(
+        default=None, description="Optional: Singles released on or after this date."
+    )
+    released_to: Optional[date] = Field(
+        default=None, description="Optional: Singles released on or before this date."
+    )
+
+    @property
+    def is_empty(self) -> bool:
+        return all(value is None for value in self.model_dump().values())
+
+
+class BulkRowError(BaseModel):
+    """
+    Pydantic model describing why one row of a bulk request was rejected.
+    """
+
+    row: int = Field(..., description="Zero-based index of the row in the request.")
+    isrc: Optional[str] = Field(
+        default=None, description="Optional: ISRC of the row, when it could be read."
+    )
+    message: str = Field(..., description="Why the row was rejected.")
+
+
+class BulkReport(BaseModel):
+    """
+    Pydantic model reporting the outcome of a bulk request. Bulk requests are
+    atomic: when `errors` is not empty no row was applied.
+    """
+
+    processed: int = Field(..., description="Number of rows read from the request.")
+    applied: int = Field(..., description="Number of rows applied to the catalogue.")
+    errors: List[BulkRowError] = Field(
+        default_factory=list, description="Rows that were rejected."
+    )
+
+
+class ArtifactUploadRequest(BaseModel):
+    """
+    Pydantic model announcing an artifact (a master, stem, artwork, ...) about
+    to be uploaded for a single.
+    """
+
+    name: str = Field(
+        ...,
+        description="File name of the artifact, unique per single (e.g. 'master.flac').",
+        pattern=ARTIFACT_NAME_PATTERN,
+    )
+    media_type: str = Field(
+        default="application/octet-stream",
+        description="Media type the artifact is served with (e.g. 'audio/flac').",
+    )
+    size: int = Field(
+        ..., description="Size of the artifact in bytes.", ge=0, le=MAX_ARTIFACT_SIZE
+    )
+
+
+class ArtifactUpload(ArtifactUploadRequest):
+    """
+    Pydantic model of an upload in progress. Chunks are appended at `offset`
+    until it reaches `size`; an interrupted upload resumes from `offset`.
+    """
+
+    upload_id: str = Field(..., description="Identifier of the upload.")
+    isrc: str = Field(..., description="ISRC of the single the artifact belongs to.")
+    offset: int = Field(..., description="Number of bytes received so far.")
+    block_size: int = Field(
+        default=ARTIFACT_BLOCK_SIZE,
+        description="Size of the blocks the artifact is stored in; stored blocks can be reused by SHA-256.",
+    )
+
+
+class Artifact(BaseModel):
+    """
+    Pydantic model of a stored artifact of a single.
+    """
+
+    isrc: str = Field(..., description="ISRC of the single the artifact belongs to.")
+    name: str = Field(..., description="File name of the artifact.")
+    media_type: str = Field(..., description="Media type the artifact is served with.")
+    size: int = Field(..., description="Size of the artifact in bytes.")
+    sha256: str = Field(..., description="Hex SHA-256 digest of the artifact.")
+
+
+class Rendition(BaseModel):
+    """
+    Pydantic model of a rendition derived from an artifact, such as an artwork
+    thumbnail or an audio preview, as cached on disk.
+    """
+
+    name: str = Field(..., description="Name of the rendition, e.g. thumbnail-300.")
+    media_type: str = Field(..., description="Media type the rendition is served with.")
+    size: int = Field(..., description="Size of the rendition in bytes.")
+    path: str = Field(..., description="Filesystem path of the cached rendition.")
+
+
+ReleaseAction = Literal["publish", "promote"]
+# Writes to the catalogue, and scheduled release actions as they fire
+ChangeKind = Literal["created", "updated", "deleted", "published", "promoted"]
+
+
+class SingleChange(BaseModel):
+    """
+    Pydantic model of one write to the catalogue, as told by the change feed.
+    """
+
+    sequence: int = Field(
+        ..., description="Position of the change in the feed, one more than the last."
+    )
+    kind: ChangeKind = Field(
+        ...,
+        description="Whether the single was created, updated or deleted, or a scheduled release action fired.",
+    )
+    isrc: str = Field(
+        ...,
+        description="ISRC the single had before the change; an update that renamed it differs from single.isrc.",
+    )
+    single: Optional[MusicSingleRelease] = Field(
+        default=None, description="The single as written; absent for deletes."
+    )
+
+
+class ChangeBatch(BaseModel):
+    """
+    Pydantic model of the changes following a sequence of the change feed.
+    """
+
+    changes: List[SingleChange] = Field(..., description="Changes, oldest first.")
+    sequence: int = Field(
+        ...,
+        description="Sequence of the last change returned; pass as `after` for the next.",
+    )
+
+
+BundleKind = Literal["ep", "album", "compilation"]
+CreditRole = Literal["artist", "composer", "producer"]
+
+
+class ReleaseBundle(BaseModel):
+    """
+    Pydantic model of a release grouping singles, such as an EP, album or
+    compilation, which may nest other bundles.
+    """
+
+    id: str = Field(
+        ...,
+        description="Identifier of the bundle (e.g., 'greatest-hits-2024').",
+        pattern=BUNDLE_ID_PATTERN,
+    )
+    title: str = Field(..., description="The title of the bundle.")
+    kind: BundleKind = Field(..., description="What sort of release the bundle is.")
+    tracks: List[str] = Field(
+        default_factory=list,
+        description="ISRCs of the singles on the bundle, in order.",
+    )
+    bundles: List[str] = Field(
+        default_factory=list,
+        description="Identifiers of the bundles nested in this one, in order.",
+    )
+    release_date: Optional[date] = Field(
+        default=None, description="Optional: The date the bundle is released."
+    )
+    label: Optional[str] = Field(
+        default=None, description="Optional: The record label releasing the bundle."
+    )
+
+
+class BundleCredit(BaseModel):
+    """
+    Pydantic model of one credit rolled up over the tracks of a bundle.
+    """
+
+    name: str = Field(..., description="Name of the artist, composer or producer.")
+    role: CreditRole = Field(..., description="How the tracks credit them.")
+    tracks: int = Field(..., description="Number of tracks crediting them so.")
+
+
+class BundleView(BaseModel):
+    """
+    Pydantic model of a bundle with the aggregates of its tracks, including
+    those of nested bundles. A track appearing twice counts twice.
+    """
+
+    bundle: ReleaseBundle = Field(..., description="The bundle.")
+    tracks: int = Field(..., description="Number of tracks.")
+    missing_tracks: List[str] = Field(
+        default_factory=list,
+        description="ISRCs of the tracks not in the catalogue.",
+    )
+    duration: timedelta = Field(
+        ..., description="Total duration of the tracks with a duration."
+    )
+    untimed_tracks: int = Field(
+        ..., description="Number of tracks in the catalogue without a duration."
+    )
+    genres: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Number of tracks in each genre, most first.",
+    )
+    credits: List[BundleCredit] = Field(
+        default_factory=list,
+        description="Everyone credited on the tracks, most credited first.",
+    )
+
+
+class ScheduledReleaseRequest(BaseModel):
+    """
+    Pydantic model asking for a release action on a single at a future time.
+    """
+
+    action: ReleaseAction = Field(..., description="What to do when the time comes.")
+    due: Optional[datetime] = Field(
+        default=None,
+        description="Optional: When to act, UTC unless zoned; defaults to the start of the release date, UTC.",
+    )
+
+
+class ScheduledRelease(BaseModel):
+    """
+    Pydantic model of a release action waiting for its time.
+    """
+
+    id: str = Field(..., description="Identifier of the scheduled action.")
+    isrc: str = Field(..., description="ISRC of the single to act on.")
+    action: ReleaseAction = Field(..., description="What to do when the time comes.")
+    due: datetime = Field(..., description="When to act, in UTC.")
+
+
+class DurationBucket(BaseModel):
+    """
+    Pydantic model of one bar of the histogram of single durations.
+    """
+
+    start_seconds: int = Field(..., description="Shortest duration in the bar.")
+    singles: int = Field(..., description="Number of singles in the bar.")
+
+
+class DurationStats(BaseModel):
+    """
+    Pydantic model of the distribution of single durations, in whole seconds.
+    """
+
+    singles: int = Field(..., description="Number of singles with a duration.")
+    min_seconds: Optional[int] = Field(default=None)
+    max_seconds: Optional[int] = Field(default=None)
+    mean_seconds: Optional[float] = Field(default=None)
+    median_seconds: Optional[int] = Field(default=None)
+    p90_seconds: Optional[int] = Field(default=None)
+    histogram: List[DurationBucket] = Field(
+        default_factory=list,
+        description="Singles per bar of durations, shortest first.",
+    )
+
+
+class CoCredit(BaseModel):
+    """
+    Pydantic model of two artists credited together, and on how many singles.
+    """
+
+    artists: List[str] = Field(..., description="The two artists, in name order.")
+    singles: int = Field(..., description="Number of singles crediting both.")
+
+
+class CatalogueStats(BaseModel):
+    """
+    Pydantic model of aggregates over the whole catalogue.
+    """
+
+    singles: int = Field(..., description="Number of singles in the catalogue.")
+    per_month: Dict[str, int] = Field(
+        ..., description="Singles released per month (YYYY-MM), oldest first."
+    )
+    per_genre: Dict[str, int] = Field(..., description="Singles per genre, most first.")
+    per_label: Dict[str, int] = Field(
+        ..., description="Singles per record label, most first."
+    )
+    durations: DurationStats
+    co_credits: List[CoCredit] = Field(
+        ..., description="The artist pairs credited together most often, most first."
+    )
+
+
+class ProfilingSettings(BaseModel):
+    """
+    Pydantic model of the settings of the request profiler.
+    """
+
+    rate: float = Field(
+        default=0.0,
+        description="Fraction of requests to profile; 0 turns profiling off.",
+        ge=0.0,
+        le=1.0,
+    )
+    format: Literal["speedscope", "collapsed"] = Field(
+        default="speedscope",
+        description="File format of the profiles: speedscope JSON, or collapsed stacks for flame graphs.",
+    )
+
+
+IntegrityIssueKind = Literal[
+    "invalid_isrc",
+    "isrc_year_after_release",
+    "near_duplicate_title",
+    "registrant_label_mismatch",
+    "missing_artifact",
+]
+
+
+class IntegrityIssue(BaseModel):
+    """
+    Pydantic model of a problem an integrity scan found with a single.
+    """
+
+    sequence: int = Field(
+        ..., description="Position of the issue in its scan, one more than the last."
+    )
+    kind: IntegrityIssueKind = Field(..., description="What is wrong.")
+    isrc: str = Field(..., description="ISRC of the single the issue is with.")
+    detail: str = Field(..., description="What is wrong, for people to read.")
+    related: List[str] = Field(
+        default_factory=list,
+        description="ISRCs of other singles involved, e.g. the one duplicated.",
+    )
+
+
+class IntegrityScan(BaseModel):
+    """
+    Pydantic model of a check of the whole catalogue, and its progress so far.
+    """
+
+    id: str = Field(..., description="Unique identifier of the scan.")
+    state: Literal["running", "completed", "failed"] = Field(
+        ..., description="Whether the scan is still going, finished, or gave up."
+    )
+    started: datetime = Field(..., description="When the scan started.")
+    finished: Optional[datetime] = Field(
+        default=None, description="When the scan completed or failed."
+    )
+    total: Optional[int] = Field(
+        default=None, description="Singles in the catalogue when the scan started."
+    )
+    scanned: int = Field(default=0, description="Singles checked so far.")
+    issues: Dict[IntegrityIssueKind, int] = Field(
+        default_factory=dict, description="Issues found so far, by kind."
+    )
+    error: Optional[str] = Field(
+        default=None, description="Why the scan failed, if it did."
+    )
@@ -1,5 +1,44 @@
-from typing import List
-from musos_assist.domain.models import MusicSingleRelease
+from concurrent.futures import Future
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from musos_assist.domain.models import (
+    Artifact,
+    ArtifactUpload,
+    ArtifactUploadRequest,
+    BundleView,
+    CatalogueStats,
+    ChangeKind,
+    IntegrityIssue,
+    IntegrityScan,
+    MusicSingleQuery,
+    MusicSingleRelease,
+    MusicSingleSearchHit,
+    ReleaseAction,
+    ReleaseBundle,
+    Rendition,
+    ScheduledRelease,
+    SingleChange,
+)
+from musos_assist.constants import (
+    DEFAULT_CO_CREDITS,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+)
+
+
+class BulkWriteError(ValueError):
+    """
+    Raised when a batch write is rejected. `errors` maps the index of each
+    offending entry in the batch to the reason; nothing in the batch is applied.
+    """
+
+    def __init__(self, errors: Dict[int, str]) -> None:
+        super().__init__(f"{len(errors)} entries in the batch were rejected")
+        self.errors = errors
+
+
+# A write to the catalogue: its kind, the ISRC written, the single as written
+SingleWrite = tuple[ChangeKind, str, Optional[MusicSingleRelease]]
 
 
 class MusicSingleReleaseRepository:
@@ -9,9 +48,83 @@ class MusicSingleReleaseRepository:
     def list_singles(self) -> List[MusicSingleRelease]:
         raise NotImplementedError
 
+    def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        """
+        Return up to `limit` singles ordered by ISRC, starting strictly after the
+        `after` cursor (an ISRC). Pass the last ISRC of a page to fetch the next.
+        """
+        raise NotImplementedError
+
+    def iter_singles(
+        self,
+        after: Optional[str] = None,
+        batch_size: int = DEFAULT_PAGE_SIZE,
+        query: Optional[MusicSingleQuery] = None,
+    ) -> Iterator[MusicSingleRelease]:
+        """
+        Iterate the catalogue (or the singles matching `query`) in ISRC order,
+        one page at a time, so that callers never hold more than `batch_size`
+        singles at once.
+        """
+        while True:
+            if query is None or query.is_empty:
+                page = self.list_singles_page(after=after, limit=batch_size)
+            else:
+                page = self.query_singles(query, after=after, limit=batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after = page[-1].isrc
+
+    def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        """
+        Return up to `limit` singles matching `query`, ordered by ISRC and paged
+        with the same `after` cursor as `list_singles_page`.
+        """
+        raise NotImplementedError
+
+    def search_singles(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[MusicSingleSearchHit]:
+        """
+        Full-text search over titles, credits, lyrics and notes. Every word of
+        `text` must match, the last one also as a prefix; the best `limit`
+        matches are returned, most relevant first.
+        """
+        raise NotImplementedError
+
     def read_single(self, isrc: str) -> MusicSingleRelease:
         raise NotImplementedError
 
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        """
+        Return a single with its revision: a number that changes whenever the
+        single is written, and is never reused for different content.
+        """
+        raise NotImplementedError
+
+    def catalogue_revision(self) -> int:
+        """Return a number that changes whenever any single is written."""
+        raise NotImplementedError
+
+    def count_singles(self) -> int:
+        """Return the number of singles in the catalogue."""
+        raise NotImplementedError
+
+    def catalogue_stats(self, co_credits: int = DEFAULT_CO_CREDITS) -> CatalogueStats:
+        """
+        Return aggregates over the catalogue, ranking the `co_credits` artist
+        pairs credited together most often.
+        """
+        raise NotImplementedError
+
     def update_single(
         self, isrc: str, single_update: MusicSingleRelease
     ) -> MusicSingleRelease:
@@ -19,3 +132,342 @@ class MusicSingleReleaseRepository:
 
     def delete_single(self, isrc: str) -> None:
         raise NotImplementedError
+
+    def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        """
+        Create every single in one atomic batch, raising BulkWriteError if any
+        ISRC already exists or repeats within the batch.
+        """
+        raise NotImplementedError
+
+    def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        """
+        Create or replace every single by ISRC in one atomic batch, raising
+        BulkWriteError if an ISRC repeats within the batch.
+        """
+        raise NotImplementedError
+
+    def delete_singles(self, isrcs: List[str]) -> None:
+        """
+        Delete every ISRC in one atomic batch, raising BulkWriteError if any is
+        not found or repeats within the batch.
+        """
+        raise NotImplementedError
+
+
+class AsyncMusicSingleReleaseRepository:
+    """
+    Awaitable counterpart of MusicSingleReleaseRepository, for callers running
+    on an event loop that must not block on storage I/O.
+    """
+
+    async def create_single(self, single: MusicSingleRelease) -> MusicSingleRelease:
+        raise NotImplementedError
+
+    async def list_singles(self) -> List[MusicSingleRelease]:
+        raise NotImplementedError
+
+    async def list_singles_page(
+        self, after: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[MusicSingleRelease]:
+        raise NotImplementedError
+
+    async def iter_singles(
+        self,
+        after: Optional[str] = None,
+        batch_size: int = DEFAULT_PAGE_SIZE,
+        query: Optional[MusicSingleQuery] = None,
+    ) -> AsyncIterator[MusicSingleRelease]:
+        """
+        Iterate the catalogue (or the singles matching `query`) in ISRC order,
+        awaiting one page at a time.
+        """
+        while True:
+            if query is None or query.is_empty:
+                page = await self.list_singles_page(after=after, limit=batch_size)
+            else:
+                page = await self.query_singles(query, after=after, limit=batch_size)
+            for single in page:
+                yield single
+            if len(page) < batch_size:
+                return
+            after = page[-1].isrc
+
+    async def query_singles(
+        self,
+        query: MusicSingleQuery,
+        after: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> List[MusicSingleRelease]:
+        raise NotImplementedError
+
+    async def search_singles(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[MusicSingleSearchHit]:
+        raise NotImplementedError
+
+    async def read_single(self, isrc: str) -> MusicSingleRelease:
+        raise NotImplementedError
+
+    async def read_single_with_revision(
+        self, isrc: str
+    ) -> tuple[MusicSingleRelease, int]:
+        raise NotImplementedError
+
+    async def catalogue_revision(self) -> int:
+        raise NotImplementedError
+
+    async def count_singles(self) -> int:
+        raise NotImplementedError
+
+    async def catalogue_stats(
+        self, co_credits: int = DEFAULT_CO_CREDITS
+    ) -> CatalogueStats:
+        raise NotImplementedError
+
+    async def update_single(
+        self, isrc: str, single_update: MusicSingleRelease
+    ) -> MusicSingleRelease:
+        raise NotImplementedError
+
+    async def delete_single(self, isrc: str) -> None:
+        raise NotImplementedError
+
+    async def create_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        raise NotImplementedError
+
+    async def upsert_singles(
+        self, singles: List[MusicSingleRelease]
+    ) -> List[MusicSingleRelease]:
+        raise NotImplementedError
+
+    async def delete_singles(self, isrcs: List[str]) -> None:
+        raise NotImplementedError
+
+
+class ChunkWriter:
+    """
+    Appends one chunk to an upload, hashing it as it streams. Bytes written
+    are kept unless the chunk carried a digest and was not committed.
+    """
+
+    def write(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def commit(self) -> ArtifactUpload:
+        """
+        Finish the chunk, checking it against its digest if it was given one;
+        a mismatching chunk raises ValueError, and is discarded on close.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the upload for its next chunk, committed or not."""
+        raise NotImplementedError
+
+
+class ArtifactStore:
+    """
+    Storage for the artifacts of singles, uploaded in resumable chunks so that
+    no artifact is ever held in memory whole, and stored in blocks that are
+    shared between artifacts with the same content.
+    """
+
+    def start_upload(self, isrc: str, request: ArtifactUploadRequest) -> ArtifactUpload:
+        raise NotImplementedError
+
+    def read_upload(self, upload_id: str) -> ArtifactUpload:
+        raise NotImplementedError
+
+    def open_chunk(
+        self, upload_id: str, offset: int, sha256: Optional[str] = None
+    ) -> ChunkWriter:
+        """
+        Start a chunk at `offset`, which must be the upload's current offset.
+        Only one chunk of an upload may be in progress at a time.
+        """
+        raise NotImplementedError
+
+    def reuse_blocks(
+        self, upload_id: str, offset: int, digests: List[str]
+    ) -> ArtifactUpload:
+        """
+        Append blocks the store already holds to an upload by their SHA-256,
+        in order from `offset`, which must be the upload's current offset and
+        a block boundary. Stops at the first block not held, whose bytes the
+        client then uploads; only what the store lacks crosses the network.
+        """
+        raise NotImplementedError
+
+    def complete_upload(self, upload_id: str) -> Artifact:
+        """
+        Store a fully received upload as an artifact, replacing any artifact
+        of the same name.
+        """
+        raise NotImplementedError
+
+    def abort_upload(self, upload_id: str) -> None:
+        raise NotImplementedError
+
+    def list_artifacts(self, isrc: str) -> List[Artifact]:
+        raise NotImplementedError
+
+    def read_artifact(self, isrc: str, name: str) -> Artifact:
+        raise NotImplementedError
+
+    def artifact_blocks(self, isrc: str, name: str) -> List[str]:
+        """
+        Return the filesystem paths of the blocks holding an artifact's
+        content, in order; every block but the last is ARTIFACT_BLOCK_SIZE.
+        """
+        raise NotImplementedError
+
+    def delete_artifact(self, isrc: str, name: str) -> None:
+        raise NotImplementedError
+
+    def delete_artifacts(self, isrc: str) -> None:
+        """Delete every artifact of a single, as when the single is deleted."""
+        raise NotImplementedError
+
+    def move_artifacts(self, isrc: str, new_isrc: str) -> None:
+        """Move every artifact of a single to a new ISRC, replacing by name."""
+        raise NotImplementedError
+
+
+class RenditionCache:
+    """
+    Renditions derived from artifacts, such as artwork thumbnails and audio
+    previews, made on first request and kept for the requests that follow.
+    """
+
+    def render(
+        self, artifact: Artifact, blocks: List[str], name: str
+    ) -> "Future[Rendition]":
+        """
+        Return a future of the `name` rendition of an artifact stored in
+        `blocks`: already resolved when cached, and shared by every caller
+        asking for the same rendition while it is being made.
+        """
+        raise NotImplementedError
+
+    def hit_counts(self) -> tuple[int, int]:
+        """
+        Return how many renditions were served without being made, from the
+        cache or by joining one in progress, and how many had to be made.
+        """
+        raise NotImplementedError
+
+
+class ChangeFeed:
+    """
+    Ordered record of the writes to the catalogue, numbered by a sequence that
+    grows by one per change, of which only the latest are kept.
+    """
+
+    def record(self, writes: List[SingleWrite]) -> None:
+        """Append writes, numbered consecutively, and wake everyone waiting."""
+        raise NotImplementedError
+
+    def latest_sequence(self) -> int:
+        raise NotImplementedError
+
+    def changes_after(self, sequence: int, limit: int) -> List[SingleChange]:
+        """
+        Return up to `limit` changes following `sequence`, oldest first,
+        raising ValueError if some of them are no longer kept.
+        """
+        raise NotImplementedError
+
+    async def wait_after(self, sequence: int, timeout: float) -> None:
+        """Return once a change follows `sequence`, or after `timeout` seconds."""
+        raise NotImplementedError
+
+
+class BundleRepository:
+    """
+    Bundles of singles, kept with the aggregates of their tracks up to date,
+    so reading one does not walk its tracks. Writes to the catalogue must be
+    passed to `observe_singles` once applied.
+    """
+
+    def create_bundle(self, bundle: ReleaseBundle) -> ReleaseBundle:
+        raise NotImplementedError
+
+    def list_bundles(self) -> List[ReleaseBundle]:
+        raise NotImplementedError
+
+    def read_bundle(self, bundle_id: str) -> BundleView:
+        raise NotImplementedError
+
+    def update_bundle(self, bundle_id: str, bundle: ReleaseBundle) -> ReleaseBundle:
+        raise NotImplementedError
+
+    def delete_bundle(self, bundle_id: str) -> None:
+        """Delete a bundle, raising ValueError if another nests it."""
+        raise NotImplementedError
+
+    def observe_singles(self, writes: List[SingleWrite]) -> None:
+        """Update the aggregates of the bundles with the singles written."""
+        raise NotImplementedError
+
+
+class ReleaseScheduler:
+    """
+    Release actions waiting for their time. Actions due are taken, acted on,
+    then completed; those taken but not completed when the process stops are
+    due again when it restarts, so each fires at least once.
+    """
+
+    def schedule(
+        self, isrc: str, action: ReleaseAction, due: datetime
+    ) -> ScheduledRelease:
+        raise NotImplementedError
+
+    def list_scheduled(self, isrc: str) -> List[ScheduledRelease]:
+        """Return the actions waiting for a single, soonest first."""
+        raise NotImplementedError
+
+    def cancel(self, isrc: str, release_id: str) -> None:
+        raise NotImplementedError
+
+    def next_due(self) -> Optional[datetime]:
+        """Return when the soonest action waiting is due, if any is."""
+        raise NotImplementedError
+
+    def take_due(self, now: datetime, limit: int) -> List[ScheduledRelease]:
+        """Take up to `limit` actions due by `now`, soonest first."""
+        raise NotImplementedError
+
+    def complete(self, release_ids: List[str]) -> None:
+        """Forget actions taken and acted on."""
+        raise NotImplementedError
+
+
+class IntegrityScanner:
+    """
+    Checks of the whole catalogue run in the background, one at a time, each
+    reporting the issues it finds as it goes.
+    """
+
+    def start_scan(self) -> IntegrityScan:
+        """Start a scan, raising ValueError if one is still running."""
+        raise NotImplementedError
+
+    def list_scans(self) -> List[IntegrityScan]:
+        """Return the latest scans, newest first."""
+        raise NotImplementedError
+
+    def read_scan(self, scan_id: str) -> IntegrityScan:
+        raise NotImplementedError
+
+    def issues_after(
+        self, scan_id: str, sequence: int, limit: int
+    ) -> List[IntegrityIssue]:
+        """Return up to `limit` issues a scan found after `sequence`, oldest first."""
+        raise NotImplementedError
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse
+from musos_assist.routers import (
+    get_change_feed,
+    get_release_scheduler,
+    get_repository,
+    get_snapshot_publisher,
+    singles_router,
+)
+from musos_assist.routers.artifacts import artifacts_router
+from musos_assist.routers.bulk import bulk_router
+from musos_assist.routers.bundles import bundles_router
+from musos_assist.routers.changes import changes_router
+from musos_assist.routers.instrumentation import MetricsMiddleware
+from musos_assist.routers.integrity import integrity_router
+from musos_assist.routers.metrics import metrics_router
+from musos_assist.routers.profiling import (
+    ProfilingMiddleware,
+    profiler,
+    profiling_router,
+)
+from musos_assist.routers.scheduling import run_scheduler, scheduling_router
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+
+
+def configure_logging() -> None:
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL, logging.WARNING),
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Start the app: configure logging, build the repositories, then fire
+    scheduled release actions for as long as the app serves. Adapters are
+    otherwise built by the first request needing them, not on import. The
+    scheduler acts on the repository requests use, overridden or not.
+    """
+    configure_logging()
+    overrides = app.dependency_overrides
+    scheduler = asyncio.create_task(
+        run_scheduler(
+            overrides.get(get_release_scheduler, get_release_scheduler)(),
+            overrides.get(get_repository, get_repository)(),
+            overrides.get(get_change_feed, get_change_feed)(),
+        )
+    )
+    yield
+    scheduler.cancel()
+    with suppress(asyncio.CancelledError):
+        await scheduler
+
+
+app = FastAPI(
+    title="Music Single Release API",
+    description="API for managing music single releases",
+    lifespan=lifespan,
+)
+
+# Mount the static directory to serve static files
+app.mount(
+    "/static",
+    StaticFiles(directory=(os.path.join(os.path.dirname(__file__), "static"))),
+    name="static",
+)
+
+# Your API routes go here...
+# Bulk and change routes first, so /singles/export and /singles/changes are
+# not taken for an ISRC
+app.include_router(bulk_router)
+app.include_router(changes_router)
+app.include_router(singles_router)
+app.include_router(scheduling_router)
+app.include_router(artifacts_router)
+app.include_router(bundles_router)
+app.include_router(integrity_router)
+app.include_router(metrics_router)
+app.include_router(profiling_router)
+
+# Time every request, by route template, status and phase
+app.add_middleware(MetricsMiddleware)
+# Sample the stacks of a fraction of requests, when profiling is on
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+# Tell reader workers which snapshot has the writes of each request
+snapshot_publisher = get_snapshot_publisher()
+if snapshot_publisher is not None:
+    from musos_assist.routers.snapshots import SnapshotVersionMiddleware
+
+    app.add_middleware(SnapshotVersionMiddleware, publisher=snapshot_publisher)
+
+
+# Serve the index.html at the root
+@app.get("/", response_class=FileResponse)
+async def read_simple_root() -> Any:
+    return FileResponse(
+        path=os.path.join(os.path.dirname(__file__), "static", "index.html")
+    )
@@ -1,70 +1,385 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from musos_assist.domain.models import MusicSingleRelease
-from musos_assist.domain.ports import MusicSingleReleaseRepository
-from musos_assist.adapters import (
-    InMemoryMusicSingleReleaseRepository,
+import os
+from http import HTTPStatus
+from functools import cache
+from typing import TYPE_CHECKING, Annotated, AsyncIterator, Iterable, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from musos_assist.constants import (
+    DEFAULT_CO_CREDITS,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_PAGE_SIZE,
+    NDJSON_MEDIA_TYPE,
+    NEXT_CURSOR_HEADER,
+    SINGLE_EXISTS,
+    SINGLE_NOT_FOUND,
 )
-
-singles_router = APIRouter()
-my_default_repository: MusicSingleReleaseRepository = (
-    InMemoryMusicSingleReleaseRepository()
+from musos_assist.domain.models import (
+    CatalogueStats,
+    MusicSingleQuery,
+    MusicSingleRelease,
+    MusicSingleSearchHit,
+)
+from musos_assist.domain.ports import (
+    ArtifactStore,
+    AsyncMusicSingleReleaseRepository,
+    BundleRepository,
+    ChangeFeed,
+    IntegrityScanner,
+    MusicSingleReleaseRepository,
+    ReleaseScheduler,
+    RenditionCache,
+)
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.adapters.threadpool import (
+    ThreadPoolMusicSingleReleaseRepository,
+    repository_executor,
+)
+from musos_assist.routers import serialization
+from musos_assist.routers.instrumentation import (
+    InstrumentedRoute,
+    observe_repository_call,
 )
+from musos_assist.routers.profiling import profiler
+from musos_assist.routers.caching import (
+    SerializedSingleCache,
+    etag_matches,
+    not_modified,
+    revision_etag,
+)
+
+if TYPE_CHECKING:
+    from musos_assist.adapters.snapshots import SnapshotPublisher
+
+singles_router = APIRouter(route_class=InstrumentedRoute)
+
+# Single update errors -> status
+UPDATE_ERROR_STATUS = {
+    SINGLE_NOT_FOUND: HTTPStatus.NOT_FOUND,
+    SINGLE_EXISTS: HTTPStatus.CONFLICT,
+}
+
+# Each adapter is built by the first call of its getter, from a request or
+# the app's startup, and shared from then on; its module is imported there
+# too, so importing the app does not import every adapter
+
+
+@cache
+def get_change_feed() -> ChangeFeed:
+    from musos_assist.adapters.changes import InMemoryChangeFeed
+
+    return InMemoryChangeFeed()
+
+
+default_change_feed: ChangeFeed = Depends(get_change_feed)
+
+
+@cache
+def get_catalogue() -> MusicSingleReleaseRepository:
+    """The singles every other repository decorates."""
+    from musos_assist.adapters.changes import ChangeFeedMusicSingleReleaseRepository
+
+    return ChangeFeedMusicSingleReleaseRepository(
+        ConcurrentInMemoryMusicSingleReleaseRepository(), get_change_feed()
+    )
+
 
+@cache
+def get_bundle_repository() -> BundleRepository:
+    from musos_assist.adapters.bundles import InMemoryBundleRepository
 
+    return InMemoryBundleRepository(get_catalogue())
+
+
+default_bundle_repository: BundleRepository = Depends(get_bundle_repository)
+
+# Set in the process owning the catalogue when reader workers serve from
+# its snapshots; see musos_assist.workers
+SNAPSHOT_PUBLISH_DIR = os.getenv("MUSOS_PUBLISH_SNAPSHOTS")
+
+
+@cache
+def get_snapshot_publisher() -> Optional["SnapshotPublisher"]:
+    if not SNAPSHOT_PUBLISH_DIR:
+        return None
+    from musos_assist.adapters.snapshots import SnapshotPublisher
+
+    return SnapshotPublisher(SNAPSHOT_PUBLISH_DIR)
+
+
+@cache
 def get_repository() -> MusicSingleReleaseRepository:
-    return my_default_repository
+    from musos_assist.adapters.analytics import AnalyticsMusicSingleReleaseRepository
+    from musos_assist.adapters.bundles import BundleViewsMusicSingleReleaseRepository
+
+    repository: MusicSingleReleaseRepository = AnalyticsMusicSingleReleaseRepository(
+        BundleViewsMusicSingleReleaseRepository(
+            get_catalogue(), get_bundle_repository()
+        )
+    )
+    publisher = get_snapshot_publisher()
+    if publisher is not None:
+        from musos_assist.adapters.snapshots import (
+            SnapshotMusicSingleReleaseRepository,
+        )
+
+        repository = SnapshotMusicSingleReleaseRepository(repository, publisher)
+    return repository
 
 
 default_repository: MusicSingleReleaseRepository = Depends(get_repository)
 
+# Shared by every request, bounding the repository calls in flight
+repository_threads = repository_executor()
+
+
+def get_async_repository(
+    repository: MusicSingleReleaseRepository = default_repository,
+) -> AsyncMusicSingleReleaseRepository:
+    return ThreadPoolMusicSingleReleaseRepository(
+        repository,
+        repository_threads,
+        observe_repository_call,
+        worker_scope=profiler.worker_scope,
+    )
+
+
+default_async_repository: AsyncMusicSingleReleaseRepository = Depends(
+    get_async_repository
+)
+
+serialized_singles = SerializedSingleCache()
+
+ARTIFACT_ROOT = os.getenv("MUSOS_ARTIFACT_ROOT", "artifacts")
+
+
+@cache
+def get_artifact_store() -> ArtifactStore:
+    from musos_assist.adapters.artifacts import FileSystemArtifactStore
+
+    return FileSystemArtifactStore(ARTIFACT_ROOT)
+
+
+default_artifact_store: ArtifactStore = Depends(get_artifact_store)
+
+
+@cache
+def get_rendition_cache() -> RenditionCache:
+    from musos_assist.adapters.renditions import FileSystemRenditionCache
+
+    return FileSystemRenditionCache(os.path.join(ARTIFACT_ROOT, "renditions"))
+
+
+default_rendition_cache: RenditionCache = Depends(get_rendition_cache)
+
+SCHEDULE_PATH = os.getenv(
+    "MUSOS_SCHEDULE_PATH", os.path.join(ARTIFACT_ROOT, "schedule.log")
+)
+
+
+@cache
+def get_release_scheduler() -> ReleaseScheduler:
+    from musos_assist.adapters.scheduler import HeapReleaseScheduler
+
+    return HeapReleaseScheduler(SCHEDULE_PATH)
+
+
+default_release_scheduler: ReleaseScheduler = Depends(get_release_scheduler)
+
+
+@cache
+def get_integrity_scanner() -> IntegrityScanner:
+    from musos_assist.adapters.integrity import BackgroundIntegrityScanner
+
+    return BackgroundIntegrityScanner(get_repository(), get_artifact_store())
+
+
+default_integrity_scanner: IntegrityScanner = Depends(get_integrity_scanner)
+
+
+def delete_artifacts(store: ArtifactStore, isrcs: Iterable[str]) -> None:
+    """Delete the artifacts of deleted singles, releasing their blocks."""
+    for isrc in isrcs:
+        store.delete_artifacts(isrc)
+
 
 @singles_router.post(
     "/singles/", response_model=MusicSingleRelease, status_code=status.HTTP_201_CREATED
 )
 async def create_single(
     single: MusicSingleRelease,
-    repository: MusicSingleReleaseRepository = default_repository,
-) -> MusicSingleRelease:
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+) -> MusicSingleRelease | Response:
     try:
-        return repository.create_single(single)
+        created = await repository.create_single(single)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if serialization.FAST_SERIALIZATION:
+        return serialization.trusted_json(
+            serialization.render_single(created), status.HTTP_201_CREATED
+        )
+    return created
+
+
+async def stream_singles_ndjson(
+    repository: AsyncMusicSingleReleaseRepository,
+    after: Optional[str] = None,
+    query: Optional[MusicSingleQuery] = None,
+) -> AsyncIterator[bytes]:
+    """Render the catalogue as NDJSON, one chunk per page of singles."""
+    lines: list[str] = []
+    async for single in repository.iter_singles(
+        after=after, batch_size=DEFAULT_PAGE_SIZE, query=query
+    ):
+        lines.append(single.model_dump_json())
+        if len(lines) == DEFAULT_PAGE_SIZE:
+            yield ("\n".join(lines) + "\n").encode()
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
 
 
 @singles_router.get("/singles/", response_model=list[MusicSingleRelease])
 async def list_singles(
-    repository: MusicSingleReleaseRepository = default_repository,
-) -> list[MusicSingleRelease]:
-    return repository.list_singles()
+    response: Response,
+    query: Annotated[MusicSingleQuery, Depends()],
+    after: Annotated[
+        Optional[str], Query(description="ISRC cursor: return singles after this one.")
+    ] = None,
+    limit: Annotated[
+        Optional[int],
+        Query(ge=1, le=MAX_PAGE_SIZE, description="Page size for keyset pagination."),
+    ] = None,
+    accept: Annotated[Optional[str], Header()] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+) -> list[MusicSingleRelease] | Response:
+    if accept is not None and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            stream_singles_ndjson(repository, after, query),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    # Read before listing: a write landing in between yields a newer list under
+    # an older ETag, which only costs the client a later full response
+    etag = revision_etag(await repository.catalogue_revision())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    if after is None and limit is None and query.is_empty:
+        page = await repository.list_singles()
+    else:
+        page_size = limit or DEFAULT_PAGE_SIZE
+        if query.is_empty:
+            page = await repository.list_singles_page(after=after, limit=page_size)
+        else:
+            page = await repository.query_singles(query, after=after, limit=page_size)
+        if len(page) == page_size:
+            response.headers[NEXT_CURSOR_HEADER] = page[-1].isrc
+    if serialization.FAST_SERIALIZATION:
+        return serialization.trusted_json(
+            serialization.render_singles(page), headers=response.headers
+        )
+    return page
+
+
+@singles_router.get("/singles/search", response_model=list[MusicSingleSearchHit])
+async def search_singles(
+    q: Annotated[
+        str,
+        Query(
+            min_length=1,
+            description="Words to find in titles, credits, lyrics and notes.",
+        ),
+    ],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_SEARCH_LIMIT,
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+) -> list[MusicSingleSearchHit]:
+    try:
+        return await repository.search_singles(q, limit)
+    except NotImplementedError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Search is not supported by this repository",
+        )
+
+
+@singles_router.get("/singles/stats", response_model=CatalogueStats)
+async def read_catalogue_stats(
+    co_credits: Annotated[
+        int,
+        Query(
+            ge=1,
+            le=MAX_PAGE_SIZE,
+            description="Number of most co-credited artist pairs to rank.",
+        ),
+    ] = DEFAULT_CO_CREDITS,
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+) -> CatalogueStats:
+    try:
+        return await repository.catalogue_stats(co_credits)
+    except NotImplementedError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Statistics are not supported by this repository",
+        )
 
 
 @singles_router.get("/singles/{isrc}", response_model=MusicSingleRelease)
 async def read_single(
-    isrc: str, repository: MusicSingleReleaseRepository = default_repository
-) -> MusicSingleRelease:
+    isrc: str,
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+) -> Response:
     try:
-        return repository.read_single(isrc)
+        single, revision = await repository.read_single_with_revision(isrc)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    etag = revision_etag(isrc, revision)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return serialization.trusted_json(
+        serialized_singles.render(single, revision), headers=response.headers
+    )
 
 
 @singles_router.put("/singles/{isrc}", response_model=MusicSingleRelease)
 async def update_single(
     isrc: str,
     single_update: MusicSingleRelease,
-    repository: MusicSingleReleaseRepository = default_repository,
-) -> MusicSingleRelease:
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+    artifacts: ArtifactStore = default_artifact_store,
+) -> MusicSingleRelease | Response:
     try:
-        return repository.update_single(isrc, single_update)
+        updated = await repository.update_single(isrc, single_update)
     except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        raise HTTPException(
+            status_code=UPDATE_ERROR_STATUS.get(str(e), status.HTTP_400_BAD_REQUEST),
+            detail=str(e),
+        )
+    serialized_singles.discard(isrc, single_update.isrc)
+    if single_update.isrc != isrc:
+        await run_in_threadpool(artifacts.move_artifacts, isrc, single_update.isrc)
+    if serialization.FAST_SERIALIZATION:
+        return serialization.trusted_json(serialization.render_single(updated))
+    return updated
 
 
 @singles_router.delete("/singles/{isrc}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_single(
-    isrc: str, repository: MusicSingleReleaseRepository = default_repository
+    isrc: str,
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+    artifacts: ArtifactStore = default_artifact_store,
 ) -> None:
     try:
-        repository.delete_single(isrc)
+        await repository.delete_single(isrc)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    serialized_singles.discard(isrc)
+    await run_in_threadpool(artifacts.delete_artifacts, isrc)
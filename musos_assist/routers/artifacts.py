@@ -0,0 +1,361 @@
+import asyncio
+import anyio
+from http import HTTPStatus
+from typing import Annotated, Optional
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+from starlette.concurrency import run_in_threadpool
+from musos_assist.constants import (
+    ARTIFACT_BLOCK_SIZE,
+    ARTIFACT_NOT_FOUND,
+    CHUNK_DIGEST_HEADER,
+    CHUNK_DIGEST_MISMATCH,
+    CHUNK_TOO_LARGE,
+    RENDITION_NOT_FOUND,
+    RENDITION_UNSUPPORTED,
+    UPLOAD_NOT_FOUND,
+    UPLOAD_OFFSET_HEADER,
+)
+from musos_assist.domain.models import Artifact, ArtifactUpload, ArtifactUploadRequest
+from musos_assist.domain.ports import (
+    ArtifactStore,
+    AsyncMusicSingleReleaseRepository,
+    RenditionCache,
+)
+from musos_assist.routers import (
+    default_artifact_store,
+    default_async_repository,
+    default_rendition_cache,
+)
+from musos_assist.routers.caching import etag_matches, not_modified, revision_etag
+from musos_assist.routers.instrumentation import InstrumentedRoute
+
+artifacts_router = APIRouter(route_class=InstrumentedRoute)
+
+# Store errors -> status; any other rejected request conflicts with the upload
+ERROR_STATUS = {
+    ARTIFACT_NOT_FOUND: HTTPStatus.NOT_FOUND,
+    UPLOAD_NOT_FOUND: HTTPStatus.NOT_FOUND,
+    CHUNK_TOO_LARGE: HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+    CHUNK_DIGEST_MISMATCH: HTTPStatus.UNPROCESSABLE_ENTITY,
+    RENDITION_NOT_FOUND: HTTPStatus.NOT_FOUND,
+    RENDITION_UNSUPPORTED: HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+}
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def requested_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    The [start, end) byte span asked for by a Range header, or None to send
+    the whole artifact: when there is no header, or it is malformed or asks
+    for several ranges, which a server may always answer in full.
+    """
+    if header is None:
+        return None
+    units, _, spec = header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if units.strip().lower() != "bytes" or "," in spec or not dash:
+        return None
+    try:
+        if first == "":
+            start, end = max(size - int(last), 0), size
+        else:
+            start = int(first)
+            end = size if last == "" else min(int(last) + 1, size)
+    except ValueError:
+        return None
+    if start < 0 or start >= end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+class ArtifactResponse(Response):
+    """
+    Serves an artifact from its blocks on disk, a block at a time, answering
+    a single-range Range header (and If-Range against the SHA-256 ETag) with
+    206. Servers offering the ASGI pathsend extension are handed one-block
+    artifacts, such as artwork, to send from disk themselves.
+    """
+
+    def __init__(self, artifact: Artifact, blocks: list[str]) -> None:
+        super().__init__(
+            media_type=artifact.media_type,
+            headers={
+                "ETag": f'"{artifact.sha256}"',
+                "Accept-Ranges": "bytes",
+                "Content-Disposition": f'attachment; filename="{artifact.name}"',
+            },
+        )
+        self.artifact = artifact
+        self.blocks = blocks
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        headers = Headers(scope=scope)
+        size = self.artifact.size
+        if_range = headers.get("if-range")
+        try:
+            span = (
+                requested_range(headers.get("range"), size)
+                if if_range is None or if_range == self.headers["etag"]
+                else None
+            )
+        except RangeNotSatisfiable:
+            await Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{size}"},
+            )(scope, receive, send)
+            return
+        start, end = span or (0, size)
+        if span is not None:
+            self.status_code = status.HTTP_206_PARTIAL_CONTENT
+            self.headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        self.headers["Content-Length"] = str(end - start)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+        elif (
+            span is None
+            and len(self.blocks) == 1
+            and "http.response.pathsend" in scope.get("extensions", {})
+        ):
+            await send({"type": "http.response.pathsend", "path": self.blocks[0]})
+        else:
+            for index in range(start // ARTIFACT_BLOCK_SIZE, len(self.blocks)):
+                block_start = index * ARTIFACT_BLOCK_SIZE
+                if block_start >= end:
+                    break
+                body = await anyio.to_thread.run_sync(
+                    read_span,
+                    self.blocks[index],
+                    max(start - block_start, 0),
+                    min(end - block_start, ARTIFACT_BLOCK_SIZE),
+                )
+                await send(
+                    {"type": "http.response.body", "body": body, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+
+
+def read_span(path: str, start: int, end: int) -> bytes:
+    with open(path, "rb") as file:
+        file.seek(start)
+        return file.read(end - start)
+
+
+def store_error(error: ValueError) -> HTTPException:
+    return HTTPException(
+        status_code=ERROR_STATUS.get(str(error), status.HTTP_409_CONFLICT),
+        detail=str(error),
+    )
+
+
+def upload_headers(upload: ArtifactUpload) -> dict[str, str]:
+    return {
+        UPLOAD_OFFSET_HEADER: str(upload.offset),
+        "Location": f"/artifacts/uploads/{upload.upload_id}",
+    }
+
+
+@artifacts_router.post(
+    "/singles/{isrc}/artifacts/uploads",
+    response_model=ArtifactUpload,
+    status_code=status.HTTP_201_CREATED,
+)
+async def start_upload(
+    isrc: str,
+    request: ArtifactUploadRequest,
+    response: Response,
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+    store: ArtifactStore = default_artifact_store,
+) -> ArtifactUpload:
+    try:
+        await repository.read_single(isrc)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    upload = await run_in_threadpool(store.start_upload, isrc, request)
+    response.headers.update(upload_headers(upload))
+    return upload
+
+
+@artifacts_router.get("/artifacts/uploads/{upload_id}", response_model=ArtifactUpload)
+async def read_upload(
+    upload_id: str, response: Response, store: ArtifactStore = default_artifact_store
+) -> ArtifactUpload:
+    """Report how far an upload got, so an interrupted one can resume."""
+    try:
+        upload = await run_in_threadpool(store.read_upload, upload_id)
+    except ValueError as e:
+        raise store_error(e)
+    response.headers.update(upload_headers(upload))
+    return upload
+
+
+@artifacts_router.patch("/artifacts/uploads/{upload_id}", response_model=ArtifactUpload)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: Annotated[int, Header(alias=UPLOAD_OFFSET_HEADER, ge=0)],
+    chunk_digest: Annotated[Optional[str], Header(alias=CHUNK_DIGEST_HEADER)] = None,
+    store: ArtifactStore = default_artifact_store,
+) -> ArtifactUpload:
+    """
+    Append the request body to an upload at `Upload-Offset`. The body is
+    streamed to disk a block at a time, and checked against the SHA-256 in
+    `X-Chunk-SHA256` when given, in which case it is kept only if it matches.
+    """
+    try:
+        writer = await run_in_threadpool(
+            store.open_chunk, upload_id, upload_offset, chunk_digest
+        )
+        try:
+            # Gather the small pieces the server delivers into blocks, so that
+            # each trip to a worker thread writes a worthwhile amount
+            block = bytearray()
+            async for data in request.stream():
+                block += data
+                if len(block) >= ARTIFACT_BLOCK_SIZE:
+                    await run_in_threadpool(writer.write, bytes(block))
+                    block.clear()
+            if block:
+                await run_in_threadpool(writer.write, bytes(block))
+            upload = await run_in_threadpool(writer.commit)
+        finally:
+            await run_in_threadpool(writer.close)
+    except ValueError as e:
+        raise store_error(e)
+    response.headers.update(upload_headers(upload))
+    return upload
+
+
+@artifacts_router.post(
+    "/artifacts/uploads/{upload_id}/blocks", response_model=ArtifactUpload
+)
+async def reuse_blocks(
+    upload_id: str,
+    digests: list[str],
+    response: Response,
+    upload_offset: Annotated[int, Header(alias=UPLOAD_OFFSET_HEADER, ge=0)],
+    store: ArtifactStore = default_artifact_store,
+) -> ArtifactUpload:
+    """
+    Append blocks the store already holds to an upload, given the SHA-256 of
+    each following block of the file. Appending stops at the first block the
+    store lacks: upload its bytes, then offer the remaining digests again.
+    """
+    try:
+        upload = await run_in_threadpool(
+            store.reuse_blocks, upload_id, upload_offset, digests
+        )
+    except ValueError as e:
+        raise store_error(e)
+    response.headers.update(upload_headers(upload))
+    return upload
+
+
+@artifacts_router.post(
+    "/artifacts/uploads/{upload_id}/complete",
+    response_model=Artifact,
+    status_code=status.HTTP_201_CREATED,
+)
+async def complete_upload(
+    upload_id: str, store: ArtifactStore = default_artifact_store
+) -> Artifact:
+    try:
+        return await run_in_threadpool(store.complete_upload, upload_id)
+    except ValueError as e:
+        raise store_error(e)
+
+
+@artifacts_router.delete(
+    "/artifacts/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def abort_upload(
+    upload_id: str, store: ArtifactStore = default_artifact_store
+) -> None:
+    try:
+        await run_in_threadpool(store.abort_upload, upload_id)
+    except ValueError as e:
+        raise store_error(e)
+
+
+@artifacts_router.get("/singles/{isrc}/artifacts", response_model=list[Artifact])
+async def list_artifacts(
+    isrc: str, store: ArtifactStore = default_artifact_store
+) -> list[Artifact]:
+    try:
+        return await run_in_threadpool(store.list_artifacts, isrc)
+    except ValueError as e:
+        raise store_error(e)
+
+
+@artifacts_router.get("/singles/{isrc}/artifacts/{name}", response_class=Response)
+async def download_artifact(
+    isrc: str, name: str, store: ArtifactStore = default_artifact_store
+) -> ArtifactResponse:
+    try:
+        artifact = await run_in_threadpool(store.read_artifact, isrc, name)
+        blocks = await run_in_threadpool(store.artifact_blocks, isrc, name)
+    except ValueError as e:
+        raise store_error(e)
+    return ArtifactResponse(artifact, blocks)
+
+
+@artifacts_router.delete(
+    "/singles/{isrc}/artifacts/{name}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_artifact(
+    isrc: str, name: str, store: ArtifactStore = default_artifact_store
+) -> None:
+    try:
+        await run_in_threadpool(store.delete_artifact, isrc, name)
+    except ValueError as e:
+        raise store_error(e)
+
+
+@artifacts_router.get(
+    "/singles/{isrc}/artifacts/{name}/renditions/{rendition}",
+    response_class=FileResponse,
+)
+async def read_rendition(
+    isrc: str,
+    name: str,
+    rendition: str,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    store: ArtifactStore = default_artifact_store,
+    renditions: RenditionCache = default_rendition_cache,
+) -> Response:
+    """
+    Serve a rendition of an artifact: `thumbnail-<size>` of artwork, or the
+    `preview` clip of a WAV file. Made on the first request and cached, so
+    later requests, and concurrent ones meanwhile, share the one rendering.
+    """
+    try:
+        artifact = await run_in_threadpool(store.read_artifact, isrc, name)
+        etag = revision_etag(artifact.sha256, rendition)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        blocks = await run_in_threadpool(store.artifact_blocks, isrc, name)
+        result = await asyncio.wrap_future(
+            await run_in_threadpool(renditions.render, artifact, blocks, rendition)
+        )
+    except ValueError as e:
+        raise store_error(e)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    return FileResponse(
+        result.path,
+        media_type=result.media_type,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
@@ -0,0 +1,322 @@
+import csv
+import io
+import json
+from typing import Annotated, Any, AsyncIterator, Iterator, Literal, Optional, Union
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
+from musos_assist.constants import (
+    BULK_BATCH_SIZE,
+    CSV_LIST_SEPARATOR,
+    CSV_MEDIA_TYPE,
+    CSV_NOT_UTF8,
+    DEFAULT_PAGE_SIZE,
+    MAX_REPORTED_ERRORS,
+    NDJSON_MEDIA_TYPE,
+)
+from musos_assist.domain.models import BulkReport, BulkRowError, MusicSingleRelease
+from musos_assist.domain.ports import (
+    ArtifactStore,
+    AsyncMusicSingleReleaseRepository,
+    BulkWriteError,
+)
+from musos_assist.routers import (
+    default_artifact_store,
+    default_async_repository,
+    delete_artifacts,
+    serialized_singles,
+    stream_singles_ndjson,
+)
+from musos_assist.routers.instrumentation import InstrumentedRoute
+
+bulk_router = APIRouter(route_class=InstrumentedRoute)
+
+SINGLES_ADAPTER = TypeAdapter(list[MusicSingleRelease])
+CSV_COLUMNS = list(MusicSingleRelease.model_fields)
+CSV_LIST_FIELDS = (
+    "artist_names",
+    "genres",
+    "formats",
+    "subgenres",
+    "composers",
+    "producers",
+)
+
+# A parsed row: its position in the request and either its data or an error
+ParsedRow = tuple[int, Union[dict[str, Any], str]]
+
+
+def ndjson_lines(body: bytes) -> list[bytes]:
+    return [line for line in body.splitlines() if line.strip()]
+
+
+def parse_ndjson(lines: list[bytes], start: int = 0) -> Iterator[ParsedRow]:
+    for row, line in enumerate(lines, start=start):
+        try:
+            data = json.loads(line)
+            yield row, data if isinstance(data, dict) else "Row is not a JSON object"
+        except json.JSONDecodeError as e:
+            yield row, f"Invalid JSON: {e.msg}"
+        except UnicodeDecodeError as e:
+            yield row, f"Invalid UTF-8: {e.reason}"
+
+
+def parse_csv(body: bytes) -> Iterator[ParsedRow]:
+    """
+    Read CSV rows with a header of MusicSingleRelease field names. Empty cells
+    are left unset and list fields are split on CSV_LIST_SEPARATOR. A body
+    that is not UTF-8 rejects the whole request, as its rows cannot be told
+    apart.
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=CSV_NOT_UTF8
+        )
+    reader = csv.DictReader(io.StringIO(text))
+    for row, record in enumerate(reader):
+        data: dict[str, Any] = {}
+        for field, value in record.items():
+            if field is None or value is None or value == "":
+                continue
+            if field in CSV_LIST_FIELDS:
+                data[field] = [part.strip() for part in value.split(CSV_LIST_SEPARATOR)]
+            else:
+                data[field] = value
+        yield row, data
+
+
+def parse_rows(request: Request, body: bytes) -> Iterator[ParsedRow]:
+    content_type = request.headers.get("content-type", NDJSON_MEDIA_TYPE)
+    if content_type.startswith(CSV_MEDIA_TYPE):
+        return parse_csv(body)
+    return parse_ndjson(ndjson_lines(body))
+
+
+def row_isrc(data: dict[str, Any]) -> Optional[str]:
+    isrc = data.get("isrc")
+    return isrc if isinstance(isrc, str) else None
+
+
+def validate_batch(
+    batch: list[tuple[int, dict[str, Any]]],
+) -> tuple[list[tuple[int, MusicSingleRelease]], list[BulkRowError]]:
+    """
+    Validate a batch of rows in one TypeAdapter call. When some rows fail, the
+    rest are validated again without them, so a bad row costs one extra pass
+    over its batch rather than one call per row.
+    """
+    try:
+        validated = SINGLES_ADAPTER.validate_python([data for _, data in batch])
+        return [(row, single) for (row, _), single in zip(batch, validated)], []
+    except ValidationError as e:
+        messages: dict[int, list[str]] = {}
+        for error in e.errors():
+            index, *location = error["loc"]
+            field = ".".join(str(part) for part in location)
+            messages.setdefault(int(index), []).append(f"{field}: {error['msg']}")
+    errors = [
+        BulkRowError(
+            row=batch[index][0],
+            isrc=row_isrc(batch[index][1]),
+            message="; ".join(lines),
+        )
+        for index, lines in sorted(messages.items())
+    ]
+    valid = [entry for index, entry in enumerate(batch) if index not in messages]
+    singles, _ = validate_batch(valid) if valid else ([], [])
+    return singles, errors
+
+
+def validate_rows(
+    rows: Iterator[ParsedRow],
+) -> tuple[int, list[tuple[int, MusicSingleRelease]], list[BulkRowError]]:
+    processed = 0
+    singles: list[tuple[int, MusicSingleRelease]] = []
+    errors: list[BulkRowError] = []
+    batch: list[tuple[int, dict[str, Any]]] = []
+    for row, data in rows:
+        processed += 1
+        if isinstance(data, str):
+            errors.append(BulkRowError(row=row, message=data))
+            continue
+        batch.append((row, data))
+        if len(batch) == BULK_BATCH_SIZE:
+            valid, invalid = validate_batch(batch)
+            singles.extend(valid)
+            errors.extend(invalid)
+            batch = []
+    if batch:
+        valid, invalid = validate_batch(batch)
+        singles.extend(valid)
+        errors.extend(invalid)
+    return processed, singles, errors
+
+
+def validate_ndjson(
+    body: bytes,
+) -> tuple[int, list[tuple[int, MusicSingleRelease]], list[BulkRowError]]:
+    """
+    Validate NDJSON a batch at a time by handing the raw lines to pydantic as
+    one JSON array, skipping a Python-level json.loads per row. A batch that
+    fails is parsed again row by row to report each row's errors.
+    """
+    lines = ndjson_lines(body)
+    singles: list[tuple[int, MusicSingleRelease]] = []
+    errors: list[BulkRowError] = []
+    for start in range(0, len(lines), BULK_BATCH_SIZE):
+        batch = lines[start : start + BULK_BATCH_SIZE]
+        try:
+            validated = SINGLES_ADAPTER.validate_json(b"[" + b",".join(batch) + b"]")
+            if len(validated) == len(batch):
+                singles.extend(zip(range(start, start + len(batch)), validated))
+                continue
+        except ValidationError:
+            pass
+        _, valid, invalid = validate_rows(parse_ndjson(batch, start))
+        singles.extend(valid)
+        errors.extend(invalid)
+    return len(lines), singles, errors
+
+
+def read_singles(
+    request: Request, body: bytes
+) -> tuple[int, list[tuple[int, MusicSingleRelease]], list[BulkRowError]]:
+    content_type = request.headers.get("content-type", NDJSON_MEDIA_TYPE)
+    if content_type.startswith(CSV_MEDIA_TYPE):
+        return validate_rows(parse_csv(body))
+    return validate_ndjson(body)
+
+
+def read_isrcs(
+    request: Request, body: bytes
+) -> tuple[int, list[int], list[str], list[BulkRowError]]:
+    """The ISRC of each row to delete, with the row it came from."""
+    processed = 0
+    rows: list[int] = []
+    isrcs: list[str] = []
+    errors: list[BulkRowError] = []
+    for row, data in parse_rows(request, body):
+        processed += 1
+        isrc = row_isrc(data) if isinstance(data, dict) else None
+        if isrc is not None:
+            rows.append(row)
+            isrcs.append(isrc)
+        else:
+            errors.append(
+                BulkRowError(
+                    row=row, message=data if isinstance(data, str) else "isrc: Missing"
+                )
+            )
+    return processed, rows, isrcs, errors
+
+
+def rejected(
+    status_code: int, processed: int, errors: list[BulkRowError]
+) -> HTTPException:
+    report = BulkReport(
+        processed=processed,
+        applied=0,
+        errors=sorted(errors, key=lambda error: error.row)[:MAX_REPORTED_ERRORS],
+    )
+    return HTTPException(status_code=status_code, detail=report.model_dump(mode="json"))
+
+
+@bulk_router.post("/singles/bulk", response_model=BulkReport)
+async def import_singles(
+    request: Request,
+    mode: Annotated[
+        Literal["create", "upsert"],
+        Query(description="Create new singles only, or create and replace by ISRC."),
+    ] = "create",
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+) -> BulkReport:
+    body = await request.body()
+    # Parsing and validating a large import is CPU-bound; keep it off the loop
+    processed, validated, errors = await run_in_threadpool(read_singles, request, body)
+    if errors:
+        raise rejected(status.HTTP_422_UNPROCESSABLE_ENTITY, processed, errors)
+    singles = [single for _, single in validated]
+    try:
+        if mode == "create":
+            await repository.create_singles(singles)
+        else:
+            await repository.upsert_singles(singles)
+            serialized_singles.discard(*(single.isrc for single in singles))
+    except BulkWriteError as e:
+        raise rejected(
+            status.HTTP_409_CONFLICT,
+            processed,
+            [
+                BulkRowError(
+                    row=validated[index][0], isrc=singles[index].isrc, message=message
+                )
+                for index, message in e.errors.items()
+            ],
+        )
+    return BulkReport(processed=processed, applied=len(singles))
+
+
+@bulk_router.post("/singles/bulk/delete", response_model=BulkReport)
+async def delete_singles(
+    request: Request,
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+    artifacts: ArtifactStore = default_artifact_store,
+) -> BulkReport:
+    body = await request.body()
+    processed, rows, isrcs, errors = await run_in_threadpool(read_isrcs, request, body)
+    if errors:
+        raise rejected(status.HTTP_422_UNPROCESSABLE_ENTITY, processed, errors)
+    try:
+        await repository.delete_singles(isrcs)
+    except BulkWriteError as e:
+        raise rejected(
+            status.HTTP_404_NOT_FOUND,
+            processed,
+            [
+                BulkRowError(row=rows[index], isrc=isrcs[index], message=message)
+                for index, message in e.errors.items()
+            ],
+        )
+    serialized_singles.discard(*isrcs)
+    await run_in_threadpool(delete_artifacts, artifacts, isrcs)
+    return BulkReport(processed=processed, applied=len(isrcs))
+
+
+async def stream_singles_csv(
+    repository: AsyncMusicSingleReleaseRepository,
+) -> AsyncIterator[bytes]:
+    """Render the catalogue as CSV, one chunk per page of singles."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    count = 0
+    async for single in repository.iter_singles():
+        count += 1
+        record = single.model_dump(mode="json")
+        for field in CSV_LIST_FIELDS:
+            if record[field] is not None:
+                record[field] = CSV_LIST_SEPARATOR.join(record[field])
+        writer.writerow(record)
+        if count % DEFAULT_PAGE_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+@bulk_router.get("/singles/export")
+async def export_singles(
+    format: Annotated[Literal["ndjson", "csv"], Query()] = "ndjson",
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+) -> StreamingResponse:
+    if format == "csv":
+        return StreamingResponse(
+            stream_singles_csv(repository), media_type=CSV_MEDIA_TYPE
+        )
+    return StreamingResponse(
+        stream_singles_ndjson(repository), media_type=NDJSON_MEDIA_TYPE
+    )
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+from fastapi import APIRouter, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from musos_assist.constants import BUNDLE_EXISTS, BUNDLE_IN_USE, BUNDLE_NOT_FOUND
+from musos_assist.domain.models import BundleView, ReleaseBundle
+from musos_assist.domain.ports import BundleRepository
+from musos_assist.routers import default_bundle_repository
+from musos_assist.routers.instrumentation import InstrumentedRoute
+
+bundles_router = APIRouter(route_class=InstrumentedRoute)
+
+# Repository errors -> status; any other rejected bundle is a bad request
+ERROR_STATUS = {
+    BUNDLE_NOT_FOUND: HTTPStatus.NOT_FOUND,
+    BUNDLE_EXISTS: HTTPStatus.CONFLICT,
+    BUNDLE_IN_USE: HTTPStatus.CONFLICT,
+}
+
+
+def bundle_error(error: ValueError) -> HTTPException:
+    return HTTPException(
+        status_code=ERROR_STATUS.get(str(error), status.HTTP_400_BAD_REQUEST),
+        detail=str(error),
+    )
+
+
+@bundles_router.post(
+    "/bundles/", response_model=ReleaseBundle, status_code=status.HTTP_201_CREATED
+)
+async def create_bundle(
+    bundle: ReleaseBundle,
+    bundles: BundleRepository = default_bundle_repository,
+) -> ReleaseBundle:
+    try:
+        return await run_in_threadpool(bundles.create_bundle, bundle)
+    except ValueError as e:
+        raise bundle_error(e)
+
+
+@bundles_router.get("/bundles/", response_model=list[ReleaseBundle])
+async def list_bundles(
+    bundles: BundleRepository = default_bundle_repository,
+) -> list[ReleaseBundle]:
+    return await run_in_threadpool(bundles.list_bundles)
+
+
+@bundles_router.get("/bundles/{bundle_id}", response_model=BundleView)
+async def read_bundle(
+    bundle_id: str,
+    bundles: BundleRepository = default_bundle_repository,
+) -> BundleView:
+    """A bundle with the aggregates of its tracks, nested bundles included."""
+    try:
+        return await run_in_threadpool(bundles.read_bundle, bundle_id)
+    except ValueError as e:
+        raise bundle_error(e)
+
+
+@bundles_router.put("/bundles/{bundle_id}", response_model=ReleaseBundle)
+async def update_bundle(
+    bundle_id: str,
+    bundle: ReleaseBundle,
+    bundles: BundleRepository = default_bundle_repository,
+) -> ReleaseBundle:
+    try:
+        return await run_in_threadpool(bundles.update_bundle, bundle_id, bundle)
+    except ValueError as e:
+        raise bundle_error(e)
+
+
+@bundles_router.delete("/bundles/{bundle_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_bundle(
+    bundle_id: str,
+    bundles: BundleRepository = default_bundle_repository,
+) -> None:
+    try:
+        await run_in_threadpool(bundles.delete_bundle, bundle_id)
+    except ValueError as e:
+        raise bundle_error(e)
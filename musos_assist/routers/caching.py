@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from typing import Optional
+from fastapi import Response, status
+from musos_assist.constants import SERIALIZED_CACHE_SIZE
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.routers.serialization import serialize_single
+
+
+def revision_etag(*parts: object) -> str:
+    """A strong ETag naming one revision of a resource."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compare an If-None-Match header with an ETag, weakly, as RFC 9110 asks."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+class SerializedSingleCache:
+    """
+    LRU of singles rendered as JSON, keyed by ISRC and tagged with the revision
+    each was rendered from, so a body is only reused for that revision. Only
+    used from request handlers on the event loop, so it takes no lock.
+    """
+
+    def __init__(self, size: int = SERIALIZED_CACHE_SIZE) -> None:
+        self.size = size
+        self._entries: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, single: MusicSingleRelease, revision: int) -> bytes:
+        entry = self._entries.get(single.isrc)
+        if entry is not None and entry[0] == revision:
+            self.hits += 1
+            self._entries.move_to_end(single.isrc)
+            return entry[1]
+        self.misses += 1
+        body = serialize_single(single)
+        self._entries[single.isrc] = (revision, body)
+        self._entries.move_to_end(single.isrc)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return body
+
+    def discard(self, *isrcs: str) -> None:
+        for isrc in isrcs:
+            self._entries.pop(isrc, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
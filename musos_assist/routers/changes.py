@@ -0,0 +1,90 @@
+from typing import Annotated, AsyncIterator, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from musos_assist.constants import (
+    DEFAULT_CHANGES_WAIT,
+    DEFAULT_PAGE_SIZE,
+    EVENT_STREAM_KEEPALIVE,
+    EVENT_STREAM_MEDIA_TYPE,
+    MAX_CHANGES_WAIT,
+    MAX_PAGE_SIZE,
+)
+from musos_assist.domain.models import ChangeBatch
+from musos_assist.domain.ports import ChangeFeed
+from musos_assist.routers import default_change_feed
+from musos_assist.routers.instrumentation import InstrumentedRoute
+
+changes_router = APIRouter(route_class=InstrumentedRoute)
+
+
+async def stream_changes(feed: ChangeFeed, after: int) -> AsyncIterator[str]:
+    """
+    Follow the feed as server-sent events, each change an event named after
+    its kind with the sequence as its id, so a reconnecting EventSource
+    resumes where it left off. Comments keep an idle stream open.
+    """
+    while True:
+        try:
+            changes = feed.changes_after(after, DEFAULT_PAGE_SIZE)
+        except ValueError as e:
+            yield f"event: expired\ndata: {e}\n\n"
+            return
+        for change in changes:
+            yield (
+                f"id: {change.sequence}\nevent: {change.kind}\n"
+                f"data: {change.model_dump_json()}\n\n"
+            )
+            after = change.sequence
+        if not changes:
+            await feed.wait_after(after, EVENT_STREAM_KEEPALIVE)
+            if feed.latest_sequence() == after:
+                yield ": keep-alive\n\n"
+
+
+@changes_router.get("/singles/changes", response_model=ChangeBatch)
+async def read_changes(
+    after: Annotated[
+        Optional[int],
+        Query(description="Sequence of the last change seen; omit to start from now."),
+    ] = None,
+    wait: Annotated[
+        float,
+        Query(
+            ge=0,
+            le=MAX_CHANGES_WAIT,
+            description="Seconds to wait for a change when none follows `after` yet.",
+        ),
+    ] = DEFAULT_CHANGES_WAIT,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    accept: Annotated[Optional[str], Header()] = None,
+    last_event_id: Annotated[Optional[int], Header()] = None,
+    feed: ChangeFeed = default_change_feed,
+) -> ChangeBatch | Response:
+    """
+    Changes to the catalogue after a sequence, to sync incrementally: take the
+    `sequence` of a call without `after`, list the catalogue, then follow the
+    changes from that sequence. Changes are the singles as written, so those
+    seen twice are harmless. Long-polls by default; follows the feed as
+    server-sent events when the client accepts text/event-stream. Answers 410
+    when changes after `after` are no longer kept: list the catalogue again.
+    """
+    if last_event_id is not None:
+        after = last_event_id
+    if after is None:
+        after = feed.latest_sequence()
+    try:
+        changes = feed.changes_after(after, limit)
+        if accept is not None and EVENT_STREAM_MEDIA_TYPE in accept:
+            return StreamingResponse(
+                stream_changes(feed, after),
+                media_type=EVENT_STREAM_MEDIA_TYPE,
+                headers={"Cache-Control": "no-cache"},
+            )
+        if not changes and wait:
+            await feed.wait_after(after, wait)
+            changes = feed.changes_after(after, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    return ChangeBatch(
+        changes=changes, sequence=changes[-1].sequence if changes else after
+    )
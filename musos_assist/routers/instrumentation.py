@@ -0,0 +1,246 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from math import inf
+from time import perf_counter
+from typing import Any, Callable, Iterator, Optional, Union
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from musos_assist.constants import LATENCY_BUCKETS
+
+
+def label_text(names: tuple[str, ...], values: tuple[str, ...], *extra: str) -> str:
+    """Render label pairs in the Prometheus text format, braces included."""
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """
+    Latency histogram, one series per combination of label values. Observing
+    is a bisect and two additions under a lock; buckets are only made
+    cumulative when rendered, so the cost lands on the scrape.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # Label values -> count per bucket, then past the last bucket, then sum
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += seconds
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = sorted(
+                (labels, list(series)) for labels, series in self._series.items()
+            )
+        for labels, series in snapshot:
+            count = 0
+            for bound, observed in zip((*self.buckets, inf), series):
+                count += int(observed)
+                le = "+Inf" if bound == inf else repr(bound)
+                text = label_text(self.label_names, labels, f'le="{le}"')
+                yield f"{self.name}_bucket{text} {count}"
+            text = label_text(self.label_names, labels)
+            yield f"{self.name}_sum{text} {series[-1]!r}"
+            yield f"{self.name}_count{text} {count}"
+
+
+class Gauge:
+    """
+    Values set when scraped, one per combination of label values. Also
+    exposes, with `kind` "counter", running totals kept by something else.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.kind = kind
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{label_text(self.label_names, labels)} {value!r}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: list[Union[Histogram, Gauge]] = []
+
+    def histogram(self, name: str, help: str, *label_names: str) -> Histogram:
+        histogram = Histogram(name, help, label_names)
+        self.metrics.append(histogram)
+        return histogram
+
+    def gauge(
+        self, name: str, help: str, *label_names: str, kind: str = "gauge"
+    ) -> Gauge:
+        gauge = Gauge(name, help, label_names, kind)
+        self.metrics.append(gauge)
+        return gauge
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        return "".join(
+            line + "\n" for metric in self.metrics for line in metric.render()
+        )
+
+
+metrics = MetricsRegistry()
+request_seconds = metrics.histogram(
+    "musos_http_request_duration_seconds",
+    "Time to answer HTTP requests, by route template.",
+    "method",
+    "route",
+    "status",
+)
+phase_seconds = metrics.histogram(
+    "musos_http_request_phase_seconds",
+    "Time requests spend before their handler (reading and validating the"
+    " request), in it, and after it until the response starts (serializing it).",
+    "route",
+    "phase",
+)
+repository_seconds = metrics.histogram(
+    "musos_repository_call_duration_seconds",
+    "Time repository calls take on their worker thread.",
+    "method",
+)
+
+
+def observe_repository_call(method: str, seconds: float) -> None:
+    repository_seconds.observe(seconds, method)
+
+
+class RequestTimings:
+    """When a request started, reached its handler, and left it."""
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.handler_started: Optional[float] = None
+        self.handler_finished: Optional[float] = None
+
+
+# Timings of the request being handled, for its handler to mark
+request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an async endpoint to mark its start and finish in the request timings."""
+    if not iscoroutinefunction(endpoint):
+        return endpoint
+
+    @wraps(endpoint)
+    async def timed(*args: Any, **kwargs: Any) -> Any:
+        timings = request_timings.get()
+        if timings is not None:
+            timings.handler_started = perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            if timings is not None:
+                timings.handler_finished = perf_counter()
+
+    return timed
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    Route whose endpoint marks when it starts and finishes, splitting the time
+    of a request into validation, handling and serialization.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by method, route template and
+    status, and, for instrumented routes, by phase.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings(perf_counter())
+        token = request_timings.set(timings)
+        status = 500
+        responded: Optional[float] = None
+
+        async def timed_send(message: Message) -> None:
+            nonlocal status, responded
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                responded = perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            finished = perf_counter()
+            request_timings.reset(token)
+            route = scope.get("route")
+            # Templates rather than paths, so ISRCs do not each get a series
+            template = route.path if isinstance(route, APIRoute) else "unmatched"
+            request_seconds.observe(
+                finished - timings.started, scope["method"], template, str(status)
+            )
+            handler_started = timings.handler_started
+            handler_finished = timings.handler_finished
+            if handler_started is not None and handler_finished is not None:
+                phase_seconds.observe(
+                    handler_started - timings.started, template, "validation"
+                )
+                phase_seconds.observe(
+                    handler_finished - handler_started, template, "handler"
+                )
+                phase_seconds.observe(
+                    (responded or finished) - handler_finished,
+                    template,
+                    "serialization",
+                )
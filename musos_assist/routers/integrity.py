@@ -0,0 +1,89 @@
+from http import HTTPStatus
+from typing import Annotated
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from musos_assist.constants import (
+    DEFAULT_PAGE_SIZE,
+    INTEGRITY_SCAN_NOT_FOUND,
+    INTEGRITY_SCAN_RUNNING,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+)
+from musos_assist.domain.models import IntegrityIssue, IntegrityScan
+from musos_assist.domain.ports import IntegrityScanner
+from musos_assist.routers import default_integrity_scanner
+from musos_assist.routers.instrumentation import InstrumentedRoute
+
+integrity_router = APIRouter(route_class=InstrumentedRoute)
+
+# Scanner errors -> status
+ERROR_STATUS = {
+    INTEGRITY_SCAN_NOT_FOUND: HTTPStatus.NOT_FOUND,
+    INTEGRITY_SCAN_RUNNING: HTTPStatus.CONFLICT,
+}
+
+
+def scan_error(error: ValueError) -> HTTPException:
+    return HTTPException(
+        status_code=ERROR_STATUS.get(str(error), status.HTTP_400_BAD_REQUEST),
+        detail=str(error),
+    )
+
+
+@integrity_router.post(
+    "/integrity/scans",
+    response_model=IntegrityScan,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_scan(
+    scanner: IntegrityScanner = default_integrity_scanner,
+) -> IntegrityScan:
+    """
+    Start checking the whole catalogue in the background: ISRCs well formed
+    and assigned no later than release, registrant codes used by one label,
+    titles not duplicated per artist, and the artwork and audio of each single
+    stored. Follow its progress, and the issues found so far, by its id.
+    """
+    try:
+        return scanner.start_scan()
+    except ValueError as e:
+        raise scan_error(e)
+
+
+@integrity_router.get("/integrity/scans", response_model=list[IntegrityScan])
+async def list_scans(
+    scanner: IntegrityScanner = default_integrity_scanner,
+) -> list[IntegrityScan]:
+    return scanner.list_scans()
+
+
+@integrity_router.get("/integrity/scans/{scan_id}", response_model=IntegrityScan)
+async def read_scan(
+    scan_id: str,
+    scanner: IntegrityScanner = default_integrity_scanner,
+) -> IntegrityScan:
+    try:
+        return scanner.read_scan(scan_id)
+    except ValueError as e:
+        raise scan_error(e)
+
+
+@integrity_router.get(
+    "/integrity/scans/{scan_id}/issues", response_model=list[IntegrityIssue]
+)
+async def list_issues(
+    scan_id: str,
+    response: Response,
+    after: Annotated[
+        int, Query(ge=0, description="Sequence of the last issue seen.")
+    ] = 0,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    scanner: IntegrityScanner = default_integrity_scanner,
+) -> list[IntegrityIssue]:
+    """Issues a scan found after a sequence, oldest first, even while it runs."""
+    try:
+        issues = scanner.issues_after(scan_id, after, limit)
+    except ValueError as e:
+        raise scan_error(e)
+    if len(issues) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(issues[-1].sequence)
+    return issues
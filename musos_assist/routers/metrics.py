@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Response
+from musos_assist.constants import PROMETHEUS_MEDIA_TYPE
+from musos_assist.domain.ports import AsyncMusicSingleReleaseRepository, RenditionCache
+from musos_assist.routers import (
+    default_async_repository,
+    default_rendition_cache,
+    serialized_singles,
+)
+from musos_assist.routers.instrumentation import metrics
+
+metrics_router = APIRouter()
+
+singles = metrics.gauge("musos_singles", "Singles in the catalogue.")
+cache_lookups = metrics.gauge(
+    "musos_cache_lookups_total",
+    "Lookups of each cache, by whether they hit.",
+    "cache",
+    "result",
+    kind="counter",
+)
+cache_hit_ratio = metrics.gauge(
+    "musos_cache_hit_ratio", "Share of the lookups of each cache that hit.", "cache"
+)
+
+
+@metrics_router.get("/metrics", response_class=Response, include_in_schema=False)
+async def read_metrics(
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+    renditions: RenditionCache = default_rendition_cache,
+) -> Response:
+    """Metrics in the Prometheus text format, for dashboards to scrape."""
+    try:
+        singles.set(await repository.count_singles())
+    except NotImplementedError:
+        pass
+    caches = {
+        "serialized_singles": (serialized_singles.hits, serialized_singles.misses)
+    }
+    try:
+        caches["renditions"] = renditions.hit_counts()
+    except NotImplementedError:
+        pass
+    for cache, (hits, misses) in caches.items():
+        cache_lookups.set(hits, cache, "hit")
+        cache_lookups.set(misses, cache, "miss")
+        if hits + misses:
+            cache_hit_ratio.set(hits / (hits + misses), cache)
+    return Response(metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
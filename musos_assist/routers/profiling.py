@@ -0,0 +1,342 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+from time import perf_counter, sleep, time_ns
+from types import FrameType, TracebackType
+from typing import ContextManager, Optional
+from uuid import uuid4
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+from musos_assist.constants import (
+    PROFILE_INTERVAL,
+    PROFILES_KEPT,
+    SPEEDSCOPE_SCHEMA,
+)
+from musos_assist.domain.models import ProfilingSettings
+
+logger = logging.getLogger(__name__)
+
+# A frame of a sampled stack: function, file, first line; and a stack, root first
+Frame = tuple[str, str, int]
+Stack = tuple[Frame, ...]
+
+# Profiles written: nanoseconds, route, duration, id, then the format
+PROFILE_NAME = re.compile(r"^\d+-.*\.(?:speedscope\.json|collapsed)$")
+
+# Roots of the sampled stacks, naming the thread they were taken on
+EVENT_LOOP: Frame = ("[event loop]", "", 0)
+REPOSITORY_WORKER: Frame = ("[repository worker]", "", 0)
+
+
+def sampled_stack(leaf: FrameType, root: FrameType, thread: Frame) -> Optional[Stack]:
+    """
+    The stack from `root` out to `leaf`, or None when `root` is not on it, as
+    when the event loop is running another request.
+    """
+    frames: list[Frame] = []
+    frame: Optional[FrameType] = leaf
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "")
+        frames.append(
+            (f"{module}.{code.co_qualname}", code.co_filename, code.co_firstlineno)
+        )
+        if frame is root:
+            frames.append(thread)
+            return tuple(reversed(frames))
+        frame = frame.f_back
+    return None
+
+
+class RequestProfile:
+    """Stacks sampled from the threads working on one request."""
+
+    def __init__(self, frame: FrameType, thread: int) -> None:
+        # The frame handling the request, and the event loop thread running it
+        self.frame = frame
+        self.thread = thread
+        # Worker thread -> frame its repository call for the request runs under
+        self.workers: dict[int, FrameType] = {}
+        self.samples: list[Stack] = []
+        self.label = ""
+        self.seconds = 0.0
+
+    def sample(self, frames: dict[int, FrameType]) -> None:
+        leaf = frames.get(self.thread)
+        if leaf is not None:
+            stack = sampled_stack(leaf, self.frame, EVENT_LOOP)
+            if stack is not None:
+                self.samples.append(stack)
+        for thread, root in self.workers.items():
+            leaf = frames.get(thread)
+            if leaf is not None:
+                stack = sampled_stack(leaf, root, REPOSITORY_WORKER)
+                if stack is not None:
+                    self.samples.append(stack)
+
+
+# The profile of the request being handled, if it is being profiled
+active_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "active_profile", default=None
+)
+
+NOT_PROFILED: ContextManager[object] = nullcontext()
+
+
+class WorkerScope:
+    """Samples the worker thread entering it as part of a profiled request."""
+
+    def __init__(self, profiler: "Profiler", profile: RequestProfile) -> None:
+        self.profiler = profiler
+        self.profile = profile
+
+    def __enter__(self) -> None:
+        with self.profiler.lock:
+            self.profile.workers[threading.get_ident()] = sys._getframe(1)
+
+    def __exit__(
+        self,
+        kind: Optional[type[BaseException]],
+        error: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        with self.profiler.lock:
+            del self.profile.workers[threading.get_ident()]
+
+
+class Profiler:
+    """
+    Sampling profiler for a fraction of requests. While a profiled request is
+    in flight, a thread takes the stacks of the threads working on it every
+    `interval` seconds: the event loop while it runs the request (validation,
+    the handler and rendering) and the repository workers running its calls.
+    Each profile is written to `directory` once its request is answered, and
+    only the newest `kept` are left there, so that profiling every request
+    does not fill the disk. When off, requests pay one comparison and no
+    sampling thread runs.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        settings: Optional[ProfilingSettings] = None,
+        interval: float = PROFILE_INTERVAL,
+        kept: int = PROFILES_KEPT,
+    ) -> None:
+        settings = settings or ProfilingSettings()
+        self.directory = directory
+        self.rate = settings.rate
+        self.format = settings.format
+        self.interval = interval
+        self.kept = kept
+        self.lock = threading.Lock()
+        self._active: list[RequestProfile] = []
+        self._finished: list[RequestProfile] = []
+        self._sampler: Optional[threading.Thread] = None
+
+    def settings(self) -> ProfilingSettings:
+        return ProfilingSettings(rate=self.rate, format=self.format)
+
+    def configure(self, settings: ProfilingSettings) -> None:
+        """Change the settings; requests already profiled are still written."""
+        with self.lock:
+            self.rate = settings.rate
+            self.format = settings.format
+
+    def sampled(self) -> bool:
+        """Whether to profile the next request."""
+        return self.rate > 0 and random.random() < self.rate
+
+    def begin(self, frame: FrameType) -> RequestProfile:
+        """Start sampling a request handled in `frame` on this thread."""
+        profile = RequestProfile(frame, threading.get_ident())
+        with self.lock:
+            self._active.append(profile)
+            if self._sampler is None:
+                self._sampler = threading.Thread(
+                    target=self._sample, name="musos-profiler", daemon=True
+                )
+                self._sampler.start()
+        return profile
+
+    def end(self, profile: RequestProfile, label: str, seconds: float) -> None:
+        """Stop sampling a request, leaving its profile to be written."""
+        profile.label = label
+        profile.seconds = seconds
+        with self.lock:
+            self._active.remove(profile)
+            self._finished.append(profile)
+
+    def worker_scope(self) -> ContextManager[object]:
+        """Scope for a repository call on a worker thread, in the caller's context."""
+        profile = active_profile.get()
+        if profile is None:
+            return NOT_PROFILED
+        return WorkerScope(self, profile)
+
+    def wait(self) -> None:
+        """Block until every profiled request so far has been written."""
+        sampler = self._sampler
+        while sampler is not None:
+            sampler.join()
+            sampler = self._sampler
+
+    def _sample(self) -> None:
+        """Sample until no request is being profiled and every one is written."""
+        while True:
+            sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for profile in self._active:
+                    profile.sample(frames)
+                finished, self._finished = self._finished, []
+                format = self.format
+            for profile in finished:
+                try:
+                    self._write(profile, format)
+                except OSError:
+                    logger.exception("Cannot write the profile of %s", profile.label)
+            if finished:
+                try:
+                    self._prune()
+                except OSError:
+                    logger.exception("Cannot delete old profiles")
+            with self.lock:
+                if not self._active and not self._finished:
+                    self._sampler = None
+                    return
+
+    def _write(self, profile: RequestProfile, format: str) -> None:
+        if not profile.samples:
+            # Answered within one interval: nothing to see
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", profile.label).strip("-")
+        milliseconds = round(profile.seconds * 1000)
+        extension = "speedscope.json" if format == "speedscope" else "collapsed"
+        name = f"{time_ns()}-{slug}-{milliseconds}ms-{uuid4().hex[:8]}.{extension}"
+        temporary = os.path.join(self.directory, f".{name}")
+        with open(temporary, "w") as file:
+            if format == "speedscope":
+                json.dump(speedscope(profile, self.interval), file)
+            else:
+                file.write(collapsed(profile))
+        os.replace(temporary, os.path.join(self.directory, name))
+
+    def _prune(self) -> None:
+        """Delete all but the newest `kept` profiles, named from when written."""
+        try:
+            names = sorted(
+                name for name in os.listdir(self.directory) if PROFILE_NAME.match(name)
+            )
+        except FileNotFoundError:
+            # Every request answered within one interval: nothing written yet
+            return
+        for name in names[: max(len(names) - self.kept, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def collapsed(profile: RequestProfile) -> str:
+    """Samples as collapsed stacks, one `root;...;leaf count` line per stack."""
+    counts = Counter(profile.samples)
+    return "".join(
+        ";".join(name for name, _, _ in stack) + f" {count}\n"
+        for stack, count in sorted(counts.items())
+    )
+
+
+def speedscope(profile: RequestProfile, interval: float) -> dict[str, object]:
+    """Samples as a speedscope sampled profile, in the order they were taken."""
+    indices: dict[Frame, int] = {}
+    samples = [
+        [indices.setdefault(frame, len(indices)) for frame in stack]
+        for stack in profile.samples
+    ]
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": profile.label,
+        "exporter": "musos-assist",
+        "shared": {
+            "frames": [
+                {"name": name, "file": file, "line": line}
+                for name, file, line in indices
+            ]
+        },
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": f"{profile.label} ({profile.seconds * 1000:.1f} ms)",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": len(samples) * interval,
+                "samples": samples,
+                "weights": [interval] * len(samples),
+            }
+        ],
+    }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the share of HTTP requests its profiler samples."""
+
+    def __init__(self, app: ASGIApp, profiler: Profiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.sampled():
+            await self.app(scope, receive, send)
+            return
+        profile = self.profiler.begin(sys._getframe())
+        token = active_profile.set(profile)
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            active_profile.reset(token)
+            route = scope.get("route")
+            template = route.path if isinstance(route, APIRoute) else "unmatched"
+            self.profiler.end(
+                profile, f"{scope['method']} {template}", perf_counter() - started
+            )
+
+
+# Opt in with MUSOS_PROFILE_RATE, or at runtime through /admin/profiling
+profiler = Profiler(
+    os.getenv("MUSOS_PROFILE_DIR", "profiles"),
+    ProfilingSettings.model_validate(
+        {
+            "rate": os.getenv("MUSOS_PROFILE_RATE", "0"),
+            "format": os.getenv("MUSOS_PROFILE_FORMAT", "speedscope"),
+        }
+    ),
+)
+
+profiling_router = APIRouter()
+
+
+@profiling_router.get(
+    "/admin/profiling", response_model=ProfilingSettings, include_in_schema=False
+)
+async def read_profiling() -> ProfilingSettings:
+    return profiler.settings()
+
+
+@profiling_router.put(
+    "/admin/profiling", response_model=ProfilingSettings, include_in_schema=False
+)
+async def update_profiling(settings: ProfilingSettings) -> ProfilingSettings:
+    """Turn profiling on or off, or change how much of the traffic it samples."""
+    profiler.configure(settings)
+    return profiler.settings()
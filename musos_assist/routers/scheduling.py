@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from datetime import datetime, time, timezone
+from typing import Dict, List
+from fastapi import APIRouter, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from musos_assist.constants import SCHEDULER_BATCH_SIZE, SCHEDULER_POLL_SECONDS
+from musos_assist.domain.models import (
+    ChangeKind,
+    ReleaseAction,
+    ScheduledRelease,
+    ScheduledReleaseRequest,
+)
+from musos_assist.domain.ports import (
+    AsyncMusicSingleReleaseRepository,
+    ChangeFeed,
+    MusicSingleReleaseRepository,
+    ReleaseScheduler,
+    SingleWrite,
+)
+from musos_assist.routers import default_async_repository, default_release_scheduler
+from musos_assist.routers.instrumentation import InstrumentedRoute
+
+logger = logging.getLogger(__name__)
+
+scheduling_router = APIRouter(route_class=InstrumentedRoute)
+
+# The change announced when an action fires
+FIRED_CHANGES: Dict[ReleaseAction, ChangeKind] = {
+    "publish": "published",
+    "promote": "promoted",
+}
+
+
+def fire_due(
+    scheduler: ReleaseScheduler,
+    repository: MusicSingleReleaseRepository,
+    feed: ChangeFeed,
+    now: datetime,
+) -> int:
+    """
+    Fire the actions due by `now`, up to a batch, by announcing them in the
+    change feed with the single as it stands, and return how many were due.
+    Actions on singles no longer in the catalogue are dropped.
+    """
+    releases = scheduler.take_due(now, SCHEDULER_BATCH_SIZE)
+    writes: List[SingleWrite] = []
+    for release in releases:
+        try:
+            single = repository.read_single(release.isrc)
+        except ValueError:
+            logger.warning(
+                "Dropping %s of %s: single not found", release.action, release.isrc
+            )
+            continue
+        writes.append((FIRED_CHANGES[release.action], release.isrc, single))
+    if writes:
+        feed.record(writes)
+    scheduler.complete([release.id for release in releases])
+    return len(releases)
+
+
+async def run_scheduler(
+    scheduler: ReleaseScheduler,
+    repository: MusicSingleReleaseRepository,
+    feed: ChangeFeed,
+    poll: float = SCHEDULER_POLL_SECONDS,
+) -> None:
+    """
+    Fire scheduled actions as they fall due, until cancelled. Sleeps until the
+    soonest is due, but no longer than `poll`, to see those scheduled since.
+    """
+    while True:
+        try:
+            now = datetime.now(timezone.utc)
+            fired = await run_in_threadpool(fire_due, scheduler, repository, feed, now)
+            if fired == SCHEDULER_BATCH_SIZE:
+                continue
+            next_due = await run_in_threadpool(scheduler.next_due)
+        except Exception:
+            logger.exception("Failed to fire scheduled release actions")
+            next_due = None
+        delay = poll
+        if next_due is not None:
+            delay = min(poll, (next_due - datetime.now(timezone.utc)).total_seconds())
+        await asyncio.sleep(max(delay, 0))
+
+
+@scheduling_router.post(
+    "/singles/{isrc}/schedule",
+    response_model=ScheduledRelease,
+    status_code=status.HTTP_201_CREATED,
+)
+async def schedule_release(
+    isrc: str,
+    request: ScheduledReleaseRequest,
+    repository: AsyncMusicSingleReleaseRepository = default_async_repository,
+    scheduler: ReleaseScheduler = default_release_scheduler,
+) -> ScheduledRelease:
+    """
+    Schedule an action on a single, by default at the start of its release
+    date in UTC. Actions already due fire at once.
+    """
+    try:
+        single = await repository.read_single(isrc)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    due = request.due or datetime.combine(single.release_date, time(), timezone.utc)
+    return await run_in_threadpool(scheduler.schedule, isrc, request.action, due)
+
+
+@scheduling_router.get(
+    "/singles/{isrc}/schedule", response_model=list[ScheduledRelease]
+)
+async def list_scheduled_releases(
+    isrc: str,
+    scheduler: ReleaseScheduler = default_release_scheduler,
+) -> list[ScheduledRelease]:
+    """The actions waiting for a single, soonest first."""
+    return await run_in_threadpool(scheduler.list_scheduled, isrc)
+
+
+@scheduling_router.delete(
+    "/singles/{isrc}/schedule/{release_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def cancel_scheduled_release(
+    isrc: str,
+    release_id: str,
+    scheduler: ReleaseScheduler = default_release_scheduler,
+) -> None:
+    try:
+        await run_in_threadpool(scheduler.cancel, isrc, release_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
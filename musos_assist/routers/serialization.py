@@ -0,0 +1,56 @@
+import json
+import os
+from typing import List, Mapping, Optional
+from fastapi import Response, status
+from pydantic import TypeAdapter
+from musos_assist.domain.models import MusicSingleRelease
+
+# Opt in with MUSOS_FAST_SERIALIZATION=1 to render repository output directly,
+# without FastAPI first validating it again against the response model
+FAST_SERIALIZATION = os.getenv("MUSOS_FAST_SERIALIZATION", "") == "1"
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Built once: the serializers are compiled when the adapter is created
+SINGLE_SERIALIZER = TypeAdapter(MusicSingleRelease)
+SINGLES_SERIALIZER = TypeAdapter(List[MusicSingleRelease])
+
+
+def render_single(single: MusicSingleRelease) -> bytes:
+    return SINGLE_SERIALIZER.dump_json(single)
+
+
+def render_single_validated(single: MusicSingleRelease) -> bytes:
+    """
+    Render a single as FastAPI renders a response model: dumped, validated
+    again, then encoded by the json module.
+    """
+    content = SINGLE_SERIALIZER.dump_python(
+        SINGLE_SERIALIZER.validate_python(single.model_dump()), mode="json"
+    )
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def serialize_single(single: MusicSingleRelease) -> bytes:
+    """Render a single with the fast path's serializer if opted in."""
+    if FAST_SERIALIZATION:
+        return render_single(single)
+    return render_single_validated(single)
+
+
+def render_singles(singles: List[MusicSingleRelease]) -> bytes:
+    """Render a list as one JSON array in a single pass through pydantic-core."""
+    return SINGLES_SERIALIZER.dump_json(singles)
+
+
+def trusted_json(
+    body: bytes,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """A JSON response for bytes already rendered from trusted models."""
+    return Response(
+        body, status_code=status_code, media_type=JSON_MEDIA_TYPE, headers=headers
+    )
@@ -0,0 +1,291 @@
+import asyncio
+import json
+import re
+import time
+from typing import Optional
+from urllib.parse import parse_qsl
+import h11
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from musos_assist.adapters.snapshots import SnapshotFollower, SnapshotPublisher
+from musos_assist.constants import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NDJSON_MEDIA_TYPE,
+    NEXT_CURSOR_HEADER,
+    OWNER_UNAVAILABLE,
+    SINGLE_NOT_FOUND,
+    SNAPSHOT_POLL_SECONDS,
+    SNAPSHOT_VERSION_HEADER,
+    SNAPSHOT_WAIT_SECONDS,
+)
+from musos_assist.routers.caching import etag_matches, revision_etag
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Headers about one connection, not passed on by a proxy
+HOP_BY_HOP = {
+    b"connection",
+    b"keep-alive",
+    b"proxy-connection",
+    b"te",
+    b"trailer",
+    b"transfer-encoding",
+    b"upgrade",
+}
+SINGLE_PATH = re.compile(r"^/singles/([A-Z]{2}[A-Z0-9]{3}\d{7})$")
+FORWARD_CHUNK_SIZE = 64 * 1024
+
+
+class SnapshotVersionMiddleware:
+    """
+    ASGI middleware of the process owning the catalogue, telling reader
+    workers which snapshot has the writes of each request that may write.
+    """
+
+    def __init__(self, app: ASGIApp, publisher: SnapshotPublisher) -> None:
+        self.app = app
+        self.publisher = publisher
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def versioned_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    SNAPSHOT_VERSION_HEADER, str(self.publisher.wanted_version())
+                )
+            await send(message)
+
+        await self.app(scope, receive, versioned_send)
+
+
+def json_response(
+    status: int, body: bytes, version: int, headers: Optional[dict[str, str]] = None
+) -> list[Message]:
+    return [
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"no-cache"),
+                (SNAPSHOT_VERSION_HEADER.lower().encode(), str(version).encode()),
+                *(
+                    (name.lower().encode(), value.encode())
+                    for name, value in (headers or {}).items()
+                ),
+            ],
+        },
+        {"type": "http.response.body", "body": body},
+    ]
+
+
+def not_modified_response(etag: str, version: int) -> list[Message]:
+    return [
+        {
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [
+                (b"etag", etag.encode()),
+                (b"cache-control", b"no-cache"),
+                (SNAPSHOT_VERSION_HEADER.lower().encode(), str(version).encode()),
+            ],
+        },
+        {"type": "http.response.body", "body": b""},
+    ]
+
+
+def conditional_response(
+    body: bytes,
+    version: int,
+    etag: str,
+    if_none_match: Optional[str],
+    headers: Optional[dict[str, str]] = None,
+) -> list[Message]:
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag, version)
+    return json_response(200, body, version, {**(headers or {}), "ETag": etag})
+
+
+class SnapshotReaderApp:
+    """
+    ASGI app of a reader worker. Reads of singles, and unfiltered pages of
+    the catalogue, are answered from the latest snapshot the owner published,
+    sliced from shared memory without parsing, with the ETags the owner would
+    give them and 304 for those the client already has; every other request
+    is forwarded to the owner over its Unix socket. The response to a forwarded
+    write is held until the snapshot with the write is published, so that
+    whichever worker a client reads from next sees it.
+    """
+
+    def __init__(self, follower: SnapshotFollower, owner_socket: str) -> None:
+        self.follower = follower
+        self.owner_socket = owner_socket
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        messages = self.read(scope) if scope["method"] == "GET" else None
+        if messages is None:
+            await self.forward(scope, receive, send)
+            return
+        for message in messages:
+            await send(message)
+
+    async def lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def read(self, scope: Scope) -> Optional[list[Message]]:
+        """Answer a read from the snapshot, or None to forward it."""
+        snapshot = self.follower.current()
+        if snapshot is None:
+            return None
+        if_none_match: Optional[str] = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+        match = SINGLE_PATH.match(scope["path"])
+        if match is not None:
+            isrc = match.group(1)
+            found = snapshot.find(isrc)
+            if found is None:
+                detail = json.dumps({"detail": SINGLE_NOT_FOUND}).encode()
+                return json_response(404, detail, snapshot.version)
+            row, revision = found
+            # Without revisions in the snapshot only the owner can tell
+            if not revision:
+                if if_none_match is not None:
+                    return None
+                return json_response(200, bytes(row), snapshot.version)
+            etag = revision_etag(isrc, revision)
+            return conditional_response(
+                bytes(row), snapshot.version, etag, if_none_match
+            )
+        if scope["path"] != "/singles/":
+            return None
+        for name, value in scope["headers"]:
+            if name == b"accept" and NDJSON_MEDIA_TYPE.encode() in value:
+                return None
+        if if_none_match is not None and not snapshot.catalogue_revision:
+            return None
+        params = dict(parse_qsl(scope["query_string"].decode()))
+        if not params.keys() <= {"after", "limit"}:
+            return None
+        limit: Optional[int] = None
+        if "limit" in params:
+            if not params["limit"].isdigit():
+                return None
+            limit = int(params["limit"])
+            if not 1 <= limit <= MAX_PAGE_SIZE:
+                return None
+        elif "after" in params:
+            limit = DEFAULT_PAGE_SIZE
+        rows, last = snapshot.page(params.get("after"), limit)
+        headers = {}
+        if limit is not None and len(rows) == limit and last is not None:
+            headers[NEXT_CURSOR_HEADER] = last
+        body = b"[" + b",".join(rows) + b"]"
+        if not snapshot.catalogue_revision:
+            return json_response(200, body, snapshot.version, headers)
+        etag = revision_etag(snapshot.catalogue_revision)
+        return conditional_response(
+            body, snapshot.version, etag, if_none_match, headers
+        )
+
+    async def wait_published(self, version: int) -> None:
+        deadline = time.monotonic() + SNAPSHOT_WAIT_SECONDS
+        while self.follower.latest_version() < version and time.monotonic() < deadline:
+            await asyncio.sleep(SNAPSHOT_POLL_SECONDS)
+
+    async def forward(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.owner_socket)
+        except OSError:
+            body = json.dumps({"detail": OWNER_UNAVAILABLE}).encode()
+            for message in json_response(502, body, self.follower.latest_version()):
+                await send(message)
+            return
+        try:
+            connection = h11.Connection(h11.CLIENT)
+            headers = [
+                (name, value)
+                for name, value in scope["headers"]
+                if name.lower() not in HOP_BY_HOP
+            ]
+            if not any(name == b"host" for name, _ in headers):
+                headers.append((b"host", b"owner"))
+            if not any(name == b"content-length" for name, _ in headers):
+                headers.append((b"transfer-encoding", b"chunked"))
+            headers.append((b"connection", b"close"))
+            target = scope["raw_path"] or scope["path"].encode()
+            if scope["query_string"]:
+                target += b"?" + scope["query_string"]
+            request = h11.Request(
+                method=scope["method"], target=target, headers=headers
+            )
+            writer.write(connection.send(request) or b"")
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                if message.get("body"):
+                    data = h11.Data(data=message["body"])
+                    writer.write(connection.send(data) or b"")
+                    await writer.drain()
+                if not message.get("more_body"):
+                    break
+            writer.write(connection.send(h11.EndOfMessage()) or b"")
+            await writer.drain()
+            await self.relay(connection, reader, send)
+        finally:
+            writer.close()
+
+    async def relay(
+        self, connection: h11.Connection, reader: asyncio.StreamReader, send: Send
+    ) -> None:
+        """Pass the owner's response on to the client as it arrives."""
+        while True:
+            event = connection.next_event()
+            if event is h11.NEED_DATA:
+                connection.receive_data(await reader.read(FORWARD_CHUNK_SIZE))
+            elif isinstance(event, h11.Response):
+                version = dict(event.headers).get(
+                    SNAPSHOT_VERSION_HEADER.lower().encode()
+                )
+                if version is not None:
+                    await self.wait_published(int(version))
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": event.status_code,
+                        "headers": [
+                            (name, value)
+                            for name, value in event.headers
+                            if name not in HOP_BY_HOP
+                        ],
+                    }
+                )
+            elif isinstance(event, h11.Data):
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": bytes(event.data),
+                        "more_body": True,
+                    }
+                )
+            elif isinstance(event, (h11.EndOfMessage, h11.ConnectionClosed)):
+                await send({"type": "http.response.body", "body": b""})
+                return
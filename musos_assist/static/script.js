@@ -1,7 +1,7 @@
 
-document.addEventListener("DOMContentLoaded", async () => {
+async function showFirstSingle() {
     try {
-        const response = await fetch("/singles/");
+        const response = await fetch("/singles/?limit=1");
         const singles = await response.json();
         if (singles.length > 0) {
             const single = singles[0]; // Assuming we want the first single for now
@@ -30,4 +30,13 @@ document.addEventListener("DOMContentLoaded", async () => {
     } catch (error) {
         console.error("Error fetching singles:", error);
     }
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+    showFirstSingle();
+    // Refresh as the catalogue changes, rather than polling it
+    const changes = new EventSource("/singles/changes");
+    for (const kind of ["created", "updated", "deleted"]) {
+        changes.addEventListener(kind, showFirstSingle);
+    }
 });
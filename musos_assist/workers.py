@@ -0,0 +1,83 @@
+"""
+Serve the API from several processes: one owning the catalogue, publishing
+snapshots of it to shared memory, and reader workers answering reads from
+them and forwarding every other request to the owner.
+
+    python -m musos_assist.workers --workers 4 --port 8000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uvicorn
+from musos_assist.adapters.snapshots import POINTER_FILE, SnapshotFollower
+from musos_assist.routers.snapshots import SnapshotReaderApp
+
+SNAPSHOT_DIR = os.getenv(
+    "MUSOS_SNAPSHOT_DIR",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+        "musos-snapshots",
+    ),
+)
+OWNER_SOCKET = os.getenv("MUSOS_OWNER_SOCKET", os.path.join(SNAPSHOT_DIR, "owner.sock"))
+
+# Imported by each reader worker uvicorn starts
+reader_app = SnapshotReaderApp(SnapshotFollower(SNAPSHOT_DIR), OWNER_SOCKET)
+
+
+def start_owner(
+    directory: str, socket: str, timeout: float
+) -> "subprocess.Popen[bytes]":
+    """Start the process owning the catalogue; return once it has published."""
+    owner = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "musos_assist:app", "--uds", socket],
+        env={**os.environ, "MUSOS_PUBLISH_SNAPSHOTS": directory},
+    )
+    follower = SnapshotFollower(directory)
+    deadline = time.monotonic() + timeout
+    while not (os.path.exists(socket) and follower.current() is not None):
+        if owner.poll() is not None or time.monotonic() > deadline:
+            owner.kill()
+            raise RuntimeError("Catalogue owner failed to start")
+        time.sleep(0.1)
+    return owner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve the API from an owner process and reader workers."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    socket = os.path.join(args.snapshot_dir, "owner.sock")
+    os.makedirs(args.snapshot_dir, exist_ok=True)
+    # Left by an earlier run, whose snapshots readers must not serve
+    for name in (POINTER_FILE, "owner.sock"):
+        if os.path.exists(os.path.join(args.snapshot_dir, name)):
+            os.remove(os.path.join(args.snapshot_dir, name))
+    owner = start_owner(args.snapshot_dir, socket, args.startup_timeout)
+    # Inherited by the reader workers
+    os.environ["MUSOS_SNAPSHOT_DIR"] = args.snapshot_dir
+    os.environ["MUSOS_OWNER_SOCKET"] = socket
+    try:
+        uvicorn.run(
+            "musos_assist.workers:reader_app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+        )
+    finally:
+        owner.terminate()
+        owner.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from typing import Iterator
+import pytest
+from musos_assist import app
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.routers import get_repository
+
+
+@pytest.fixture
+def fresh_repository() -> Iterator[InMemoryMusicSingleReleaseRepository]:
+    """Fixture to route requests to an empty repository for the test."""
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    app.dependency_overrides[get_repository] = lambda: repository
+    yield repository
+    app.dependency_overrides.clear()
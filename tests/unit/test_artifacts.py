@@ -0,0 +1,319 @@
+import hashlib
+import random
+from pathlib import Path
+from typing import Any, Iterator
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters.artifacts import FileSystemArtifactStore
+from musos_assist.constants import (
+    ARTIFACT_BLOCK_SIZE,
+    ARTIFACT_NOT_FOUND,
+    CHUNK_DIGEST_MISMATCH,
+    CHUNK_TOO_LARGE,
+    EXAMPLE_SINGLE_DATA,
+    UPLOAD_BUSY,
+    UPLOAD_INCOMPLETE,
+    UPLOAD_NOT_ALIGNED,
+    UPLOAD_NOT_FOUND,
+    UPLOAD_OFFSET_MISMATCH,
+)
+from musos_assist.domain.models import ArtifactUploadRequest
+from musos_assist.routers import get_artifact_store
+
+client = TestClient(app)
+ISRC = EXAMPLE_SINGLE_DATA["isrc"]
+# Two and a half blocks, so files end on a short block
+CONTENT = random.Random(0).randbytes(ARTIFACT_BLOCK_SIZE * 5 // 2)
+SIZE = len(CONTENT)
+
+
+def _start(
+    store: FileSystemArtifactStore,
+    size: int = SIZE,
+    name: str = "master.flac",
+    isrc: str = ISRC,
+) -> str:
+    request = ArtifactUploadRequest(name=name, media_type="audio/flac", size=size)
+    return store.start_upload(isrc, request).upload_id
+
+
+def _append(
+    store: FileSystemArtifactStore, upload_id: str, offset: int, data: bytes
+) -> int:
+    writer = store.open_chunk(upload_id, offset)
+    try:
+        writer.write(data)
+        return writer.commit().offset
+    finally:
+        writer.close()
+
+
+def _store(
+    store: FileSystemArtifactStore,
+    content: bytes = CONTENT,
+    name: str = "master.flac",
+    isrc: str = ISRC,
+) -> None:
+    upload_id = _start(store, len(content), name, isrc)
+    _append(store, upload_id, 0, content)
+    store.complete_upload(upload_id)
+
+
+def _read(store: FileSystemArtifactStore, name: str, isrc: str = ISRC) -> bytes:
+    return b"".join(
+        Path(path).read_bytes() for path in store.artifact_blocks(isrc, name)
+    )
+
+
+def _block_digests(content: bytes) -> list[str]:
+    return [
+        hashlib.sha256(content[start : start + ARTIFACT_BLOCK_SIZE]).hexdigest()
+        for start in range(0, len(content), ARTIFACT_BLOCK_SIZE)
+    ]
+
+
+def _stored_blocks(root: Path) -> int:
+    return sum(1 for path in (root / "blocks").glob("*/*"))
+
+
+@pytest.fixture
+def artifact_store(tmp_path: Path) -> Iterator[FileSystemArtifactStore]:
+    """Fixture to route artifact requests to a store in a temporary directory."""
+    store = FileSystemArtifactStore(str(tmp_path))
+    app.dependency_overrides[get_artifact_store] = lambda: store
+    yield store
+    app.dependency_overrides.pop(get_artifact_store)
+
+
+def test_upload_in_chunks_and_complete(tmp_path: Path) -> None:
+    store = FileSystemArtifactStore(str(tmp_path))
+    upload_id = _start(store)
+    # Chunks that straddle block boundaries
+    assert _append(store, upload_id, 0, CONTENT[:1000]) == 1000
+    middle = ARTIFACT_BLOCK_SIZE + 5
+    assert _append(store, upload_id, 1000, CONTENT[1000:middle]) == middle
+    assert store.read_upload(upload_id).offset == middle
+    assert _append(store, upload_id, middle, CONTENT[middle:]) == SIZE
+    artifact = store.complete_upload(upload_id)
+    assert artifact.sha256 == hashlib.sha256(CONTENT).hexdigest()
+    assert _read(store, "master.flac") == CONTENT
+    assert len(store.artifact_blocks(ISRC, "master.flac")) == 3
+    assert store.list_artifacts(ISRC) == [artifact]
+    with pytest.raises(ValueError, match=UPLOAD_NOT_FOUND):
+        store.read_upload(upload_id)
+
+
+def test_upload_resumes_in_a_new_process(tmp_path: Path) -> None:
+    upload_id = _start(FileSystemArtifactStore(str(tmp_path)))
+    offset = ARTIFACT_BLOCK_SIZE + 5000
+    _append(FileSystemArtifactStore(str(tmp_path)), upload_id, 0, CONTENT[:offset])
+    # A fresh store has no running digest and rebuilds it from disk
+    store = FileSystemArtifactStore(str(tmp_path))
+    assert store.read_upload(upload_id).offset == offset
+    _append(store, upload_id, offset, CONTENT[offset:])
+    assert (
+        store.complete_upload(upload_id).sha256 == hashlib.sha256(CONTENT).hexdigest()
+    )
+
+
+def test_chunk_rejections(tmp_path: Path) -> None:
+    store = FileSystemArtifactStore(str(tmp_path))
+    upload_id = _start(store, size=10)
+    with pytest.raises(ValueError, match=UPLOAD_OFFSET_MISMATCH):
+        store.open_chunk(upload_id, 3)
+    writer = store.open_chunk(upload_id, 0)
+    with pytest.raises(ValueError, match=UPLOAD_BUSY):
+        store.open_chunk(upload_id, 0)
+    with pytest.raises(ValueError, match=CHUNK_TOO_LARGE):
+        writer.write(b"x" * 11)
+    writer.close()
+    with pytest.raises(ValueError, match=UPLOAD_INCOMPLETE):
+        store.complete_upload(upload_id)
+    with pytest.raises(ValueError, match=UPLOAD_NOT_FOUND):
+        store.read_upload("../../etc/passwd")
+    with pytest.raises(ValueError, match=ARTIFACT_NOT_FOUND):
+        store.read_artifact(ISRC, "../secret")
+
+
+def test_chunk_with_wrong_digest_is_discarded(tmp_path: Path) -> None:
+    store = FileSystemArtifactStore(str(tmp_path), collection_delay=3600)
+    upload_id = _start(store)
+    _append(store, upload_id, 0, CONTENT[:10])
+    rest = CONTENT[10:]
+    writer = store.open_chunk(upload_id, 10, sha256=hashlib.sha256(b"xyz").hexdigest())
+    writer.write(rest)
+    with pytest.raises(ValueError, match=CHUNK_DIGEST_MISMATCH):
+        writer.commit()
+    writer.close()
+    assert store.read_upload(upload_id).offset == 10
+    # The blocks the discarded chunk filled are released
+    assert store.collect_garbage() == 2
+    # An interrupted chunk with a digest is discarded too
+    writer = store.open_chunk(upload_id, 10, sha256=hashlib.sha256(rest).hexdigest())
+    writer.write(rest[:20])
+    writer.close()
+    assert store.read_upload(upload_id).offset == 10
+    _append(store, upload_id, 10, rest)
+    assert (
+        store.complete_upload(upload_id).sha256 == hashlib.sha256(CONTENT).hexdigest()
+    )
+    assert _read(store, "master.flac") == CONTENT
+
+
+def test_identical_blocks_are_stored_once(tmp_path: Path) -> None:
+    store = FileSystemArtifactStore(str(tmp_path))
+    _store(store, name="radio-edit.flac")
+    _store(store, name="extended-mix.flac", isrc="USX9P2400002")
+    # A version sharing its first block and differing afterwards
+    acoustic = CONTENT[:ARTIFACT_BLOCK_SIZE] + CONTENT[:1000]
+    _store(store, acoustic, name="acoustic.flac")
+    assert _stored_blocks(tmp_path) == 4
+    assert _read(store, "acoustic.flac") == acoustic
+    assert _read(store, "extended-mix.flac", "USX9P2400002") == CONTENT
+
+
+def test_reuse_blocks_skips_uploading_stored_content(tmp_path: Path) -> None:
+    store = FileSystemArtifactStore(str(tmp_path))
+    _store(store)
+    edit = CONTENT[: ARTIFACT_BLOCK_SIZE * 2] + b"a different ending"
+    digests = _block_digests(edit)
+    upload_id = _start(store, len(edit), "radio-edit.flac")
+    upload = store.reuse_blocks(upload_id, 0, digests)
+    # The first two blocks are stored; the short last one is not
+    assert upload.offset == ARTIFACT_BLOCK_SIZE * 2
+    _append(store, upload_id, upload.offset, edit[upload.offset :])
+    artifact = store.complete_upload(upload_id)
+    assert artifact.sha256 == hashlib.sha256(edit).hexdigest()
+    assert _read(store, "radio-edit.flac") == edit
+    # A whole file can be reused, its short last block included
+    upload_id = _start(store, SIZE, "copy.flac")
+    assert store.reuse_blocks(upload_id, 0, _block_digests(CONTENT)).offset == SIZE
+    store.complete_upload(upload_id)
+    assert _stored_blocks(tmp_path) == 4
+    upload_id = _start(store, SIZE, "other.flac")
+    _append(store, upload_id, 0, CONTENT[:10])
+    with pytest.raises(ValueError, match=UPLOAD_NOT_ALIGNED):
+        store.reuse_blocks(upload_id, 10, digests)
+
+
+def test_unreferenced_blocks_are_collected(tmp_path: Path) -> None:
+    store = FileSystemArtifactStore(str(tmp_path), collection_delay=3600)
+    _store(store, name="a.flac")
+    _store(store, name="b.flac")
+    store.delete_artifact(ISRC, "a.flac")
+    assert store.collect_garbage() == 0
+    assert _read(store, "b.flac") == CONTENT
+    # Replacing an artifact releases the blocks of the old content
+    _store(store, b"new content", name="b.flac")
+    assert store.collect_garbage() == 3
+    store.abort_upload(_start(store))
+    store.delete_artifacts(ISRC)
+    assert store.collect_garbage() == 1
+    assert _stored_blocks(tmp_path) == 0
+
+
+def test_background_collection_and_recount(tmp_path: Path) -> None:
+    store = FileSystemArtifactStore(str(tmp_path), collection_delay=0)
+    _store(store)
+    store.delete_artifact(ISRC, "master.flac")
+    collector = store._collector
+    assert collector is not None
+    collector.join(timeout=5)
+    assert _stored_blocks(tmp_path) == 0
+    # Blocks left unreferenced by an earlier process are found on first use
+    _store(FileSystemArtifactStore(str(tmp_path)))
+    (tmp_path / "lists" / ISRC / "master.flac").unlink()
+    store = FileSystemArtifactStore(str(tmp_path), collection_delay=3600)
+    assert store.collect_garbage() == 3
+
+
+def test_move_artifacts(tmp_path: Path) -> None:
+    store = FileSystemArtifactStore(str(tmp_path))
+    _store(store, b"abc")
+    store.move_artifacts(ISRC, "USX9P2400002")
+    assert store.list_artifacts(ISRC) == []
+    (artifact,) = store.list_artifacts("USX9P2400002")
+    assert artifact.isrc == "USX9P2400002"
+    assert _read(store, "master.flac", "USX9P2400002") == b"abc"
+
+
+def test_artifact_api(fresh_repository: Any, artifact_store: Any) -> None:
+    """Test a chunked upload over HTTP, then ranged and full downloads."""
+    announce = {"name": "master.flac", "media_type": "audio/flac", "size": SIZE}
+    uploads = f"/singles/{ISRC}/artifacts/uploads"
+    assert client.post(uploads, json=announce).status_code == 404
+    client.post("/singles/", json=EXAMPLE_SINGLE_DATA)
+    response = client.post(uploads, json=announce)
+    assert response.status_code == 201
+    assert response.json()["block_size"] == ARTIFACT_BLOCK_SIZE
+    location = response.headers["Location"]
+
+    half = SIZE // 2
+    digest = hashlib.sha256(CONTENT[half:]).hexdigest()
+    response = client.patch(
+        location, content=CONTENT[:half], headers={"Upload-Offset": "0"}
+    )
+    assert response.headers["Upload-Offset"] == str(half)
+    response = client.patch(
+        location,
+        content=CONTENT[half:],
+        headers={"Upload-Offset": "0", "X-Chunk-SHA256": digest},
+    )
+    assert response.status_code == 409
+    response = client.patch(
+        location,
+        content=CONTENT[half:][::-1],
+        headers={"Upload-Offset": str(half), "X-Chunk-SHA256": digest},
+    )
+    assert response.status_code == 422
+    assert client.get(location).json()["offset"] == half
+    response = client.patch(
+        location,
+        content=CONTENT[half:],
+        headers={"Upload-Offset": str(half), "X-Chunk-SHA256": digest},
+    )
+    assert response.json()["offset"] == SIZE
+    response = client.post(f"{location}/complete")
+    assert response.status_code == 201
+    sha256 = response.json()["sha256"]
+
+    url = f"/singles/{ISRC}/artifacts/master.flac"
+    response = client.get(url)
+    assert response.content == CONTENT
+    assert response.headers["Content-Type"] == "audio/flac"
+    assert response.headers["ETag"] == f'"{sha256}"'
+    # A range spanning a block boundary
+    start = ARTIFACT_BLOCK_SIZE - 100
+    response = client.get(url, headers={"Range": f"bytes={start}-{start + 199}"})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes {start}-{start + 199}/{SIZE}"
+    assert response.content == CONTENT[start : start + 200]
+    assert client.get(url, headers={"Range": "bytes=-10"}).content == CONTENT[-10:]
+    response = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    response = client.get(url, headers={"Range": f"bytes={SIZE}-"})
+    assert response.status_code == 416
+
+    # Another single reusing the stored blocks uploads nothing
+    client.post("/singles/", json={**EXAMPLE_SINGLE_DATA, "isrc": "USX9P2400002"})
+    response = client.post("/singles/USX9P2400002/artifacts/uploads", json=announce)
+    response = client.post(
+        f"{response.headers['Location']}/blocks",
+        json=_block_digests(CONTENT),
+        headers={"Upload-Offset": "0"},
+    )
+    assert response.json()["offset"] == SIZE
+    assert client.post(f"{response.headers['Location']}/complete").status_code == 201
+
+    assert [a["name"] for a in client.get(f"/singles/{ISRC}/artifacts").json()] == [
+        "master.flac"
+    ]
+    # Deleting or renaming a single takes its artifacts along
+    client.delete(f"/singles/{ISRC}")
+    assert client.get(url).status_code == 404
+    client.put(
+        "/singles/USX9P2400002", json={**EXAMPLE_SINGLE_DATA, "isrc": "USX9P2400003"}
+    )
+    assert client.get("/singles/USX9P2400003/artifacts/master.flac").status_code == 200
+    assert client.get(location).status_code == 404
@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+from typing import Any
+from httpx import Response
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.constants import (
+    CSV_MEDIA_TYPE,
+    CSV_NOT_UTF8,
+    EXAMPLE_SINGLE_DATA,
+    NDJSON_MEDIA_TYPE,
+    SINGLE_NOT_FOUND,
+)
+
+client = TestClient(app)
+
+
+def _rows(count: int, start: int = 0) -> list[dict[str, Any]]:
+    rows = []
+    for n in range(start, start + count):
+        row = EXAMPLE_SINGLE_DATA.copy()
+        row["isrc"] = f"USX9P24{n:05d}"
+        row["title"] = f"Song {n}"
+        rows.append(row)
+    return rows
+
+
+def _ndjson(rows: list[dict[str, Any]]) -> str:
+    return "\n".join(json.dumps(row) for row in rows) + "\n"
+
+
+def _post(
+    body: str, mode: str = "create", media_type: str = NDJSON_MEDIA_TYPE
+) -> Response:
+    response: Response = client.post(
+        "/singles/bulk",
+        params={"mode": mode},
+        content=body,
+        headers={"Content-Type": media_type},
+    )
+    return response
+
+
+def test_bulk_create_ndjson(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+) -> None:
+    """Test importing many singles from NDJSON in one request."""
+    response = _post(_ndjson(_rows(2500)))
+    assert response.status_code == 200
+    assert response.json() == {"processed": 2500, "applied": 2500, "errors": []}
+    assert len(fresh_repository.list_singles()) == 2500
+
+
+def test_bulk_create_reports_invalid_rows_atomically(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+) -> None:
+    """Test that one invalid row rejects the whole import with a row report."""
+    rows = _rows(5)
+    del rows[1]["title"]
+    rows[3]["isrc"] = "bad"
+    body = _ndjson(rows) + "{not json}\n"
+    response = _post(body)
+    assert response.status_code == 422
+    report = response.json()["detail"]
+    assert report["processed"] == 6
+    assert report["applied"] == 0
+    assert [error["row"] for error in report["errors"]] == [1, 3, 5]
+    assert report["errors"][0]["message"].startswith("title:")
+    assert report["errors"][1]["isrc"] == "bad"
+    assert fresh_repository.list_singles() == []
+
+
+def test_bulk_rejects_bodies_not_utf8(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+) -> None:
+    """Test that bytes that are not UTF-8 are reported, not a server error."""
+    body = _ndjson(_rows(2)).encode() + b'{"isrc": "\xff"}\n'
+    response = client.post("/singles/bulk", content=body)
+    assert response.status_code == 422
+    [error] = response.json()["detail"]["errors"]
+    assert error["row"] == 2 and error["message"].startswith("Invalid UTF-8")
+    response = client.post("/singles/bulk/delete", content=body)
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"][0]["row"] == 2
+    body = b"isrc,title\nUSX9P2400001,\xff\n"
+    for path in ("/singles/bulk", "/singles/bulk/delete"):
+        response = client.post(
+            path, content=body, headers={"Content-Type": CSV_MEDIA_TYPE}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"] == CSV_NOT_UTF8
+    assert fresh_repository.list_singles() == []
+
+
+def test_bulk_create_conflicts(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+) -> None:
+    """Test that existing and repeated ISRCs are reported per row."""
+    _post(_ndjson(_rows(1)))
+    rows = _rows(3)
+    rows.append(rows[2])
+    response = _post(_ndjson(rows))
+    assert response.status_code == 409
+    errors = response.json()["detail"]["errors"]
+    assert [(error["row"], error["message"]) for error in errors] == [
+        (0, "ISRC already exists"),
+        (3, "ISRC repeated within the batch"),
+    ]
+    assert len(fresh_repository.list_singles()) == 1
+
+
+def test_bulk_upsert(fresh_repository: InMemoryMusicSingleReleaseRepository) -> None:
+    """Test that upserts create new singles and replace existing ones."""
+    _post(_ndjson(_rows(2)))
+    rows = _rows(3)
+    rows[0]["title"] = "Replaced"
+    response = _post(_ndjson(rows), mode="upsert")
+    assert response.json()["applied"] == 3
+    assert fresh_repository.read_single(rows[0]["isrc"]).title == "Replaced"
+    assert len(fresh_repository.list_singles()) == 3
+
+
+def test_bulk_create_csv(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+) -> None:
+    """Test importing singles from CSV with list and empty cells."""
+    body = (
+        "isrc,title,artist_names,release_date,genres,label\n"
+        "USX9P2400001,First,Band A;Band B,2024-01-15,Rock,\n"
+        'USX9P2400002,"Second, with comma",Band C,2024-02-01,Pop;Indie,Label\n'
+    )
+    response = _post(body, media_type=CSV_MEDIA_TYPE)
+    assert response.status_code == 200
+    first = fresh_repository.read_single("USX9P2400001")
+    assert first.artist_names == ["Band A", "Band B"]
+    assert first.label is None
+    assert fresh_repository.read_single("USX9P2400002").genres == ["Pop", "Indie"]
+
+
+def test_bulk_delete(fresh_repository: InMemoryMusicSingleReleaseRepository) -> None:
+    """Test deleting many singles, atomically."""
+    rows = _rows(3)
+    _post(_ndjson(rows))
+    body = _ndjson([{"isrc": rows[0]["isrc"]}, {"isrc": "USX9P2499999"}])
+    response = client.post("/singles/bulk/delete", content=body)
+    assert response.status_code == 404
+    assert response.json()["detail"]["errors"] == [
+        {"row": 1, "isrc": "USX9P2499999", "message": SINGLE_NOT_FOUND}
+    ]
+    assert len(fresh_repository.list_singles()) == 3
+
+    body = _ndjson([{"isrc": row["isrc"]} for row in rows[:2]])
+    response = client.post("/singles/bulk/delete", content=body)
+    assert response.json()["applied"] == 2
+    assert [single.isrc for single in fresh_repository.list_singles()] == [
+        rows[2]["isrc"]
+    ]
+
+
+def test_export_round_trips(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+) -> None:
+    """Test that NDJSON and CSV exports can be imported again."""
+    _post(_ndjson(_rows(150)))
+    exported = client.get("/singles/export")
+    assert exported.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    assert len(exported.text.splitlines()) == 150
+
+    exported_csv = client.get("/singles/export", params={"format": "csv"})
+    records = list(csv.DictReader(io.StringIO(exported_csv.text)))
+    assert len(records) == 150
+    assert records[0]["artist_names"] == "My Band"
+
+    originals = fresh_repository.list_singles_page(limit=1000)
+    fresh_repository.delete_singles([single.isrc for single in originals])
+    response = _post(exported_csv.text, media_type=CSV_MEDIA_TYPE)
+    assert response.json()["applied"] == 150
+    assert fresh_repository.list_singles_page(limit=1000) == originals
@@ -0,0 +1,244 @@
+import random
+from collections import Counter
+from datetime import timedelta
+from typing import Iterator, List, Sequence
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters.bundles import (
+    BundleViewsMusicSingleReleaseRepository,
+    InMemoryBundleRepository,
+)
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.constants import (
+    BUNDLE_CYCLE,
+    BUNDLE_EXISTS,
+    BUNDLE_ID_MISMATCH,
+    BUNDLE_IN_USE,
+    BUNDLE_NOT_FOUND,
+    EXAMPLE_SINGLE_DATA,
+    NESTED_BUNDLE_NOT_FOUND,
+)
+from musos_assist.domain.models import BundleView, MusicSingleRelease, ReleaseBundle
+from musos_assist.routers import get_bundle_repository, get_repository
+
+client = TestClient(app)
+
+
+def _single(n: int, **update: object) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={
+            "isrc": f"US{n:010d}",
+            "artist_names": [f"Artist {n % 3}"],
+            "genres": [f"Genre {n % 2}"],
+            "composers": None,
+            "producers": ["Producer"],
+            "duration": timedelta(minutes=n),
+            **update,
+        }
+    )
+
+
+def _bundle(
+    bundle_id: str, tracks: List[int], bundles: Sequence[str] = ()
+) -> ReleaseBundle:
+    return ReleaseBundle(
+        id=bundle_id,
+        title=bundle_id.title(),
+        kind="compilation" if bundles else "album",
+        tracks=[f"US{n:010d}" for n in tracks],
+        bundles=list(bundles),
+    )
+
+
+def _repositories() -> (
+    tuple[BundleViewsMusicSingleReleaseRepository, InMemoryBundleRepository]
+):
+    catalogue = ConcurrentInMemoryMusicSingleReleaseRepository()
+    bundles = InMemoryBundleRepository(catalogue)
+    return BundleViewsMusicSingleReleaseRepository(catalogue, bundles), bundles
+
+
+def test_bundles_aggregate_their_tracks() -> None:
+    singles, bundles = _repositories()
+    singles.create_singles([_single(n) for n in range(1, 5)])
+    bundles.create_bundle(_bundle("first", [1, 2]))
+    bundles.create_bundle(_bundle("best-of", [3, 1, 9], ["first"]))
+    view = bundles.read_bundle("best-of")
+    assert view.tracks == 5
+    assert view.missing_tracks == ["US0000000009"]
+    assert view.duration == timedelta(minutes=3 + 1 + 1 + 2)
+    assert view.untimed_tracks == 0
+    assert view.genres == {"Genre 1": 3, "Genre 0": 1}
+    assert [(credit.role, credit.name, credit.tracks) for credit in view.credits] == [
+        ("producer", "Producer", 4),
+        ("artist", "Artist 1", 2),
+        ("artist", "Artist 0", 1),
+        ("artist", "Artist 2", 1),
+    ]
+    # Kept until the aggregates change
+    assert bundles.read_bundle("best-of") is view
+    singles.update_single("US0000000001", _single(1, duration=None))
+    singles.create_single(_single(9))
+    singles.delete_single("US0000000002")
+    view = bundles.read_bundle("best-of")
+    assert view.missing_tracks == ["US0000000002"]
+    assert view.duration == timedelta(minutes=3 + 9)
+    assert view.untimed_tracks == 2
+    assert bundles.read_bundle("first").tracks == 2
+    bundles.update_bundle("first", _bundle("first", [4]))
+    assert bundles.read_bundle("best-of").tracks == 4
+    assert bundles.read_bundle("best-of").missing_tracks == []
+
+
+def test_bundles_validate_their_nesting() -> None:
+    _, bundles = _repositories()
+    bundles.create_bundle(_bundle("a", [1]))
+    bundles.create_bundle(_bundle("b", [], ["a"]))
+    bundles.create_bundle(_bundle("c", [], ["b", "a"]))
+    for bundle, error in [
+        (_bundle("a", []), BUNDLE_EXISTS),
+        (_bundle("d", [], ["x"]), NESTED_BUNDLE_NOT_FOUND),
+    ]:
+        with pytest.raises(ValueError, match=error):
+            bundles.create_bundle(bundle)
+    for bundle_id, bundle, error in [
+        ("a", _bundle("a", [], ["c"]), BUNDLE_CYCLE),
+        ("a", _bundle("a", [], ["a"]), BUNDLE_CYCLE),
+        ("a", _bundle("b", []), BUNDLE_ID_MISMATCH),
+        ("x", _bundle("x", []), BUNDLE_NOT_FOUND),
+    ]:
+        with pytest.raises(ValueError, match=error):
+            bundles.update_bundle(bundle_id, bundle)
+    with pytest.raises(ValueError, match=BUNDLE_IN_USE):
+        bundles.delete_bundle("a")
+    assert bundles.read_bundle("c").tracks == 2
+    bundles.delete_bundle("c")
+    bundles.delete_bundle("b")
+    bundles.delete_bundle("a")
+    assert bundles.list_bundles() == []
+    assert bundles._containing == {} and bundles._facts == {}
+
+
+def _walked(
+    bundles: InMemoryBundleRepository, catalogue: dict[str, MusicSingleRelease]
+) -> dict[str, Counter[str]]:
+    """The aggregates of every bundle, walking its tracks."""
+
+    def tracks(bundle: ReleaseBundle) -> List[str]:
+        found = list(bundle.tracks)
+        for child in bundle.bundles:
+            found.extend(tracks(bundles._bundles[child]))
+        return found
+
+    walked = {}
+    for bundle in bundles.list_bundles():
+        totals: Counter[str] = Counter()
+        for isrc in tracks(bundle):
+            single = catalogue.get(isrc)
+            if single is None:
+                totals[f"missing {isrc}"] = 1
+                continue
+            assert single.duration is not None
+            totals["seconds"] += int(single.duration.total_seconds())
+            totals.update(f"genre {genre}" for genre in set(single.genres))
+            totals.update(f"artist {name}" for name in set(single.artist_names))
+        walked[bundle.id] = +totals
+    return walked
+
+
+def _aggregated(view: BundleView) -> Counter[str]:
+    totals: Counter[str] = Counter()
+    totals.update(f"missing {isrc}" for isrc in view.missing_tracks)
+    totals["seconds"] = int(view.duration.total_seconds())
+    totals.update({f"genre {genre}": count for genre, count in view.genres.items()})
+    totals.update(
+        {
+            f"artist {credit.name}": credit.tracks
+            for credit in view.credits
+            if credit.role == "artist"
+        }
+    )
+    return +totals
+
+
+def test_aggregates_match_walking_the_tracks() -> None:
+    rng = random.Random(0)
+    singles, bundles = _repositories()
+    catalogue: dict[str, MusicSingleRelease] = {}
+    for _ in range(400):
+        roll = rng.random()
+        ids = [bundle.id for bundle in bundles.list_bundles()]
+        n = rng.randrange(1, 30)
+        if roll < 0.4:
+            single = _single(n, duration=timedelta(seconds=rng.randrange(60, 400)))
+            singles.upsert_singles([single])
+            catalogue[single.isrc] = single
+        elif roll < 0.5 and catalogue:
+            isrc = rng.choice(sorted(catalogue))
+            singles.delete_single(isrc)
+            del catalogue[isrc]
+        else:
+            bundle = _bundle(
+                f"bundle-{rng.randrange(8)}",
+                [rng.randrange(1, 30) for _ in range(rng.randrange(5))],
+                rng.sample(ids, min(len(ids), rng.randrange(3))),
+            )
+            try:
+                if bundle.id in ids:
+                    bundles.update_bundle(bundle.id, bundle)
+                else:
+                    bundles.create_bundle(bundle)
+            except ValueError as e:
+                assert str(e) == BUNDLE_CYCLE
+    walked = _walked(bundles, catalogue)
+    assert len(walked) > 4
+    for bundle_id, totals in walked.items():
+        assert _aggregated(bundles.read_bundle(bundle_id)) == totals
+
+
+@pytest.fixture
+def bundles(
+    fresh_repository: ConcurrentInMemoryMusicSingleReleaseRepository,
+) -> Iterator[InMemoryBundleRepository]:
+    """Route requests to fresh bundles of the singles in an empty repository."""
+    bundles = InMemoryBundleRepository(fresh_repository)
+    repository = BundleViewsMusicSingleReleaseRepository(fresh_repository, bundles)
+    app.dependency_overrides[get_repository] = lambda: repository
+    app.dependency_overrides[get_bundle_repository] = lambda: bundles
+    yield bundles
+
+
+def test_bundles_api(bundles: InMemoryBundleRepository) -> None:
+    client.post("/singles/", json=EXAMPLE_SINGLE_DATA)
+    isrc = EXAMPLE_SINGLE_DATA["isrc"]
+    ep = {"id": "debut-ep", "title": "Debut", "kind": "ep", "tracks": [isrc, isrc]}
+    assert client.post("/bundles/", json=ep).status_code == 201
+    assert client.post("/bundles/", json=ep).status_code == 409
+    response = client.post("/bundles/", json={**ep, "id": "Not An Id"})
+    assert response.status_code == 422
+    response = client.post("/bundles/", json={**ep, "id": "x", "bundles": ["y"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == NESTED_BUNDLE_NOT_FOUND
+    anthology = {"id": "anthology", "title": "All", "kind": "compilation"}
+    client.post("/bundles/", json={**anthology, "bundles": ["debut-ep"]})
+    assert [b["id"] for b in client.get("/bundles/").json()] == [
+        "anthology",
+        "debut-ep",
+    ]
+    client.put(f"/singles/{isrc}", json={**EXAMPLE_SINGLE_DATA, "duration": "PT4M"})
+    body = client.get("/bundles/anthology").json()
+    assert body["bundle"]["bundles"] == ["debut-ep"]
+    assert body["tracks"] == 2
+    assert body["duration"] == "PT8M"
+    assert body["genres"] == {"Indie": 2, "Rock": 2}
+    assert client.get("/bundles/nothing").status_code == 404
+    response = client.put("/bundles/debut-ep", json={**ep, "tracks": [isrc]})
+    assert response.status_code == 200
+    assert client.get("/bundles/anthology").json()["tracks"] == 1
+    assert client.put("/bundles/debut-ep", json=anthology).status_code == 400
+    assert client.delete("/bundles/debut-ep").status_code == 409
+    assert client.delete("/bundles/anthology").status_code == 204
+    assert client.delete("/bundles/anthology").status_code == 404
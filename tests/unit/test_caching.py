@@ -0,0 +1,45 @@
+from musos_assist.constants import EXAMPLE_SINGLE_DATA
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.routers.caching import (
+    SerializedSingleCache,
+    etag_matches,
+    revision_etag,
+)
+
+
+def _single(isrc: str) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": isrc}
+    )
+
+
+def test_etag_matches() -> None:
+    etag = revision_etag("US0000000001", 7)
+    assert etag == '"US0000000001-7"'
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"US0000000001-8"', etag)
+
+
+def test_cache_reuses_body_for_the_same_revision_only() -> None:
+    cache = SerializedSingleCache()
+    single = _single("US0000000001")
+    body = cache.render(single, 1)
+    assert cache.render(single, 1) is body
+    renamed = single.model_copy(update={"title": "Changed"})
+    assert b"Changed" in cache.render(renamed, 2)
+    cache.discard("US0000000001")
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = SerializedSingleCache(size=2)
+    first, second, third = (_single(f"US000000000{n}") for n in range(3))
+    cache.render(first, 1)
+    cache.render(second, 1)
+    first_body = cache.render(first, 1)
+    cache.render(third, 1)
+    assert len(cache) == 2
+    assert cache.render(first, 1) is first_body
@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Iterator
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters.changes import (
+    ChangeFeedMusicSingleReleaseRepository,
+    InMemoryChangeFeed,
+)
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.constants import CHANGES_EXPIRED, EXAMPLE_SINGLE_DATA
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.domain.ports import BulkWriteError
+from musos_assist.routers import get_change_feed, get_repository
+from musos_assist.routers.changes import stream_changes
+
+client = TestClient(app)
+
+
+def _single(isrc: str, **update: object) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": isrc, "title": f"Song {isrc}", **update}
+    )
+
+
+def _kinds(feed: InMemoryChangeFeed, after: int) -> list[tuple[str, str]]:
+    return [(change.kind, change.isrc) for change in feed.changes_after(after, 100)]
+
+
+def test_feed_keeps_the_latest_changes() -> None:
+    feed = InMemoryChangeFeed(size=3)
+    start = feed.latest_sequence()
+    assert feed.changes_after(start, 10) == []
+    feed.record(
+        [("created", f"US000000000{n}", _single(f"US000000000{n}")) for n in range(2)]
+    )
+    feed.record([("deleted", "US0000000000", None)])
+    changes = feed.changes_after(start, 10)
+    assert [change.sequence for change in changes] == [start + 1, start + 2, start + 3]
+    assert feed.latest_sequence() == start + 3
+    assert changes[2].single is None
+    assert [c.sequence for c in feed.changes_after(start + 1, 1)] == [start + 2]
+    feed.record([("deleted", "US0000000001", None)])
+    # The first change has been dropped from the ring
+    with pytest.raises(ValueError, match=CHANGES_EXPIRED):
+        feed.changes_after(start, 10)
+    assert len(feed.changes_after(start + 1, 10)) == 3
+    # A sequence ahead of the feed comes from another, as before a restart
+    with pytest.raises(ValueError, match=CHANGES_EXPIRED):
+        feed.changes_after(start + 5, 10)
+    # Sequences keep growing across feeds
+    assert InMemoryChangeFeed().latest_sequence() > start + 4
+
+
+def test_feed_wakes_waiters() -> None:
+    feed = InMemoryChangeFeed()
+    start = feed.latest_sequence()
+
+    async def scenario() -> float:
+        started = time.perf_counter()
+        # Nothing recorded: waits out the timeout
+        await feed.wait_after(start, 0.05)
+        assert time.perf_counter() - started >= 0.05
+        threading.Timer(
+            0.05, feed.record, [[("deleted", "US0000000001", None)]]
+        ).start()
+        started = time.perf_counter()
+        await feed.wait_after(start, 10)
+        return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) < 5
+    assert feed._waiters == []
+
+
+def test_repository_records_accepted_writes() -> None:
+    feed = InMemoryChangeFeed()
+    start = feed.latest_sequence()
+    repository = ChangeFeedMusicSingleReleaseRepository(
+        ConcurrentInMemoryMusicSingleReleaseRepository(), feed
+    )
+    repository.create_single(_single("US0000000001"))
+    repository.update_single("US0000000001", _single("US0000000002"))
+    repository.create_singles([_single("US0000000003"), _single("US0000000004")])
+    repository.upsert_singles([_single("US0000000003", label="Other")])
+    repository.delete_singles(["US0000000003", "US0000000004"])
+    with pytest.raises(ValueError):
+        repository.create_single(_single("US0000000002"))
+    with pytest.raises(BulkWriteError):
+        repository.delete_singles(["US0000000002", "US0000000009"])
+    repository.delete_single("US0000000002")
+    assert _kinds(feed, start) == [
+        ("created", "US0000000001"),
+        ("updated", "US0000000001"),
+        ("created", "US0000000003"),
+        ("created", "US0000000004"),
+        ("updated", "US0000000003"),
+        ("deleted", "US0000000003"),
+        ("deleted", "US0000000004"),
+        ("deleted", "US0000000002"),
+    ]
+    # A rename tells both ISRCs
+    renamed = feed.changes_after(start + 1, 1)[0]
+    assert renamed.single is not None and renamed.single.isrc == "US0000000002"
+
+
+@pytest.fixture
+def feed() -> Iterator[InMemoryChangeFeed]:
+    """Route requests to a repository recording changes in a fresh feed."""
+    feed = InMemoryChangeFeed()
+    repository = ChangeFeedMusicSingleReleaseRepository(
+        ConcurrentInMemoryMusicSingleReleaseRepository(), feed
+    )
+    app.dependency_overrides[get_repository] = lambda: repository
+    app.dependency_overrides[get_change_feed] = lambda: feed
+    yield feed
+    app.dependency_overrides.clear()
+
+
+def test_changes_api(feed: InMemoryChangeFeed) -> None:
+    response = client.get("/singles/changes", params={"wait": 0})
+    assert response.status_code == 200
+    start = response.json()["sequence"]
+    assert response.json()["changes"] == []
+    client.post("/singles/", json=EXAMPLE_SINGLE_DATA)
+    client.delete(f"/singles/{EXAMPLE_SINGLE_DATA['isrc']}")
+    body = client.get("/singles/changes", params={"after": start, "limit": 1}).json()
+    (change,) = body["changes"]
+    assert change["kind"] == "created"
+    assert change["single"]["title"] == EXAMPLE_SINGLE_DATA["title"]
+    assert body["sequence"] == start + 1
+    body = client.get(
+        "/singles/changes", headers={"Last-Event-ID": str(start + 1)}
+    ).json()
+    assert [change["kind"] for change in body["changes"]] == ["deleted"]
+    for after in (start - 1, start + 3):
+        response = client.get("/singles/changes", params={"after": after, "wait": 0})
+        assert response.status_code == 410
+        response = client.get(
+            "/singles/changes",
+            params={"after": after},
+            headers={"Accept": "text/event-stream"},
+        )
+        assert response.status_code == 410
+
+
+def test_changes_api_long_polls(feed: InMemoryChangeFeed) -> None:
+    start = feed.latest_sequence()
+    threading.Timer(
+        0.1, client.post, ["/singles/"], {"json": EXAMPLE_SINGLE_DATA}
+    ).start()
+    started = time.perf_counter()
+    body = client.get("/singles/changes", params={"after": start, "wait": 10}).json()
+    assert time.perf_counter() - started < 5
+    assert [change["kind"] for change in body["changes"]] == ["created"]
+
+
+def test_event_stream() -> None:
+    feed = InMemoryChangeFeed()
+    start = feed.latest_sequence()
+    feed.record([("created", "US0000000001", _single("US0000000001"))])
+
+    async def events(stream: AsyncIterator[str], count: int) -> list[str]:
+        received = [await anext(stream)]
+        threading.Timer(
+            0.05, feed.record, [[("deleted", "US0000000001", None)]]
+        ).start()
+        while len(received) < count:
+            received.append(await anext(stream))
+        return received
+
+    created, deleted = asyncio.run(events(stream_changes(feed, start), 2))
+    assert created.startswith(f"id: {start + 1}\nevent: created\ndata: {{")
+    assert deleted.startswith(f"id: {start + 2}\nevent: deleted\ndata: {{")
+    assert deleted.endswith("\n\n")
+    (expired,) = asyncio.run(events(stream_changes(feed, start - 5), 1))
+    assert expired == f"event: expired\ndata: {CHANGES_EXPIRED}\n\n"
@@ -0,0 +1,164 @@
+import time
+from datetime import date
+from typing import Iterator, List
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.adapters.integrity import (
+    BackgroundIntegrityScanner,
+    IntegrityChecker,
+    title_keys,
+)
+from musos_assist.constants import (
+    EXAMPLE_SINGLE_DATA,
+    INTEGRITY_SCAN_NOT_FOUND,
+    NEXT_CURSOR_HEADER,
+)
+from musos_assist.domain.models import Artifact, IntegrityScan, MusicSingleRelease
+from musos_assist.domain.ports import ArtifactStore
+from musos_assist.routers import get_integrity_scanner
+
+client = TestClient(app)
+
+
+def _single(isrc: str, **update: object) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={
+            "isrc": isrc,
+            "title": f"Song {isrc}",
+            "release_date": date(2024, 6, 1),
+            "label": None,
+            **update,
+        }
+    )
+
+
+def test_title_keys_fold_what_does_not_tell_titles_apart() -> None:
+    assert title_keys(
+        ["Café del Mar!", "CAFE DEL MAR (feat. Someone)", "Café\ndel mar", ""]
+    ) == ["cafedelmar", "cafedelmar", "cafedelmar", ""]
+
+
+def test_checker_finds_issues_within_and_across_batches() -> None:
+    checker = IntegrityChecker(2025)
+    findings = checker.check(
+        [
+            _single("USAB12400001", label="Label X", title="Hello"),
+            # Built as a repository might hold them, unchecked
+            _single("USAB12400001").model_copy(update={"isrc": "usab12400002"}),
+            _single("USAB12400000", title="Hello, Again"),
+            _single("USAB12500001", label=" label x ", title="Hello (Radio Edit)"),
+            _single("USAB12400003", label="Label Y", title="hello!"),
+        ]
+    )
+    findings += checker.check(
+        [
+            _single("USAB12400004", title="Héllo"),
+            _single("USAB12400005", title="Hello", version="Acoustic"),
+            _single("USAB12400006", title="Hello", artist_names=["Someone Else"]),
+            _single("USAB19900001", release_date=date(1999, 1, 1)),
+        ]
+    )
+    assert [(kind, isrc, related) for kind, isrc, _, related in findings] == [
+        ("invalid_isrc", "usab12400002", []),
+        ("invalid_isrc", "USAB12400000", []),
+        ("isrc_year_after_release", "USAB12500001", []),
+        ("registrant_label_mismatch", "USAB12400003", ["USAB12400001"]),
+        ("near_duplicate_title", "USAB12400003", ["USAB12400001"]),
+        ("near_duplicate_title", "USAB12400004", ["USAB12400001"]),
+    ]
+
+
+class ArtifactsOf(ArtifactStore):
+    """Artifacts of given media types, the same for every single."""
+
+    def __init__(self, media_types: List[str]) -> None:
+        self.media_types = media_types
+
+    def list_artifacts(self, isrc: str) -> List[Artifact]:
+        return [
+            Artifact(
+                isrc=isrc, name=f"file-{n}", media_type=media_type, size=1, sha256=""
+            )
+            for n, media_type in enumerate(self.media_types)
+        ]
+
+
+def _finished(scanner: BackgroundIntegrityScanner, scan_id: str) -> IntegrityScan:
+    deadline = time.monotonic() + 10
+    while (scan := scanner.read_scan(scan_id)).state == "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return scan
+
+
+def test_scans_run_in_batches_in_the_background() -> None:
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    repository.create_singles(
+        [_single(f"USAB1240{n:04d}", title=f"Song {n % 3}") for n in range(1, 11)]
+    )
+    scanner = BackgroundIntegrityScanner(
+        repository, ArtifactsOf(["image/png"]), batch_size=4, kept=2
+    )
+    scan = _finished(scanner, scanner.start_scan().id)
+    assert scan.state == "completed"
+    assert scan.total == scan.scanned == 10
+    assert scan.issues == {"near_duplicate_title": 7, "missing_artifact": 10}
+    issues = scanner.issues_after(scan.id, 0, 100)
+    assert [issue.sequence for issue in issues] == list(range(1, 18))
+    assert issues[-1].detail == "No artifact of type audio/*"
+    assert scanner.issues_after(scan.id, 15, 100) == issues[15:]
+    # Only the latest scans are kept
+    second = _finished(scanner, scanner.start_scan().id)
+    third = _finished(scanner, scanner.start_scan().id)
+    assert [scan.id for scan in scanner.list_scans()] == [third.id, second.id]
+    with pytest.raises(ValueError, match=INTEGRITY_SCAN_NOT_FOUND):
+        scanner.issues_after(scan.id, 0, 1)
+
+
+def test_failed_scans_say_why() -> None:
+    class Broken(ConcurrentInMemoryMusicSingleReleaseRepository):
+        def iter_singles(
+            self, *args: object, **kwargs: object
+        ) -> Iterator[MusicSingleRelease]:
+            raise RuntimeError("Disk on fire")
+
+    scanner = BackgroundIntegrityScanner(Broken())
+    scan = _finished(scanner, scanner.start_scan().id)
+    assert scan.state == "failed" and scan.error == "Disk on fire"
+
+
+@pytest.fixture
+def scanner(
+    fresh_repository: ConcurrentInMemoryMusicSingleReleaseRepository,
+) -> Iterator[BackgroundIntegrityScanner]:
+    """Route requests to a scanner of an empty repository, checking no artifacts."""
+    scanner = BackgroundIntegrityScanner(fresh_repository)
+    app.dependency_overrides[get_integrity_scanner] = lambda: scanner
+    yield scanner
+
+
+def test_integrity_api(scanner: BackgroundIntegrityScanner) -> None:
+    for n in range(3):
+        single = _single(f"USAB1240000{n + 1}", title="Same")
+        client.post("/singles/", json=single.model_dump(mode="json"))
+    response = client.post("/integrity/scans")
+    assert response.status_code == 202
+    scan_id = response.json()["id"]
+    _finished(scanner, scan_id)
+    body = client.get(f"/integrity/scans/{scan_id}").json()
+    assert body["state"] == "completed"
+    assert body["issues"] == {"near_duplicate_title": 2}
+    response = client.get(f"/integrity/scans/{scan_id}/issues", params={"limit": 1})
+    assert [issue["isrc"] for issue in response.json()] == ["USAB12400002"]
+    after = response.headers[NEXT_CURSOR_HEADER]
+    response = client.get(
+        f"/integrity/scans/{scan_id}/issues", params={"after": after, "limit": 1}
+    )
+    assert response.json()[0]["related"] == ["USAB12400001"]
+    assert [scan["id"] for scan in client.get("/integrity/scans").json()] == [scan_id]
+    assert client.get("/integrity/scans/nothing").status_code == 404
+    assert client.get("/integrity/scans/nothing/issues").status_code == 404
@@ -0,0 +1,66 @@
+import re
+from typing import Any
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.constants import EXAMPLE_SINGLE_DATA
+from musos_assist.routers.instrumentation import Gauge, Histogram
+
+client = TestClient(app)
+ISRC = EXAMPLE_SINGLE_DATA["isrc"]
+
+
+def _sample(text: str, series: str) -> float:
+    """The value of one series in Prometheus text, or 0 if absent."""
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(seconds, '/a"b')
+    text = "\n".join(histogram.render())
+    assert "# TYPE latency_seconds histogram" in text
+    assert _sample(text, 'latency_seconds_bucket{route="/a\\"b",le="0.1"}') == 2
+    assert _sample(text, 'latency_seconds_bucket{route="/a\\"b",le="1.0"}') == 3
+    assert _sample(text, 'latency_seconds_bucket{route="/a\\"b",le="+Inf"}') == 4
+    assert _sample(text, 'latency_seconds_count{route="/a\\"b"}') == 4
+    assert _sample(text, 'latency_seconds_sum{route="/a\\"b"}') == 2.65
+
+
+def test_gauge_renders_kind_and_values() -> None:
+    gauge = Gauge("lookups_total", "Lookups.", ("result",), kind="counter")
+    gauge.set(3, "hit")
+    text = "\n".join(gauge.render())
+    assert "# TYPE lookups_total counter" in text
+    assert _sample(text, 'lookups_total{result="hit"}') == 3
+
+
+def test_metrics_endpoint(fresh_repository: Any) -> None:
+    series = 'musos_http_request_duration_seconds_count{method="GET",route="/singles/{isrc}",status="200"}'
+    before = client.get("/metrics").text
+    client.post("/singles/", json=EXAMPLE_SINGLE_DATA)
+    client.get(f"/singles/{ISRC}")
+    client.get(f"/singles/{ISRC}")
+    client.get("/no/such/path")
+    response = client.get("/metrics")
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert _sample(text, series) - _sample(before, series) == 2
+    assert _sample(
+        text,
+        'musos_http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}',
+    )
+    # ISRCs never become labels
+    assert ISRC not in text
+    for phase in ("validation", "handler", "serialization"):
+        assert _sample(
+            text,
+            f'musos_http_request_phase_seconds_count{{route="/singles/{{isrc}}",phase="{phase}"}}',
+        )
+    assert _sample(
+        text,
+        'musos_repository_call_duration_seconds_count{method="read_single_with_revision"}',
+    )
+    assert _sample(text, "musos_singles") == 1
+    assert 'musos_cache_lookups_total{cache="serialized_singles",result="hit"}' in text
@@ -1,10 +1,17 @@
+import json
 from typing import Any, Dict
 import pytest
 from httpx import Response
 from fastapi.testclient import TestClient
 from musos_assist import app
-from musos_assist.constants import EXAMPLE_SINGLE_DATA, SINGLE_NOT_FOUND
-
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.constants import (
+    EXAMPLE_SINGLE_DATA,
+    NDJSON_MEDIA_TYPE,
+    NEXT_CURSOR_HEADER,
+    SINGLE_EXISTS,
+    SINGLE_NOT_FOUND,
+)
 
 # Example Usage Data (for testing via API client like curl or Postman)
 client = TestClient(app)  # Create a TestClient instance for your FastAPI router
@@ -113,6 +120,21 @@ def test_update_single_not_found() -> None:
     assert response.json() == {"detail": SINGLE_NOT_FOUND}
 
 
+def test_update_single_onto_another_isrc(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+) -> None:
+    """Test that renaming a single onto an ISRC already taken is a conflict."""
+    other = {**EXAMPLE_SINGLE_DATA, "isrc": "USX9P2400003"}
+    client.post("/singles/", json=EXAMPLE_SINGLE_DATA)
+    client.post("/singles/", json=other)
+    response: Response = client.put(
+        f"/singles/{EXAMPLE_SINGLE_DATA['isrc']}", json=other
+    )
+    assert response.status_code == 409
+    assert response.json() == {"detail": SINGLE_EXISTS}
+    assert len(fresh_repository.list_singles()) == 2
+
+
 def test_delete_single_exists(create_single: None) -> None:
     """Test deleting an existing music single."""
     response: Response = client.delete(f"/singles/{EXAMPLE_SINGLE_DATA['isrc']}")
@@ -129,3 +151,117 @@ def test_delete_single_not_found() -> None:
     response: Response = client.delete("/singles/NONEXISTENT_ISRC")
     assert response.status_code == 404
     assert response.json() == {"detail": SINGLE_NOT_FOUND}
+
+
+def _post_singles(count: int) -> list[str]:
+    isrcs = [f"USX9P24{n:05d}" for n in range(count)]
+    for isrc in isrcs:
+        single_data = EXAMPLE_SINGLE_DATA.copy()
+        single_data["isrc"] = isrc
+        client.post("/singles/", json=single_data)
+    return isrcs
+
+
+def test_list_singles_paginated(fresh_repository: Any) -> None:
+    """Test walking the catalogue with the keyset cursor."""
+    isrcs = _post_singles(5)
+    response: Response = client.get("/singles/", params={"limit": 2})
+    assert [single["isrc"] for single in response.json()] == isrcs[:2]
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = client.get("/singles/", params={"limit": 2, "after": cursor})
+    assert [single["isrc"] for single in response.json()] == isrcs[2:4]
+    response = client.get(
+        "/singles/", params={"limit": 2, "after": response.headers[NEXT_CURSOR_HEADER]}
+    )
+    assert [single["isrc"] for single in response.json()] == isrcs[4:]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_list_singles_limit_out_of_range(fresh_repository: Any) -> None:
+    """Test that page sizes outside the allowed range are rejected."""
+    assert client.get("/singles/", params={"limit": 0}).status_code == 422
+    assert client.get("/singles/", params={"limit": 100000}).status_code == 422
+
+
+def test_list_singles_ndjson_stream(fresh_repository: Any) -> None:
+    """Test streaming the catalogue as newline-delimited JSON."""
+    isrcs = _post_singles(3)
+    response: Response = client.get("/singles/", headers={"Accept": NDJSON_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["isrc"] for row in rows] == isrcs
+
+
+def test_list_singles_filtered(fresh_repository: Any) -> None:
+    """Test filtering singles with query parameters."""
+    isrcs = _post_singles(3)
+    other_data = EXAMPLE_SINGLE_DATA.copy()
+    other_data["isrc"] = "GBABC2400001"
+    other_data["genres"] = ["Jazz"]
+    other_data["release_date"] = "2023-06-01"
+    client.post("/singles/", json=other_data)
+
+    response: Response = client.get("/singles/", params={"genre": "jazz"})
+    assert [single["isrc"] for single in response.json()] == ["GBABC2400001"]
+    response = client.get(
+        "/singles/", params={"artist": "My Band", "released_from": "2024-01-01"}
+    )
+    assert [single["isrc"] for single in response.json()] == isrcs
+    response = client.get("/singles/", params={"genre": "Rock", "limit": 2})
+    assert response.headers[NEXT_CURSOR_HEADER] == isrcs[1]
+    response = client.get(
+        "/singles/",
+        params={"label": "Independent Label"},
+        headers={"Accept": NDJSON_MEDIA_TYPE},
+    )
+    assert len(response.text.splitlines()) == 4
+
+
+def test_read_single_conditional_get(fresh_repository: Any) -> None:
+    """Test that a single's ETag answers If-None-Match until it changes."""
+    (isrc,) = _post_singles(1)
+    response: Response = client.get(f"/singles/{isrc}")
+    etag = response.headers["ETag"]
+    assert response.json()["isrc"] == isrc
+
+    response = client.get(f"/singles/{isrc}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    response = client.get(f"/singles/{isrc}", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+
+    updated = EXAMPLE_SINGLE_DATA.copy()
+    updated.update(isrc=isrc, title="Changed")
+    client.put(f"/singles/{isrc}", json=updated)
+    response = client.get(f"/singles/{isrc}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["title"] == "Changed"
+
+
+def test_list_singles_conditional_get(fresh_repository: Any) -> None:
+    """Test that list ETags follow the catalogue revision."""
+    _post_singles(2)
+    etag = client.get("/singles/", params={"limit": 1}).headers["ETag"]
+    response: Response = client.get(
+        "/singles/", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    _post_singles(3)
+    response = client.get(
+        "/singles/", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+def test_search_singles(fresh_repository: Any) -> None:
+    """Test ranked full-text search over the catalogue."""
+    (isrc,) = _post_singles(1)
+    response: Response = client.get("/singles/search", params={"q": "awesome so"})
+    assert response.status_code == 200
+    (hit,) = response.json()
+    assert hit["single"]["isrc"] == isrc
+    assert hit["score"] > 0
+    assert client.get("/singles/search", params={"q": "nothing"}).json() == []
+    assert client.get("/singles/search").status_code == 422
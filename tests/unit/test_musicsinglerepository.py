@@ -1,6 +1,13 @@
+import asyncio
 import pytest
-from musos_assist.domain.ports import MusicSingleReleaseRepository
-from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.domain.ports import (
+    ArtifactStore,
+    AsyncMusicSingleReleaseRepository,
+    ChunkWriter,
+    MusicSingleReleaseRepository,
+    RenditionCache,
+)
+from musos_assist.domain.models import Artifact, MusicSingleQuery, MusicSingleRelease
 from musos_assist.constants import EXAMPLE_SINGLE_DATA
 
 
@@ -38,3 +45,77 @@ def test_delete_single_raises_not_implemented_error() -> None:
     repository = IncompleteMusicSingleReleaseRepository()
     with pytest.raises(NotImplementedError):
         repository.delete_single("US1234567890")
+
+
+def test_list_singles_page_raises_not_implemented_error() -> None:
+    repository = IncompleteMusicSingleReleaseRepository()
+    with pytest.raises(NotImplementedError):
+        repository.list_singles_page()
+
+
+def test_query_singles_raises_not_implemented_error() -> None:
+    repository = IncompleteMusicSingleReleaseRepository()
+    with pytest.raises(NotImplementedError):
+        repository.query_singles(MusicSingleQuery(artist="My Band"))
+
+
+def test_batch_writes_raise_not_implemented_error() -> None:
+    repository = IncompleteMusicSingleReleaseRepository()
+    single = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+    with pytest.raises(NotImplementedError):
+        repository.create_singles([single])
+    with pytest.raises(NotImplementedError):
+        repository.upsert_singles([single])
+    with pytest.raises(NotImplementedError):
+        repository.delete_singles([single.isrc])
+
+
+def test_async_repository_raises_not_implemented_error() -> None:
+    repository = AsyncMusicSingleReleaseRepository()
+    with pytest.raises(NotImplementedError):
+        asyncio.run(repository.list_singles())
+    with pytest.raises(NotImplementedError):
+        asyncio.run(repository.read_single("US1234567890"))
+
+
+def test_revisions_raise_not_implemented_error() -> None:
+    repository = IncompleteMusicSingleReleaseRepository()
+    with pytest.raises(NotImplementedError):
+        repository.read_single_with_revision("US1234567890")
+    with pytest.raises(NotImplementedError):
+        repository.catalogue_revision()
+    with pytest.raises(NotImplementedError):
+        repository.count_singles()
+    with pytest.raises(NotImplementedError):
+        repository.catalogue_stats()
+
+
+def test_search_singles_raises_not_implemented_error() -> None:
+    repository = IncompleteMusicSingleReleaseRepository()
+    with pytest.raises(NotImplementedError):
+        repository.search_singles("song")
+
+
+def test_artifact_ports_raise_not_implemented_error() -> None:
+    store = ArtifactStore()
+    with pytest.raises(NotImplementedError):
+        store.read_upload("0" * 32)
+    with pytest.raises(NotImplementedError):
+        store.list_artifacts("US1234567890")
+    with pytest.raises(NotImplementedError):
+        ChunkWriter().write(b"")
+
+
+def test_rendition_cache_raises_not_implemented_error() -> None:
+    with pytest.raises(NotImplementedError):
+        RenditionCache().render(
+            Artifact(
+                isrc="US1234567890",
+                name="cover.jpg",
+                media_type="image/jpeg",
+                size=0,
+                sha256="0" * 64,
+            ),
+            [],
+            "preview",
+        )
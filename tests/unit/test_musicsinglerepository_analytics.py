@@ -0,0 +1,193 @@
+from datetime import date, timedelta
+from typing import Iterator
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.adapters.analytics import (
+    AnalyticsMusicSingleReleaseRepository,
+    RankedCounts,
+)
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.domain.models import CatalogueStats, MusicSingleRelease
+from musos_assist.domain.ports import BulkWriteError
+from musos_assist.constants import EXAMPLE_SINGLE_DATA
+from musos_assist.routers import get_repository
+
+client = TestClient(app)
+
+
+def _single(isrc: str, **update: object) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": isrc, "title": f"Song {isrc}", **update}
+    )
+
+
+def _catalogue() -> list[MusicSingleRelease]:
+    return [
+        _single(
+            "US0000000001",
+            artist_names=["Ana", "Bo", "Cy"],
+            genres=["Rock", "Indie", "Rock"],
+            release_date=date(2024, 1, 15),
+            duration=timedelta(minutes=3, seconds=44.6),
+        ),
+        _single(
+            "US0000000002",
+            artist_names=["Bo", "Ana"],
+            genres=["Pop"],
+            release_date=date(2024, 1, 31),
+            duration=timedelta(minutes=2),
+        ),
+        _single(
+            "US0000000003",
+            artist_names=["Cy"],
+            genres=["Rock"],
+            label=None,
+            release_date=date(2023, 12, 1),
+            duration=None,
+        ),
+    ]
+
+
+def _aggregated(singles: list[MusicSingleRelease]) -> dict[str, object]:
+    """The per-month, genre and label counts, the slow way."""
+    per_month: dict[str, int] = {}
+    per_genre: dict[str, int] = {}
+    per_label: dict[str, int] = {}
+    for single in singles:
+        month = single.release_date.strftime("%Y-%m")
+        per_month[month] = per_month.get(month, 0) + 1
+        for genre in set(single.genres):
+            per_genre[genre] = per_genre.get(genre, 0) + 1
+        if single.label is not None:
+            per_label[single.label] = per_label.get(single.label, 0) + 1
+    return {
+        "per_month": dict(sorted(per_month.items())),
+        "per_genre": per_genre,
+        "per_label": per_label,
+    }
+
+
+def _groups(stats: CatalogueStats) -> dict[str, object]:
+    return stats.model_dump(include={"per_month", "per_genre", "per_label"})
+
+
+def test_analytics_repository_aggregates_the_catalogue() -> None:
+    repository = AnalyticsMusicSingleReleaseRepository(
+        InMemoryMusicSingleReleaseRepository()
+    )
+    repository.create_singles(_catalogue())
+    stats = repository.catalogue_stats()
+    assert stats.singles == 3
+    assert stats.per_month == {"2023-12": 1, "2024-01": 2}
+    assert list(stats.per_genre.items()) == [("Rock", 2), ("Indie", 1), ("Pop", 1)]
+    assert stats.per_label == {"Independent Label": 2}
+    durations = stats.durations
+    assert (durations.singles, durations.min_seconds, durations.max_seconds) == (
+        2,
+        120,
+        225,
+    )
+    assert (durations.median_seconds, durations.p90_seconds) == (120, 225)
+    assert durations.mean_seconds == 172.5
+    assert [(b.start_seconds, b.singles) for b in durations.histogram] == [
+        (120, 1),
+        (210, 1),
+    ]
+    assert [(c.artists, c.singles) for c in stats.co_credits] == [
+        (["Ana", "Bo"], 2),
+        (["Ana", "Cy"], 1),
+        (["Bo", "Cy"], 1),
+    ]
+    assert len(repository.catalogue_stats(co_credits=1).co_credits) == 1
+
+
+def test_ranked_counts_list_the_largest_first() -> None:
+    counts: RankedCounts[str] = RankedCounts()
+    for key in "abcabca":
+        counts.add(key, 1)
+    counts.add("d", 1)
+    assert counts.largest(2) == [("a", 3), ("b", 2)]
+    counts.add("a", -2)
+    assert counts.largest(10) == [("b", 2), ("c", 2), ("d", 1), ("a", 1)]
+    counts.add("a", -1)
+    assert len(counts) == 3
+    assert "a" not in counts.counts
+
+
+def test_analytics_repository_follows_writes() -> None:
+    inner = ConcurrentInMemoryMusicSingleReleaseRepository()
+    repository = AnalyticsMusicSingleReleaseRepository(inner)
+    repository.create_singles(_catalogue())
+    before = repository.catalogue_stats()
+    repository.update_single(
+        "US0000000001",
+        _single("US0000000004", artist_names=["Cy"], genres=["Jazz"], duration=None),
+    )
+    repository.delete_single("US0000000002")
+    repository.upsert_singles([_single("US0000000003", label="Other")])
+    repository.create_single(_single("US0000000005", release_date=date(2022, 6, 1)))
+    stats = repository.catalogue_stats()
+    assert stats != before
+    assert _groups(stats) == _aggregated(inner.list_singles())
+    assert stats.co_credits == []
+    # Rejected writes leave the statistics alone
+    with pytest.raises(ValueError):
+        repository.create_single(_single("US0000000005"))
+    with pytest.raises(BulkWriteError):
+        repository.delete_singles(["US0000000005", "US0000000009"])
+    assert repository.catalogue_stats() == stats
+    repository.delete_singles(["US0000000003", "US0000000004", "US0000000005"])
+    assert repository.catalogue_stats().model_dump() == {
+        "singles": 0,
+        "per_month": {},
+        "per_genre": {},
+        "per_label": {},
+        "durations": {
+            "singles": 0,
+            "min_seconds": None,
+            "max_seconds": None,
+            "mean_seconds": None,
+            "median_seconds": None,
+            "p90_seconds": None,
+            "histogram": [],
+        },
+        "co_credits": [],
+    }
+
+
+def test_analytics_repository_mirrors_existing_singles() -> None:
+    inner = InMemoryMusicSingleReleaseRepository()
+    inner.create_singles(_catalogue())
+    stats = AnalyticsMusicSingleReleaseRepository(inner).catalogue_stats()
+    assert stats.singles == 3
+    assert _groups(stats) == _aggregated(_catalogue())
+
+
+@pytest.fixture
+def analytics_repository() -> Iterator[AnalyticsMusicSingleReleaseRepository]:
+    repository = AnalyticsMusicSingleReleaseRepository(
+        ConcurrentInMemoryMusicSingleReleaseRepository()
+    )
+    app.dependency_overrides[get_repository] = lambda: repository
+    yield repository
+    app.dependency_overrides.clear()
+
+
+def test_stats_api(analytics_repository: AnalyticsMusicSingleReleaseRepository) -> None:
+    for single in _catalogue():
+        client.post("/singles/", json=single.model_dump(mode="json"))
+    response = client.get("/singles/stats", params={"co_credits": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["singles"] == 3
+    assert body["per_genre"] == {"Rock": 2, "Indie": 1, "Pop": 1}
+    assert len(body["co_credits"]) == 2
+    assert client.get("/singles/stats?co_credits=0").status_code == 422
+
+
+def test_stats_api_needs_analytics(fresh_repository: object) -> None:
+    assert client.get("/singles/stats").status_code == 501
@@ -0,0 +1,140 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+import pytest
+from musos_assist.adapters.caching import (
+    CachingMusicSingleReleaseRepository,
+    FrequencySketch,
+)
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.constants import EXAMPLE_SINGLE_DATA, SINGLE_NOT_FOUND
+from musos_assist.domain.models import MusicSingleRelease
+
+
+def _single(n: int, **update: object) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": f"US{n:010d}", "title": f"Song {n}", **update}
+    )
+
+
+class CountingRepository(ConcurrentInMemoryMusicSingleReleaseRepository):
+    """Counts reads, and holds each until `release` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads: List[str] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        self.reads.append(isrc)
+        self.release.wait()
+        if isrc == "XX0000000000":
+            raise RuntimeError("Backend down")
+        return super().read_single_with_revision(isrc)
+
+
+def test_reads_are_cached_until_written() -> None:
+    backend = CountingRepository()
+    repository = CachingMusicSingleReleaseRepository(backend)
+    repository.create_singles([_single(1), _single(2)])
+    for _ in range(3):
+        assert repository.read_single(_single(1).isrc) == _single(1)
+        with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+            repository.read_single(_single(3).isrc)
+    assert backend.reads == [_single(1).isrc, _single(3).isrc]
+    assert repository.hit_counts() == (4, 2)
+    # Renamed to an ISRC known missing
+    repository.update_single(_single(1).isrc, _single(3, title="Renamed"))
+    assert repository.read_single(_single(3).isrc).title == "Renamed"
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.read_single(_single(1).isrc)
+    repository.read_single(_single(2).isrc)
+    _, revision = repository.read_single_with_revision(_single(2).isrc)
+    repository.upsert_singles([_single(2, title="Upserted")])
+    single, new_revision = repository.read_single_with_revision(_single(2).isrc)
+    assert single.title == "Upserted" and new_revision != revision
+    repository.delete_singles([_single(2).isrc])
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.read_single(_single(2).isrc)
+
+
+def test_concurrent_misses_share_one_read() -> None:
+    backend = CountingRepository()
+    repository = CachingMusicSingleReleaseRepository(backend)
+    repository.create_single(_single(1))
+    backend.release.clear()
+    with ThreadPoolExecutor(8) as pool:
+        reads = [pool.submit(repository.read_single, _single(1).isrc) for _ in range(8)]
+        while not backend.reads:
+            threading.Event().wait(0.001)
+        backend.release.set()
+        assert all(read.result() == _single(1) for read in reads)
+    assert backend.reads == [_single(1).isrc]
+    assert repository.hit_counts() == (7, 1)
+
+
+def test_failed_reads_reach_every_waiter_and_are_not_cached() -> None:
+    backend = CountingRepository()
+    repository = CachingMusicSingleReleaseRepository(backend)
+    backend.release.clear()
+    with ThreadPoolExecutor(4) as pool:
+        reads = [pool.submit(repository.read_single, "XX0000000000") for _ in range(4)]
+        while not backend.reads:
+            threading.Event().wait(0.001)
+        backend.release.set()
+        for read in reads:
+            with pytest.raises(RuntimeError):
+                read.result()
+    with pytest.raises(RuntimeError):
+        repository.read_single("XX0000000000")
+    assert len(backend.reads) == 2 and len(repository) == 0
+
+
+def test_write_during_a_read_is_not_hidden_by_it() -> None:
+    backend = CountingRepository()
+    repository = CachingMusicSingleReleaseRepository(backend)
+    repository.create_single(_single(1))
+    backend.release.clear()
+    with ThreadPoolExecutor(1) as pool:
+        stale = pool.submit(repository.read_single, _single(1).isrc)
+        while not backend.reads:
+            threading.Event().wait(0.001)
+        # Applied after the read, observed before it finishes
+        ConcurrentInMemoryMusicSingleReleaseRepository.update_single(
+            backend, _single(1).isrc, _single(1, title="New")
+        )
+        repository.observe([("updated", _single(1).isrc, _single(1, title="New"))])
+        backend.release.set()
+        stale.result()
+    assert repository.read_single(_single(1).isrc).title == "New"
+
+
+def test_frequent_singles_survive_a_scan() -> None:
+    repository = CachingMusicSingleReleaseRepository(
+        ConcurrentInMemoryMusicSingleReleaseRepository(), size=4
+    )
+    repository.create_singles([_single(n) for n in range(100)])
+    for _ in range(5):
+        for n in range(4):
+            repository.read_single(_single(n).isrc)
+    for n in range(4, 100):
+        repository.read_single(_single(n).isrc)
+    hits, _ = repository.hit_counts()
+    for n in range(4):
+        repository.read_single(_single(n).isrc)
+    assert repository.hit_counts()[0] == hits + 4
+
+
+def test_sketch_counts_and_ages() -> None:
+    sketch = FrequencySketch(16)
+    for _ in range(20):
+        sketch.increment("hot")
+    sketch.increment("cold")
+    assert sketch.frequency("hot") == 15
+    assert sketch.frequency("cold") >= 1
+    for n in range(1000):
+        sketch.increment(str(n))
+    assert sketch.frequency("hot") < 15
@@ -0,0 +1,180 @@
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.adapters.columnar import ColumnarMusicSingleReleaseRepository
+from musos_assist.domain.models import MusicSingleQuery, MusicSingleRelease
+from musos_assist.domain.ports import BulkWriteError, MusicSingleReleaseRepository
+from musos_assist.constants import EXAMPLE_SINGLE_DATA, SINGLE_NOT_FOUND
+from musos_assist.routers import get_repository
+
+
+def _single(isrc: str, **update: object) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": isrc, "title": f"Song {isrc}", **update}
+    )
+
+
+def test_columnar_repository_round_trips_singles() -> None:
+    repository = ColumnarMusicSingleReleaseRepository()
+    assert isinstance(repository, MusicSingleReleaseRepository)
+    full = _single("US0000000001")
+    sparse = _single(
+        "US0000000002",
+        release_date=date(1999, 12, 31),
+        **{field: None for field in ("label", "version", "duration", "lyrics")},
+    )
+    repository.create_single(full)
+    repository.create_single(sparse)
+    assert repository.read_single(full.isrc) == full
+    assert repository.read_single(sparse.isrc) == sparse
+    assert repository.list_singles() == [full, sparse]
+    with pytest.raises(ValueError, match="ISRC already exists"):
+        repository.create_single(full)
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.read_single("US0000000003")
+
+
+def test_columnar_repository_keeps_whole_second_durations() -> None:
+    repository = ColumnarMusicSingleReleaseRepository()
+    repository.create_single(
+        _single("US0000000001", duration=timedelta(minutes=3, seconds=44.6))
+    )
+    assert repository.read_single("US0000000001").duration == timedelta(
+        minutes=3, seconds=45
+    )
+
+
+def test_columnar_repository_interns_shared_strings() -> None:
+    repository = ColumnarMusicSingleReleaseRepository()
+    repository.create_singles([_single(f"US000000000{n}") for n in range(5)])
+    # Artists, genres, formats, credits, label, version and language
+    assert len(repository._strings) == 12
+    assert len(repository._lists) == 6
+
+
+def test_columnar_repository_updates_and_deletes() -> None:
+    repository = ColumnarMusicSingleReleaseRepository()
+    repository.create_singles([_single("US0000000001"), _single("US0000000002")])
+    renamed = _single("US0000000003", lyrics=None, label="Other Label")
+    assert repository.update_single("US0000000001", renamed) == renamed
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.read_single("US0000000001")
+    assert repository.read_single("US0000000003") == renamed
+    with pytest.raises(ValueError, match="ISRC already exists"):
+        repository.update_single("US0000000002", renamed)
+    repository.delete_single("US0000000002")
+    assert repository.count_singles() == 1
+    # The freed slot is reused
+    repository.create_single(_single("US0000000004"))
+    assert len(repository._isrcs) == 2
+    assert repository.count_singles() == 2
+    assert [single.isrc for single in repository.list_singles_page()] == [
+        "US0000000003",
+        "US0000000004",
+    ]
+    assert repository.list_singles_page(after="US0000000003", limit=1) == [
+        _single("US0000000004")
+    ]
+
+
+def test_columnar_repository_batch_writes() -> None:
+    repository = ColumnarMusicSingleReleaseRepository()
+    repository.create_singles([_single("US0000000002"), _single("US0000000001")])
+    with pytest.raises(BulkWriteError) as error:
+        repository.create_singles([_single("US0000000001"), _single("US0000000003")])
+    assert error.value.errors == {0: "ISRC already exists"}
+    changed = _single("US0000000001", title="Changed")
+    repository.upsert_singles([changed, _single("US0000000003")])
+    assert repository.read_single("US0000000001") == changed
+    with pytest.raises(BulkWriteError) as error:
+        repository.delete_singles(["US0000000001", "US0000000009"])
+    assert error.value.errors == {1: SINGLE_NOT_FOUND}
+    repository.delete_singles(["US0000000001", "US0000000003"])
+    assert [single.isrc for single in repository.list_singles_page()] == [
+        "US0000000002"
+    ]
+
+
+def test_columnar_repository_queries_match_in_memory() -> None:
+    singles = [
+        _single(
+            f"US00000000{n:02d}",
+            artist_names=[f"Artist {n % 3}"],
+            genres=["Rock" if n % 2 else "Pop"],
+            release_date=date(2020, 1, 1) + timedelta(days=30 * n),
+        )
+        for n in range(20)
+    ]
+    columnar = ColumnarMusicSingleReleaseRepository()
+    in_memory = InMemoryMusicSingleReleaseRepository()
+    columnar.create_singles(singles)
+    in_memory.create_singles(singles)
+    queries = [
+        MusicSingleQuery(artist="artist 1"),
+        MusicSingleQuery(genre="ROCK", language="english"),
+        MusicSingleQuery(released_from=date(2020, 6, 1), released_to=date(2021, 1, 1)),
+        MusicSingleQuery(artist="Artist 2", released_from=date(2020, 6, 1)),
+        MusicSingleQuery(label="Nobody"),
+    ]
+    for query in queries:
+        assert columnar.query_singles(query) == in_memory.query_singles(query)
+        assert columnar.query_singles(
+            query, after="US0000000005", limit=2
+        ) == in_memory.query_singles(query, after="US0000000005", limit=2)
+
+
+def test_columnar_repository_revisions() -> None:
+    repository = ColumnarMusicSingleReleaseRepository()
+    start = repository.catalogue_revision()
+    repository.create_single(_single("US0000000001"))
+    _, revision = repository.read_single_with_revision("US0000000001")
+    assert revision > start
+    repository.create_single(_single("US0000000002"))
+    assert repository.read_single_with_revision("US0000000001")[1] == revision
+    repository.update_single("US0000000001", _single("US0000000001", title="New"))
+    assert repository.read_single_with_revision("US0000000001")[1] > revision
+    assert repository.catalogue_revision() > revision
+
+
+def test_columnar_repository_spills_lyrics_to_a_file(tmp_path: Path) -> None:
+    path = tmp_path / "lyrics"
+    repository = ColumnarMusicSingleReleaseRepository(str(path))
+    repository.create_single(_single("US0000000001"))
+    repository.create_single(_single("US0000000002", lyrics=None))
+    repository.update_single("US0000000001", _single("US0000000001", lyrics="New"))
+    assert repository.read_single("US0000000001").lyrics == "New"
+    assert repository.read_single("US0000000002").lyrics is None
+    assert path.stat().st_size > 0
+    repository.close()
+
+
+def test_columnar_repository_is_compact() -> None:
+    singles = [
+        _single(f"US{n:010d}", lyrics=f"{EXAMPLE_SINGLE_DATA['lyrics']} {n}" * 20)
+        for n in range(2000)
+    ]
+    sizes = []
+    for repository in (
+        InMemoryMusicSingleReleaseRepository(),
+        ColumnarMusicSingleReleaseRepository(),
+    ):
+        tracemalloc.start()
+        repository.create_singles(singles)
+        sizes.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+    in_memory, columnar = sizes
+    assert columnar * 4 < in_memory
+
+
+def test_columnar_repository_search_is_not_implemented() -> None:
+    repository = ColumnarMusicSingleReleaseRepository()
+    app.dependency_overrides[get_repository] = lambda: repository
+    try:
+        response = TestClient(app).get("/singles/search", params={"q": "song"})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 501
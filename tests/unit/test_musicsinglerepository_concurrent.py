@@ -0,0 +1,201 @@
+import random
+import threading
+import time
+from typing import Callable
+import pytest
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.adapters.forwarding import locked_stripes
+from musos_assist.domain.models import MusicSingleQuery, MusicSingleRelease
+from musos_assist.domain.ports import MusicSingleReleaseRepository
+from musos_assist.constants import EXAMPLE_SINGLE_DATA, SINGLE_NOT_FOUND
+
+
+def _single(isrc: str, title: str = "My Awesome Song") -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": isrc, "title": title}
+    )
+
+
+def _run_threads(count: int, work: Callable[[int], object]) -> list[Exception]:
+    errors: list[Exception] = []
+    barrier = threading.Barrier(count)
+
+    def run(thread: int) -> None:
+        barrier.wait()
+        try:
+            work(thread)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def _assert_consistent(
+    repository: ConcurrentInMemoryMusicSingleReleaseRepository,
+) -> None:
+    isrcs = sorted(repository.singles_db)
+    assert repository.list_singles_page(limit=len(isrcs) + 1) == [
+        repository.singles_db[isrc] for isrc in isrcs
+    ]
+    assert sorted(isrc for _, isrc in repository._release_dates) == isrcs
+    artist = MusicSingleQuery(artist="My Band")
+    assert len(repository.query_singles(artist, limit=len(isrcs) + 1)) == len(isrcs)
+
+
+def test_concurrent_repository_is_a_repository() -> None:
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    assert isinstance(repository, MusicSingleReleaseRepository)
+    repository.create_single(_single("US0000000001"))
+    with pytest.raises(ValueError, match="ISRC already exists"):
+        repository.create_single(_single("US0000000001"))
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.read_single("US0000000002")
+
+
+def test_rename_does_not_overwrite_another_single() -> None:
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    repository.create_single(_single("US0000000001"))
+    repository.create_single(_single("US0000000002"))
+    with pytest.raises(ValueError, match="ISRC already exists"):
+        repository.update_single("US0000000001", _single("US0000000002"))
+    repository.update_single("US0000000001", _single("US0000000003", "Renamed"))
+    assert [single.isrc for single in repository.list_singles_page()] == [
+        "US0000000002",
+        "US0000000003",
+    ]
+
+
+def test_racing_creates_admit_one_winner() -> None:
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    errors = _run_threads(
+        8, lambda t: repository.create_single(_single("US0000000001", f"Song {t}"))
+    )
+    assert len(errors) == 7
+    assert all(str(error) == "ISRC already exists" for error in errors)
+    assert len(repository.list_singles()) == 1
+    _assert_consistent(repository)
+
+
+def test_racing_renames_onto_one_isrc_admit_one_winner() -> None:
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    for t in range(8):
+        repository.create_single(_single(f"US{t:010d}"))
+    errors = _run_threads(
+        8,
+        lambda t: repository.update_single(f"US{t:010d}", _single("US9999999999")),
+    )
+    assert len(errors) == 7
+    assert len(repository.list_singles()) == 8
+    _assert_consistent(repository)
+
+
+def test_reads_during_updates_always_find_the_single() -> None:
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    isrc = "US0000000001"
+    repository.create_single(_single(isrc))
+    stop = threading.Event()
+    missing: list[str] = []
+
+    def read() -> None:
+        while not stop.is_set():
+            for read_one in (
+                repository.read_single,
+                repository.read_single_with_revision,
+            ):
+                try:
+                    read_one(isrc)
+                except (ValueError, KeyError) as error:
+                    missing.append(repr(error))
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for n in range(2000):
+        repository.update_single(isrc, _single(isrc, f"Take {n}"))
+        repository.upsert_singles([_single(isrc, f"Upsert {n}")])
+    stop.set()
+    reader.join()
+
+    assert missing == []
+    assert repository.read_single(isrc).title == "Upsert 1999"
+
+
+def test_writers_wait_only_on_their_own_stripes() -> None:
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository(stripes=8)
+    held = "US0000000001"
+    other = next(
+        isrc
+        for isrc in (f"US{n:010d}" for n in range(2, 100))
+        if hash(isrc) % 8 != hash(held) % 8
+    )
+    with locked_stripes(repository._stripes, [held]):
+        writer = threading.Thread(
+            target=repository.create_single, args=(_single(other),)
+        )
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        waiting = threading.Thread(
+            target=repository.create_single, args=(_single(held),)
+        )
+        waiting.start()
+        waiting.join(timeout=0.1)
+        assert waiting.is_alive()
+    waiting.join()
+    assert [single.isrc for single in repository.list_singles_page()] == sorted(
+        [held, other]
+    )
+
+
+def test_stress_mixed_writers_and_readers() -> None:
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository(stripes=8)
+    pool = [f"US{n:010d}" for n in range(40)]
+    stop = threading.Event()
+    torn: list[str] = []
+
+    def write(thread: int) -> None:
+        rng = random.Random(thread)
+        for _ in range(200):
+            isrc, other = rng.sample(pool, 2)
+            action = rng.randrange(4)
+            try:
+                if action == 0:
+                    repository.create_single(_single(isrc))
+                elif action == 1:
+                    repository.update_single(isrc, _single(other, f"From {isrc}"))
+                elif action == 2:
+                    repository.delete_single(isrc)
+                else:
+                    repository.upsert_singles([_single(isrc), _single(other)])
+            except ValueError:
+                pass
+
+    def read() -> None:
+        while not stop.is_set():
+            snapshot = repository.list_singles()
+            isrcs = [single.isrc for single in snapshot]
+            if len(isrcs) != len(set(isrcs)):
+                torn.append("duplicate ISRC in snapshot")
+            repository.list_singles_page(limit=10)
+            time.sleep(0)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    errors = _run_threads(8, write)
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert torn == []
+    _assert_consistent(repository)
+    assert [single.isrc for single in repository.list_singles()] == list(
+        repository.singles_db
+    )
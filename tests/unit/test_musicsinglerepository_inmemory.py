@@ -1,6 +1,8 @@
+from datetime import date
+from typing import Any
 import pytest
-from musos_assist.domain.ports import MusicSingleReleaseRepository
-from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.domain.ports import BulkWriteError, MusicSingleReleaseRepository
+from musos_assist.domain.models import MusicSingleQuery, MusicSingleRelease
 from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
 from musos_assist.constants import EXAMPLE_SINGLE_DATA, SINGLE_NOT_FOUND
 
@@ -69,11 +71,24 @@ def test_update_single_not_found() -> None:
         repository.update_single("US1234567890", single)
 
 
+def test_update_single_rename_to_existing_isrc() -> None:
+    repository: MusicSingleReleaseRepository = InMemoryMusicSingleReleaseRepository()
+    first = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+    second = first.model_copy(update={"isrc": "US1234567890", "title": "Second"})
+    repository.create_singles([first, second])
+    with pytest.raises(ValueError, match="ISRC already exists"):
+        repository.update_single(first.isrc, second)
+    assert repository.read_single(first.isrc) == first
+    assert repository.read_single(second.isrc) == second
+
+
 def test_delete_single() -> None:
     repository: MusicSingleReleaseRepository = InMemoryMusicSingleReleaseRepository()
     single = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
     repository.create_single(single)
+    assert repository.count_singles() == 1
     repository.delete_single(single.isrc)
+    assert repository.count_singles() == 0
     with pytest.raises(ValueError):
         repository.read_single(single.isrc)
 
@@ -82,3 +97,196 @@ def test_delete_single_not_found() -> None:
     repository: MusicSingleReleaseRepository = InMemoryMusicSingleReleaseRepository()
     with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
         repository.delete_single("US1234567890")
+
+
+def _create_singles(repository: MusicSingleReleaseRepository, isrcs: list[str]) -> None:
+    for isrc in isrcs:
+        single = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+        single.isrc = isrc
+        repository.create_single(single)
+
+
+def test_list_singles_page_is_isrc_ordered() -> None:
+    repository: MusicSingleReleaseRepository = InMemoryMusicSingleReleaseRepository()
+    _create_singles(repository, ["US0000000003", "US0000000001", "US0000000002"])
+    page = repository.list_singles_page(limit=2)
+    assert [single.isrc for single in page] == ["US0000000001", "US0000000002"]
+    page = repository.list_singles_page(after=page[-1].isrc, limit=2)
+    assert [single.isrc for single in page] == ["US0000000003"]
+    assert repository.list_singles_page(after="US0000000003") == []
+
+
+def test_list_singles_page_follows_delete_and_rename() -> None:
+    repository: MusicSingleReleaseRepository = InMemoryMusicSingleReleaseRepository()
+    _create_singles(repository, ["US0000000001", "US0000000002", "US0000000003"])
+    repository.delete_single("US0000000002")
+    renamed = repository.read_single("US0000000001").model_copy()
+    renamed.isrc = "US0000000009"
+    repository.update_single("US0000000001", renamed)
+    isrcs = [single.isrc for single in repository.list_singles_page()]
+    assert isrcs == ["US0000000003", "US0000000009"]
+
+
+def test_iter_singles_walks_every_page() -> None:
+    repository: MusicSingleReleaseRepository = InMemoryMusicSingleReleaseRepository()
+    isrcs = [f"US{n:010d}" for n in range(7)]
+    _create_singles(repository, isrcs)
+    assert [single.isrc for single in repository.iter_singles(batch_size=3)] == isrcs
+    assert [
+        single.isrc for single in repository.iter_singles(after=isrcs[4], batch_size=3)
+    ] == isrcs[5:]
+
+
+def _catalogue() -> MusicSingleReleaseRepository:
+    repository: MusicSingleReleaseRepository = InMemoryMusicSingleReleaseRepository()
+    rows = [
+        ("US0000000001", ["Band A"], ["Rock"], "Label X", date(2024, 1, 1)),
+        ("US0000000002", ["Band A", "Guest"], ["Pop"], "Label Y", date(2024, 2, 1)),
+        ("US0000000003", ["Band B"], ["Rock"], "Label X", date(2024, 3, 1)),
+        ("US0000000004", ["Band B"], ["Rock", "Pop"], None, date(2024, 4, 1)),
+    ]
+    for isrc, artists, genres, label, release_date in rows:
+        single = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+        single.isrc = isrc
+        single.artist_names = artists
+        single.genres = genres
+        single.label = label
+        single.release_date = release_date
+        repository.create_single(single)
+    return repository
+
+
+def _query_isrcs(
+    repository: MusicSingleReleaseRepository, **criteria: Any
+) -> list[str]:
+    return [
+        single.isrc for single in repository.query_singles(MusicSingleQuery(**criteria))
+    ]
+
+
+def test_query_singles_by_indexed_fields() -> None:
+    repository = _catalogue()
+    assert _query_isrcs(repository, artist="band a") == ["US0000000001", "US0000000002"]
+    assert _query_isrcs(repository, genre="Rock", label="Label X") == [
+        "US0000000001",
+        "US0000000003",
+    ]
+    assert _query_isrcs(repository, genre="Pop", artist="Guest") == ["US0000000002"]
+    assert _query_isrcs(repository, genre="Jazz") == []
+    assert len(_query_isrcs(repository)) == 4
+
+
+def test_query_singles_by_release_date_range() -> None:
+    repository = _catalogue()
+    assert _query_isrcs(
+        repository, released_from=date(2024, 2, 1), released_to=date(2024, 3, 1)
+    ) == ["US0000000002", "US0000000003"]
+    assert _query_isrcs(repository, genre="Rock", released_from=date(2024, 2, 1)) == [
+        "US0000000003",
+        "US0000000004",
+    ]
+    assert _query_isrcs(repository, released_to=date(2023, 12, 31)) == []
+
+
+def test_query_singles_paginates() -> None:
+    repository = _catalogue()
+    query = MusicSingleQuery(genre="rock")
+    page = repository.query_singles(query, limit=2)
+    assert [single.isrc for single in page] == ["US0000000001", "US0000000003"]
+    page = repository.query_singles(query, after=page[-1].isrc, limit=2)
+    assert [single.isrc for single in page] == ["US0000000004"]
+
+
+def test_query_singles_indexes_follow_writes() -> None:
+    repository = _catalogue()
+    moved = repository.read_single("US0000000001").model_copy()
+    moved.isrc = "US0000000009"
+    moved.genres = ["Jazz"]
+    repository.update_single("US0000000001", moved)
+    repository.delete_single("US0000000003")
+    assert _query_isrcs(repository, genre="Rock") == ["US0000000004"]
+    assert _query_isrcs(repository, genre="Jazz") == ["US0000000009"]
+    assert _query_isrcs(repository, released_to=date(2024, 1, 31)) == ["US0000000009"]
+    assert _query_isrcs(repository, label="Label X") == ["US0000000009"]
+
+
+def test_create_singles_is_atomic() -> None:
+    repository = _catalogue()
+    batch = [
+        MusicSingleRelease(**{**EXAMPLE_SINGLE_DATA, "isrc": isrc})
+        for isrc in ("US0000000005", "US0000000001", "US0000000005")
+    ]
+    with pytest.raises(BulkWriteError) as excinfo:
+        repository.create_singles(batch)
+    assert excinfo.value.errors == {
+        1: "ISRC already exists",
+        2: "ISRC repeated within the batch",
+    }
+    assert len(repository.list_singles()) == 4
+    repository.create_singles(batch[:1])
+    assert _query_isrcs(repository, genre="indie") == ["US0000000005"]
+
+
+def test_upsert_and_delete_singles() -> None:
+    repository = _catalogue()
+    replacement = repository.read_single("US0000000001").model_copy()
+    replacement.genres = ["Jazz"]
+    added = MusicSingleRelease(**{**EXAMPLE_SINGLE_DATA, "isrc": "US0000000005"})
+    repository.upsert_singles([replacement, added])
+    assert _query_isrcs(repository, genre="jazz") == ["US0000000001"]
+    assert _query_isrcs(repository, genre="rock") == [
+        "US0000000003",
+        "US0000000004",
+        "US0000000005",
+    ]
+
+    with pytest.raises(BulkWriteError) as excinfo:
+        repository.delete_singles(["US0000000002", "US0000000009"])
+    assert excinfo.value.errors == {1: SINGLE_NOT_FOUND}
+    repository.delete_singles(["US0000000002", "US0000000005"])
+    assert [single.isrc for single in repository.list_singles_page()] == [
+        "US0000000001",
+        "US0000000003",
+        "US0000000004",
+    ]
+    assert _query_isrcs(repository, released_from=date(2024, 2, 1)) == [
+        "US0000000003",
+        "US0000000004",
+    ]
+
+
+def test_revisions_change_on_every_write() -> None:
+    repository = InMemoryMusicSingleReleaseRepository()
+    _create_singles(repository, ["US0000000001", "US0000000002"])
+    single, first = repository.read_single_with_revision("US0000000001")
+    catalogue = repository.catalogue_revision()
+    assert repository.read_single_with_revision("US0000000001") == (single, first)
+
+    repository.update_single("US0000000001", single)
+    _, second = repository.read_single_with_revision("US0000000001")
+    assert second > first
+    assert repository.catalogue_revision() > catalogue
+
+    repository.delete_single("US0000000001")
+    repository.create_single(single)
+    assert repository.read_single_with_revision("US0000000001")[1] > second
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.read_single_with_revision("US0000000009")
+
+
+def test_search_follows_writes() -> None:
+    repository = InMemoryMusicSingleReleaseRepository()
+    single = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+    repository.create_single(single)
+    hits = repository.search_singles("cool so")
+    assert [hit.single for hit in hits] == [single]
+    assert hits[0].score > 0
+
+    renamed = single.model_copy(update={"isrc": "US0000000002", "lyrics": "Hush"})
+    repository.update_single(single.isrc, renamed)
+    assert repository.search_singles("cool") == []
+    assert [hit.single.isrc for hit in repository.search_singles("hush")] == [
+        "US0000000002"
+    ]
+    repository.delete_singles(["US0000000002"])
+    assert repository.search_singles("awesome") == []
@@ -0,0 +1,170 @@
+import os
+import threading
+from pathlib import Path
+import pytest
+from musos_assist.domain.ports import MusicSingleReleaseRepository
+from musos_assist.domain.models import MusicSingleQuery, MusicSingleRelease
+from musos_assist.adapters.journal import (
+    SNAPSHOT_FILE,
+    JournalMusicSingleReleaseRepository,
+    journal_name,
+)
+from musos_assist.constants import EXAMPLE_SINGLE_DATA, SINGLE_NOT_FOUND
+
+
+def _single(isrc: str, title: str = "My Awesome Song") -> MusicSingleRelease:
+    single = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+    single.isrc = isrc
+    single.title = title
+    return single
+
+
+def test_journal_repository_is_a_repository(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path))
+    assert isinstance(repository, MusicSingleReleaseRepository)
+    assert repository.list_singles() == []
+    repository.close()
+
+
+def test_writes_survive_restart(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path))
+    repository.create_single(_single("US0000000001"))
+    repository.create_single(_single("US0000000002"))
+    repository.update_single("US0000000001", _single("US0000000003", "Renamed"))
+    repository.delete_single("US0000000002")
+    repository.close()
+
+    recovered = JournalMusicSingleReleaseRepository(str(tmp_path))
+    assert [single.isrc for single in recovered.list_singles()] == ["US0000000003"]
+    assert recovered.read_single("US0000000003").title == "Renamed"
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        recovered.read_single("US0000000001")
+    recovered.close()
+
+
+def test_failed_write_is_not_journaled(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path))
+    repository.create_single(_single("US0000000001"))
+    with pytest.raises(ValueError, match="ISRC already exists"):
+        repository.create_single(_single("US0000000001"))
+    repository.close()
+    with open(tmp_path / journal_name(0)) as handle:
+        assert len(handle.readlines()) == 1
+
+
+def test_snapshot_compacts_journal(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path), snapshot_every=3)
+    for n in range(5):
+        repository.create_single(_single(f"US{n:010d}"))
+    repository.close()
+    assert (tmp_path / SNAPSHOT_FILE).exists()
+    assert not (tmp_path / journal_name(0)).exists()
+    with open(tmp_path / journal_name(1)) as handle:
+        assert len(handle.readlines()) == 2
+
+    recovered = JournalMusicSingleReleaseRepository(str(tmp_path))
+    assert len(recovered.list_singles()) == 5
+    assert len(recovered.query_singles(MusicSingleQuery(artist="My Band"))) == 5
+    recovered.close()
+
+
+def test_torn_tail_is_truncated(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path))
+    repository.create_single(_single("US0000000001"))
+    repository.close()
+    journal_path = tmp_path / journal_name(0)
+    intact_size = os.path.getsize(journal_path)
+    with open(journal_path, "a") as handle:
+        handle.write('C\tUS0000000002\t{"title": "half writ')
+
+    recovered = JournalMusicSingleReleaseRepository(str(tmp_path))
+    assert [single.isrc for single in recovered.list_singles()] == ["US0000000001"]
+    assert os.path.getsize(journal_path) == intact_size
+    recovered.create_single(_single("US0000000002"))
+    recovered.close()
+    assert len(JournalMusicSingleReleaseRepository(str(tmp_path)).list_singles()) == 2
+
+
+def test_corrupt_entry_before_tail_raises(tmp_path: Path) -> None:
+    with open(tmp_path / journal_name(0), "w") as handle:
+        handle.write("X\tUS0000000001\t{}\n")
+        handle.write("D\tUS0000000001\t\n")
+    with pytest.raises(ValueError, match="Corrupt journal entry"):
+        JournalMusicSingleReleaseRepository(str(tmp_path))
+
+
+def test_concurrent_writers_share_commits(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path))
+
+    def write(offset: int) -> None:
+        for n in range(25):
+            repository.create_single(_single(f"US{offset + n:010d}"))
+
+    threads = [threading.Thread(target=write, args=(t * 100,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    repository.close()
+    assert len(JournalMusicSingleReleaseRepository(str(tmp_path)).list_singles()) == 100
+
+
+def test_reads_during_deletes(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path), fsync=False)
+    singles = [_single(f"US{n:010d}") for n in range(400)]
+    repository.create_singles(singles)
+    done = threading.Event()
+    errors: list[Exception] = []
+
+    def read() -> None:
+        try:
+            while not done.is_set():
+                repository.list_singles_page(limit=50)
+                repository.query_singles(MusicSingleQuery(genre="Indie"), limit=50)
+                repository.search_singles("awesome", limit=50)
+                repository.list_singles()
+        except Exception as error:
+            errors.append(error)
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    for single in singles:
+        repository.delete_single(single.isrc)
+    done.set()
+    for reader in readers:
+        reader.join()
+    repository.close()
+    assert errors == []
+
+
+def test_batches_survive_restart(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path))
+    repository.create_singles([_single(f"US{n:010d}") for n in range(4)])
+    repository.upsert_singles([_single("US0000000000", "Replaced")])
+    repository.delete_singles(["US0000000001", "US0000000002"])
+    repository.create_singles([])
+    repository.close()
+
+    recovered = JournalMusicSingleReleaseRepository(str(tmp_path))
+    assert [single.isrc for single in recovered.list_singles_page()] == [
+        "US0000000000",
+        "US0000000003",
+    ]
+    assert recovered.read_single("US0000000000").title == "Replaced"
+    recovered.close()
+
+
+def test_torn_batch_is_dropped_whole(tmp_path: Path) -> None:
+    repository = JournalMusicSingleReleaseRepository(str(tmp_path))
+    repository.create_single(_single("US0000000009"))
+    repository.create_singles([_single(f"US{n:010d}") for n in range(3)])
+    repository.close()
+    journal_path = tmp_path / journal_name(0)
+    with open(journal_path, "rb+") as handle:
+        lines = handle.readlines()
+        handle.truncate(sum(len(line) for line in lines[:-1]))
+
+    recovered = JournalMusicSingleReleaseRepository(str(tmp_path))
+    assert [single.isrc for single in recovered.list_singles()] == ["US0000000009"]
+    recovered.close()
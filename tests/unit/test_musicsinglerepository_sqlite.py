@@ -0,0 +1,310 @@
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+import pytest
+from musos_assist.domain.ports import BulkWriteError, MusicSingleReleaseRepository
+from musos_assist.domain.models import MusicSingleQuery, MusicSingleRelease
+from musos_assist.adapters.sqlite import SQLiteMusicSingleReleaseRepository
+from musos_assist.constants import EXAMPLE_SINGLE_DATA, SINGLE_NOT_FOUND
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> Iterator[SQLiteMusicSingleReleaseRepository]:
+    repository = SQLiteMusicSingleReleaseRepository(str(tmp_path / "singles.db"))
+    yield repository
+    repository.close()
+
+
+def _single(isrc: str, **changes: object) -> MusicSingleRelease:
+    single = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+    return single.model_copy(update={"isrc": isrc, **changes})
+
+
+def test_create_and_read_round_trip(
+    repository: SQLiteMusicSingleReleaseRepository,
+) -> None:
+    assert isinstance(repository, MusicSingleReleaseRepository)
+    single = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+    assert repository.create_single(single) == single
+    assert repository.read_single(single.isrc) == single
+    with pytest.raises(ValueError, match="ISRC already exists"):
+        repository.create_single(single)
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.read_single("US0000000000")
+
+
+def test_optional_fields_round_trip(
+    repository: SQLiteMusicSingleReleaseRepository,
+) -> None:
+    single = _single(
+        "US0000000001",
+        label=None,
+        duration=None,
+        artwork_url=None,
+        subgenres=None,
+        composers=None,
+    )
+    repository.create_single(single)
+    assert repository.read_single("US0000000001") == single
+
+
+def test_update_and_delete(repository: SQLiteMusicSingleReleaseRepository) -> None:
+    repository.create_single(_single("US0000000001"))
+    repository.create_single(_single("US0000000002"))
+    renamed = _single("US0000000003", title="Renamed", genres=["Jazz"])
+    assert repository.update_single("US0000000001", renamed) == renamed
+    assert [single.isrc for single in repository.list_singles()] == [
+        "US0000000002",
+        "US0000000003",
+    ]
+    with pytest.raises(ValueError, match="ISRC already exists"):
+        repository.update_single("US0000000002", _single("US0000000003"))
+    assert repository.read_single("US0000000002").title == "My Awesome Song"
+    assert repository.count_singles() == 2
+    repository.delete_single("US0000000002")
+    assert repository.count_singles() == 1
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.delete_single("US0000000002")
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.update_single("US0000000002", _single("US0000000002"))
+
+
+def test_pages_and_summaries(repository: SQLiteMusicSingleReleaseRepository) -> None:
+    for n in (3, 1, 2):
+        repository.create_single(_single(f"US000000000{n}"))
+    page = repository.list_singles_page(limit=2)
+    assert [single.isrc for single in page] == ["US0000000001", "US0000000002"]
+    page = repository.list_singles_page(after=page[-1].isrc, limit=2)
+    assert [single.isrc for single in page] == ["US0000000003"]
+    summaries = repository.list_summaries(after="US0000000001")
+    assert [summary.isrc for summary in summaries] == ["US0000000002", "US0000000003"]
+    assert summaries[0].release_date == date(2024, 1, 15)
+
+
+def test_summaries_use_covering_index(
+    repository: SQLiteMusicSingleReleaseRepository,
+) -> None:
+    with repository.pool.connection() as connection:
+        plan = " ".join(
+            str(row[-1])
+            for row in connection.execute(
+                "EXPLAIN QUERY PLAN SELECT isrc, title, release_date FROM singles"
+                " INDEXED BY singles_summary WHERE isrc > ? ORDER BY isrc LIMIT ?",
+                ("", 10),
+            )
+        )
+    assert "COVERING INDEX singles_summary" in plan
+
+
+def test_query_singles(repository: SQLiteMusicSingleReleaseRepository) -> None:
+    repository.create_single(_single("US0000000001", artist_names=["Band A"]))
+    repository.create_single(
+        _single("US0000000002", artist_names=["Band B"], genres=["Pop"])
+    )
+    repository.create_single(
+        _single("US0000000003", label="Other", release_date=date(2025, 1, 1))
+    )
+
+    def isrcs(**criteria: object) -> list[str]:
+        query = MusicSingleQuery.model_validate(criteria)
+        return [single.isrc for single in repository.query_singles(query)]
+
+    assert isrcs(artist="band a") == ["US0000000001"]
+    assert isrcs(genre="rock") == ["US0000000001", "US0000000003"]
+    assert isrcs(label="independent label", genre="Pop") == ["US0000000002"]
+    assert isrcs(released_from=date(2024, 6, 1)) == ["US0000000003"]
+    assert isrcs(genre="Rock", released_to=date(2024, 6, 1)) == ["US0000000001"]
+
+
+def test_data_survives_reopen(tmp_path: Path) -> None:
+    path = str(tmp_path / "singles.db")
+    repository = SQLiteMusicSingleReleaseRepository(path)
+    repository.create_single(_single("US0000000001"))
+    repository.close()
+    reopened = SQLiteMusicSingleReleaseRepository(path)
+    assert reopened.read_single("US0000000001").isrc == "US0000000001"
+    reopened.close()
+
+
+def test_concurrent_readers_and_writers(tmp_path: Path) -> None:
+    repository = SQLiteMusicSingleReleaseRepository(
+        str(tmp_path / "singles.db"), pool_size=3
+    )
+    errors: list[Exception] = []
+
+    def work(offset: int) -> None:
+        try:
+            for n in range(20):
+                repository.create_single(_single(f"US{offset + n:010d}"))
+                repository.list_singles_page(limit=5)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(t * 100,)) for t in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(repository.list_singles()) == 120
+    repository.close()
+
+
+def test_reads_see_whole_singles_during_writes(tmp_path: Path) -> None:
+    repository = SQLiteMusicSingleReleaseRepository(
+        str(tmp_path / "singles.db"), pool_size=4
+    )
+    versions = [
+        _single("US0000000001", title="One", artist_names=["One"]),
+        _single("US0000000001", title="Two", artist_names=["Two", "Other"]),
+    ]
+    repository.create_single(versions[0])
+    done = threading.Event()
+    errors: list[Exception] = []
+    seen: list[MusicSingleRelease] = []
+
+    def write() -> None:
+        try:
+            for n in range(300):
+                single = versions[n % 2]
+                if n % 3:
+                    repository.update_single(single.isrc, single)
+                else:
+                    repository.delete_single(single.isrc)
+                    repository.create_single(single)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            done.set()
+
+    def read() -> None:
+        try:
+            while not done.is_set():
+                seen.extend(repository.list_singles_page(limit=5))
+                seen.extend(repository.query_singles(MusicSingleQuery()))
+                try:
+                    seen.append(repository.read_single("US0000000001"))
+                except ValueError as error:
+                    assert str(error) == SINGLE_NOT_FOUND
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=write)]
+    threads += [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    repository.close()
+    assert errors == []
+    # Never the title of one version with the artists of the other
+    assert seen and all(single in versions for single in seen)
+
+
+def test_batch_writes(repository: SQLiteMusicSingleReleaseRepository) -> None:
+    repository.create_singles([_single(f"US{n:010d}") for n in range(3)])
+    with pytest.raises(BulkWriteError) as excinfo:
+        repository.create_singles([_single("US0000000009"), _single("US0000000001")])
+    assert excinfo.value.errors == {1: "ISRC already exists"}
+    repository.upsert_singles(
+        [_single("US0000000001", title="Replaced"), _single("US0000000009")]
+    )
+    assert repository.read_single("US0000000001").title == "Replaced"
+    with pytest.raises(BulkWriteError) as excinfo:
+        repository.delete_singles(["US0000000000", "US0000000000"])
+    assert excinfo.value.errors == {1: "ISRC repeated within the batch"}
+    repository.delete_singles(["US0000000000", "US0000000009"])
+    assert [single.isrc for single in repository.list_singles_page()] == [
+        "US0000000001",
+        "US0000000002",
+    ]
+    assert repository.read_single("US0000000001").artist_names == ["My Band"]
+
+
+def test_revisions(repository: SQLiteMusicSingleReleaseRepository) -> None:
+    repository.create_single(_single("US0000000001"))
+    catalogue = repository.catalogue_revision()
+    single, first = repository.read_single_with_revision("US0000000001")
+    assert single.isrc == "US0000000001"
+    repository.update_single("US0000000001", _single("US0000000001", title="New"))
+    assert repository.read_single_with_revision("US0000000001")[1] > first
+    assert repository.catalogue_revision() > catalogue
+    with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+        repository.read_single_with_revision("US0000000002")
+
+
+def test_search_singles(repository: SQLiteMusicSingleReleaseRepository) -> None:
+    repository.create_single(_single("US0000000001", title="Midnight"))
+    repository.create_single(
+        _single("US0000000002", title="Quiet", lyrics="Midnight rain")
+    )
+    hits = repository.search_singles("midni")
+    assert [hit.single.isrc for hit in hits] == ["US0000000001", "US0000000002"]
+    assert hits[0].score > hits[1].score
+    assert hits[0].single == repository.read_single("US0000000001")
+    assert repository.search_singles('"quiet" OR') == []
+    assert len(repository.search_singles("quiet rain")) == 1
+
+    repository.update_single("US0000000001", _single("US0000000001", title="Dawn"))
+    repository.delete_single("US0000000002")
+    assert repository.search_singles("midnight") == []
+    assert len(repository.search_singles("dawn")) == 1
+
+
+def test_upgrades_database_keyed_by_isrc(tmp_path: Path) -> None:
+    path = str(tmp_path / "singles.db")
+    # The schema of the first release, without row ids or revisions
+    legacy = sqlite3.connect(path)
+    legacy.executescript("""
+        CREATE TABLE singles (
+            isrc TEXT PRIMARY KEY, title TEXT NOT NULL,
+            release_date TEXT NOT NULL, label TEXT, label_key TEXT,
+            version TEXT, duration_seconds REAL, artwork_url TEXT,
+            audio_preview_url TEXT, catalog_number TEXT, language TEXT,
+            language_key TEXT, lyrics TEXT, notes TEXT
+        );
+        CREATE TABLE single_artists (
+            isrc TEXT NOT NULL REFERENCES singles (isrc) ON DELETE CASCADE,
+            position INTEGER NOT NULL, name TEXT NOT NULL,
+            name_key TEXT NOT NULL, PRIMARY KEY (isrc, position)
+        ) WITHOUT ROWID;
+        CREATE TABLE single_genres (
+            isrc TEXT NOT NULL REFERENCES singles (isrc) ON DELETE CASCADE,
+            position INTEGER NOT NULL, name TEXT NOT NULL,
+            name_key TEXT NOT NULL, PRIMARY KEY (isrc, position)
+        ) WITHOUT ROWID;
+        INSERT INTO singles (isrc, title, release_date)
+            VALUES ('US0000000001', 'Midnight', '2024-01-01');
+        INSERT INTO single_artists VALUES ('US0000000001', 0, 'My Band', 'my band');
+        INSERT INTO single_genres VALUES ('US0000000001', 0, 'Indie', 'indie');
+        """)
+    legacy.close()
+
+    repository = SQLiteMusicSingleReleaseRepository(path)
+    single, revision = repository.read_single_with_revision("US0000000001")
+    assert single.artist_names == ["My Band"] and revision > 0
+    assert [hit.single.isrc for hit in repository.search_singles("midnight")] == [
+        "US0000000001"
+    ]
+    repository.create_single(_single("US0000000002"))
+    repository.delete_single("US0000000001")
+    assert repository.query_singles(MusicSingleQuery(artist="My Band")) == [
+        _single("US0000000002")
+    ]
+    repository.close()
+    # Opened again, the upgraded schema is left alone
+    repository = SQLiteMusicSingleReleaseRepository(path)
+    assert repository.count_singles() == 1
+    repository.close()
+
+
+def test_refuses_newer_schema(tmp_path: Path) -> None:
+    path = str(tmp_path / "singles.db")
+    SQLiteMusicSingleReleaseRepository(path).close()
+    newer = sqlite3.connect(path)
+    newer.execute("PRAGMA user_version = 99")
+    newer.close()
+    with pytest.raises(ValueError, match="newer"):
+        SQLiteMusicSingleReleaseRepository(path)
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+from typing import List
+import pytest
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.adapters.threadpool import (
+    ThreadPoolMusicSingleReleaseRepository,
+    repository_executor,
+)
+from musos_assist.domain.models import MusicSingleQuery, MusicSingleRelease
+from musos_assist.domain.ports import AsyncMusicSingleReleaseRepository
+from musos_assist.constants import EXAMPLE_SINGLE_DATA, SINGLE_NOT_FOUND
+
+
+def _single(isrc: str) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": isrc}
+    )
+
+
+class SlowRepository(InMemoryMusicSingleReleaseRepository):
+    """Blocks each read to make concurrency observable."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.threads: set[str] = set()
+
+    def list_singles(self) -> List[MusicSingleRelease]:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return super().list_singles()
+
+
+def test_calls_round_trip_through_the_pool() -> None:
+    repository = ThreadPoolMusicSingleReleaseRepository(
+        InMemoryMusicSingleReleaseRepository()
+    )
+    assert isinstance(repository, AsyncMusicSingleReleaseRepository)
+
+    async def scenario() -> None:
+        single = _single("US0000000001")
+        assert await repository.create_single(single) == single
+        assert await repository.read_single(single.isrc) == single
+        await repository.create_singles([_single("US0000000002")])
+        query = MusicSingleQuery(artist="My Band")
+        assert len(await repository.query_singles(query)) == 2
+        await repository.delete_single(single.isrc)
+        with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+            await repository.read_single(single.isrc)
+        assert await repository.count_singles() == 1
+
+    asyncio.run(scenario())
+
+
+def test_calls_are_timed_on_the_worker() -> None:
+    observed: list[tuple[str, float, str]] = []
+    repository = ThreadPoolMusicSingleReleaseRepository(
+        SlowRepository(),
+        observe=lambda name, seconds: observed.append(
+            (name, seconds, threading.current_thread().name)
+        ),
+    )
+
+    async def scenario() -> None:
+        await repository.list_singles()
+        with pytest.raises(ValueError, match=SINGLE_NOT_FOUND):
+            await repository.read_single("US0000000001")
+
+    asyncio.run(scenario())
+    assert [name for name, _, _ in observed] == ["list_singles", "read_single"]
+    assert observed[0][1] >= 0.02
+    assert all(thread.startswith("musos-repository") for _, _, thread in observed)
+
+
+def test_iter_singles_awaits_pages() -> None:
+    repository = InMemoryMusicSingleReleaseRepository()
+    repository.create_singles([_single(f"US{n:010d}") for n in range(5)])
+    wrapper = ThreadPoolMusicSingleReleaseRepository(repository)
+
+    async def collect() -> list[str]:
+        return [single.isrc async for single in wrapper.iter_singles(batch_size=2)]
+
+    assert asyncio.run(collect()) == [f"US{n:010d}" for n in range(5)]
+
+
+def test_pool_bounds_concurrent_calls() -> None:
+    slow = SlowRepository()
+    repository = ThreadPoolMusicSingleReleaseRepository(
+        slow, repository_executor(max_workers=2)
+    )
+
+    async def burst() -> None:
+        await asyncio.gather(*(repository.list_singles() for _ in range(8)))
+
+    asyncio.run(burst())
+    assert slow.peak == 2
+    assert all(name.startswith("musos-repository") for name in slow.threads)
+
+
+def test_event_loop_stays_responsive() -> None:
+    repository = ThreadPoolMusicSingleReleaseRepository(SlowRepository())
+
+    async def scenario() -> int:
+        ticks = 0
+        call = asyncio.ensure_future(repository.list_singles())
+        while not call.done():
+            ticks += 1
+            await asyncio.sleep(0.001)
+        await call
+        return ticks
+
+    assert asyncio.run(scenario()) > 1
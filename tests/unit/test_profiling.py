@@ -0,0 +1,105 @@
+import json
+import time
+from pathlib import Path
+from typing import Iterator
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.constants import EXAMPLE_SINGLE_DATA, SPEEDSCOPE_SCHEMA
+from musos_assist.domain.models import MusicSingleRelease, ProfilingSettings
+from musos_assist.routers import get_repository
+from musos_assist.routers.profiling import NOT_PROFILED, profiler
+
+client = TestClient(app)
+ISRC = EXAMPLE_SINGLE_DATA["isrc"]
+
+
+class SlowRepository(InMemoryMusicSingleReleaseRepository):
+    def read_single_with_revision(self, isrc: str) -> tuple[MusicSingleRelease, int]:
+        time.sleep(0.05)
+        return super().read_single_with_revision(isrc)
+
+
+@pytest.fixture
+def profiles(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Route requests to a slow repository, profiles to tmp_path."""
+    repository = SlowRepository()
+    repository.create_single(MusicSingleRelease(**EXAMPLE_SINGLE_DATA))
+    app.dependency_overrides[get_repository] = lambda: repository
+    monkeypatch.setattr(profiler, "directory", str(tmp_path))
+    yield tmp_path
+    profiler.configure(ProfilingSettings())
+    profiler.wait()
+    app.dependency_overrides.pop(get_repository)
+
+
+def _profile(directory: Path, pattern: str) -> str:
+    profiler.wait()
+    (path,) = directory.glob(pattern)
+    assert "-GET-singles-isrc-" in path.name
+    return path.read_text()
+
+
+def test_profiling_is_off_by_default(profiles: Path) -> None:
+    assert client.get("/admin/profiling").json() == {
+        "rate": 0.0,
+        "format": "speedscope",
+    }
+    assert profiler.worker_scope() is NOT_PROFILED
+    assert client.get(f"/singles/{ISRC}").status_code == 200
+    profiler.wait()
+    assert list(profiles.iterdir()) == []
+
+
+def test_collapsed_stacks(profiles: Path) -> None:
+    response = client.put("/admin/profiling", json={"rate": 1.0, "format": "collapsed"})
+    assert response.json() == {"rate": 1.0, "format": "collapsed"}
+    assert client.get(f"/singles/{ISRC}").status_code == 200
+    lines = _profile(profiles, "*.collapsed").splitlines()
+    worker = [line for line in lines if line.startswith("[repository worker];")]
+    # The repository call is sampled on its worker thread, from the call down
+    assert any(
+        "test_profiling.SlowRepository.read_single_with_revision" in line
+        for line in worker
+    )
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in worker) >= 5
+
+
+def test_speedscope(profiles: Path) -> None:
+    client.put("/admin/profiling", json={"rate": 1.0})
+    assert client.get(f"/singles/{ISRC}").status_code == 200
+    document = json.loads(_profile(profiles, "*.speedscope.json"))
+    assert document["$schema"] == SPEEDSCOPE_SCHEMA
+    (profile,) = document["profiles"]
+    assert profile["type"] == "sampled"
+    assert profile["name"].startswith("GET /singles/{isrc} (")
+    assert len(profile["samples"]) == len(profile["weights"]) >= 5
+    frames = [frame["name"] for frame in document["shared"]["frames"]]
+    assert "test_profiling.SlowRepository.read_single_with_revision" in frames
+
+
+def test_invalid_settings_are_rejected(profiles: Path) -> None:
+    assert client.put("/admin/profiling", json={"rate": 1.5}).status_code == 422
+    assert client.put("/admin/profiling", json={"format": "pstats"}).status_code == 422
+    assert client.get("/admin/profiling").json()["rate"] == 0.0
+
+
+def test_only_the_newest_profiles_are_kept(
+    profiles: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(profiler, "kept", 2)
+    (profiles / "notes.txt").write_text("Not a profile")
+    client.put("/admin/profiling", json={"rate": 1.0, "format": "collapsed"})
+    written: list[str] = []
+    for _ in range(4):
+        assert client.get(f"/singles/{ISRC}").status_code == 200
+        profiler.wait()
+        written.extend(
+            path.name
+            for path in profiles.glob("*.collapsed")
+            if path.name not in written
+        )
+    assert sorted(path.name for path in profiles.iterdir()) == sorted(
+        [*written[-2:], "notes.txt"]
+    )
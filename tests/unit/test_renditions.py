@@ -0,0 +1,256 @@
+import hashlib
+import io
+import os
+import struct
+import sys
+import threading
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Iterator
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters.artifacts import FileSystemArtifactStore
+from musos_assist.adapters.renditions import FileSystemRenditionCache
+from musos_assist.constants import (
+    ARTIFACT_BLOCK_SIZE,
+    EXAMPLE_SINGLE_DATA,
+    PREVIEW_SECONDS,
+    RENDITION_NOT_FOUND,
+    RENDITION_UNSUPPORTED,
+)
+from musos_assist.domain.models import Artifact, ArtifactUploadRequest
+from musos_assist.routers import get_artifact_store, get_rendition_cache
+
+client = TestClient(app)
+ISRC = EXAMPLE_SINGLE_DATA["isrc"]
+
+
+def _wav(seconds: int, frame: bytes, width: int = 2, rate: int = 44_100) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(len(frame) // width)
+        writer.setsampwidth(width)
+        writer.setframerate(rate)
+        writer.writeframes(frame * (rate * seconds))
+    return buffer.getvalue()
+
+
+def _stored(tmp_path: Path, content: bytes) -> tuple[Artifact, list[str]]:
+    """Lay content out in blocks the way the artifact store does."""
+    sha256 = hashlib.sha256(content).hexdigest()
+    blocks = []
+    for start in range(0, len(content), ARTIFACT_BLOCK_SIZE):
+        block = tmp_path / f"{sha256}-{start}"
+        block.write_bytes(content[start : start + ARTIFACT_BLOCK_SIZE])
+        blocks.append(str(block))
+    artifact = Artifact(
+        isrc=ISRC,
+        name="master.wav",
+        media_type="audio/wav",
+        size=len(content),
+        sha256=sha256,
+    )
+    return artifact, blocks
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Runs renditions in a thread, counting them, and can hold them back."""
+
+    def __init__(self) -> None:
+        super().__init__(max_workers=1)
+        self.submitted = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def submit(
+        self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any
+    ) -> "Future[Any]":
+        self.submitted += 1
+
+        def held() -> Any:
+            self.release.wait()
+            return fn(*args, **kwargs)
+
+        return super().submit(held)
+
+
+@pytest.fixture
+def executor() -> Iterator[CountingExecutor]:
+    executor = CountingExecutor()
+    yield executor
+    executor.shutdown()
+
+
+def _samples(path: str) -> tuple[int, int, int, tuple[int, ...]]:
+    with wave.open(path, "rb") as reader:
+        frames = reader.readframes(reader.getnframes())
+        return (
+            reader.getnchannels(),
+            reader.getframerate(),
+            reader.getnframes(),
+            struct.unpack(f"<{len(frames) // 2}h", frames),
+        )
+
+
+def test_preview_is_trimmed_mono_and_downsampled(
+    tmp_path: Path, executor: CountingExecutor
+) -> None:
+    cache = FileSystemRenditionCache(str(tmp_path / "cache"), executor=executor)
+    # Stereo 16-bit at 44.1 kHz, running past the preview length
+    frame = struct.pack("<hh", 1000, -3000)
+    artifact, blocks = _stored(tmp_path, _wav(PREVIEW_SECONDS + 5, frame))
+    rendition = cache.render(artifact, blocks, "preview").result()
+    assert rendition.media_type == "audio/wav"
+    channels, rate, frames, samples = _samples(rendition.path)
+    assert (channels, rate, frames) == (1, 22_050, 22_050 * PREVIEW_SECONDS)
+    assert set(samples) == {-1000}
+    assert rendition.size == Path(rendition.path).stat().st_size
+
+
+def test_preview_of_24_bit_audio(tmp_path: Path, executor: CountingExecutor) -> None:
+    cache = FileSystemRenditionCache(str(tmp_path / "cache"), executor=executor)
+    frame = (1000 << 8).to_bytes(3, "little", signed=True)
+    artifact, blocks = _stored(tmp_path, _wav(1, frame, width=3, rate=48_000))
+    channels, rate, frames, samples = _samples(
+        cache.render(artifact, blocks, "preview").result().path
+    )
+    assert (channels, rate, frames) == (1, 16_000, 16_000)
+    assert set(samples) == {1000}
+
+
+def test_rendition_errors(tmp_path: Path, executor: CountingExecutor) -> None:
+    cache = FileSystemRenditionCache(str(tmp_path / "cache"), executor=executor)
+    artifact, blocks = _stored(tmp_path, b"not a wav file")
+    with pytest.raises(ValueError, match=RENDITION_NOT_FOUND):
+        cache.render(artifact, blocks, "thumbnail-7")
+    with pytest.raises(ValueError, match=RENDITION_UNSUPPORTED):
+        cache.render(artifact, blocks, "preview").result()
+    # Failures are not cached, and leave nothing behind
+    with pytest.raises(ValueError, match=RENDITION_UNSUPPORTED):
+        cache.render(artifact, blocks, "preview").result()
+    assert executor.submitted == 2
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_thumbnail_without_pillow(
+    tmp_path: Path, executor: CountingExecutor, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(sys.modules, "PIL", None)
+    cache = FileSystemRenditionCache(str(tmp_path / "cache"), executor=executor)
+    artifact, blocks = _stored(tmp_path, b"artwork")
+    with pytest.raises(NotImplementedError):
+        cache.render(artifact, blocks, "thumbnail-128").result()
+
+
+def test_thumbnail(tmp_path: Path, executor: CountingExecutor) -> None:
+    image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    image.new("RGB", (1200, 800), "red").save(buffer, "PNG")
+    cache = FileSystemRenditionCache(str(tmp_path / "cache"), executor=executor)
+    artifact, blocks = _stored(tmp_path, buffer.getvalue())
+    rendition = cache.render(artifact, blocks, "thumbnail-300").result()
+    assert rendition.media_type == "image/jpeg"
+    with image.open(rendition.path) as thumbnail:
+        assert thumbnail.size == (300, 200)
+
+
+def test_concurrent_requests_share_one_rendering(
+    tmp_path: Path, executor: CountingExecutor
+) -> None:
+    cache = FileSystemRenditionCache(str(tmp_path / "cache"), executor=executor)
+    artifact, blocks = _stored(tmp_path, _wav(1, b"\0\0"))
+    executor.release.clear()
+    first = cache.render(artifact, blocks, "preview")
+    second = cache.render(artifact, blocks, "preview")
+    assert first is second
+    executor.release.set()
+    assert (
+        first.result().path == cache.render(artifact, blocks, "preview").result().path
+    )
+    assert executor.submitted == 1
+    # Joining a rendition in progress counts as a hit
+    assert cache.hit_counts() == (2, 1)
+
+
+def test_least_recently_served_renditions_are_evicted(
+    tmp_path: Path, executor: CountingExecutor
+) -> None:
+    root = str(tmp_path / "cache")
+    previews = [_stored(tmp_path, _wav(1, struct.pack("<h", n))) for n in range(3)]
+    cache = FileSystemRenditionCache(root, executor=executor)
+    size = cache.render(*previews[0], "preview").result().size
+    cache = FileSystemRenditionCache(root, max_bytes=size * 2, executor=executor)
+    cache.render(*previews[1], "preview").result()
+    # Serving the first makes the second the least recently served
+    cache.render(*previews[0], "preview").result()
+    cache.render(*previews[2], "preview").result()
+    assert executor.submitted == 3
+    assert len(list(Path(root).iterdir())) == 2
+    # A restarted cache keeps the order, and still has the first
+    cache = FileSystemRenditionCache(root, max_bytes=size * 2, executor=executor)
+    cache.render(*previews[0], "preview").result()
+    assert executor.submitted == 3
+    cache.render(*previews[1], "preview").result()
+    assert executor.submitted == 4
+
+
+def test_pool_is_replaced_after_a_worker_dies(tmp_path: Path) -> None:
+    cache = FileSystemRenditionCache(str(tmp_path / "cache"))
+    frame = struct.pack("<hh", 10, 20)
+    artifact, blocks = _stored(tmp_path, _wav(1, frame))
+    assert cache.render(artifact, blocks, "preview").result().size > 0
+    # A worker exiting abruptly, as one killed by the kernel would
+    with pytest.raises(BrokenProcessPool):
+        cache._pool().submit(os._exit, 1).result()
+    artifact, blocks = _stored(tmp_path, _wav(2, frame))
+    assert cache.render(artifact, blocks, "preview").result().size > 0
+    artifact, blocks = _stored(tmp_path, _wav(3, frame))
+    assert cache.render(artifact, blocks, "preview").result().size > 0
+    cache.close()
+
+
+@pytest.fixture
+def stores(tmp_path: Path) -> Iterator[FileSystemRenditionCache]:
+    """Route requests to an artifact store and rendition cache in tmp_path."""
+    store = FileSystemArtifactStore(str(tmp_path))
+    cache = FileSystemRenditionCache(str(tmp_path / "renditions"))
+    app.dependency_overrides[get_artifact_store] = lambda: store
+    app.dependency_overrides[get_rendition_cache] = lambda: cache
+    content = _wav(1, struct.pack("<hh", 10, 20))
+    upload_id = store.start_upload(
+        ISRC, ArtifactUploadRequest(name="master.wav", size=len(content))
+    ).upload_id
+    writer = store.open_chunk(upload_id, 0)
+    writer.write(content)
+    writer.commit()
+    writer.close()
+    store.complete_upload(upload_id)
+    yield cache
+    cache.close()
+    app.dependency_overrides.pop(get_artifact_store)
+    app.dependency_overrides.pop(get_rendition_cache)
+
+
+def test_rendition_api(stores: FileSystemRenditionCache) -> None:
+    """Render in the real process pool, then serve from the cache."""
+    url = f"/singles/{ISRC}/artifacts/master.wav/renditions"
+    response = client.get(f"{url}/preview")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "audio/wav"
+    with wave.open(io.BytesIO(response.content), "rb") as reader:
+        assert (reader.getnchannels(), reader.getframerate()) == (1, 22_050)
+    etag = response.headers["ETag"]
+    response = client.get(f"{url}/preview", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert client.get(f"{url}/waveform").status_code == 404
+    assert (
+        client.get(
+            f"/singles/{ISRC}/artifacts/other.wav/renditions/preview"
+        ).status_code
+        == 404
+    )
+    # Pillow may not be installed; either way the WAV is no artwork
+    assert client.get(f"{url}/thumbnail-128").status_code in (415, 501)
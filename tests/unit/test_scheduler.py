@@ -0,0 +1,209 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+import pytest
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters.changes import InMemoryChangeFeed
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.adapters.scheduler import HeapReleaseScheduler
+from musos_assist.constants import EXAMPLE_SINGLE_DATA, SCHEDULED_RELEASE_NOT_FOUND
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.routers import get_change_feed, get_release_scheduler
+from musos_assist.routers.scheduling import fire_due, run_scheduler
+
+client = TestClient(app)
+
+NOW = datetime(2030, 6, 1, tzinfo=timezone.utc)
+
+
+def _at(minutes: int) -> datetime:
+    return NOW + timedelta(minutes=minutes)
+
+
+def test_scheduler_takes_actions_as_they_fall_due() -> None:
+    scheduler = HeapReleaseScheduler()
+    assert scheduler.next_due() is None
+    late = scheduler.schedule("US0000000001", "promote", _at(30))
+    early = scheduler.schedule("US0000000001", "publish", _at(10))
+    other = scheduler.schedule("US0000000002", "publish", _at(20))
+    # Naive times are taken to be UTC
+    naive = scheduler.schedule("US0000000002", "promote", datetime(2030, 6, 1, 0, 40))
+    assert naive.due == _at(40)
+    assert scheduler.list_scheduled("US0000000001") == [early, late]
+    assert scheduler.next_due() == _at(10)
+    assert scheduler.take_due(_at(5), 10) == []
+    assert scheduler.take_due(_at(30), 2) == [early, other]
+    assert scheduler.take_due(_at(30), 10) == [late]
+    assert scheduler.list_scheduled("US0000000001") == []
+    scheduler.complete([early.id, other.id, late.id])
+    assert scheduler.next_due() == _at(40)
+
+
+def test_scheduler_cancels_actions() -> None:
+    scheduler = HeapReleaseScheduler()
+    releases = [
+        scheduler.schedule("US0000000001", "publish", _at(minutes))
+        for minutes in range(10)
+    ]
+    with pytest.raises(ValueError, match=SCHEDULED_RELEASE_NOT_FOUND):
+        scheduler.cancel("US0000000002", releases[0].id)
+    for release in releases[:8]:
+        scheduler.cancel("US0000000001", release.id)
+    with pytest.raises(ValueError, match=SCHEDULED_RELEASE_NOT_FOUND):
+        scheduler.cancel("US0000000001", releases[0].id)
+    # Rebuilt once the cancelled outnumbered the rest
+    assert len(scheduler._heap) < 8
+    assert scheduler.next_due() == _at(8)
+    assert scheduler.take_due(_at(60), 10) == releases[8:]
+
+
+def test_scheduler_survives_restarts(tmp_path: str) -> None:
+    path = os.path.join(tmp_path, "schedule", "schedule.log")
+    scheduler = HeapReleaseScheduler(path, fsync=False)
+    fired = scheduler.schedule("US0000000001", "publish", _at(1))
+    taken = scheduler.schedule("US0000000001", "promote", _at(2))
+    cancelled = scheduler.schedule("US0000000002", "publish", _at(3))
+    waiting = scheduler.schedule("US0000000002", "promote", _at(4))
+    scheduler.take_due(_at(2), 10)
+    scheduler.complete([fired.id])
+    scheduler.cancel("US0000000002", cancelled.id)
+    scheduler.close()
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write('S\t{"id": "torn')
+    restarted = HeapReleaseScheduler(path, fsync=False)
+    # Taken but not completed: due again
+    assert restarted.take_due(_at(10), 10) == [taken, waiting]
+    restarted.close()
+    with open(path, encoding="utf-8") as handle:
+        assert handle.read().endswith("\n")
+
+
+def test_scheduler_compacts_its_log(tmp_path: str) -> None:
+    path = os.path.join(tmp_path, "schedule.log")
+    scheduler = HeapReleaseScheduler(path, fsync=False, compact_after=10)
+    kept = scheduler.schedule("US0000000001", "promote", _at(60))
+    for minutes in range(20):
+        scheduler.schedule("US0000000002", "publish", _at(minutes))
+    scheduler.complete([release.id for release in scheduler.take_due(_at(30), 100)])
+    scheduler.close()
+    with open(path, encoding="utf-8") as handle:
+        assert len(handle.readlines()) < 10
+    assert HeapReleaseScheduler(path).list_scheduled("US0000000001") == [kept]
+
+
+def _single(isrc: str) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": isrc}
+    )
+
+
+def test_fire_due_announces_actions() -> None:
+    scheduler = HeapReleaseScheduler()
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    repository.create_single(_single("US0000000001"))
+    feed = InMemoryChangeFeed()
+    start = feed.latest_sequence()
+    scheduler.schedule("US0000000001", "publish", _at(1))
+    scheduler.schedule("US0000000009", "publish", _at(2))
+    scheduler.schedule("US0000000001", "promote", _at(3))
+    scheduler.schedule("US0000000001", "promote", _at(60))
+    assert fire_due(scheduler, repository, feed, _at(10)) == 3
+    changes = feed.changes_after(start, 10)
+    # The action on a single no longer in the catalogue is dropped
+    assert [(change.kind, change.isrc) for change in changes] == [
+        ("published", "US0000000001"),
+        ("promoted", "US0000000001"),
+    ]
+    assert changes[0].single == repository.read_single("US0000000001")
+    assert scheduler._taken == {}
+    assert fire_due(scheduler, repository, feed, _at(10)) == 0
+
+
+def test_run_scheduler_fires_on_time() -> None:
+    scheduler = HeapReleaseScheduler()
+    repository = ConcurrentInMemoryMusicSingleReleaseRepository()
+    repository.create_single(_single("US0000000001"))
+    feed = InMemoryChangeFeed()
+    start = feed.latest_sequence()
+
+    async def scenario() -> float:
+        now = datetime.now(timezone.utc)
+        scheduler.schedule("US0000000001", "publish", now + timedelta(seconds=0.1))
+        due = now + timedelta(seconds=0.2)
+        scheduler.schedule("US0000000001", "promote", due)
+        # Polls far less often than actions fall due: sleeps until each is
+        task = asyncio.create_task(run_scheduler(scheduler, repository, feed, 60))
+        while feed.latest_sequence() < start + 2:
+            await feed.wait_after(feed.latest_sequence(), 10)
+        task.cancel()
+        return (datetime.now(timezone.utc) - due).total_seconds()
+
+    assert asyncio.run(scenario()) < 1
+    assert [change.kind for change in feed.changes_after(start, 10)] == [
+        "published",
+        "promoted",
+    ]
+
+
+@pytest.fixture
+def scheduler(
+    fresh_repository: ConcurrentInMemoryMusicSingleReleaseRepository,
+) -> Iterator[HeapReleaseScheduler]:
+    """Route requests to a fresh scheduler, and an empty repository."""
+    scheduler = HeapReleaseScheduler()
+    app.dependency_overrides[get_release_scheduler] = lambda: scheduler
+    yield scheduler
+
+
+def test_schedule_api(scheduler: HeapReleaseScheduler) -> None:
+    isrc = EXAMPLE_SINGLE_DATA["isrc"]
+    response = client.post(f"/singles/{isrc}/schedule", json={"action": "publish"})
+    assert response.status_code == 404
+    client.post("/singles/", json=EXAMPLE_SINGLE_DATA)
+    response = client.post(f"/singles/{isrc}/schedule", json={"action": "publish"})
+    assert response.status_code == 201
+    published = response.json()
+    # Defaults to the start of the release date
+    release_date = EXAMPLE_SINGLE_DATA["release_date"]
+    assert datetime.fromisoformat(published["due"]) == datetime.fromisoformat(
+        f"{release_date}T00:00:00+00:00"
+    )
+    response = client.post(
+        f"/singles/{isrc}/schedule",
+        json={"action": "promote", "due": "1999-12-31T23:00:00-02:00"},
+    )
+    promoted = response.json()
+    assert promoted["due"].startswith("2000-01-01T01:00:00")
+    body = client.get(f"/singles/{isrc}/schedule").json()
+    assert [release["id"] for release in body] == [promoted["id"], published["id"]]
+    assert (
+        client.post(f"/singles/{isrc}/schedule", json={"action": "retire"}).status_code
+        == 422
+    )
+    response = client.delete(f"/singles/{isrc}/schedule/{promoted['id']}")
+    assert response.status_code == 204
+    response = client.delete(f"/singles/{isrc}/schedule/{promoted['id']}")
+    assert response.status_code == 404
+    assert response.json()["detail"] == SCHEDULED_RELEASE_NOT_FOUND
+    assert len(client.get(f"/singles/{isrc}/schedule").json()) == 1
+
+
+def test_app_fires_actions_on_the_overridden_repository(
+    scheduler: HeapReleaseScheduler,
+    fresh_repository: ConcurrentInMemoryMusicSingleReleaseRepository,
+) -> None:
+    feed = InMemoryChangeFeed()
+    app.dependency_overrides[get_change_feed] = lambda: feed
+    fresh_repository.create_single(_single("US0000000001"))
+    start = feed.latest_sequence()
+    scheduler.schedule("US0000000001", "publish", datetime.now(timezone.utc))
+    with TestClient(app):
+        deadline = time.monotonic() + 5
+        while feed.latest_sequence() == start and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert [change.isrc for change in feed.changes_after(start, 10)] == ["US0000000001"]
@@ -0,0 +1,52 @@
+from musos_assist.adapters.search import FullTextIndex, tokenize
+from musos_assist.constants import EXAMPLE_SINGLE_DATA
+from musos_assist.domain.models import MusicSingleRelease
+
+
+def _single(isrc: str, **changes: object) -> MusicSingleRelease:
+    return MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy()).model_copy(
+        update={"isrc": isrc, "lyrics": None, "notes": None, **changes}
+    )
+
+
+def _isrcs(index: FullTextIndex, text: str, limit: int = 10) -> list[str]:
+    return [isrc for isrc, _ in index.search(text, limit)]
+
+
+def test_tokenize_folds_case_and_accents() -> None:
+    assert tokenize("Déjà Vu, the REMIX!") == ["deja", "vu", "the", "remix"]
+    assert tokenize("  ,; ") == []
+
+
+def test_title_matches_outrank_lyrics_matches() -> None:
+    index = FullTextIndex()
+    index.add(_single("US0000000001", title="Quiet", lyrics="midnight rain"))
+    index.add(_single("US0000000002", title="Midnight", lyrics="quiet streets"))
+    assert _isrcs(index, "midnight") == ["US0000000002", "US0000000001"]
+    assert _isrcs(index, "quiet") == ["US0000000001", "US0000000002"]
+
+
+def test_every_word_must_match_and_the_last_as_a_prefix() -> None:
+    index = FullTextIndex()
+    index.add(_single("US0000000001", title="Summer Nights"))
+    index.add(_single("US0000000002", title="Summer Rain"))
+    index.add(_single("US0000000003", title="Winter Nightfall"))
+    assert sorted(_isrcs(index, "summer")) == ["US0000000001", "US0000000002"]
+    assert _isrcs(index, "summer nig") == ["US0000000001"]
+    assert sorted(_isrcs(index, "night")) == ["US0000000001", "US0000000003"]
+    assert _isrcs(index, "nig summer") == []
+    assert _isrcs(index, "") == []
+    assert _isrcs(index, "my band summer", limit=1) != []
+
+
+def test_removal_keeps_the_index_in_step() -> None:
+    index = FullTextIndex()
+    first = _single("US0000000001", title="Lullaby", notes="acoustic")
+    index.add(first)
+    index.add(_single("US0000000002", title="Lullaby Reprise"))
+    index.remove(first)
+    assert _isrcs(index, "lull") == ["US0000000002"]
+    assert _isrcs(index, "acoust") == []
+    index.add(first)
+    assert _isrcs(index, "acoust") == ["US0000000001"]
+    assert len(index) == 2
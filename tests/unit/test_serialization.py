@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, List
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_model_field
+from musos_assist import app
+from musos_assist.adapters import InMemoryMusicSingleReleaseRepository
+from musos_assist.constants import EXAMPLE_SINGLE_DATA
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.routers import serialization, serialized_singles
+
+client = TestClient(app)
+
+CATALOGUE = 500
+
+
+def _load(repository: InMemoryMusicSingleReleaseRepository) -> list[str]:
+    template = MusicSingleRelease(**EXAMPLE_SINGLE_DATA.copy())
+    singles = [
+        template.model_copy(update={"isrc": f"USX9P24{n:05d}", "title": f"Song {n}"})
+        for n in range(CATALOGUE)
+    ]
+    repository.create_singles(singles)
+    return [single.isrc for single in singles]
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_fast_path_renders_the_same_json(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    fast: bool,
+) -> None:
+    monkeypatch.setattr(serialization, "FAST_SERIALIZATION", fast)
+    isrcs = _load(fresh_repository)
+    expected = [
+        single.model_dump(mode="json") for single in fresh_repository.list_singles()
+    ]
+
+    response = client.get("/singles/", params={"limit": 2})
+    assert response.json() == expected[:2]
+    assert response.headers["X-Next-Cursor"] == isrcs[1]
+    assert "ETag" in response.headers
+    response = client.get(f"/singles/{isrcs[0]}")
+    assert response.json() == expected[0]
+    assert response.headers["content-type"] == "application/json"
+
+    data: dict[str, Any] = EXAMPLE_SINGLE_DATA.copy()
+    data["isrc"] = "USX9P2499999"
+    response = client.post("/singles/", json=data)
+    assert response.status_code == 201
+    assert response.json()["isrc"] == "USX9P2499999"
+
+
+def test_renderers_emit_identical_bytes(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+) -> None:
+    _load(fresh_repository)
+    singles = fresh_repository.list_singles()[:5]
+    singles.append(singles[0].model_copy(update={"title": 'Café ☕ "Live"'}))
+    for single in singles:
+        assert serialization.render_single(
+            single
+        ) == serialization.render_single_validated(single)
+
+    # Lists still go through FastAPI's response-model pass when not opted in
+    field = create_model_field(
+        name="response", type_=List[MusicSingleRelease], mode="serialization"
+    )
+
+    async def render_default() -> bytes:
+        content = await serialize_response(field=field, response_content=singles)
+        return bytes(JSONResponse(content).body)
+
+    assert asyncio.run(render_default()) == serialization.render_singles(singles)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_repeat_reads_are_served_from_rendered_bodies(
+    fresh_repository: InMemoryMusicSingleReleaseRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    fast: bool,
+) -> None:
+    monkeypatch.setattr(serialization, "FAST_SERIALIZATION", fast)
+    isrc = _load(fresh_repository)[0]
+    serialized_singles.discard(isrc)
+    hits = serialized_singles.hits
+    bodies = [client.get(f"/singles/{isrc}").content for _ in range(3)]
+    assert serialized_singles.hits == hits + 2
+    assert bodies[0] == bodies[1] == bodies[2]
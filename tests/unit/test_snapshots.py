@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+from typing import Iterator
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+from musos_assist import app
+from musos_assist.adapters.concurrent import (
+    ConcurrentInMemoryMusicSingleReleaseRepository,
+)
+from musos_assist.adapters.snapshots import (
+    POINTER,
+    POINTER_FILE,
+    CatalogueSnapshot,
+    SnapshotFollower,
+    SnapshotMusicSingleReleaseRepository,
+    SnapshotPublisher,
+    snapshot_name,
+    write_snapshot,
+)
+from musos_assist.constants import (
+    EXAMPLE_SINGLE_DATA,
+    NEXT_CURSOR_HEADER,
+    OWNER_UNAVAILABLE,
+    SINGLE_NOT_FOUND,
+    SNAPSHOT_VERSION_HEADER,
+)
+from musos_assist.domain.models import MusicSingleRelease
+from musos_assist.routers import get_repository
+from musos_assist.routers.snapshots import SnapshotReaderApp, SnapshotVersionMiddleware
+
+
+def _single(n: int) -> MusicSingleRelease:
+    return MusicSingleRelease(
+        **{**EXAMPLE_SINGLE_DATA, "isrc": f"US{n:010d}", "title": f"Song {n}"}
+    )
+
+
+def test_snapshot_finds_and_pages_rows(tmp_path: str) -> None:
+    path = os.path.join(tmp_path, snapshot_name(7))
+    rows = [(f"US{n:010d}", f'{{"n":{n}}}'.encode(), n + 1) for n in range(0, 10, 2)]
+    write_snapshot(path, 7, rows, catalogue_revision=11)
+    snapshot = CatalogueSnapshot(path)
+    assert snapshot.version == 7 and len(snapshot) == 5
+    assert snapshot.catalogue_revision == 11
+    found = snapshot.find("US0000000004")
+    assert found is not None
+    assert bytes(found[0]) == b'{"n":4}' and found[1] == 5
+    assert snapshot.find("US0000000005") is None
+    assert snapshot.find("ZZ9999999999") is None
+    page, last = snapshot.page("US0000000003", 2)
+    assert [bytes(row) for row in page] == [b'{"n":4}', b'{"n":6}']
+    assert last == "US0000000006"
+    page, last = snapshot.page(last, None)
+    assert [bytes(row) for row in page] == [b'{"n":8}'] and last == "US0000000008"
+    assert snapshot.page(last, 5) == ([], None)
+
+
+def test_publisher_publishes_every_write(tmp_path: str) -> None:
+    catalogue = ConcurrentInMemoryMusicSingleReleaseRepository()
+    catalogue.create_singles([_single(1), _single(2)])
+    publisher = SnapshotPublisher(str(tmp_path), keep=2)
+    repository = SnapshotMusicSingleReleaseRepository(catalogue, publisher)
+    follower = SnapshotFollower(str(tmp_path))
+    assert publisher.wait_published(publisher.wanted_version(), timeout=5)
+    snapshot = follower.current()
+    assert snapshot is not None and len(snapshot) == 2
+    versions = [snapshot.version]
+    repository.delete_single("US0000000001")
+    repository.create_single(_single(3))
+    renamed = _single(2).model_copy(update={"isrc": "US0000000004"})
+    repository.update_single("US0000000002", renamed)
+    assert publisher.wait_published(publisher.wanted_version(), timeout=5)
+    snapshot = follower.current()
+    assert snapshot is not None and snapshot.version > versions[0]
+    rows, _ = snapshot.page(None, None)
+    assert [json.loads(bytes(row))["isrc"] for row in rows] == [
+        "US0000000003",
+        "US0000000004",
+    ]
+    # Snapshots already published are left alone, but only the latest are kept
+    assert snapshot.version == follower.latest_version() == publisher.wanted_version()
+    snapshots = [name for name in os.listdir(tmp_path) if name.endswith(".snap")]
+    assert len(snapshots) == 2
+
+
+@pytest.fixture
+def owner(
+    tmp_path: str, fresh_repository: ConcurrentInMemoryMusicSingleReleaseRepository
+) -> Iterator[str]:
+    """Serve the app publishing snapshots of an empty repository on a socket."""
+    publisher = SnapshotPublisher(str(tmp_path))
+    repository = SnapshotMusicSingleReleaseRepository(fresh_repository, publisher)
+    app.dependency_overrides[get_repository] = lambda: repository
+    socket = os.path.join(tmp_path, "owner.sock")
+    server = uvicorn.Server(
+        uvicorn.Config(
+            SnapshotVersionMiddleware(app, publisher),
+            uds=socket,
+            lifespan="off",
+            log_level="warning",
+        )
+    )
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    publisher.wait_published(publisher.wanted_version(), timeout=5)
+    yield str(tmp_path)
+    server.should_exit = True
+    thread.join()
+
+
+def test_readers_see_writes_forwarded_to_owner(owner: str) -> None:
+    reader = TestClient(
+        SnapshotReaderApp(SnapshotFollower(owner), os.path.join(owner, "owner.sock"))
+    )
+    isrc = EXAMPLE_SINGLE_DATA["isrc"]
+    response = reader.get(f"/singles/{isrc}")
+    assert response.status_code == 404
+    assert response.json()["detail"] == SINGLE_NOT_FOUND
+    response = reader.post("/singles/", json=EXAMPLE_SINGLE_DATA)
+    assert response.status_code == 201
+    version = int(response.headers[SNAPSHOT_VERSION_HEADER])
+    # Another reader, answering from the snapshot with the write
+    other = TestClient(
+        SnapshotReaderApp(SnapshotFollower(owner), os.path.join(owner, "owner.sock"))
+    )
+    response = other.get(f"/singles/{isrc}")
+    assert response.status_code == 200
+    assert int(response.headers[SNAPSHOT_VERSION_HEADER]) >= version
+    assert MusicSingleRelease(**response.json()).isrc == isrc
+    for n in range(3):
+        other.post("/singles/", json=_single(n).model_dump(mode="json"))
+    response = reader.get("/singles/", params={"limit": 2})
+    assert [single["isrc"] for single in response.json()] == [
+        "US0000000000",
+        "US0000000001",
+    ]
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = reader.get("/singles/", params={"after": cursor, "limit": 2})
+    assert [single["isrc"] for single in response.json()] == [
+        "US0000000002",
+        isrc,
+    ]
+    # Pages after a cursor are as long as the owner's
+    response = reader.get("/singles/", params={"after": "US0000000000"})
+    assert (
+        response.json()
+        == TestClient(app).get("/singles/", params={"after": "US0000000000"}).json()
+    )
+    assert [single["isrc"] for single in response.json()] == [
+        "US0000000001",
+        "US0000000002",
+        isrc,
+    ]
+    # Filtered reads are forwarded
+    response = reader.get("/singles/", params={"genre": "Indie"})
+    assert SNAPSHOT_VERSION_HEADER not in response.headers
+    assert len(response.json()) == 4
+    assert reader.delete(f"/singles/{isrc}").status_code == 204
+    assert other.get(f"/singles/{isrc}").status_code == 404
+
+
+def test_readers_answer_conditional_reads_as_the_owner(owner: str) -> None:
+    reader = TestClient(
+        SnapshotReaderApp(SnapshotFollower(owner), os.path.join(owner, "owner.sock"))
+    )
+    isrc = EXAMPLE_SINGLE_DATA["isrc"]
+    created = reader.post("/singles/", json=EXAMPLE_SINGLE_DATA)
+    owned = TestClient(app)
+    for path in (f"/singles/{isrc}", "/singles/"):
+        response = reader.get(path)
+        assert response.status_code == 200
+        assert SNAPSHOT_VERSION_HEADER in response.headers
+        etag = response.headers["ETag"]
+        assert etag == owned.get(path).headers["ETag"]
+        response = reader.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 304 and response.content == b""
+        assert response.headers["ETag"] == etag
+        assert SNAPSHOT_VERSION_HEADER in response.headers
+    # A write changes the ETags readers give, once its snapshot is published
+    updated = {**created.json(), "title": "Renamed"}
+    assert reader.put(f"/singles/{isrc}", json=updated).status_code == 200
+    response = reader.get(f"/singles/{isrc}", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["title"] == "Renamed"
+    assert response.headers["ETag"] == owned.get(f"/singles/{isrc}").headers["ETag"]
+
+
+def test_reader_forwards_conditional_reads_without_revisions(tmp_path: str) -> None:
+    rows = [(EXAMPLE_SINGLE_DATA["isrc"], b"{}", 0)]
+    write_snapshot(os.path.join(tmp_path, snapshot_name(1)), 1, rows)
+    with open(os.path.join(tmp_path, POINTER_FILE), "wb") as handle:
+        handle.write(POINTER.pack(1))
+    reader = TestClient(
+        SnapshotReaderApp(
+            SnapshotFollower(str(tmp_path)), os.path.join(tmp_path, "owner.sock")
+        )
+    )
+    path = f"/singles/{EXAMPLE_SINGLE_DATA['isrc']}"
+    response = reader.get(path)
+    assert response.status_code == 200 and "ETag" not in response.headers
+    response = reader.get(path, headers={"If-None-Match": '"1"'})
+    assert response.status_code == 502
+    response = reader.get("/singles/", headers={"If-None-Match": '"1"'})
+    assert response.status_code == 502
+
+
+def test_reader_without_owner(tmp_path: str) -> None:
+    reader = TestClient(
+        SnapshotReaderApp(
+            SnapshotFollower(str(tmp_path)), os.path.join(tmp_path, "owner.sock")
+        )
+    )
+    response = reader.get(f"/singles/{EXAMPLE_SINGLE_DATA['isrc']}")
+    assert response.status_code == 502
+    assert response.json()["detail"] == OWNER_UNAVAILABLE